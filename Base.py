@@ -34,10 +34,12 @@ Cleans up and converts raw data files & organizes files associated
 with dive.
 """
 
+import concurrent.futures
 import cProfile
 import functools
 import glob
 import math
+import multiprocessing
 import os
 import pathlib
 import pdb
@@ -67,6 +69,7 @@ import BaseNetCDF
 import BaseNetwork
 import BaseOpts
 import BasePlot
+import BaseProfile
 import Bogue
 import CalibConst
 import CommLog
@@ -87,6 +90,9 @@ import Ver65
 from BaseLog import (
     BaseLogger,
     log_alerts,
+    log_capture_replay,
+    log_capture_start,
+    log_capture_stop,
     log_conversion_alert,
     log_conversion_alerts,
     log_critical,
@@ -311,6 +317,8 @@ def process_dive_selftest(
     """
     ret_val = 0
     force_data_processing = False
+    # --sensor_extension_budget applies per dive
+    Sensors.reset_extension_budget()
 
     log_debug(f"process_dive_selftest file list {pprint.pformat(dive_files)}")
 
@@ -365,10 +373,30 @@ def process_dive_selftest(
                         if ret_val == 0:
                             ret_val = 1
 
+    # Files from different loggers are independent of each other, so with
+    # base_opts.logger_jobs > 1 each logger's files are converted in a process pool
+    # after the seaglider's own files
+    logger_groups = {}
+    if getattr(base_opts, "logger_jobs", 1) > 1:
+        for base, file_group in dive_files_dict.items():
+            fc = FileMgr.FileCode(base, instrument_id)
+            if fc.is_logger() and (
+                check_process_file_group(base, file_group, complete_files_dict)
+                or (fc.is_data() and force_data_processing)
+            ):
+                logger_groups.setdefault(fc.logger_prefix(), []).append(
+                    (base, file_group)
+                )
+        if len(logger_groups) < 2:
+            logger_groups = {}
+    pooled_bases = {base for groups in logger_groups.values() for base, _ in groups}
+
     # Process what's left remainder
     for base, file_group in list(dive_files_dict.items()):
         # if(complete_files.count(base) == 0):
         fc = FileMgr.FileCode(base, instrument_id)
+        if base in pooled_bases:
+            continue
         if check_process_file_group(base, file_group, complete_files_dict) or (
             fc.is_data() and force_data_processing
         ):
@@ -406,10 +434,180 @@ def process_dive_selftest(
                     if ret_val == 0:
                         ret_val = 1
 
+    for base, pfg_retval in process_logger_file_groups(
+        base_opts,
+        logger_groups,
+        fragment_size_dict,
+        calib_consts,
+        instrument_id,
+        comm_log,
+        incomplete_files,
+    ):
+        if pfg_retval is None:
+            # Exception already reported by the worker
+            ret_val = -1
+        elif pfg_retval:
+            log_error(
+                f"Could not process {FileMgr.FileCode(base, instrument_id).base_name()} - skipping"
+            )
+            ret_val = -1
+        else:
+            complete_files_dict[base] = time.time()
+            del dive_files_dict[base]  # All processed
+            if ret_val == 0:
+                ret_val = 1
+
     log_debug("process_dive_selftest(%d) = %d" % (dive_num, ret_val))
     return ret_val
 
 
+def _processed_file_lists():
+    """The global processed file lists process_file_group() appends to"""
+    return (
+        processed_eng_and_log_files,
+        processed_selftest_eng_and_log_files,
+        processed_other_files,
+        processed_logger_eng_files,
+        processed_logger_other_files,
+    )
+
+
+# Worker process state for process_logger_file_groups(), set by the pool initializer
+_logger_pool_args = None
+
+
+def _logger_pool_init(*args):
+    """Process pool initializer for process_logger_file_groups()"""
+    global _logger_pool_args
+    _logger_pool_args = args
+
+
+def _logger_pool_task(groups):
+    """Runs process_file_group() over one logger's file groups in a pool worker
+
+    Returns:
+        tuple
+            list of (base, process_file_group() return value - None if it raised)
+            entries added to each of _processed_file_lists()
+            entries added to processed_logger_payload_files
+            files added to incomplete_files
+            sensor extension timing counters accumulated by this task
+            captured log output
+    """
+    base_opts, fragment_size_dict, calib_consts, instrument_id, comm_log = (
+        _logger_pool_args
+    )
+    log_capture_start()
+    # A forked worker inherits the parent's budget window as it was when the pool
+    # started.  Start a fresh one - a logger's extension only runs on that logger's
+    # files, so this matches the window it would have had in a serial run.
+    Sensors.reset_extension_budget()
+    start_stats = Sensors.extension_stats()
+    start_lens = [len(x) for x in _processed_file_lists()]
+    payload_lens = {k: len(v) for k, v in processed_logger_payload_files.items()}
+    incomplete_files = []
+    results = []
+    for base, file_group in groups:
+        try:
+            pfg_retval = process_file_group(
+                base_opts,
+                file_group,
+                fragment_size_dict,
+                0,
+                calib_consts,
+                instrument_id,
+                comm_log,
+                incomplete_files,
+            )
+        except Exception:
+            log_error(
+                f"Could not process {FileMgr.FileCode(base, instrument_id).base_name()} - skipping",
+                "exc",
+            )
+            pfg_retval = None
+        results.append((base, pfg_retval))
+    return (
+        results,
+        [x[n:] for x, n in zip(_processed_file_lists(), start_lens, strict=True)],
+        {
+            k: v[payload_lens.get(k, 0) :]
+            for k, v in processed_logger_payload_files.items()
+        },
+        incomplete_files,
+        {
+            k: {
+                counter: value - start_stats.get(k, {}).get(counter, 0)
+                for counter, value in v.items()
+            }
+            for k, v in Sensors.extension_stats().items()
+        },
+        log_capture_stop(),
+    )
+
+
+def process_logger_file_groups(
+    base_opts,
+    logger_groups,
+    fragment_size_dict,
+    calib_consts,
+    instrument_id,
+    comm_log,
+    incomplete_files,
+):
+    """Processes the file groups of several loggers, one pool worker per logger
+
+    Each logger's groups are processed in order by a single worker.  The worker's
+    additions to the processed file lists, its log output and its sensor extension
+    timings are merged back into this process, one logger at a time, in
+    logger_groups order.
+
+    Input:
+        logger_groups - {logger_prefix: [(base, file_group), ...]}
+
+    Yields:
+        (base, process_file_group() return value - None if it raised) for each group
+    """
+    if not logger_groups:
+        return
+    jobs = min(base_opts.logger_jobs, len(logger_groups))
+    log_info(f"Processing files from {len(logger_groups)} loggers with {jobs} jobs")
+    # fork, so the workers inherit the sensor extensions set up by the caller
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=jobs,
+        mp_context=multiprocessing.get_context("fork"),
+        initializer=_logger_pool_init,
+        initargs=(base_opts, fragment_size_dict, calib_consts, instrument_id, comm_log),
+    ) as executor:
+        futures = {
+            logger_prefix: executor.submit(_logger_pool_task, groups)
+            for logger_prefix, groups in logger_groups.items()
+        }
+        for logger_prefix, future in futures.items():
+            try:
+                (
+                    results,
+                    added_files,
+                    added_payload_files,
+                    added_incomplete_files,
+                    stats,
+                    captured,
+                ) = future.result()
+            except Exception:
+                log_error(f"Worker failed processing {logger_prefix} files", "exc")
+                results = [(base, None) for base, _ in logger_groups[logger_prefix]]
+            else:
+                log_capture_replay(captured)
+                for file_list, added in zip(
+                    _processed_file_lists(), added_files, strict=True
+                ):
+                    file_list.extend(added)
+                for k, v in added_payload_files.items():
+                    processed_logger_payload_files.setdefault(k, []).extend(v)
+                incomplete_files.extend(added_incomplete_files)
+                Sensors.merge_extension_stats(stats)
+            yield from results
+
+
 def select_fragments(file_group, instrument_id):
     """Given a sorted list of fragments, possibly containing PARTIAL files,
     return a list which contains only one file for each fragment slot.
@@ -1411,6 +1609,12 @@ def signal_handler_abort_processing(signum, frame):
         stop_processing_event.set()
 
 
+# Where ProcessProgress writes its run profiles, relative to the mission directory
+profile_dir_name = "profiles"
+# Number of run profiles (and associated cProfile files) to keep
+profile_keep_count = 50
+
+
 class ProcessProgress:
     # TODO - add in comm.log data - dive_number, call_cycle, calls_made for stats building
     def __init__(self, base_opts):
@@ -1436,6 +1640,19 @@ class ProcessProgress:
         }
         self.times = {k: {"start": 0, "stop": 0} for k in self.section_times}
 
+        # Nested timings (stage -> dive -> plot/extension) - see BaseProfile.py
+        self.profiler = None
+        self.section_spans = {}
+        if getattr(base_opts, "profile_spans", False):
+            cprofile_patterns = [
+                x.strip()
+                for x in (
+                    getattr(base_opts, "profile_span_cprofile", None) or ""
+                ).split(",")
+                if x.strip()
+            ]
+            self.profiler = BaseProfile.start_profiler("Base.py", cprofile_patterns)
+
     def update_base_opts(self, base_opts):
         self.glider_id = base_opts.instrument_id
         self.job_id = base_opts.job_id
@@ -1449,6 +1666,33 @@ class ProcessProgress:
         for k, v in self.times.items():
             log_info(f"{k}:{v['stop']-v['start']:.3f}")
 
+        if self.profiler is None:
+            return
+        BaseProfile.stop_profiler()
+        profile_d = self.profiler.to_dict()
+        # Report the slowest spans below the stage level
+        flat = BaseProfile.flatten_profile(profile_d)
+        inner = [
+            (span_d["wall"], path)
+            for path, span_d in flat.items()
+            if path.count("/") > 1 and span_d["wall"] is not None
+        ]
+        for wall, path in sorted(inner, reverse=True)[:5]:
+            log_info(f"{path}:{wall:.3f}")
+
+        profiles_dir = self.mission_dir.joinpath(profile_dir_name)
+        profile_file_name = profiles_dir.joinpath(
+            f"base_{time.strftime('%Y%m%d_%H%M%S', time.gmtime(self.profiler.root.start))}.json"
+        )
+        if self.profiler.write(str(profile_file_name)):
+            log_info(f"Wrote run profile to {profile_file_name}")
+        # Keep only the most recent runs
+        for old_file in sorted(profiles_dir.glob("base_*"))[:-profile_keep_count]:
+            try:
+                old_file.unlink()
+            except OSError:
+                log_warning(f"Could not remove {old_file}", "exc")
+
     def process_progress(
         self, section: str, action: str, send: bool = True, reason: str | None = None
     ) -> None:
@@ -1465,6 +1709,14 @@ class ProcessProgress:
             except KeyError:
                 log_error(f"Uknown section:{section}", "exc")
 
+        if self.profiler is not None:
+            if action == "start":
+                self.section_spans[section] = self.profiler.start(section, "stage")
+            elif action == "stop" and section in self.section_spans:
+                self.profiler.stop(self.section_spans.pop(section))
+            elif action == "skip":
+                self.profiler.add(section, "stage", 0.0, 0.0, skipped=reason)
+
         if send:
             msg = {
                 "section": section,
@@ -2039,9 +2291,11 @@ def main(cmdline_args: list[str] = sys.argv[1:]) -> int:
             BaseNetwork.make_netcdf_network_files(
                 network_files_to_process, processed_other_files
             )
-            for ncf in processed_other_files:
-                if ".ncdf" in ncf:
-                    BaseDB.loadDB(base_opts, ncf, run_dive_plots=False)
+            BaseDB.loadDBFiles(
+                base_opts,
+                [ncf for ncf in processed_other_files if ".ncdf" in ncf],
+                run_dive_plots=False,
+            )
 
         # Process regular files
         dives_to_profile = []  # A list of basenames to profile
@@ -2104,17 +2358,18 @@ def main(cmdline_args: list[str] = sys.argv[1:]) -> int:
             # log_info("logger_eng_files = %s" % logger_eng_files[dive_to_profile])
 
             try:
-                (retval, nc_dive_file_name) = MakeDiveProfiles.make_dive_profile(
-                    True,
-                    dive_num,
-                    eng_file_name,
-                    log_file_name,
-                    sg_calib_file_name,
-                    base_opts,
-                    nc_dive_file_name,
-                    # logger_ct_eng_files=logger_ct_eng_files[dive_to_profile],
-                    logger_eng_files=logger_eng_files[dive_to_profile],
-                )
+                with BaseProfile.span(os.path.basename(head), "dive", dive=dive_num):
+                    (retval, nc_dive_file_name) = MakeDiveProfiles.make_dive_profile(
+                        True,
+                        dive_num,
+                        eng_file_name,
+                        log_file_name,
+                        sg_calib_file_name,
+                        base_opts,
+                        nc_dive_file_name,
+                        # logger_ct_eng_files=logger_ct_eng_files[dive_to_profile],
+                        logger_eng_files=logger_eng_files[dive_to_profile],
+                    )
             except KeyboardInterrupt:
                 log_error(
                     "MakeDiveProfiles caught a keyboard exception - bailing out", "exc"
@@ -2353,11 +2608,10 @@ def main(cmdline_args: list[str] = sys.argv[1:]) -> int:
             except Exception:
                 log_error("Failed to rebuild mission sqlite db", "exc")
         else:
-            for ncf in nc_files_created:
-                try:
-                    BaseDB.loadDB(base_opts, ncf, run_dive_plots=False)
-                except Exception:
-                    log_error(f"Failed to add {ncf} to mission sqlite db", "exc")
+            try:
+                BaseDB.loadDBFiles(base_opts, nc_files_created, run_dive_plots=False)
+            except Exception:
+                log_error("Failed to add netcdf files to mission sqlite db", "exc")
             log_info("netcdf load to db done")
         po.process_progress("update_db", "stop")
     else:
@@ -3152,6 +3406,7 @@ def main(cmdline_args: list[str] = sys.argv[1:]) -> int:
     Utils.cleanup_lock_file(base_opts, base_lockfile_name)
     po.process_progress("notifications", "stop", send=False)
     po.write_stats()
+    Sensors.log_extension_stats()
 
     # looked at processed_other_files list to decide if we should be more
     # granular about what is completed
@@ -52,6 +52,7 @@ import pandas as pd
 import BaseOpts
 import BaseOptsType
 import BasePlot
+import BaseProfile
 import CalibConst
 import CommLog
 import parms
@@ -141,11 +142,171 @@ def insertColumn(dive, cur, col, val, db_type):
             val = 'NULL'
         cur.execute(f"UPDATE dives SET {col} = {val} WHERE dive={dive};")
 
+def setColumn(row, col, val, db_type):
+    """Stage a column value for writeDiveRow - sqlite column names are case
+    insensitive, so the row is keyed on the lower case name.  The first type
+    seen for a column wins, the last value does, as with repeated insertColumn calls"""
+    key = col.lower()
+    if key in row:
+        row[key] = (row[key][0], val, row[key][2])
+    else:
+        row[key] = (col, val, db_type)
+
+def rowValue(row, col):
+    """Fetch a staged value as a float, treating missing and NaN values (NULL
+    once written) as errors"""
+    val = numpy.float64(row[col.lower()][1])
+    if numpy.isnan(val):
+        raise ValueError(f"{col} is NULL")
+    return val
+
+def writeDiveRow(dive, cur, row):
+    """Replace the dives row for dive with the staged columns - any missing
+    columns are added in one pass and the row is written with a single INSERT"""
+    existing = { x[1].lower() for x in cur.execute("PRAGMA table_info(dives)").fetchall() }
+
+    cols = []
+    vals = []
+    for key, (col, val, db_type) in row.items():
+        if key not in existing:
+            if not addColumn(cur, col, db_type):
+                continue
+            existing.add(key)
+
+        if db_type == "TEXT":
+            val = str(val)
+        elif math.isnan(val):
+            val = None
+        elif db_type == "INTEGER":
+            val = int(val)
+        else:
+            val = float(val)
+
+        cols.append(col)
+        vals.append(val)
+
+    cur.execute("DELETE FROM dives WHERE dive=?;", (dive,))
+    cur.execute(
+        f"INSERT INTO dives(dive{''.join(',' + c for c in cols)}) VALUES(?{',?' * len(cols)});",
+        [dive] + vals,
+    )
+
 
 def checkTableExists(cur, table):
     cur.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{table}'")
     return cur.fetchone() is not None
 
+def createDiveIndexes(cur):
+    """Index the dive number on the dives and gc tables - every per-dive update
+    and mission plot query selects on it"""
+    for table in ("dives", "gc"):
+        if checkTableExists(cur, table):
+            cur.execute(f"CREATE INDEX IF NOT EXISTS {table}_dive_idx ON {table}(dive);")
+
+# Column caches for the dives table, keyed on id() of the connection they serve.
+# Each holds the dive column, the column names and any data columns fetched so far,
+# valid for the table version they were read at (see diveTableVersion)
+dive_column_caches = {}
+
+def diveTableVersion(con):
+    """A token that changes whenever the database is written - data_version tracks
+    other connections, total_changes this one and schema_version catches ALTER TABLE"""
+    cur = con.cursor()
+    data_version = cur.execute("PRAGMA data_version").fetchone()[0]
+    schema_version = cur.execute("PRAGMA schema_version").fetchone()[0]
+    cur.close()
+    return (data_version, schema_version, con.total_changes)
+
+@contextlib.contextmanager
+def diveColumnCache(con):
+    """Serve fetchDiveColumns calls on con from an in-memory column cache for the
+    duration of the block.  Nested blocks share the outermost cache"""
+    key = id(con)
+    if key in dive_column_caches:
+        yield dive_column_caches[key]
+        return
+
+    cache = {"version": None, "dive": None, "names": None, "columns": {}}
+    dive_column_caches[key] = cache
+    try:
+        yield cache
+    finally:
+        dive_column_caches.pop(key, None)
+
+def validDiveColumnCache(con):
+    """Return the cache registered for con, emptied if the table has changed since it was filled"""
+    cache = dive_column_caches.get(id(con))
+    if cache is None:
+        return None
+
+    version = diveTableVersion(con)
+    if cache["version"] != version:
+        cache["version"] = version
+        cache["dive"] = None
+        cache["names"] = None
+        cache["columns"].clear()
+    return cache
+
+def noteDiveColumnsWritten(con, columns, version):
+    """Called after a write to columns that started at table version version - drops
+    just those columns from the cache, rather than the whole of it, when nothing else
+    has written in between"""
+    cache = dive_column_caches.get(id(con))
+    if cache is None or cache["version"] != version:
+        return
+
+    for col in columns:
+        cache["columns"].pop(col.lower(), None)
+    cache["names"] = None
+    cache["version"] = diveTableVersion(con)
+
+def diveColumnNames(con):
+    """Return the column names of the dives table"""
+    cache = validDiveColumnCache(con)
+    if cache is not None and cache["names"] is not None:
+        return list(cache["names"])
+
+    names = [x[1] for x in con.cursor().execute("PRAGMA table_info(dives)").fetchall()]
+    if cache is not None:
+        cache["names"] = names
+    return list(names)
+
+def fetchDiveColumns(con, columns, dive=None):
+    """Return a DataFrame of the dive number and the requested dives table columns,
+    ordered by dive and limited to dives <= dive if given.
+
+    Inside a diveColumnCache block, only columns not already cached are read from
+    the database - in one query - so a set of plots pulling overlapping columns
+    touches the table once.  A missing column raises pandas.errors.DatabaseError,
+    as the equivalent SELECT would."""
+    columns = [c for c in columns if c.lower() != "dive"]
+    existing = {x.lower() for x in diveColumnNames(con)}
+    # diveColumnNames has just validated any registered cache
+    cache = dive_column_caches.get(id(con), {"dive": None, "columns": {}})
+    for col in columns:
+        if col.lower() not in existing:
+            raise pd.errors.DatabaseError(f"no such column: {col}")
+
+    missing = list(dict.fromkeys(c.lower() for c in columns if c.lower() not in cache["columns"]))
+    if cache["dive"] is None or missing:
+        df = pd.read_sql_query(
+            f"SELECT dive{''.join(',' + c for c in missing)} FROM dives ORDER BY dive ASC, rowid ASC",
+            con,
+        )
+        df.columns = ["dive"] + missing
+        cache["dive"] = df["dive"].to_numpy()
+        for col in missing:
+            cache["columns"][col] = df[col].to_numpy()
+
+    data = {"dive": cache["dive"]}
+    for col in columns:
+        data[col] = cache["columns"][col.lower()]
+    df = pd.DataFrame(data, copy=True)
+
+    if dive is not None:
+        df = df[df["dive"] <= dive].reset_index(drop=True)
+    return df
+
 def processGC(dive, cur, nci):
     # cur.execute("CREATE TABLE IF NOT EXISTS gc(idx INTEGER PRIMARY KEY AUTOINCREMENT,dive INT,st_secs FLOAT,depth FLOAT,ob_vertv FLOAT,end_secs FLOAT,flags INT,pitch_ctl FLOAT,pitch_secs FLOAT,pitch_i FLOAT,pitch_ad FLOAT,pitch_rate FLOAT,roll_ctl FLOAT,roll_secs FLOAT,roll_i FLOAT,roll_ad FLOAT,roll_rate FLOAT,vbd_ctl FLOAT,vbd_secs FLOAT,vbd_i FLOAT,vbd_ad FLOAT,vbd_rate FLOAT,vbd_eff FLOAT,vbd_pot1_ad FLOAT,vbd_pot2_ad,pitch_errors INT,roll_errors INT,vbd_errors INT,pitch_volts FLOAT,roll_volts FLOAT,vbd_volts FLOAT);")
 
@@ -285,8 +446,9 @@ def loadFileToDB(base_opts, cur, filename, con, run_dive_plots=False):
         return
 
     dive = int(nci.variables["log_DIVE"].getValue())
-    cur.execute(f"DELETE FROM dives WHERE dive={dive};")
-    cur.execute(f"INSERT INTO dives(dive) VALUES({dive});")
+
+    # Column values are staged here and written as a single row by writeDiveRow
+    row = {}
 
     for v in list(nci.variables.keys()):
         if not nci.variables[v].dimensions:
@@ -297,7 +459,7 @@ def loadFileToDB(base_opts, cur, filename, con, run_dive_plots=False):
                     val = float(nci.variables[v].getValue())
                 except ValueError:
                     continue
-                insertColumn(dive, cur, v,val , "FLOAT")
+                setColumn(row, v,val , "FLOAT")
         elif len(nci.variables[v].dimensions) == 1 and nci.variables[v].dimensions[0] == 'gps_info' and '_'.join(v.split('_')[2:]) in gpsVars:
             for i in range(0,nci.dimensions['gps_info'].size):
                 if i in (0, 1):
@@ -305,7 +467,7 @@ def loadFileToDB(base_opts, cur, filename, con, run_dive_plots=False):
                 else:
                     name = v
 
-                insertColumn(dive, cur, name, nci.variables[v][i], "FLOAT")
+                setColumn(row, name, nci.variables[v][i], "FLOAT")
 
     # this appears to do nothing
     if 'log_24V_AH' in nci.variables:
@@ -313,31 +475,29 @@ def loadFileToDB(base_opts, cur, filename, con, run_dive_plots=False):
 
     if 'depth' in nci.variables:
         dep_mx = numpy.nanmax(nci.variables["depth"][:])
-        insertColumn(dive, cur, "max_depth", dep_mx, "FLOAT")
+        setColumn(row, "max_depth", dep_mx, "FLOAT")
     elif 'eng_depth' in nci.variables:
         dep_mx = numpy.nanmax(nci.variables["eng_depth"][:])/100
-        insertColumn(dive, cur, "max_depth", dep_mx, "FLOAT")
+        setColumn(row, "max_depth", dep_mx, "FLOAT")
 
     # Last state time is begin surface
     if "gc_state_secs" in nci.variables:
-        insertColumn(
-            dive,
-            cur,
+        setColumn(
+            row,
             "time_seconds_diving",
             nci.variables["gc_state_secs"][-1] - nci.start_time,
             "FLOAT",
         )
     if hasattr(nci, "start_time"):
-        insertColumn(
-            dive,
-            cur,
+        setColumn(
+            row,
             "time_seconds_on_surface",
             nci.start_time - nci.variables["log_gps_time"][0],
             "FLOAT",
         )
 
     if "start_of_climb_time" in nci.variables:
-        insertColumn(dive, cur, "start_of_climb_time", nci.variables["start_of_climb_time"].getValue(), "FLOAT")
+        setColumn(row, "start_of_climb_time", nci.variables["start_of_climb_time"].getValue(), "FLOAT")
         i = numpy.where(
             nci.variables["eng_elaps_t"][:]
             < nci.variables["start_of_climb_time"].getValue()
@@ -351,8 +511,8 @@ def loadFileToDB(base_opts, cur, filename, con, run_dive_plots=False):
         )
         pi_clm = numpy.nanmean(nci.variables["eng_pitchAng"][i])
         # ro_clm = numpy.nanmean(nci.variables["eng_rollAng"][i])
-        insertColumn(dive, cur, "pitch_dive", pi_div, "FLOAT")
-        insertColumn(dive, cur, "pitch_climb", pi_clm, "FLOAT")
+        setColumn(row, "pitch_dive", pi_div, "FLOAT")
+        setColumn(row, "pitch_climb", pi_clm, "FLOAT")
 
     errors_line = nci.variables["log_ERRORS"][:].tobytes().decode("utf-8").split(",")
     if len(errors_line) == 16:
@@ -424,21 +584,21 @@ def loadFileToDB(base_opts, cur, filename, con, run_dive_plots=False):
             ] = errors_line
 
     errors = sum(list(map(int, extractStr(nci.variables["log_ERRORS"]).split(','))))
-    insertColumn(dive, cur, "error_count", errors, "INTEGER")
+    setColumn(row, "error_count", errors, "INTEGER")
 
     [minSpeed, maxSpeed] = list(
         map(float, extractStr(nci.variables["log_SPEED_LIMITS"]).split(","))
     )
-    insertColumn(dive, cur, "log_speed_min", minSpeed, "FLOAT")
-    insertColumn(dive, cur, "log_speed_max", maxSpeed, "FLOAT")
+    setColumn(row, "log_speed_min", minSpeed, "FLOAT")
+    setColumn(row, "log_speed_max", maxSpeed, "FLOAT")
 
-    insertColumn(dive, cur, "log_TGT_NAME", extractStr(nci.variables["log_TGT_NAME"]), "TEXT")
+    setColumn(row, "log_TGT_NAME", extractStr(nci.variables["log_TGT_NAME"]), "TEXT")
 
     [lat, lon] = list(
         map(float, extractStr(nci.variables["log_TGT_LATLONG"]).split(","))
     )
-    insertColumn(dive, cur, "log_TGT_LAT", ddmm2dd(lat), "FLOAT")
-    insertColumn(dive, cur, "log_TGT_LON", ddmm2dd(lon), "FLOAT")
+    setColumn(row, "log_TGT_LAT", ddmm2dd(lat), "FLOAT")
+    setColumn(row, "log_TGT_LON", ddmm2dd(lon), "FLOAT")
 
     [v10, ah10] = list(
         map(float, extractStr(nci.variables["log_10V_AH"]).split(","))
@@ -470,34 +630,36 @@ def loadFileToDB(base_opts, cur, filename, con, run_dive_plots=False):
         [sdcap, sdfree] = list(
             map(int, nci.variables["log_SDSIZE"][:].tobytes().decode("utf-8").split(","))
         )
-        insertColumn(dive, cur, "SD_free", sdfree, "INTEGER")
+        setColumn(row, "SD_free", sdfree, "INTEGER")
     if "log_SDFILEDIR" in nci.variables:
         [sdfiles, sddirs] = list(
             map(int, nci.variables["log_SDFILEDIR"][:].tobytes().decode("utf-8").split(","))
         )
-        insertColumn(dive, cur, "SD_files", sdfiles, "INTEGER")
-        insertColumn(dive, cur, "SD_dirs", sddirs, "INTEGER")
+        setColumn(row, "SD_files", sdfiles, "INTEGER")
+        setColumn(row, "SD_dirs", sddirs, "INTEGER")
 
-    insertColumn(dive, cur, "batt_volts_10V", v10, "FLOAT")
-    insertColumn(dive, cur, "batt_volts_24V", v24, "FLOAT")
+    setColumn(row, "batt_volts_10V", v10, "FLOAT")
+    setColumn(row, "batt_volts_24V", v24, "FLOAT")
 
-    insertColumn(dive, cur, "batt_ah_10V", ah10, "FLOAT")
-    insertColumn(dive, cur, "batt_ah_24V", ah24, "FLOAT")
+    setColumn(row, "batt_ah_10V", ah10, "FLOAT")
+    setColumn(row, "batt_ah_24V", ah24, "FLOAT")
 
-    insertColumn(dive, cur, "batt_capacity_24V", avail24, "FLOAT")
-    insertColumn(dive, cur, "batt_capacity_10V", avail10, "FLOAT")
-    insertColumn(
-        dive, cur, "batt_Ahr_cap_10V", nci.variables["log_AH0_10V"].getValue(), "FLOAT"
+    setColumn(row, "batt_capacity_24V", avail24, "FLOAT")
+    setColumn(row, "batt_capacity_10V", avail10, "FLOAT")
+    setColumn(
+        row, "batt_Ahr_cap_10V", nci.variables["log_AH0_10V"].getValue(), "FLOAT"
     )
     if "log_AH0_24V" in nci.variables:
-        insertColumn(
-            dive, cur, "batt_Ahr_cap_24V", nci.variables["log_AH0_24V"].getValue(), "FLOAT"
+        setColumn(
+            row, "batt_Ahr_cap_24V", nci.variables["log_AH0_24V"].getValue(), "FLOAT"
         )
     try:
-        data = pd.read_sql_query(
-                    f"SELECT dive,max_depth,GPS_north_displacement_m,GPS_east_displacement_m,log_speed_max,log_D_TGT,log_T_DIVE,log_TGT_LAT,log_TGT_LON,log_gps2_lat,log_gps2_lon,log_gps_lat,log_gps_lon FROM dives WHERE dive={dive} ORDER BY dive DESC LIMIT 1",
-                    con,
-                ).loc[0,:]
+        data = {
+            col: rowValue(row, col)
+            for col in ("max_depth", "GPS_north_displacement_m", "GPS_east_displacement_m",
+                        "log_speed_max", "log_D_TGT", "log_T_DIVE", "log_TGT_LAT", "log_TGT_LON",
+                        "log_gps2_lat", "log_gps2_lon", "log_gps_lat", "log_gps_lon")
+        }
 
         dog = math.sqrt(math.pow(data['GPS_north_displacement_m'], 2) +
                         math.pow(data['GPS_east_displacement_m'], 2))
@@ -517,10 +679,10 @@ def loadFileToDB(base_opts, cur, filename, con, run_dive_plots=False):
 
     # print(f"{dive}: OG:{dog:.1f} MG:{dmg:.1f} TG:{dtg2:.1f} {dogEff}")
 
-    insertColumn(dive, cur, "distance_over_ground", dog, "FLOAT")
-    insertColumn(dive, cur, "distance_made_good", dmg, "FLOAT")
-    insertColumn(dive, cur, "distance_to_goal", dtg2, "FLOAT")
-    insertColumn(dive, cur, "dog_efficiency", dogEff, "FLOAT")
+    setColumn(row, "distance_over_ground", dog, "FLOAT")
+    setColumn(row, "distance_made_good", dmg, "FLOAT")
+    setColumn(row, "distance_to_goal", dtg2, "FLOAT")
+    setColumn(row, "dog_efficiency", dogEff, "FLOAT")
 
     batt_kJ_used_10V = 0.0
     batt_kJ_used_24V = 0.0
@@ -548,11 +710,11 @@ def loadFileToDB(base_opts, cur, filename, con, run_dive_plots=False):
             batt_kJ_used_10V = batt_ah_used_10V * v10 * 3600.0 / 1000.0
             batt_kJ_used_24V = batt_ah_used_24V * (v24 if v24 else v10) * 3600.0 / 1000.0
 
-    insertColumn(dive, cur, "batt_ah_used_10V", batt_ah_used_10V, "FLOAT")
-    insertColumn(dive, cur, "batt_ah_used_24V", batt_ah_used_24V, "FLOAT")
+    setColumn(row, "batt_ah_used_10V", batt_ah_used_10V, "FLOAT")
+    setColumn(row, "batt_ah_used_24V", batt_ah_used_24V, "FLOAT")
 
-    insertColumn(dive, cur, "batt_kJ_used_10V", batt_kJ_used_10V, "FLOAT")
-    insertColumn(dive, cur, "batt_kJ_used_24V", batt_kJ_used_24V, "FLOAT")
+    setColumn(row, "batt_kJ_used_10V", batt_kJ_used_10V, "FLOAT")
+    setColumn(row, "batt_kJ_used_24V", batt_kJ_used_24V, "FLOAT")
 
     if "log_FG_AHR_10Vo" in nci.variables:
         if "log_AH0_24V" in nci.variables and nci.variables["log_AH0_24V"].getValue() == 0:
@@ -594,19 +756,19 @@ def loadFileToDB(base_opts, cur, filename, con, run_dive_plots=False):
                 nci.variables["log_FG_AHR_24Vo"].getValue()
                 - nci.variables["log_FG_AHR_24V"].getValue()
             )
-            insertColumn(dive, cur, "fg_ah_used_24V", fg_24V_AH, "FLOAT")
+            setColumn(row, "fg_ah_used_24V", fg_24V_AH, "FLOAT")
             
             fg_24V_kJ = fg_24V_AH * (v24 if v24 else v10) * 3600.0 / 1000.0
-            insertColumn(dive, cur, "fg_kJ_used_24V", fg_24V_kJ, "FLOAT")
-            insertColumn(dive, cur, "fg_batt_capacity_24V", fg_avail24, "FLOAT")
+            setColumn(row, "fg_kJ_used_24V", fg_24V_kJ, "FLOAT")
+            setColumn(row, "fg_batt_capacity_24V", fg_avail24, "FLOAT")
 
-        insertColumn(dive, cur, "fg_ah_used_10V", fg_10V_AH, "FLOAT")
+        setColumn(row, "fg_ah_used_10V", fg_10V_AH, "FLOAT")
 
-        insertColumn(dive, cur, "fg_batt_capacity_10V", fg_avail10, "FLOAT")
+        setColumn(row, "fg_batt_capacity_10V", fg_avail10, "FLOAT")
 
         fg_10V_kJ = fg_10V_AH * v10 * 3600.0 / 1000.0
 
-        insertColumn(dive, cur, "fg_kJ_used_10V", fg_10V_kJ, "FLOAT")
+        setColumn(row, "fg_kJ_used_10V", fg_10V_kJ, "FLOAT")
 
     mhead_line = extractStr(nci.variables["log_MHEAD_RNG_PITCHd_Wd"]).split(",")
 
@@ -620,8 +782,8 @@ def loadFileToDB(base_opts, cur, filename, con, run_dive_plots=False):
     # if len(mhead_line) > 6:
     #     pressureNoise = float(mhead_line[6])
 
-    insertColumn(dive, cur, "mag_heading_to_target", mhead, "FLOAT")
-    insertColumn(dive, cur, "meters_to_target", rng, "FLOAT")
+    setColumn(row, "mag_heading_to_target", mhead, "FLOAT")
+    setColumn(row, "meters_to_target", rng, "FLOAT")
     [tgt_la, tgt_lo] = list(
         map(
             float,
@@ -629,12 +791,12 @@ def loadFileToDB(base_opts, cur, filename, con, run_dive_plots=False):
         )
     )
 
-    insertColumn(dive, cur, "target_lat", tgt_la, "FLOAT")
-    insertColumn(dive, cur, "target_lon", tgt_lo, "FLOAT")
+    setColumn(row, "target_lat", tgt_la, "FLOAT")
+    setColumn(row, "target_lon", tgt_lo, "FLOAT")
 
     nm = extractStr(nci.variables["log_TGT_NAME"])
-    insertColumn(dive, cur, "target_name", nm, "TEXT")
-    insertColumn(dive, cur, "log_SENSORS", extractStr(nci.variables["log_SENSORS"]), "TEXT")
+    setColumn(row, "target_name", nm, "TEXT")
+    setColumn(row, "log_SENSORS", extractStr(nci.variables["log_SENSORS"]), "TEXT")
 
     # Fails here
     try:
@@ -660,23 +822,20 @@ def loadFileToDB(base_opts, cur, filename, con, run_dive_plots=False):
             for ii, pwr_device in enumerate(pwr_devices):
                 if pwr_device == "nil":
                     continue
-                insertColumn(
-                    dive,
-                    cur,
+                setColumn(
+                    row,
                     f"{pwr_type.lower()}_{pwr_device}_secs",
                     pwr_devices_secs[ii],
                     "FLOAT",
                 )
-                insertColumn(
-                    dive,
-                    cur,
+                setColumn(
+                    row,
                     f"{pwr_type.lower()}_{pwr_device}_amps",
                     pwr_devices_mamps[ii] / 1000.0,
                     "FLOAT",
                 )
-                insertColumn(
-                    dive,
-                    cur,
+                setColumn(
+                    row,
                     f"{pwr_type.lower()}_{pwr_device}_joules",
                     v10 * (pwr_devices_mamps[ii] / 1000.0) * pwr_devices_secs[ii],
                     "FLOAT",
@@ -696,11 +855,11 @@ def loadFileToDB(base_opts, cur, filename, con, run_dive_plots=False):
             glider_implied_volmax = (
                 mass / rho0 + (vbd_min_cnts - glider_implied_c_vbd) * vbd_cnts_per_cc
             )
-            insertColumn(
-                dive, cur, "log_IMPLIED_C_VBD", glider_implied_c_vbd, "FLOAT"
+            setColumn(
+                row, "log_IMPLIED_C_VBD", glider_implied_c_vbd, "FLOAT"
             )
-            insertColumn(
-                dive, cur, "implied_volmax_glider", glider_implied_volmax, "FLOAT"
+            setColumn(
+                row, "implied_volmax_glider", glider_implied_volmax, "FLOAT"
             )
 
     except Exception:
@@ -720,9 +879,11 @@ def loadFileToDB(base_opts, cur, filename, con, run_dive_plots=False):
     data = pd.read_sql_query(f"SELECT roll_i,roll_secs,roll_volts FROM gc WHERE dive={dive}", con)
     roll_J = numpy.sum(data['roll_i'][:] * data['roll_volts'][:] * data['roll_secs'][:])
 
-    insertColumn(dive, cur, "GC_pitch_joules", pitch_J, "FLOAT")
-    insertColumn(dive, cur, "GC_VBD_joules", VBD_J, "FLOAT")
-    insertColumn(dive, cur, "GC_roll_joules", roll_J, "FLOAT")
+    setColumn(row, "GC_pitch_joules", pitch_J, "FLOAT")
+    setColumn(row, "GC_VBD_joules", VBD_J, "FLOAT")
+    setColumn(row, "GC_roll_joules", roll_J, "FLOAT")
+
+    writeDiveRow(dive, cur, row)
 
     updateDBFromFM(base_opts, [filename], cur)
     updateDBFromFileExistence(base_opts, [filename], con)
@@ -997,6 +1158,8 @@ def prepDivesGC(base_opts):
 
     cur.execute("CREATE TABLE IF NOT EXISTS chat(idx INTEGER PRIMARY KEY AUTOINCREMENT, timestamp REAL, user TEXT, message TEXT, attachment BLOB, mime TEXT);")
 
+    createDiveIndexes(cur)
+
     cur.close()
 
     try:
@@ -1009,7 +1172,7 @@ def prepDivesGC(base_opts):
 
     log_info("prepDivesGC db closed")
 
-currentSchemaVersion = 2
+currentSchemaVersion = 3
 
 def checkSchema(base_opts, con):
     if con is None:
@@ -1054,8 +1217,10 @@ def checkSchema(base_opts, con):
                 cols = [ x[1] for x in mycon.cursor().execute('PRAGMA table_info(files)').fetchall() ]
                 if 'cycle' not in cols:
                     mycon.cursor().execute("ALTER TABLE files ADD COLUMN cycle INTEGER;")
-            # elif i == 2:
+            elif i == 2: # step from 2 to 3, index dives and gc on dive
+                createDiveIndexes(mycon.cursor())
             # elif i == 3:
+            # elif i == 4:
         
         mycon.cursor().execute(f'PRAGMA user_version = {currentSchemaVersion}')
     except Exception:
@@ -1080,8 +1245,6 @@ def rebuildDivesGC(base_opts, ext):
     con = Utils.open_mission_database(base_opts)
     log_info("rebuildDivesGC db opened")
 
-    cur = con.cursor()
-
     # patt = path + "/p%03d????.nc" % sg
     patt = os.path.join(
         base_opts.mission_dir, f"p{base_opts.instrument_id:03d}????.{ext}"
@@ -1090,24 +1253,77 @@ def rebuildDivesGC(base_opts, ext):
     for filename in glob.glob(patt):
         ncfs.append(filename)
     ncfs = sorted(ncfs)
-    for filename in ncfs:
-        print(filename)
-        if "ncdf" in filename:
-            loadNetworkFileToDB(base_opts, cur, filename, con)
-        else:
-            loadFileToDB(base_opts, cur, filename, con, run_dive_plots=True)
 
+    bulkLoadFilesToDB(base_opts, con, ncfs, run_dive_plots=True)
+
+    con.close()
+
+    log_info("rebuildDivesGC db closed")
+
+def bulkLoadFilesToDB(base_opts, con, filenames, run_dive_plots=False):
+    """Load many netcdf files into the database in a single transaction.
+
+    The database is switched to WAL mode for the duration of the load and
+    restored (after a checkpoint) at the end, so readers opening the database
+    immutable - vis.py - only ever need the main file.  Each file is loaded
+    under its own savepoint, so a failure drops just that file's changes.
+    """
+    con.commit()
+    journal_mode = con.execute("PRAGMA journal_mode;").fetchone()[0]
+    if journal_mode != "wal":
+        try:
+            con.execute("PRAGMA journal_mode=WAL;")
+        except sqlite3.OperationalError as e:
+            log_warning(f"Could not switch to WAL mode for bulk load ({e})")
+
+    cur = con.cursor()
+    cur.execute("BEGIN;")
+    for filename in filenames:
+        log_debug(f"Bulk loading {filename}")
+        cur.execute("SAVEPOINT load_file;")
+        try:
+            with BaseProfile.span(os.path.basename(filename), "file"):
+                if "ncdf" in filename:
+                    loadNetworkFileToDB(base_opts, cur, filename, con)
+                else:
+                    loadFileToDB(base_opts, cur, filename, con, run_dive_plots=run_dive_plots)
+        except Exception:
+            if DEBUG_PDB:
+                _, _, traceb = sys.exc_info()
+                traceback.print_exc()
+                pdb.post_mortem(traceb)
+            log_error(f"Failed to add {filename} to mission sqlite db", "exc")
+            cur.execute("ROLLBACK TO load_file;")
+        cur.execute("RELEASE load_file;")
     cur.close()
 
     try:
         con.commit()
     except Exception as e:
         con.rollback()
-        log_error(f"Failed commit, rebuildDivesGC {e}", "exc", alert="DB_LOCKED")
+        log_error(f"Failed commit, bulkLoadFilesToDB {e}", "exc", alert="DB_LOCKED")
 
-    con.close()
+    if journal_mode != "wal":
+        try:
+            con.execute("PRAGMA wal_checkpoint(TRUNCATE);")
+            con.execute(f"PRAGMA journal_mode={journal_mode};")
+        except sqlite3.OperationalError as e:
+            log_warning(f"Could not restore journal_mode={journal_mode} after bulk load ({e})")
+
+def loadDBFiles(base_opts, filenames, run_dive_plots=True):
+    """Load a list of netcdf files into the database in one bulk transaction"""
+    if not filenames:
+        return
 
-    log_info("rebuildDivesGC db closed")
+    con = Utils.open_mission_database(base_opts)
+    log_info(f"loadDBFiles db opened - adding {len(filenames)} files")
+
+    checkSchema(base_opts, con)
+
+    bulkLoadFilesToDB(base_opts, con, filenames, run_dive_plots=run_dive_plots)
+
+    log_info("loadDBFiles db closed")
+    con.close()
 
 def loadDB(base_opts, filename, run_dive_plots=True):
     """Load a single netcdf file into the database"""
@@ -1200,10 +1416,12 @@ def addValToDB(base_opts, dive_num, var_n, val, con=None):
     status = 0
 
     try:
+        version = diveTableVersion(mycon) if id(mycon) in dive_column_caches else None
         cur = mycon.cursor()
         log_debug(f"Loading {var_n}:{val} dive:{dive_num} to db")
         insertColumn(dive_num, cur, var_n, val, db_type)
         cur.close()
+        noteDiveColumnsWritten(mycon, [var_n], version)
     except Exception:
         if DEBUG_PDB:
             _, _, traceb = sys.exc_info()
@@ -1585,8 +1803,7 @@ def main():
 
     if base_opts.subparser_name == "addncfs":
         if base_opts.netcdf_files:
-            for ncf in base_opts.netcdf_files:
-                loadDB(base_opts, ncf)
+            loadDBFiles(base_opts, base_opts.netcdf_files)
         else:
             rebuildDivesGC(base_opts, "nc" if not base_opts.network else "ncdf")
 
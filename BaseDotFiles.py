@@ -67,6 +67,7 @@ with warnings.catch_warnings():
 import BaseGZip
 import BaseOpts
 import BaseOptsType
+import BaseProfile
 import CommLog
 import Globals
 import Utils
@@ -1566,17 +1567,20 @@ def process_extensions(
                             else:
                                 try:
                                     # Invoke the extension
-                                    extension_ret_val = extension_module.main(
-                                        base_opts=base_opts,
-                                        sg_calib_file_name=sg_calib_file_name,
-                                        dive_nc_file_names=dive_nc_file_names,
-                                        nc_files_created=nc_files_created,
-                                        processed_other_files=processed_other_files,
-                                        known_mailer_tags=known_mailer_tags,
-                                        known_ftp_tags=known_ftp_tags,
-                                        processed_file_names=processed_file_names,
-                                        **kwargs,
-                                    )
+                                    with BaseProfile.span(
+                                        extension_module_name, "extension"
+                                    ):
+                                        extension_ret_val = extension_module.main(
+                                            base_opts=base_opts,
+                                            sg_calib_file_name=sg_calib_file_name,
+                                            dive_nc_file_names=dive_nc_file_names,
+                                            nc_files_created=nc_files_created,
+                                            processed_other_files=processed_other_files,
+                                            known_mailer_tags=known_mailer_tags,
+                                            known_ftp_tags=known_ftp_tags,
+                                            processed_file_names=processed_file_names,
+                                            **kwargs,
+                                        )
                                 except Exception:
                                     log_error(
                                         "Extension %s raised an exception"
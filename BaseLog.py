@@ -287,6 +287,92 @@ def log_conversion_alert(key: str, msg: str, resend: str) -> None:
     conversion_alerts_d[key].append((msg, resend))
 
 
+class _RecordCaptureHandler(logging.Handler):
+    """Collects log records, flattened so they can be pickled back to a parent process"""
+
+    def __init__(self) -> None:
+        super().__init__(logging.DEBUG)
+        self.records: list[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        self.records.append(record)
+
+
+# (logger, handlers, propagate) for each logger diverted by log_capture_start()
+_capture_saved: list[tuple[logging.Logger, list[logging.Handler], bool]] = []
+_capture_handler: _RecordCaptureHandler | None = None
+
+
+def log_capture_start() -> None:
+    """Divert all logging in this (worker) process into a list of records
+
+    Used by process pool workers - the records and any alerts raised are returned by
+    log_capture_stop() and handed to log_capture_replay() in the parent process
+    """
+    global _capture_handler
+    log_capture_stop()
+    if BaseLogger.log is None:
+        return
+    _capture_handler = _RecordCaptureHandler()
+    for logger in (BaseLogger.log, logging.getLogger("py.warnings")):
+        _capture_saved.append((logger, logger.handlers[:], logger.propagate))
+        for handler in logger.handlers[:]:
+            logger.removeHandler(handler)
+        logger.addHandler(_capture_handler)
+        logger.propagate = False
+    BaseLogger.alerts_d = {}
+    BaseLogger.conversion_alerts_d = {}
+
+
+def log_capture_stop() -> (
+    tuple[
+        list[logging.LogRecord], dict[str, list[str]], dict[str, list[tuple[str, str]]]
+    ]
+):
+    """Restore logging diverted by log_capture_start()
+
+    Returns:
+        (records, alerts, conversion alerts) logged since log_capture_start()
+    """
+    global _capture_handler
+    if _capture_handler is None:
+        return ([], {}, {})
+    for logger, handlers, propagate in _capture_saved:
+        logger.removeHandler(_capture_handler)
+        for handler in handlers:
+            logger.addHandler(handler)
+        logger.propagate = propagate
+    _capture_saved.clear()
+    records = _capture_handler.records
+    _capture_handler = None
+    return (records, BaseLogger.alerts_d, BaseLogger.conversion_alerts_d)
+
+
+def log_capture_replay(
+    captured: tuple[
+        list[logging.LogRecord],
+        dict[str, list[str]],
+        dict[str, list[tuple[str, str]]],
+    ],
+) -> None:
+    """Feed the output of a worker's log_capture_stop() through this process's logging"""
+    records, alerts_d, conversion_alerts_d = captured
+    for record in records:
+        logger = logging.getLogger(record.name)
+        if BaseLogger.log is not None and record.name != "py.warnings":
+            logger = BaseLogger.log
+        logger.handle(record)
+    for key, values in alerts_d.items():
+        BaseLogger.alerts_d.setdefault(key, []).extend(values)
+    for key, values in conversion_alerts_d.items():
+        BaseLogger.conversion_alerts_d.setdefault(key, []).extend(values)
+
+
 def _log_alert(key: str, s: str) -> None:
     """Log a genreral alert"""
     if not isinstance(key, str):
@@ -3678,6 +3678,99 @@ def reset_nc_char_dims():
     nc_char_dims = {}
 
 
+# Write profiles - per file type compression and chunking used by create_nc_var()
+#
+# complevel - zlib compression level (0 disables compression)
+# shuffle - apply the HDF5 byte shuffle filter before compressing
+# chunking - chunk shape policy
+#   None - leave it to the netCDF library
+#   "whole" - one chunk per variable (capped at nc_chunk_max_elements); per-dive
+#             files are read a whole variable at a time
+#   "dive_range" - chunks along the leading dimension sized so reading a range of
+#             dives (vis.py, ExtractTimeseries) touches few chunks: nc_chunk_profiles
+#             rows of the (profile, depth) mission profile variables and
+#             nc_chunk_dive_range_elements points of the timeseries variables
+#
+# "archive" is the historical zlib level 9 for everything
+nc_write_file_types = ("dive", "timeseries", "profile")
+nc_write_profiles = {
+    "archive": {
+        file_type: {"complevel": 9, "shuffle": True, "chunking": None}
+        for file_type in nc_write_file_types
+    },
+    "balanced": {
+        "dive": {"complevel": 4, "shuffle": True, "chunking": "whole"},
+        "timeseries": {"complevel": 4, "shuffle": True, "chunking": "dive_range"},
+        "profile": {"complevel": 4, "shuffle": True, "chunking": "dive_range"},
+    },
+    "fast": {
+        "dive": {"complevel": 1, "shuffle": True, "chunking": "whole"},
+        "timeseries": {"complevel": 1, "shuffle": True, "chunking": "dive_range"},
+        "profile": {"complevel": 1, "shuffle": True, "chunking": "dive_range"},
+    },
+}
+nc_chunk_max_elements = 1 << 20
+nc_chunk_profiles = 16
+nc_chunk_dive_range_elements = 16384
+
+nc_write_settings = nc_write_profiles["archive"]["dive"]
+
+
+def set_nc_write_profile(base_opts, file_type):
+    """Select the write settings create_nc_var() uses for the next NC file
+
+    The setting is module wide and stays in effect until the next call, so every writer
+    selects its file type before creating variables.
+
+    Input:
+        base_opts - options; nc_write_profile names the profile
+        file_type - one of nc_write_file_types
+    """
+    global nc_write_settings
+    profile_name = getattr(base_opts, "nc_write_profile", "archive")
+    try:
+        nc_write_settings = nc_write_profiles[profile_name][file_type]
+    except KeyError:
+        log_warning(
+            f"Unknown nc write profile {profile_name}/{file_type} - using archive"
+        )
+        nc_write_settings = nc_write_profiles["archive"]["dive"]
+
+
+def nc_chunk_sizes(nc_file, var_dims, chunking):
+    """Chunk shape for a variable with dimensions var_dims under a chunking policy
+
+    Returns:
+        list of chunk sizes, or None to leave chunking to the netCDF library
+    """
+    if chunking is None or not var_dims:
+        return None
+    sizes = [max(1, len(nc_file.dimensions[dim])) for dim in var_dims]
+    row_elements = int(np.prod(sizes[1:]))
+    if chunking == "dive_range":
+        leading = nc_chunk_profiles if len(sizes) > 1 else nc_chunk_dive_range_elements
+    elif chunking == "whole":
+        leading = sizes[0]
+    else:
+        log_warning(f"Unknown chunking policy {chunking} - using library default")
+        return None
+    leading = min(leading, sizes[0], max(1, nc_chunk_max_elements // row_elements))
+    return [leading] + sizes[1:]
+
+
+def nc_var_write_kwargs(nc_file, var_dims):
+    """createVariable() compression and chunking arguments for the current write settings"""
+    kwargs = {}
+    if nc_write_settings["complevel"] > 0:
+        kwargs["compression"] = "zlib"
+        kwargs["complevel"] = nc_write_settings["complevel"]
+        kwargs["shuffle"] = nc_write_settings["shuffle"]
+    chunksizes = nc_chunk_sizes(nc_file, var_dims, nc_write_settings["chunking"])
+    if chunksizes is not None:
+        kwargs["chunksizes"] = chunksizes
+    return kwargs
+
+
 def create_nc_var(
     nc_file,
     var_name,
@@ -3810,18 +3903,16 @@ def create_nc_var(
                 var_name,
                 "c",
                 (var_dims,),
-                compression="zlib",
-                complevel=9,
                 fill_value=meta_data_d.get("_FillValue", False),
+                **nc_var_write_kwargs(nc_file, (var_dims,)),
             )
         else:  # another type we know
             nc_var = nc_file.createVariable(
                 var_name,
                 nc_data_type,
                 (),
-                compression="zlib",
-                complevel=9,
                 fill_value=meta_data_d.get("_FillValue", False),
+                **nc_var_write_kwargs(nc_file, ()),
             )
         if value is None:
             # try replacing the initial value with the fill value, if any
@@ -3835,9 +3926,8 @@ def create_nc_var(
             var_name,
             nc_data_type,
             var_dims,
-            compression="zlib",
-            complevel=9,
             fill_value=meta_data_d.get("_FillValue", False),
+            **nc_var_write_kwargs(nc_file, var_dims),
         )
     if value is not None:
         try:
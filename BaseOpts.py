@@ -685,6 +685,118 @@ global_options_dict = {
             "help": "Which half of the profile to use - 1 down, 2 up, 3 both, 4 combine down and up",
         },
     ),
+    "mission_profile_cache": options_t(
+        True,
+        ("Base", "Reprocess", "MakeMissionProfile"),
+        ("--mission_profile_cache",),
+        bool,
+        {
+            "help": "Cache binned dives so the mission profile only re-bins new or changed dives",
+            "action": argparse.BooleanOptionalAction,
+        },
+    ),
+    "mission_timeseries_cache": options_t(
+        True,
+        ("Base", "Reprocess", "MakeMissionTimeSeries"),
+        ("--mission_timeseries_cache",),
+        bool,
+        {
+            "help": "Cache per-dive data so the mission timeseries only re-reads new or changed dives",
+            "action": argparse.BooleanOptionalAction,
+        },
+    ),
+    "jobs": options_t(
+        1,
+        ("MakeDiveProfiles", "Reprocess"),
+        ("--jobs",),
+        int,
+        {
+            "help": "Number of processes used to make per-dive netCDF files (mission level products are built after all dives finish)",
+        },
+    ),
+    "plot_jobs": options_t(
+        1,
+        ("Base", "BasePlot", "Reprocess"),
+        ("--plot_jobs",),
+        int,
+        {
+            "help": "Number of processes used to render dive and mission plots",
+        },
+    ),
+    "logger_jobs": options_t(
+        1,
+        ("Base",),
+        ("--logger_jobs",),
+        int,
+        {
+            "help": "Number of processes used to convert files from different loggers (scicon, pmar, ...) concurrently",
+        },
+    ),
+    "sensor_extension_budget": options_t(
+        None,
+        ("Base", "MakeDiveProfiles", "Reprocess"),
+        ("--sensor_extension_budget",),
+        float,
+        {
+            "help": "Seconds a sensor extension may run per dive before its remaining calls for that dive are skipped (with an alert)",
+        },
+    ),
+    "nc_write_profile": options_t(
+        "archive",
+        (
+            "Base",
+            "MakeDiveProfiles",
+            "MakeMissionProfile",
+            "MakeMissionTimeSeries",
+            "Reprocess",
+        ),
+        ("--nc_write_profile",),
+        str,
+        {
+            "help": "Compression and chunking profile for the per-dive, mission timeseries and mission profile netcdf files (see BaseNetCDF.nc_write_profiles)",
+            "choices": ["archive", "balanced", "fast"],
+        },
+    ),
+    "tsv_solver": options_t(
+        "vectorized",
+        ("Base", "MakeDiveProfiles", "Reprocess"),
+        ("--tsv_solver",),
+        str,
+        {
+            "help": "How the thermal-inertia mode recursion is solved - vectorized, or the original per-sample loop",
+            "choices": ["vectorized", "loop"],
+        },
+    ),
+    "kml_cache": options_t(
+        True,
+        ("Base", "Reprocess", "MakeKML"),
+        ("--kml_cache",),
+        bool,
+        {
+            "help": "Cache per-dive KML fragments so only new or changed dives are re-read",
+            "section": "makekml",
+            "action": argparse.BooleanOptionalAction,
+        },
+    ),
+    "profile_spans": options_t(
+        True,
+        ("Base",),
+        ("--profile_spans",),
+        bool,
+        {
+            "help": "Record per stage/dive/plot timings to profiles/base_<time>.json in the mission directory",
+            "action": argparse.BooleanOptionalAction,
+        },
+    ),
+    "profile_span_cprofile": options_t(
+        None,
+        ("Base",),
+        ("--profile_span_cprofile",),
+        str,
+        {
+            "help": "Comma separated list of span name patterns (e.g. 'mission_kml,*.py') to run under cProfile",
+        },
+    ),
     "daemon": options_t(
         False,
         ("Base", "GliderEarlyGPS", "GliderTrack"),
@@ -33,7 +33,9 @@
 # TODO: This can be removed as of python 3.11
 from __future__ import annotations
 
+import concurrent.futures
 import cProfile
+import multiprocessing
 import os
 import pdb
 import pstats
@@ -44,8 +46,10 @@ import traceback
 import numpy as np
 import plotly
 
+import BaseDB
 import BaseOpts
 import BaseOptsType
+import BaseProfile
 import CommLog
 import MakeDiveProfiles
 import Plotting
@@ -53,6 +57,9 @@ import PlotUtils
 import Utils
 from BaseLog import (
     BaseLogger,
+    log_capture_replay,
+    log_capture_start,
+    log_capture_stop,
     log_critical,
     log_debug,
     log_error,
@@ -74,6 +81,145 @@ def get_mission_plots(base_opts: BaseOpts.BaseOptions) -> dict:
     return {x: Plotting.mission_plot_funcs[x] for x in base_opts.mission_plots}
 
 
+# Worker process state for the plotting pool, set by the pool initializer
+_plot_pool_args = None
+
+
+def _plot_pool_init(base_opts: BaseOpts.BaseOptions, plot_dict: dict) -> None:
+    """Process pool initializer for plot_pool()"""
+    global _plot_pool_args
+    _plot_pool_args = (base_opts, plot_dict)
+
+
+def _plot_pool_task(
+    plot_name: str,
+    dive_nc_file_name: str | None,
+    mission_str: str | None,
+    dive: int | None,
+) -> tuple[list, float, float, tuple]:
+    """Renders one dive plot (dive_nc_file_name given) or mission plot in a pool worker
+
+    Each task uses its own database connection and its log output is captured to be
+    replayed by the parent.
+
+    Returns:
+        tuple
+            list of filenames created
+            wall time of the plot
+            cpu time of the plot
+            captured log output
+    """
+    base_opts, plot_dict = _plot_pool_args
+    log_capture_start()
+    plot_t0 = time.time()
+    plot_cpu0 = time.process_time()
+    output_files = []
+    con = Utils.open_mission_database(base_opts)
+    if con is not None:
+        # Commit each update as it is made so the tasks running alongside this one
+        # are only locked out of the database briefly
+        con.isolation_level = None
+        con.cursor().execute("PRAGMA busy_timeout=10000;")
+    try:
+        if dive_nc_file_name:
+            dive_ncf = Utils.open_netcdf_file(dive_nc_file_name)
+            _, file_list = plot_dict[plot_name](
+                base_opts, dive_ncf, generate_plots=True, dbcon=con
+            )
+            dive_ncf.close()
+        else:
+            _, file_list = plot_dict[plot_name](
+                base_opts, mission_str, dive=dive, generate_plots=True, dbcon=con
+            )
+    except Exception:
+        if dive_nc_file_name:
+            log_error(f"{plot_name} failed {dive_nc_file_name}", "exc")
+        else:
+            log_error(f"{plot_name}", "exc")
+    else:
+        output_files = list(Utils.flatten(file_list))
+
+    if con is not None:
+        con.close()
+
+    return (
+        output_files,
+        time.time() - plot_t0,
+        time.process_time() - plot_cpu0,
+        log_capture_stop(),
+    )
+
+
+def plot_pool(base_opts: BaseOpts.BaseOptions, plot_dict: dict, tasks: list) -> list:
+    """Renders plots in a pool of base_opts.plot_jobs processes
+
+    Input:
+        base_opts - basestation options object
+        plot_dict - dictionary of plot names and functions to apply
+        tasks - list of (plot_name, dive_nc_file_name, mission_str, dive)
+    Returns:
+        list of filenames created, in task order
+
+    Log output (and the wall time of each plot) is reported in task order.  The figures
+    stay in the worker processes - use the serial path when the figures are needed.
+    """
+    output_files = []
+    if not tasks:
+        return output_files
+
+    # fork, so the workers inherit the registered plots and the state set up by the caller
+    executor = concurrent.futures.ProcessPoolExecutor(
+        max_workers=min(base_opts.plot_jobs, len(tasks)),
+        mp_context=multiprocessing.get_context("fork"),
+        initializer=_plot_pool_init,
+        initargs=(base_opts, plot_dict),
+    )
+    futures = [executor.submit(_plot_pool_task, *task) for task in tasks]
+    try:
+        for task, future in zip(tasks, futures, strict=True):
+            plot_name, dive_nc_file_name, _, _ = task
+            label = (
+                f"{plot_name} {dive_nc_file_name}" if dive_nc_file_name else plot_name
+            )
+            while True:
+                try:
+                    if (
+                        hasattr(base_opts, "stop_processing_event")
+                        and base_opts.stop_processing_event.is_set()
+                    ):
+                        log_warning("Caught SIGUSR1 - bailing out")
+                        return output_files
+                except AttributeError:
+                    pass
+                try:
+                    file_list, plot_time, plot_cpu, captured = future.result(
+                        timeout=1.0
+                    )
+                except concurrent.futures.TimeoutError:
+                    continue
+                except Exception:
+                    log_error(f"{label} failed", "exc")
+                else:
+                    log_capture_replay(captured)
+                    log_info(f"{label} took {plot_time:.2f} secs")
+                    BaseProfile.add_span(
+                        f"{os.path.basename(dive_nc_file_name)}:{plot_name}"
+                        if dive_nc_file_name
+                        else plot_name,
+                        "plot",
+                        plot_time,
+                        plot_cpu,
+                    )
+                    output_files.extend(file_list)
+                break
+    except KeyboardInterrupt:
+        return output_files
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    return output_files
+
+
 def plot_dives(
     base_opts: BaseOpts.BaseOptions,
     dive_plot_dict: dict,
@@ -93,9 +239,25 @@ def plot_dives(
             list of figures created
 
             list of filenames created
+
+    With base_opts.plot_jobs > 1, each (dive, plot) is rendered as a separate task in a
+    process pool (see plot_pool()) and no figures are returned.
     """
     figs = []
     output_files = []
+    if (
+        generate_plots
+        and dbcon is None
+        and hasattr(base_opts, "plot_jobs")
+        and base_opts.plot_jobs > 1
+    ):
+        tasks = [
+            (plot_name, dive_nc_file_name, None, None)
+            for dive_nc_file_name in dive_nc_file_names
+            for plot_name in dive_plot_dict
+        ]
+        return (figs, plot_pool(base_opts, dive_plot_dict, tasks))
+
     if dbcon is None:
         con = Utils.open_mission_database(base_opts)
         log_info("plot_dives db opened")
@@ -104,7 +266,8 @@ def plot_dives(
 
     for dive_nc_file_name in dive_nc_file_names:
         log_info(f"Plotting {dive_nc_file_name}")
-        dive_ncf = Utils.open_netcdf_file(dive_nc_file_name)
+        # All the plots for this dive share one read of each variable
+        dive_ncf = PlotUtils.DiveData(Utils.open_netcdf_file(dive_nc_file_name))
         for plot_name, plot_func in dive_plot_dict.items():
             try:
                 if (
@@ -116,13 +279,17 @@ def plot_dives(
             except AttributeError:
                 pass
             log_debug(f"Trying Dive Plot :{plot_name}")
+            plot_t0 = time.time()
             try:
-                fig_list, file_list = plot_func(
-                    base_opts,
-                    dive_ncf,
-                    generate_plots=generate_plots,
-                    dbcon=con,
-                )
+                with BaseProfile.span(
+                    f"{os.path.basename(dive_nc_file_name)}:{plot_name}", "plot"
+                ):
+                    fig_list, file_list = plot_func(
+                        base_opts,
+                        dive_ncf,
+                        generate_plots=generate_plots,
+                        dbcon=con,
+                    )
             except KeyboardInterrupt:
                 return (figs, output_files)
             except Exception:
@@ -136,6 +303,9 @@ def plot_dives(
                     figs.append(figure)
                 for file_name in Utils.flatten(file_list):
                     output_files.append(file_name)
+            log_info(
+                f"{plot_name} {dive_nc_file_name} took {time.time() - plot_t0:.2f} secs"
+            )
     if dbcon is None:
         try:
             con.commit()
@@ -167,7 +337,21 @@ def plot_mission(
         tuple
             list of figures created
             list of filenames created
+
+    With base_opts.plot_jobs > 1, each plot is rendered as a separate task in a
+    process pool (see plot_pool()) and no figures are returned.
     """
+    if (
+        generate_plots
+        and dbcon is None
+        and hasattr(base_opts, "plot_jobs")
+        and base_opts.plot_jobs > 1
+    ):
+        tasks = [
+            (plot_name, None, mission_str, dive) for plot_name in mission_plot_dict
+        ]
+        return ([], plot_pool(base_opts, mission_plot_dict, tasks))
+
     if dbcon is None:
         con = Utils.open_mission_database(base_opts)
         log_info("plot_mission db opened")
@@ -176,45 +360,50 @@ def plot_mission(
 
     figs = []
     output_files = []
-    for plot_name, plot_func in mission_plot_dict.items():
-        try:
-            if (
-                hasattr(base_opts, "stop_processing_event")
-                and base_opts.stop_processing_event.is_set()
-            ):
-                log_warning("Caught SIGUSR1 - bailing out")
+    # The mission plots pull overlapping sets of dives table columns - share them
+    with BaseDB.diveColumnCache(con):
+        for plot_name, plot_func in mission_plot_dict.items():
+            try:
+                if (
+                    hasattr(base_opts, "stop_processing_event")
+                    and base_opts.stop_processing_event.is_set()
+                ):
+                    log_warning("Caught SIGUSR1 - bailing out")
+                    return (figs, output_files)
+            except AttributeError:
+                pass
+            log_debug(f"Trying Mission Plot: {plot_name}")
+            plot_t0 = time.time()
+            try:
+                with BaseProfile.span(plot_name, "plot"):
+                    fig_list, file_list = plot_func(
+                        base_opts,
+                        mission_str,
+                        dive=dive,
+                        generate_plots=generate_plots,
+                        dbcon=con,
+                    )
+                # if dive == None:
+                #    fig_list, file_list = plot_func(base_opts, mission_str, generate_plots=generate_plots, dbcon=con)
+                # else:
+
+                #    fig_list, file_list = plot_func(
+                #        base_opts, mission_str, dive=dive, generate_plots=generate_plots, dbcon=con
+                #    )
+            except KeyboardInterrupt:
                 return (figs, output_files)
-        except AttributeError:
-            pass
-        log_debug(f"Trying Mission Plot: {plot_name}")
-        try:
-            fig_list, file_list = plot_func(
-                base_opts,
-                mission_str,
-                dive=dive,
-                generate_plots=generate_plots,
-                dbcon=con,
-            )
-            # if dive == None:
-            #    fig_list, file_list = plot_func(base_opts, mission_str, generate_plots=generate_plots, dbcon=con)
-            # else:
-
-            #    fig_list, file_list = plot_func(
-            #        base_opts, mission_str, dive=dive, generate_plots=generate_plots, dbcon=con
-            #    )
-        except KeyboardInterrupt:
-            return (figs, output_files)
-        except Exception:
-            log_error(f"{plot_name}", "exc")
-            if DEBUG_PDB:
-                _, _, traceb = sys.exc_info()
-                traceback.print_exc()
-                pdb.post_mortem(traceb)
-        else:
-            for figure in fig_list:
-                figs.append(figure)
-            for file_name in file_list:
-                output_files.append(file_name)
+            except Exception:
+                log_error(f"{plot_name}", "exc")
+                if DEBUG_PDB:
+                    _, _, traceb = sys.exc_info()
+                    traceback.print_exc()
+                    pdb.post_mortem(traceb)
+            else:
+                for figure in fig_list:
+                    figs.append(figure)
+                for file_name in file_list:
+                    output_files.append(file_name)
+            log_info(f"{plot_name} took {time.time() - plot_t0:.2f} secs")
 
     if dbcon is None:
         try:
@@ -0,0 +1,345 @@
+#! /usr/bin/env python
+# -*- python-fmt -*-
+
+## Copyright (c) 2026  University of Washington.
+##
+## Redistribution and use in source and binary forms, with or without
+## modification, are permitted provided that the following conditions are met:
+##
+## 1. Redistributions of source code must retain the above copyright notice, this
+##    list of conditions and the following disclaimer.
+##
+## 2. Redistributions in binary form must reproduce the above copyright notice,
+##    this list of conditions and the following disclaimer in the documentation
+##    and/or other materials provided with the distribution.
+##
+## 3. Neither the name of the University of Washington nor the names of its
+##    contributors may be used to endorse or promote products derived from this
+##    software without specific prior written permission.
+##
+## THIS SOFTWARE IS PROVIDED BY THE UNIVERSITY OF WASHINGTON AND CONTRIBUTORS “AS
+## IS” AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+## IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+## DISCLAIMED. IN NO EVENT SHALL THE UNIVERSITY OF WASHINGTON OR CONTRIBUTORS BE
+## LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+## CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE
+## GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+## HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+## LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT
+## OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Nested span profiler for basestation runs
+
+Spans form a tree - for Base.py, stage -> dive -> plot/extension/file - and each
+records its wall time, CPU time and the process' peak RSS.  A run's tree is written
+out as a JSON record (see Base.ProcessProgress) and two records can be compared with
+
+    python BaseProfile.py old.json new.json
+
+Code anywhere in the basestation marks out a span with
+
+    with BaseProfile.span("name", "kind"):
+        ...
+
+which does nothing unless a profiler has been started.
+"""
+
+import argparse
+import contextlib
+import cProfile
+import fnmatch
+import json
+import os
+import resource
+import sys
+import time
+
+from BaseLog import log_debug, log_error
+
+# Version of the JSON record written by SpanProfiler.write()
+profile_record_version = 1
+
+
+def rusage_snapshot():
+    """Returns (cpu secs for this process, cpu secs for reaped children, peak RSS in kB)"""
+    ru_self = resource.getrusage(resource.RUSAGE_SELF)
+    ru_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return (
+        ru_self.ru_utime + ru_self.ru_stime,
+        ru_children.ru_utime + ru_children.ru_stime,
+        ru_self.ru_maxrss,
+    )
+
+
+class Span:
+    """A timed section of a run"""
+
+    def __init__(self, name, kind, attrs=None):
+        self.name = name
+        self.kind = kind
+        self.attrs = attrs or {}
+        self.children = []
+        self.start = time.time()
+        self.wall = None
+        self.cpu = None
+        self.cpu_children = None
+        self.peak_rss_kb = None
+        self.rss_growth_kb = None
+        self.cprofile_file = None
+        self._t0 = time.perf_counter()
+        self._rusage0 = rusage_snapshot()
+        self._cprofile = None
+
+    def finish(self):
+        """Records the span's totals"""
+        cpu, cpu_children, peak_rss_kb = rusage_snapshot()
+        self.wall = time.perf_counter() - self._t0
+        self.cpu = cpu - self._rusage0[0]
+        self.cpu_children = cpu_children - self._rusage0[1]
+        self.peak_rss_kb = peak_rss_kb
+        # Only non-zero for spans that pushed the process to a new high water mark
+        self.rss_growth_kb = peak_rss_kb - self._rusage0[2]
+
+    def to_dict(self):
+        """Returns the span and its children as a json-able dictionary"""
+        span_d = {
+            "name": self.name,
+            "kind": self.kind,
+            "start": self.start,
+            "wall": self.wall,
+            "cpu": self.cpu,
+            "cpu_children": self.cpu_children,
+            "peak_rss_kb": self.peak_rss_kb,
+            "rss_growth_kb": self.rss_growth_kb,
+        }
+        if self.attrs:
+            span_d["attrs"] = self.attrs
+        if self.cprofile_file:
+            span_d["cprofile"] = self.cprofile_file
+        if self.children:
+            span_d["children"] = [child.to_dict() for child in self.children]
+        return span_d
+
+
+class SpanProfiler:
+    """Collects the span tree for a run
+
+    Input:
+        name - name of the run (the root span)
+        cprofile_patterns - spans whose name matches any of these fnmatch patterns
+            are run under cProfile, with the stats written next to the JSON record
+    """
+
+    def __init__(self, name, cprofile_patterns=()):
+        self.root = Span(name, "run")
+        self.stack = [self.root]
+        self.cprofile_patterns = list(cprofile_patterns)
+        self.cprofile_active = False
+        self.cprofile_spans = []
+
+    def start(self, name, kind=None, **attrs):
+        """Opens a span as a child of the innermost open span"""
+        span_obj = Span(name, kind, attrs)
+        self.stack[-1].children.append(span_obj)
+        self.stack.append(span_obj)
+        if not self.cprofile_active and any(
+            fnmatch.fnmatch(name, pattern) for pattern in self.cprofile_patterns
+        ):
+            # Only one cProfile can run at a time, so nested matches are covered by
+            # the outer one
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Some other profiler (Base.py --profile, for one) is already running
+                log_debug(f"Could not start cProfile for span {name}", "exc")
+            else:
+                span_obj._cprofile = profile
+                self.cprofile_active = True
+        return span_obj
+
+    def stop(self, span_obj):
+        """Closes span_obj, along with any spans left open inside it"""
+        if span_obj not in self.stack:
+            return
+        while self.stack:
+            top = self.stack.pop()
+            if top._cprofile is not None:
+                top._cprofile.disable()
+                self.cprofile_active = False
+                self.cprofile_spans.append(top)
+            top.finish()
+            if top is span_obj:
+                break
+
+    def add(self, name, kind, wall, cpu=None, **attrs):
+        """Adds a span that was timed elsewhere (for example, in a worker process)"""
+        span_obj = Span(name, kind, attrs)
+        span_obj.finish()
+        span_obj.start -= wall
+        span_obj.wall = wall
+        span_obj.cpu = cpu
+        span_obj.cpu_children = None
+        span_obj.rss_growth_kb = None
+        self.stack[-1].children.append(span_obj)
+        return span_obj
+
+    def to_dict(self):
+        """Returns the run as a json-able dictionary, closing any spans still open"""
+        if len(self.stack) > 1:
+            self.stop(self.stack[1])
+        if self.root.wall is None:
+            self.root.finish()
+        return {"version": profile_record_version, "run": self.root.to_dict()}
+
+    def write(self, file_name):
+        """Writes the run's JSON record to file_name and the stats for any spans run
+        under cProfile alongside it
+        """
+        base_name, _ = os.path.splitext(file_name)
+        for ii, span_obj in enumerate(self.cprofile_spans):
+            span_obj.cprofile_file = f"{base_name}_{ii:02d}.cprof"
+            try:
+                span_obj._cprofile.dump_stats(span_obj.cprofile_file)
+            except Exception:
+                log_error(f"Could not write {span_obj.cprofile_file}", "exc")
+                span_obj.cprofile_file = None
+        tmp_name = f"{file_name}.tmp"
+        try:
+            os.makedirs(os.path.dirname(file_name), exist_ok=True)
+            with open(tmp_name, "w") as fo:
+                json.dump(self.to_dict(), fo, indent=1)
+            os.replace(tmp_name, file_name)
+        except Exception:
+            log_error(f"Could not write {file_name}", "exc")
+            return False
+        return True
+
+
+# The profiler spans are added to, if any
+active_profiler = None
+
+
+def start_profiler(name, cprofile_patterns=()):
+    """Starts a new profiler, which span() will add to until stop_profiler()"""
+    global active_profiler
+    active_profiler = SpanProfiler(name, cprofile_patterns)
+    return active_profiler
+
+
+def stop_profiler():
+    """Stops adding spans to the active profiler, returning it"""
+    global active_profiler
+    profiler = active_profiler
+    active_profiler = None
+    return profiler
+
+
+@contextlib.contextmanager
+def span(name, kind=None, **attrs):
+    """Times the enclosed block as a span of the active profiler, if there is one"""
+    profiler = active_profiler
+    if profiler is None:
+        yield None
+        return
+    span_obj = profiler.start(name, kind, **attrs)
+    try:
+        yield span_obj
+    finally:
+        profiler.stop(span_obj)
+
+
+def add_span(name, kind, wall, cpu=None, **attrs):
+    """Adds a span timed elsewhere to the active profiler, if there is one"""
+    if active_profiler is not None:
+        active_profiler.add(name, kind, wall, cpu, **attrs)
+
+
+def flatten_profile(profile_d):
+    """Returns {span path: span dictionary} for a JSON record
+
+    Paths are the names from the root down, joined with "/".  Repeated names under
+    the same parent get a #n suffix.
+    """
+    flat = {}
+
+    def walk(span_d, path):
+        flat[path] = span_d
+        seen = {}
+        for child in span_d.get("children", []):
+            n = seen.get(child["name"], 0)
+            seen[child["name"]] = n + 1
+            child_name = child["name"] if n == 0 else f"{child['name']}#{n}"
+            walk(child, f"{path}/{child_name}")
+
+    walk(profile_d["run"], profile_d["run"]["name"])
+    return flat
+
+
+def diff_profiles(old_d, new_d, min_delta=0.0):
+    """Compares the wall and CPU time of two JSON records
+
+    Returns:
+        list of (path, old wall, new wall, old cpu, new cpu) for spans whose wall time
+        changed by at least min_delta secs, largest change first.  Times are None for
+        spans in only one of the runs.
+    """
+    old_flat = flatten_profile(old_d)
+    new_flat = flatten_profile(new_d)
+    rows = []
+    for path in list(old_flat) + [p for p in new_flat if p not in old_flat]:
+        old_span = old_flat.get(path, {})
+        new_span = new_flat.get(path, {})
+        row = (
+            path,
+            old_span.get("wall"),
+            new_span.get("wall"),
+            old_span.get("cpu"),
+            new_span.get("cpu"),
+        )
+        if abs((row[2] or 0.0) - (row[1] or 0.0)) >= min_delta:
+            rows.append(row)
+    rows.sort(key=lambda row: abs((row[2] or 0.0) - (row[1] or 0.0)), reverse=True)
+    return rows
+
+
+def main(cmdline_args: list[str] = sys.argv[1:]) -> int:
+    """Prints the differences in wall and CPU time between two run records"""
+    ap = argparse.ArgumentParser(description=main.__doc__)
+    ap.add_argument("old", help="JSON record of the baseline run")
+    ap.add_argument("new", help="JSON record of the run to compare")
+    ap.add_argument(
+        "--min_delta",
+        type=float,
+        default=0.1,
+        help="Only show spans whose wall time changed by at least this many secs",
+    )
+    args = ap.parse_args(cmdline_args)
+
+    try:
+        with open(args.old) as fi:
+            old_d = json.load(fi)
+        with open(args.new) as fi:
+            new_d = json.load(fi)
+    except Exception:
+        print(f"Could not read run records: {sys.exc_info()[1]}", file=sys.stderr)
+        return 1
+
+    def fmt(t):
+        return f"{t:9.3f}" if t is not None else f"{'-':>9s}"
+
+    print(
+        f"{'old wall':>9s} {'new wall':>9s} {'delta':>9s} {'old cpu':>9s} {'new cpu':>9s}  span"
+    )
+    for path, old_wall, new_wall, old_cpu, new_cpu in diff_profiles(
+        old_d, new_d, args.min_delta
+    ):
+        delta = (new_wall or 0.0) - (old_wall or 0.0)
+        print(
+            f"{fmt(old_wall)} {fmt(new_wall)} {delta:+9.3f} {fmt(old_cpu)} {fmt(new_cpu)}  {path}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -308,6 +308,7 @@ def main(
         Utils.strip_vars(dsi, dso, [i for i in new_columns])
 
         # Add the new columns
+        BaseNetCDF.set_nc_write_profile(base_opts, "dive")
         for nc_var_name, values in new_columns.items():
             value, nc_dim, additional_meta_data_d = values
             BaseNetCDF.create_nc_var(
@@ -39,12 +39,14 @@ import collections
 import contextlib
 import copy
 import cProfile
+import hashlib
 import inspect
 import io
 import json
 import math
 import os
 import pdb
+import pickle
 import pstats
 import re
 import sys
@@ -1129,6 +1131,82 @@ def crack_counter_line(
     return False
 
 
+# Bump when a change to process_comm_log() changes the parse state kept in the index
+comm_log_index_version = 2
+# Number of bytes hashed at the start and the indexed end of the comm.log
+comm_log_fingerprint_len = 4096
+
+
+def comm_log_index_name(comm_log_file_name):
+    """Returns the name of the parse index kept next to comm_log_file_name"""
+    head, tail = os.path.split(comm_log_file_name)
+    return os.path.join(head, f".{tail}.idx")
+
+
+def comm_log_fingerprint(comm_log_file, pos):
+    """Hashes the first and last comm_log_fingerprint_len bytes before pos, so a
+    truncated or replaced comm.log is not matched to a stale index
+    """
+    hash_len = min(comm_log_fingerprint_len, pos)
+    comm_log_file.seek(0)
+    head = comm_log_file.read(hash_len)
+    comm_log_file.seek(pos - hash_len)
+    tail = comm_log_file.read(hash_len)
+    return hashlib.sha1(head + tail).hexdigest()
+
+
+def load_comm_log_index(comm_log_file_name, comm_log_file, config):
+    """Loads the parse index for comm_log_file_name
+
+    Returns:
+        (pos, state) where state is the parse state after the first pos bytes, or
+        None if there is no usable index
+    """
+    index_file_name = comm_log_index_name(comm_log_file_name)
+    if not os.path.exists(index_file_name):
+        return None
+    try:
+        with open(index_file_name, "rb") as fi:
+            index_d = pickle.load(fi)
+        if index_d["config"] != config:
+            log_debug(f"{index_file_name} built with a different config - rebuilding")
+            return None
+        pos = index_d["pos"]
+        if os.fstat(comm_log_file.fileno()).st_size < pos:
+            log_info(f"{comm_log_file_name} got smaller - rebuilding index")
+            return None
+        if comm_log_fingerprint(comm_log_file, pos) != index_d["fingerprint"]:
+            log_info(f"{comm_log_file_name} changed - rebuilding index")
+            return None
+    except Exception:
+        log_warning(f"Could not load {index_file_name} - rebuilding", "exc")
+        return None
+    return (pos, index_d["state"])
+
+
+def save_comm_log_index(comm_log_file_name, comm_log_file, config, pos, state):
+    """Saves the parse index for comm_log_file_name
+
+    state is the pickled parse state after the first pos bytes
+    """
+    index_file_name = comm_log_index_name(comm_log_file_name)
+    tmp_file_name = f"{index_file_name}.{os.getpid()}.tmp"
+    try:
+        index_d = {
+            "config": config,
+            "pos": pos,
+            "fingerprint": comm_log_fingerprint(comm_log_file, pos),
+            "state": state,
+        }
+        with open(tmp_file_name, "wb") as fo:
+            pickle.dump(index_d, fo)
+        os.replace(tmp_file_name, index_file_name)
+    except Exception:
+        log_warning(f"Could not save {index_file_name}", "exc")
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp_file_name)
+
+
 def process_comm_log(
     comm_log_file_name,
     base_opts,
@@ -1142,6 +1220,10 @@ def process_comm_log(
     """Processes a Seagliders comm log
 
     Returns a CommLog object
+
+    When the whole comm log is processed (no start_pos, call_back or scan_back), the parse
+    state is persisted in an index next to the comm log and later calls only parse the
+    lines added since.
     """
 
     if not known_commlog_files:
@@ -1223,7 +1305,62 @@ def process_comm_log(
 
         file_transfer_method = {}
 
+        use_index = (
+            start_pos < 0
+            and not scan_back
+            and call_back is None
+            and session is None
+            and line_count == 0
+        )
+        index_pos = index_loaded_pos = 0
+        index_state = None
+        if use_index:
+            # The session timestamps are converted with time.mktime(), so the
+            # local timezone is part of the config.  known_commlog_files is not -
+            # it only steers the call_back dispatch (never used with the index)
+            # and debug logging, so callers with different lists share the index
+            index_config = (
+                comm_log_index_version,
+                bool(base_opts and base_opts.ver_65),
+                time.timezone,
+            )
+            index = load_comm_log_index(comm_log_file_name, comm_log_file, index_config)
+            if index is None:
+                index_loaded_pos = -1
+            else:
+                index_pos, state = index
+                index_loaded_pos = index_pos
+                (
+                    sessions,
+                    raw_file_lines,
+                    files_transfered,
+                    file_transfered,
+                    file_crc_errors,
+                    file_transfer_method,
+                    session,
+                    line_count,
+                ) = pickle.loads(state)
+                log_debug(f"Resuming {comm_log_file_name} from index at {index_pos}")
+            comm_log_file.seek(index_pos)
+
         for raw_line in comm_log_file:
+            if use_index:
+                if index_state is None and not raw_line.endswith(b"\n"):
+                    # Last line is still being written - index up to the line before it
+                    index_state = pickle.dumps(
+                        (
+                            sessions,
+                            raw_file_lines,
+                            files_transfered,
+                            file_transfered,
+                            file_crc_errors,
+                            file_transfer_method,
+                            session,
+                            line_count,
+                        )
+                    )
+                else:
+                    index_pos += len(raw_line)
             line_count = line_count + 1
             try:
                 raw_line = raw_line.decode("utf-8")
@@ -1881,6 +2018,23 @@ def process_comm_log(
                     % (comm_log_file_name, line_count, raw_line)
                 )
         start_pos = comm_log_file.tell()
+        if use_index and index_pos != index_loaded_pos:
+            if index_state is None:
+                index_state = pickle.dumps(
+                    (
+                        sessions,
+                        raw_file_lines,
+                        files_transfered,
+                        file_transfered,
+                        file_crc_errors,
+                        file_transfer_method,
+                        session,
+                        line_count,
+                    )
+                )
+            save_comm_log_index(
+                comm_log_file_name, comm_log_file, index_config, index_pos, index_state
+            )
         comm_log_file.close()
 
         commlog = CommLog(
@@ -33,9 +33,15 @@
 """Routines for extracting profiles from dive timeseries files
 """
 
+import asyncio
+import collections
+import concurrent.futures
 import json
+import os
 import sys
+import threading
 import warnings
+from functools import partial
 from json import JSONEncoder
 
 import numpy
@@ -59,10 +65,154 @@ class NumpyArrayEncoder(JSONEncoder):
    
 def dumps(d):
     return json.dumps(d, cls=NumpyArrayEncoder)
+
+# netCDF4/HDF5 is not thread safe.  Async callers (vis.py, rafos.py) run all of their
+# netCDF work on the one thread of netcdf_executor, via run_netcdf(), and every read
+# through the timeseries cache also holds netcdf_lock
+netcdf_lock = threading.RLock()
+netcdf_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="netcdf")
+
+async def run_netcdf(func, *args, **kwargs):
+    """Runs func(*args, **kwargs) on the netCDF worker thread"""
+    return await asyncio.get_running_loop().run_in_executor(netcdf_executor, partial(func, *args, **kwargs))
+
+class CachedVariable:
+    """Stands in for a netCDF variable of a CachedTimeseries - the data is read once and kept"""
+    def __init__(self, cached_nci, name):
+        self._cached_nci = cached_nci
+        self._name = name
+        self.dimensions = cached_nci.nci.variables[name].dimensions
+
+    def __getitem__(self, key):
+        return self._cached_nci.data(self._name)[key]
+
+class CachedTimeseries:
+    """An open mission timeseries file that can be passed as the extnci argument of the
+    routines below, keeping the variable data and time/depth extractions already read
+
+    users counts the requests using the entry (see cached_timeseries() and release()) - the
+    file is closed once the entry is out of the cache and has no users"""
+    def __init__(self, ncfilename, stamp):
+        with netcdf_lock:
+            self.nci = Utils.open_netcdf_file(ncfilename, "r")
+            self.variables = {k: CachedVariable(self, k) for k in self.nci.variables}
+        self.stamp = stamp
+        self.nbytes = 0
+        self.users = 0
+        self.in_cache = True
+        self._data = {}
+        self._time_depth = {}
+
+    def data(self, name):
+        with netcdf_lock:
+            data = self._data.get(name)
+            if data is None:
+                data = self.nci.variables[name][:]
+                # Out of the cache, the entry is only finishing off its users - nothing is kept
+                if self.in_cache:
+                    self._data[name] = data
+                    self.nbytes += data.nbytes
+                    # May evict this entry, if another file was used more recently
+                    trim_timeseries_cache()
+            return data
+
+    def time_depth(self, varname):
+        with netcdf_lock:
+            time_depth = self._time_depth.get(varname)
+            if time_depth is None:
+                time_depth = extractVarTimeDepth(None, varname, extnci=self)
+                if self.in_cache:
+                    self._time_depth[varname] = time_depth
+            return time_depth
+
+    def acquire(self):
+        with netcdf_lock:
+            self.users += 1
+
+    def release(self):
+        """Ends a use of the entry started by cached_timeseries()"""
+        with netcdf_lock:
+            self.users -= 1
+            self._close_if_unused()
+
+    def drop(self):
+        """Takes the entry out of the cache, dropping the data read so far - the file
+        stays open for any request still using it"""
+        with netcdf_lock:
+            self.in_cache = False
+            self._data = {}
+            self._time_depth = {}
+            self.nbytes = 0
+            self._close_if_unused()
+
+    def _close_if_unused(self):
+        if not self.in_cache and self.users <= 0 and self.nci.isopen():
+            self.nci.close()
+
+# Process level cache of CachedTimeseries, most recently used last - an entry is
+# replaced when the file's modification time or size changes.  Entries beyond
+# timeseries_cache_max files, or timeseries_cache_max_bytes of variable data,
+# are evicted least recently used first
+timeseries_cache_max = 8
+timeseries_cache_max_bytes = 512 * 1024 * 1024
+_timeseries_cache = collections.OrderedDict()
+
+def trim_timeseries_cache():
+    """Evicts entries until the cache is within its limits - the most recently used
+    entry is always kept"""
+    with netcdf_lock:
+        while len(_timeseries_cache) > 1 and (
+            len(_timeseries_cache) > timeseries_cache_max
+            or sum(c.nbytes for c in _timeseries_cache.values()) > timeseries_cache_max_bytes
+        ):
+            _, cached_nci = _timeseries_cache.popitem(last=False)
+            cached_nci.drop()
+
+def cached_timeseries(ncfilename):
+    """Returns the CachedTimeseries for ncfilename, re-opening it if the file has changed
+
+    The entry is acquired for the caller, who release()s it when done with it"""
+    try:
+        st = os.stat(ncfilename)
+    except OSError:
+        log_error(f"Unable to open {ncfilename}")
+        return None
+    stamp = (st.st_mtime_ns, st.st_size)
+
+    with netcdf_lock:
+        cached_nci = _timeseries_cache.get(ncfilename)
+        if cached_nci is not None and cached_nci.stamp == stamp:
+            _timeseries_cache.move_to_end(ncfilename)
+            cached_nci.acquire()
+            return cached_nci
+
+        if cached_nci is not None:
+            _timeseries_cache.pop(ncfilename).drop()
+        try:
+            cached_nci = CachedTimeseries(ncfilename, stamp)
+        except Exception:
+            log_error(f"Unable to open {ncfilename}")
+            return None
+        cached_nci.acquire()
+        _timeseries_cache[ncfilename] = cached_nci
+        trim_timeseries_cache()
+        return cached_nci
  
 def timeSeriesToProfile(var, which, 
                         diveStart, diveStop, diveStride, 
-                        binStart, binStop, binSize, ncfilename, extnci=None, x=None):
+                        binStart, binStop, binSize, ncfilename, extnci=None, x=None, cached=False):
+
+    if extnci is None and cached:
+        extnci = cached_timeseries(ncfilename)
+        if extnci is None:
+            return (None, None)
+        try:
+            return timeSeriesToProfile(var, which,
+                                       diveStart, diveStop, diveStride,
+                                       binStart, binStop, binSize, ncfilename, extnci=extnci,
+                                       x=extnci.time_depth(var) if x is None else x)
+        finally:
+            extnci.release()
 
     if extnci is None:
         try:
@@ -181,7 +331,16 @@ def timeSeriesToProfile(var, which,
 
     return (message, x)
 
-def getVarNames(nc_filename, ext_nc_file=None):
+def getVarNames(nc_filename, ext_nc_file=None, cached=False):
+
+    if ext_nc_file is None and cached:
+        ext_nc_file = cached_timeseries(nc_filename)
+        if ext_nc_file is None:
+            return None
+        try:
+            return getVarNames(nc_filename, ext_nc_file=ext_nc_file)
+        finally:
+            ext_nc_file.release()
 
     if ext_nc_file is None:
         try:
@@ -203,7 +362,16 @@ def getVarNames(nc_filename, ext_nc_file=None):
 
     return vars
 
-def extractVars(nc_filename, varNames, dive1, diveN, extnci=None):
+def extractVars(nc_filename, varNames, dive1, diveN, extnci=None, cached=False):
+    if extnci is None and cached:
+        extnci = cached_timeseries(nc_filename)
+        if extnci is None:
+            return None
+        try:
+            return extractVars(nc_filename, varNames, dive1, diveN, extnci=extnci)
+        finally:
+            extnci.release()
+
     if extnci is None:
         try:
             nci = Utils.open_netcdf_file(nc_filename, "r")
@@ -36,6 +36,9 @@
 
 """An attempt to turn 'experimental' regress_vbd.m into a Maytag washer, an automatic reliable appliance"""
 
+import collections
+import collections.abc
+import concurrent.futures
 import contextlib
 import copy
 import cProfile
@@ -44,6 +47,7 @@ import pdb
 import pickle
 import pstats
 import shutil
+import sqlite3
 import stat
 import sys
 import time
@@ -70,7 +74,7 @@ from BaseLog import (
 )
 from CalibConst import getSGCalibrationConstants
 from Globals import flight_variables
-from HydroModel import hydro_model
+from HydroModel import hydro_model, hydro_model_grid
 
 DEBUG_PDB = False
 
@@ -141,6 +145,10 @@ def set_globals() -> None:
         dump_checkpoint_data_matfiles, \
         dump_fm_files, \
         flush_ab_grid_cache_entries, \
+        ab_grid_solver, \
+        ab_grid_workers, \
+        ab_grid_coarse_stride, \
+        dive_data_cache_max_mb, \
         early_volmax_adjust, \
         FM_default_rho0, \
         sg_hd_s, \
@@ -190,7 +198,8 @@ def set_globals() -> None:
         hd_a_grid, \
         hd_b_grid, \
         ab_grid_cache_d, \
-        restart_cache_d
+        restart_cache_d, \
+        dive_data_cache
     # see load_dive_data() these are the vectors we collect for each dive to compute various flight model parameters
     # deliberately NOT vol_comp, vol_comp_ref, and therm_expan_term, which are computed and cached
     # if compare_velo is non-zero we add 'velo_speed' to this list below
@@ -246,6 +255,20 @@ def set_globals() -> None:
     flush_ab_grid_cache_entries = []  # DEBUG which dives to flush and force recomputation?
     # flush_ab_grid_cache_entries = [47]
 
+    # How solve_ab_grid() evaluates the misfit over hd_a_grid x hd_b_grid
+    # 'batched' evaluates each hd_a column of the grid as array operations (same results as 'loop')
+    # 'loop' is the original cell-by-cell search via w_rms_func()
+    ab_grid_solver = "batched"  # CONTROL
+    ab_grid_workers = 0  # CONTROL if > 1, 'batched' fans the hd_a columns out over a pool of this many processes
+    # If > 1, 'batched' first evaluates every Nth grid point in a and b and then only densifies the grid
+    # around that coarse minimum.  The remaining cells are interpolated from the coarse pass, so this is
+    # faster but W_misfit_RMS is only exact near the minimum.
+    ab_grid_coarse_stride = 0  # CONTROL
+
+    # Upper bound on the memory used to cache the vectors read by load_dive_data() and load_dive_data_DAC()
+    # so overlapping dive sets in solve_ab_grid() don't re-open the same nc files; 0 disables the cache
+    dive_data_cache_max_mb = 256  # PARAMETER
+
     # PARAMTERS that control the operation of FlightModel calculations:
 
     # A note on volmax/vbdbias and our initial estimates MakeDiveProfiles() uses
@@ -360,7 +383,7 @@ def set_globals() -> None:
     flight_directory = None
     plots_directory = None
     flight_dive_data_filename = None
-    # eventually a dict: dive -> <flight_data>, 'mass', etc. assumptions
+    # eventually a flight_database: dive -> <flight_data>, 'mass', etc. assumptions
     flight_dive_data_d = None
 
     mission_directory = None
@@ -379,6 +402,7 @@ def set_globals() -> None:
     hd_b_grid = None
     ab_grid_cache_d = None
     restart_cache_d = None
+    dive_data_cache = None  # a DiveDataCache, set in main()
 
 
 # Set globals on import
@@ -413,6 +437,9 @@ if generate_figures:
 class flight_data:  # deliberately no (object) so we can pickle these puppies
     """Per-dive flight related data"""
 
+    # dive_nums of instances changed since the flight database was last saved
+    changed_dives = set()
+
     def __init__(self, dive_num):
         self.dive_num = dive_num
         self.last_updated = (
@@ -458,6 +485,10 @@ class flight_data:  # deliberately no (object) so we can pickle these puppies
         self.abs_compress = np.nan
         self.w_rms_vbdbias = np.nan  # w_rms at vbdbias (and abs_compress)
 
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        flight_data.changed_dives.add(self.dive_num)
+
     def __repr__(self):
         return (
             "<Dive %d pitch_d: %.1f p: %.1fdbar vbias: %.1fcc (%.1fcc) abs_compress=%g RMS%s=%5.4fcm/s>"
@@ -474,6 +505,112 @@ class flight_data:  # deliberately no (object) so we can pickle these puppies
         )
 
 
+# flight_data attributes load_dive_data() sets by side effect, restored on a cache hit
+load_dive_data_attributes = (
+    "dive_data_ok",
+    "start_time",
+    "pitch_d",
+    "nc_hd_a",
+    "nc_hd_b",
+    "nc_volmax",
+    "nc_vbdbias",
+    "nc_abs_compress",
+    "log_HD_A",
+    "log_HD_B",
+    "log_HD_C",
+    "n_valid",
+    "min_pitch",
+    "max_pitch",
+    "bottom_press",
+    "bottom_temp",
+    "bottom_rho0",
+    "bottom_pden",
+)
+
+
+class DiveDataCache:
+    """Bounded LRU cache of the per-dive vectors read from the nc files
+
+    Entries are keyed by the kind of load, the dive number, the nc file's mtime and size
+    and fm_version, so a reprocessed dive is simply reloaded.  The displaced volume depends
+    on the prevailing volmax, so it is stored without it and rebuilt on each hit.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = collections.OrderedDict()
+        self.n_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, kind, dive_num, nc_file_name):
+        try:
+            st = os.stat(nc_file_name)
+        except OSError:
+            return None
+        return (kind, dive_num, st.st_mtime_ns, st.st_size, fm_version)
+
+    def fetch(self, key, dive_data):
+        """Returns a copy of the cached data_d for key, updating dive_data as the load would, or None"""
+        try:
+            entry, _ = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        for attr, value in entry["attributes"].items():
+            setattr(dive_data, attr, value)
+        data_d = dict(entry["data_d"])
+        vbd0 = flight_dive_data_d["volmax"] + entry["vbd_neutral"]
+        data_d["displaced_volume"] = vbd0 + entry["eng_vbd_cc"]
+        return data_d
+
+    def store(self, key, dive_data, data_d, vbd_neutral, eng_vbd_cc, attributes=()):
+        if key is None or self.max_bytes <= 0:
+            return
+        data_d = {k: v for k, v in data_d.items() if k != "displaced_volume"}
+        entry = {
+            "data_d": data_d,
+            "attributes": {attr: getattr(dive_data, attr) for attr in attributes},
+            "vbd_neutral": vbd_neutral,
+            "eng_vbd_cc": eng_vbd_cc,
+        }
+        size = eng_vbd_cc.nbytes + sum(
+            v.nbytes for v in data_d.values() if isinstance(v, np.ndarray)
+        )
+        if size > self.max_bytes:
+            return
+        if key in self.entries:
+            self.n_bytes -= self.entries.pop(key)[1]
+        self.entries[key] = (entry, size)
+        self.n_bytes += size
+        while self.n_bytes > self.max_bytes:
+            _, (_, old_size) = self.entries.popitem(last=False)
+            self.n_bytes -= old_size
+            self.evictions += 1
+
+    def report(self):
+        log_info(
+            "Dive data cache: %d hits, %d misses, %d evictions, %d entries (%.1fMB)"
+            % (
+                self.hits,
+                self.misses,
+                self.evictions,
+                len(self.entries),
+                self.n_bytes / (1024 * 1024),
+            )
+        )
+
+
+def dive_data_cache_key(kind, dive_num, nc_file_name):
+    """Returns the dive_data_cache key for a load, or None if not caching"""
+    if dive_data_cache is None:
+        return None
+    return dive_data_cache.key(kind, dive_num, nc_file_name)
+
+
 def estimate_volmax(mass, density, vbd_adjust=660):
     # Estimate of volmax given mass of the vehicle and an insitu density measurement or estimate
     # This estimate just has to get us within +/-1000cc; we'll adjust it based on vbdbias calculations per dive later
@@ -604,13 +741,23 @@ def load_flight_database(
 
     if flight_directory_ok:
         # this file either exists or can be created so set this global
-        flight_dive_data_filename = os.path.join(flight_directory, "flight.pkl")
-        try:
-            fh = open(flight_dive_data_filename, "rb")
-            (flight_dive_data_d) = pickle.load(fh)  # reload
-            fh.close()
-        except Exception:
-            pass  # file corrupt or doesn't exist
+        flight_dive_data_filename = os.path.join(flight_directory, "flight.db")
+        if os.path.exists(flight_dive_data_filename):
+            try:
+                flight_dive_data_d = read_flight_db(flight_dive_data_filename)
+            except Exception:
+                log_warning(f"Unable to read {flight_dive_data_filename}", "exc")
+        else:
+            # Earlier versions pickled the whole database; migrate it on the next save
+            pkl_filename = os.path.join(flight_directory, "flight.pkl")
+            try:
+                fh = open(pkl_filename, "rb")
+                flight_dive_data_d = flight_database()
+                flight_dive_data_d.update(pickle.load(fh))  # reload
+                fh.close()
+                log_info(f"Migrating {pkl_filename} to {flight_dive_data_filename}")
+            except Exception:
+                pass  # file corrupt or doesn't exist
 
     if flight_dive_data_d is not None:  # prior version exists?
         rebuild = flight_dive_data_d["fm_version"] != fm_version
@@ -652,7 +799,7 @@ def load_flight_database(
         return True
 
     # if we get here create or restart db
-    flight_dive_data_d = {}
+    flight_dive_data_d = flight_database()
     flight_dive_data_d.update(
         {
             "fm_version": fm_version,
@@ -780,7 +927,235 @@ def load_flight_database(
 #         return
 
 
-# Dump/checkpoint the flight database by pickling
+# The flight database is kept in an sqlite file with a row per header entry, per dive
+# (flight_data instance) and per ab_grid_cache and restart_cache entry, each a pickled value,
+# plus the processing history as appended chunks.  Dive and cache rows are unpickled when
+# first used, and saves rewrite only the header and the rows assigned or changed since the
+# last save, in a single transaction.  So the cost per dive does not grow with the mission
+# and an interrupted save leaves the previous state intact.
+flight_db_cache_tables = ("ab_grid_cache", "restart_cache")
+flight_db_dive_tables = ("dives", *flight_db_cache_tables)
+
+
+def open_flight_db(db_filename):
+    con = sqlite3.connect(db_filename)
+    con.execute("CREATE TABLE IF NOT EXISTS header (name TEXT PRIMARY KEY, value BLOB)")
+    for table in flight_db_dive_tables:
+        con.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} (dive_num INTEGER PRIMARY KEY, value BLOB)"
+        )
+    con.execute(
+        "CREATE TABLE IF NOT EXISTS history (id INTEGER PRIMARY KEY AUTOINCREMENT, text TEXT)"
+    )
+    return con
+
+
+class flight_db_table(collections.abc.MutableMapping):
+    """A dive_num -> value table of the flight database
+
+    Rows are unpickled from db_filename on first access.  Assigned and deleted dive_nums
+    are recorded so write_flight_db() writes only those rows.  ab_grid_cache and
+    restart_cache entries are replaced, never updated in place; changes to flight_data
+    instances are recorded by flight_data itself.
+    """
+
+    def __init__(self, table, db_filename=None, con=None):
+        self.table = table
+        self.db_filename = db_filename
+        self.loaded = {}
+        self.unloaded = set()  # dive_nums in db_filename not yet unpickled
+        self.changed = set()  # dive_nums assigned or deleted since the last save
+        if con is not None:
+            self.unloaded = {
+                dive_num for (dive_num,) in con.execute(f"SELECT dive_num FROM {table}")
+            }
+
+    def __getitem__(self, dive_num):
+        try:
+            return self.loaded[dive_num]
+        except KeyError:
+            if dive_num not in self.unloaded:
+                raise
+        con = sqlite3.connect(self.db_filename)
+        try:
+            (value,) = con.execute(
+                f"SELECT value FROM {self.table} WHERE dive_num = ?", (int(dive_num),)
+            ).fetchone()
+        finally:
+            con.close()
+        self.unloaded.discard(dive_num)
+        self.loaded[dive_num] = pickle.loads(value)
+        return self.loaded[dive_num]
+
+    def __setitem__(self, dive_num, value):
+        self.loaded[dive_num] = value
+        self.unloaded.discard(dive_num)
+        self.changed.add(dive_num)
+
+    def __delitem__(self, dive_num):
+        if dive_num in self.unloaded:
+            self.unloaded.discard(dive_num)
+        else:
+            del self.loaded[dive_num]
+        self.changed.add(dive_num)
+
+    def __contains__(self, dive_num):
+        return dive_num in self.loaded or dive_num in self.unloaded
+
+    def __iter__(self):
+        return iter(sorted([*self.loaded, *self.unloaded]))
+
+    def __len__(self):
+        return len(self.loaded) + len(self.unloaded)
+
+    def __repr__(self):
+        return f"<{self.table}: {len(self)} entries, {len(self.loaded)} loaded>"
+
+    def __reduce__(self):
+        # Checkpoints (and anything else pickling the database) get a plain dict
+        return (dict, (dict(self.items()),))
+
+    def load_all(self):
+        for dive_num in list(self.unloaded):
+            self[dive_num]  # pylint: disable=pointless-statement
+
+    def write(self, con, full, changed=()):
+        """Writes the changed rows (all rows if full) to con"""
+        if full:
+            self.load_all()
+            dive_nums = self.loaded.keys()
+        else:
+            dive_nums = self.changed | (set(changed) & self.loaded.keys())
+        for dive_num in sorted(dive_nums):
+            if dive_num in self.loaded:
+                con.execute(
+                    f"INSERT OR REPLACE INTO {self.table} VALUES (?, ?)",
+                    (int(dive_num), pickle.dumps(self.loaded[dive_num])),
+                )
+            else:
+                con.execute(
+                    f"DELETE FROM {self.table} WHERE dive_num = ?", (int(dive_num),)
+                )
+
+
+class flight_database(collections.abc.MutableMapping):
+    """The flight database - flight_dive_data_d
+
+    String keys are the header entries, held in memory; integer keys are the per-dive
+    flight_data instances, fetched from db_filename as they are used.
+    """
+
+    def __init__(self, db_filename=None, con=None):
+        self.db_filename = db_filename
+        self.header = {}
+        self.dives = flight_db_table("dives", db_filename, con)
+        self.history_saved_len = 0
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.header[key]
+        return self.dives[key]
+
+    def __setitem__(self, key, value):
+        if isinstance(key, str):
+            if key in flight_db_cache_tables and not isinstance(value, flight_db_table):
+                table = flight_db_table(key)
+                table.update(value)
+                value = table
+            self.header[key] = value
+        else:
+            self.dives[key] = value
+
+    def __delitem__(self, key):
+        if isinstance(key, str):
+            del self.header[key]
+        else:
+            del self.dives[key]
+
+    def __contains__(self, key):
+        if isinstance(key, str):
+            return key in self.header
+        return key in self.dives
+
+    def __iter__(self):
+        yield from list(self.header)
+        yield from self.dives
+
+    def __len__(self):
+        return len(self.header) + len(self.dives)
+
+    def __reduce__(self):
+        return (dict, (dict(self.items()),))
+
+    def tables(self):
+        return (self.dives, *(self.header[table] for table in flight_db_cache_tables))
+
+
+def read_flight_db(db_filename):
+    """Returns the flight_database stored in db_filename, or None if it holds none"""
+    con = open_flight_db(db_filename)
+    try:
+        fdd = flight_database(db_filename, con)
+        for name, value in con.execute("SELECT name, value FROM header"):
+            fdd.header[name] = pickle.loads(value)
+        for table in flight_db_cache_tables:
+            fdd.header[table] = flight_db_table(table, db_filename, con)
+        fdd.header["history"] = "".join(
+            text for (text,) in con.execute("SELECT text FROM history ORDER BY id")
+        )
+        fdd.history_saved_len = len(fdd.header["history"])
+    finally:
+        con.close()
+    if "fm_version" not in fdd:
+        return None
+    return fdd
+
+
+def write_flight_db(db_filename, fdd):
+    """Writes what changed in fdd, a flight_database, since it was read from or last
+    written to db_filename (everything if it came from elsewhere)"""
+    history = fdd["history"]
+    full = fdd.db_filename != db_filename or len(history) < fdd.history_saved_len
+    tables = fdd.tables()
+    if full:
+        for table in tables:
+            table.load_all()  # before db_filename is cleared below
+    con = open_flight_db(db_filename)
+    try:
+        with con:  # a single transaction
+            if full:
+                for table in ("history", *flight_db_dive_tables):
+                    con.execute(f"DELETE FROM {table}")
+                history_saved_len = 0
+            else:
+                history_saved_len = fdd.history_saved_len
+            # The header is a fixed set of small entries - rewrite it
+            con.execute("DELETE FROM header")
+            for name, value in fdd.header.items():
+                if name not in ("history", *flight_db_cache_tables):
+                    con.execute(
+                        "INSERT INTO header VALUES (?, ?)", (name, pickle.dumps(value))
+                    )
+            fdd.dives.write(con, full, flight_data.changed_dives)
+            for table in tables[1:]:
+                table.write(con, full)
+            if len(history) > history_saved_len:
+                con.execute(
+                    "INSERT INTO history (text) VALUES (?)",
+                    (history[history_saved_len:],),
+                )
+    finally:
+        con.close()
+    # Committed - only now forget what changed, so a failed save is retried
+    fdd.db_filename = db_filename
+    fdd.history_saved_len = len(history)
+    for table in tables:
+        table.db_filename = db_filename
+        table.changed.clear()
+    flight_data.changed_dives.clear()
+
+
+# Dump/checkpoint the flight database
 # pylint: disable=unused-argument
 def save_flight_database(base_opts, dump_mat=False):
     global flight_dive_data_d, flight_dive_data_filename, flight_dive_nums
@@ -792,11 +1167,9 @@ def save_flight_database(base_opts, dump_mat=False):
         BaseLogger.self.startStringCapture()  # restart string capture
 
         try:
-            fh = open(flight_dive_data_filename, "wb")
-            pickle.dump((flight_dive_data_d), fh)
-            fh.close()
+            write_flight_db(flight_dive_data_filename, flight_dive_data_d)
         except Exception:
-            log_warning(f"Unable to rebuild {flight_dive_data_filename}!")
+            log_warning(f"Unable to update {flight_dive_data_filename}!", "exc")
 
         dump_mat = dump_mat or dump_checkpoint_data_matfiles
         if dump_mat:
@@ -858,7 +1231,10 @@ def save_flight_database(base_opts, dump_mat=False):
                 mat_d["rms_ib"] = dives_ib
                 mat_d["rms_min_misfit"] = dives_misfit
                 mat_d["rms_pitch_d_diff"] = dives_pitch_d_diff
-            mat_filename = f"{flight_dive_data_filename}.mat"
+            # Named for the original pickled database for the benefit of existing matlab scripts
+            mat_filename = os.path.join(
+                os.path.dirname(flight_dive_data_filename), "flight.pkl.mat"
+            )
             sio.savemat(mat_filename, {"flight_dive_data": mat_d})
         if checkpoint_flight_dive_data and flight_dive_nums is not None:
             global flight_directory
@@ -866,7 +1242,8 @@ def save_flight_database(base_opts, dump_mat=False):
             output_basename = os.path.join(
                 flight_directory, "fdd_%04d" % max(flight_dive_nums)
             )
-            shutil.copyfile(flight_dive_data_filename, f"{output_basename}.pkl")
+            with open(f"{output_basename}.pkl", "wb") as fh:
+                pickle.dump((flight_dive_data_d), fh)
             if dump_mat:
                 shutil.copyfile(mat_filename, f"{output_basename}.mat")
     else:
@@ -1095,6 +1472,11 @@ def load_dive_data(base_opts, dive_data):
     dive_num = dive_data.dive_num
 
     dive_nc_file_name = nc_path_format % dive_num
+    cache_key = dive_data_cache_key("flight", dive_num, dive_nc_file_name)
+    if cache_key is not None:
+        data_d = dive_data_cache.fetch(cache_key, dive_data)
+        if data_d is not None:
+            return data_d
     try:
         dive_nc_file = Utils.open_netcdf_file(dive_nc_file_name, "r")
     except Exception:
@@ -1477,6 +1859,15 @@ def load_dive_data(base_opts, dive_data):
             data_d["VBD_CNV"] = vbd_cnts_per_cc
 
             dive_data.dive_data_ok = True  # data available
+            if cache_key is not None:
+                dive_data_cache.store(
+                    cache_key,
+                    dive_data,
+                    data_d,
+                    vbd_neutral,
+                    eng_vbd_cc,
+                    load_dive_data_attributes,
+                )
     except KeyError:
         log_error("Could not get required data for dive %d" % dive_num)
         data_d = None
@@ -1791,10 +2182,238 @@ def solve_vbdbias_abs_compress(base_opts, dive_data):
     return True
 
 
-def solve_ab_grid(base_opts, dive_set, reprocess_count, dive_num=None):
-    """returns the w_rms grid for a set of dives and the min a/b"""
-    # CONSIDER: for speed, pass tared prior W_misfit_RMS array, if any, and restrict search
-    # to prior values of .3 or so
+def solve_ab_grid_loop(base_opts, abs_compress, combined_data_d):
+    """Evaluate w_rms_func() cell by cell over hd_a_grid x hd_b_grid
+    Returns the W_misfit_RMS grid and the indices of its minimum"""
+    na = len(hd_a_grid)
+    nb = len(hd_b_grid)
+    W_misfit_RMS = np.zeros((nb, na), np.float64)
+    min_w_rms = 1000  # w_rms_func_bad
+    min_ia = 0
+    min_ib = 0
+    for grid_a, ia in zip(hd_a_grid, list(range(na)), strict=True):
+        for grid_b, ib in zip(hd_b_grid, list(range(nb)), strict=True):
+            # explicitly zero vbdbias since the dive-by-dive vbdbias has already been applied to combined_data_d
+            w_rms = w_rms_func(
+                base_opts, 0, grid_a, grid_b, abs_compress, combined_data_d
+            )
+            W_misfit_RMS[ib, ia] = w_rms
+            if w_rms is not w_rms_func_bad and w_rms < min_w_rms:
+                min_w_rms = w_rms
+                min_ia = ia
+                min_ib = ib
+    return W_misfit_RMS, min_ia, min_ib
+
+
+def w_rms_ab_column(
+    hd_a,
+    hd_b_v,
+    buoyancy,
+    pitch,
+    w,
+    velo_speed,
+    velo_mode,
+    correct_aoa_velo,
+    consts_d,
+    min_non_stalled,
+    w_rms_bad,
+):
+    """Compute w_rms_func() for a fixed hd_a over a vector of hd_b values
+
+    Everything is passed explicitly (no module globals) so this can run in a worker process.
+    velo_mode is compare_velo if velo data is available at all points, else 0.
+    Returns a vector of w_rms, one per hd_b; w_rms_bad marks failed solutions.
+    """
+    hd_b_v = np.asarray(hd_b_v, np.float64)
+    converged_v, speed_v, glide_angle_v, stalled_v = hydro_model_grid(
+        buoyancy, pitch, consts_d, np.full(len(hd_b_v), hd_a), hd_b_v
+    )
+
+    def rms(x):
+        return np.sqrt(np.nanmean(x**2))
+
+    num_pts = len(w)
+    w_rms_v = np.full(len(hd_b_v), w_rms_bad, np.float64)
+    for ib in np.nonzero(converged_v)[0]:
+        valid_i = ~stalled_v[ib]
+        valid_pts = float(np.count_nonzero(valid_i))
+        if not (valid_pts > 0 and valid_pts / num_pts > min_non_stalled):
+            continue
+        hdm_w_speed_cm_s_v = speed_v[ib] * np.sin(glide_angle_v[ib])
+        w_rms = rms(w[valid_i] - hdm_w_speed_cm_s_v[valid_i])
+        if velo_mode:
+            # See w_rms_func() for the velocimeter comparisons
+            v_speed = copy.copy(velo_speed)
+            if correct_aoa_velo:
+                aoa_radians_v = glide_angle_v[ib][valid_i] - np.radians(pitch[valid_i])
+                v_speed[valid_i] *= 1 / np.cos(aoa_radians_v)
+            if velo_mode in (1, 3):
+                w_rms += rms(v_speed[valid_i] - speed_v[ib][valid_i])
+            if velo_mode in (2, 3):
+                velo_w = v_speed * np.sin(glide_angle_v[ib])
+                w_rms += rms(w[valid_i] - velo_w[valid_i])
+        w_rms_v[ib] = w_rms
+    return w_rms_v
+
+
+def coarse_brackets(n, coarse_i):
+    """For each of range(n), the coarse_i entries either side of it and the fraction of the way
+    from the first to the second"""
+    coarse_i = np.asarray(coarse_i)
+    j = np.searchsorted(coarse_i, np.arange(n), side="right") - 1
+    j = np.clip(j, 0, max(len(coarse_i) - 2, 0))
+    lo = coarse_i[j]
+    hi = coarse_i[np.minimum(j + 1, len(coarse_i) - 1)]
+    return lo, hi, (np.arange(n) - lo) / np.maximum(hi - lo, 1)
+
+
+def solve_ab_grid_batched(base_opts, abs_compress, combined_data_d, prior_ia_ib=None):
+    """Evaluate the hd_a_grid x hd_b_grid misfit a column (all of hd_b_grid for one hd_a) at a time
+
+    Returns the same W_misfit_RMS grid and minimum indices as solve_ab_grid_loop().
+    The columns are optionally spread over ab_grid_workers processes and, if ab_grid_coarse_stride
+    is set, only the neighborhoods of the coarse minimum and of prior_ia_ib (the previous
+    solution's minimum) are fully evaluated.  The other cells are interpolated from the coarse
+    lattice, or are w_rms_func_bad next to a stalled coarse cell.
+    """
+    global HIST
+    na = len(hd_a_grid)
+    nb = len(hd_b_grid)
+    # buoyancy does not depend on a/b so compute it once for the whole grid
+    # explicitly zero vbdbias since the dive-by-dive vbdbias has already been applied to combined_data_d
+    buoyancy, pitch, w, _ = compute_buoyancy(
+        base_opts, 0, abs_compress, combined_data_d
+    )
+    velo_mode = compare_velo if (compare_velo and combined_data_d["n_velo"]) else 0
+    velo_speed = combined_data_d["velo_speed"] if velo_mode else None
+    consts_d = dict(flight_consts_d)
+
+    W_misfit_RMS = np.zeros((nb, na), np.float64)
+    evaluated = np.zeros((nb, na), bool)
+
+    def evaluate(ia_v, ib_v):
+        """Fill in W_misfit_RMS for any cells of ia_v x ib_v not yet evaluated"""
+        todo = []
+        for ia in ia_v:
+            ib_todo = [ib for ib in ib_v if not evaluated[ib, ia]]
+            if ib_todo:
+                todo.append((ia, ib_todo))
+        args = [
+            (
+                hd_a_grid[ia],
+                hd_b_grid[ib_todo],
+                buoyancy,
+                pitch,
+                w,
+                velo_speed,
+                velo_mode,
+                combined_data_d["correct_aoa_velo"],
+                consts_d,
+                non_stalled_percent,
+                w_rms_func_bad,
+            )
+            for ia, ib_todo in todo
+        ]
+        if ab_grid_workers > 1 and len(todo) > 1:
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=min(ab_grid_workers, len(todo))
+            ) as executor:
+                results = list(executor.map(w_rms_ab_column, *zip(*args, strict=True)))
+        else:
+            results = [w_rms_ab_column(*a) for a in args]
+        for (ia, ib_todo), w_rms_v in zip(todo, results, strict=True):
+            W_misfit_RMS[ib_todo, ia] = w_rms_v
+            evaluated[ib_todo, ia] = True
+
+    def grid_min():
+        """Same search order and tie breaking as solve_ab_grid_loop()"""
+        min_w_rms = 1000  # w_rms_func_bad
+        min_ia = 0
+        min_ib = 0
+        for ia in range(na):
+            for ib in range(nb):
+                if not evaluated[ib, ia]:
+                    continue
+                w_rms = W_misfit_RMS[ib, ia]
+                if w_rms != w_rms_func_bad and w_rms < min_w_rms:
+                    min_w_rms = w_rms
+                    min_ia = ia
+                    min_ib = ib
+        return min_ia, min_ib
+
+    stride = ab_grid_coarse_stride
+    if stride > 1 and (na > stride or nb > stride):
+        coarse_ia = sorted(set(range(0, na, stride)) | {na - 1})
+        coarse_ib = sorted(set(range(0, nb, stride)) | {nb - 1})
+        evaluate(coarse_ia, coarse_ib)
+
+        def refine(ia, ib):
+            evaluate(
+                range(max(ia - stride, 0), min(ia + stride + 1, na)),
+                range(max(ib - stride, 0), min(ib + stride + 1, nb)),
+            )
+
+        # Densify around the prior solution's minimum, if any, and the coarse minimum,
+        # following the minimum if it lands on the edge of the refined window
+        if prior_ia_ib is not None:
+            refine(*prior_ia_ib)
+        min_ia, min_ib = grid_min()
+        while True:
+            refine(min_ia, min_ib)
+            new_ia, new_ib = grid_min()
+            if (new_ia, new_ib) == (min_ia, min_ib):
+                break
+            min_ia, min_ib = new_ia, new_ib
+        # Fill in the unevaluated cells by bilinear interpolation between the coarse cells
+        # around them - unless any of those stalled, so stalls are not blended into misfits
+        lo_a, hi_a, f_a = coarse_brackets(na, coarse_ia)
+        lo_b, hi_b, f_b = coarse_brackets(nb, coarse_ib)
+        corners = [
+            W_misfit_RMS[np.ix_(b_i, a_i)]
+            for b_i in (lo_b, hi_b)
+            for a_i in (lo_a, hi_a)
+        ]
+        f_a = f_a[np.newaxis, :]
+        f_b = f_b[:, np.newaxis]
+        interp_W = (1 - f_b) * ((1 - f_a) * corners[0] + f_a * corners[1]) + f_b * (
+            (1 - f_a) * corners[2] + f_a * corners[3]
+        )
+        interp_W[np.any([c == w_rms_func_bad for c in corners], axis=0)] = (
+            w_rms_func_bad
+        )
+        W_misfit_RMS[~evaluated] = interp_W[~evaluated]
+        log_debug(
+            "Coarse a/b grid search evaluated %d of %d cells"
+            % (np.count_nonzero(evaluated), na * nb)
+        )
+    else:
+        evaluate(range(na), range(nb))
+        min_ia, min_ib = grid_min()
+
+    for ia in range(na):
+        for ib in range(nb):
+            if evaluated[ib, ia]:
+                HIST.append(
+                    (
+                        0,
+                        hd_a_grid[ia],
+                        hd_b_grid[ib],
+                        abs_compress,
+                        W_misfit_RMS[ib, ia],
+                    )
+                )  # DEBUG
+    # Leave the flight constants as the cell-by-cell search would
+    flight_consts_d["hd_a"] = hd_a_grid[-1]
+    flight_consts_d["hd_b"] = hd_b_grid[-1]
+    return W_misfit_RMS, min_ia, min_ib
+
+
+def solve_ab_grid(
+    base_opts, dive_set, reprocess_count, dive_num=None, prior_ia_ib=None
+):
+    """returns the w_rms grid for a set of dives and the min a/b
+    prior_ia_ib, the previous grid solution's min a/b indices, if any, seeds the coarse search
+    """
     global HIST, flight_dive_data_d, dive_data_vector_names, hd_a_grid, hd_b_grid
     HIST = []
     if dive_num is None:
@@ -1808,7 +2427,7 @@ def solve_ab_grid(base_opts, dive_set, reprocess_count, dive_num=None):
     correct_aoa_velo = False
     for dive_set_num in dive_set:
         dd = flight_dive_data_d[dive_set_num]
-        # NOTE we used to cache this data in a dive_cache_d but not really worth it?
+        # NOTE load_dive_data() serves overlapping dive sets from dive_data_cache
         dive_data_d = load_dive_data(base_opts, dd)  # load data
         if dd.dive_data_ok is False:
             log_error(
@@ -1847,24 +2466,15 @@ def solve_ab_grid(base_opts, dive_set, reprocess_count, dive_num=None):
     for vector_name in dive_data_vector_names:
         combined_data_d[vector_name] = np.array(combined_data_d[vector_name])
 
-    na = len(hd_a_grid)
-    nb = len(hd_b_grid)
     start_time = time.time()
-    W_misfit_RMS = np.zeros((nb, na), np.float64)
-    min_w_rms = 1000  # w_rms_func_bad
-    min_ia = 0
-    min_ib = 0
-    for grid_a, ia in zip(hd_a_grid, list(range(na)), strict=True):
-        for grid_b, ib in zip(hd_b_grid, list(range(nb)), strict=True):
-            # explicitly zero vbdbias since the dive-by-dive vbdbias has already been applied to combined_data_d
-            w_rms = w_rms_func(
-                base_opts, 0, grid_a, grid_b, abs_compress, combined_data_d
-            )
-            W_misfit_RMS[ib, ia] = w_rms
-            if w_rms is not w_rms_func_bad and w_rms < min_w_rms:
-                min_w_rms = w_rms
-                min_ia = ia
-                min_ib = ib
+    if ab_grid_solver == "loop":
+        W_misfit_RMS, min_ia, min_ib = solve_ab_grid_loop(
+            base_opts, abs_compress, combined_data_d
+        )
+    else:
+        W_misfit_RMS, min_ia, min_ib = solve_ab_grid_batched(
+            base_opts, abs_compress, combined_data_d, prior_ia_ib
+        )
     end_time = time.time()
     # log_debug
     log_info(
@@ -1929,6 +2539,14 @@ def load_dive_data_DAC(base_opts, dive_data):
     # So far so good
     dive_num = dive_data.dive_num
     dive_nc_file_name = nc_path_format % dive_num
+    # start_time is used to build the time bases below
+    cache_key = dive_data_cache_key(
+        ("DAC", dive_data.start_time), dive_num, dive_nc_file_name
+    )
+    if cache_key is not None:
+        data_d = dive_data_cache.fetch(cache_key, dive_data)
+        if data_d is not None:
+            return data_d
     try:
         dive_nc_file = Utils.open_netcdf_file(dive_nc_file_name, "r")
     except Exception:
@@ -2025,6 +2643,8 @@ def load_dive_data_DAC(base_opts, dive_data):
             vbd0 + eng_vbd_cc
         )  # [cc] measured displaced volume of glider as it varies by VBD adjustments
         data_d["displaced_volume"] = displaced_volume  # for buoyancy calculations
+        if cache_key is not None:
+            dive_data_cache.store(cache_key, dive_data, data_d, vbd_neutral, eng_vbd_cc)
 
     except KeyError:
         log_error("Could not get required DAC data for dive %d" % dive_num)
@@ -2401,7 +3021,7 @@ def process_dive(
             d_n_i = np.where(aflight_dive_nums < new_dive_num)[0]
             restart_from_dive_num = flight_dive_nums[d_n_i[-1]]
             # restore predicted ab and trust from restart_from_dive_num
-            log_debug(restart_cache_d.keys())
+            log_debug(list(restart_cache_d.keys()))
             if restart_from_dive_num in restart_cache_d:
                 (
                     mr_dives_pitches,
@@ -2879,8 +3499,13 @@ def process_dive(
                 )
                 # Now we have a set of dives to run 'regress_vbd' on over a fixed grid for cross-group and mission comparison
                 # compute a new ab grid solution
+                prior_entry = ab_grid_cache_d.get(last_W_misfit_RMS_dive_num)
                 W_misfit_RMS, ia, ib = solve_ab_grid(
-                    base_opts, dive_set, reprocess_count, dive_num
+                    base_opts,
+                    dive_set,
+                    reprocess_count,
+                    dive_num,
+                    None if prior_entry is None else prior_entry[1:3],
                 )
                 if W_misfit_RMS is None:
                     log_warning("Grid solution failed - ignoring!")
@@ -3773,7 +4398,8 @@ def main(
         angles, \
         grid_spacing_keys, \
         grid_dive_sets, \
-        dump_checkpoint_data_matfiles
+        dump_checkpoint_data_matfiles, \
+        dive_data_cache
 
     if base_opts is None:
         base_opts = BaseOpts.BaseOptions(
@@ -3836,6 +4462,7 @@ def main(
     # At this point all global parameters are updated so derive things from them
     grid_spacing_keys = sorted(list(grid_spacing_d.keys()))
     angles = np.linspace(0, pitchmax, pitchmax + 1)  # integral angle bins
+    dive_data_cache = DiveDataCache(dive_data_cache_max_mb * 1024 * 1024)
 
     if Utils.normalize_version(Globals.basestation_version) < Utils.normalize_version(
         "2.12"
@@ -4257,6 +4884,7 @@ def main(
             if all(map(lambda d: d in flight_dive_data_d, dive_set)):
                 log_info(f"Solving a/b grid for {dive_set}")
                 solve_ab_grid(base_opts, dive_set, 99)
+    dive_data_cache.report()
     return ret_val
 
 
@@ -473,3 +473,130 @@ def hydro_model(buoyancy_v, vehicle_pitch_degrees_v, calib_consts):
     u_mag = np.array(u_mag)
     theta = np.array(theta)
     return (converged, u_mag, theta, stalled_i_v)
+
+
+def hydro_model_grid(buoyancy_v, vehicle_pitch_degrees_v, calib_consts, hd_a_v, hd_b_v):
+    """Evaluate hydro_model() for a set of hd_a/hd_b pairs at once
+
+    Each pair is a row of the returned arrays and is iterated exactly as hydro_model() would
+    iterate it alone: a row stops updating once it converges (or once nothing is flying) so
+    the per-row results match the scalar version.  This lets FlightModel evaluate a whole
+    row of its a/b misfit grid as array operations.
+
+    Input:
+        buoyancy_v - n_pts vector (grams, positive is upward)
+        vehicle_pitch_degrees_v - observed vehicle pitch (degrees, positive nose up)
+        calib_consts - as for hydro_model(); hd_a and hd_b are ignored
+        hd_a_v, hd_b_v - n_pairs vectors of the hd_a/hd_b values to evaluate
+
+    Returns:
+        converged_v - n_pairs boolean vector, whether each row converged
+        umag - n_pairs x n_pts total vehicle speed through the water (cm/s)
+        theta - n_pairs x n_pts glide angle in radians, positive nose up
+        stalled_v - n_pairs x n_pts boolean array, True where stalled
+    """
+    buoyancy_v = np.asarray(buoyancy_v, float)
+    vehicle_pitch_degrees_v = np.asarray(vehicle_pitch_degrees_v, float)
+    num_rows = len(buoyancy_v)
+    hd_a = np.asarray(hd_a_v, float).reshape(-1, 1)
+    hd_b = np.asarray(hd_b_v, float).reshape(-1, 1)
+    num_pairs = hd_a.shape[0]
+    hd_c = calib_consts["hd_c"]
+    hd_s = calib_consts["hd_s"]
+    rho0 = calib_consts["rho0"]
+    glider_length = calib_consts["glider_length"]
+
+    assert np.all(hd_b != 0.0)
+    assert hd_s != -1.0
+
+    # See hydro_model() for the derivation of each of these terms
+    l2 = glider_length * glider_length
+    l2_hd_b2 = 2.0 * l2 * hd_b
+    hd_a2 = hd_a * hd_a
+    hd_bc4 = 4.0 * hd_b * hd_c
+    hd_c2 = 2.0 * hd_c
+
+    buoyancy_sign_v = np.sign(buoyancy_v)
+    pitch_sign_v = np.ones(num_rows, float)
+    pitched_i_v = np.where(vehicle_pitch_degrees_v != 0.0)[0]
+    pitch_sign_v[pitched_i_v] = np.sign(vehicle_pitch_degrees_v[pitched_i_v])
+    buoyancy_pitch_ok_v = np.zeros(num_rows, float)
+    buoyancy_pitch_ok_v[np.where(buoyancy_sign_v * pitch_sign_v > 0.0)[0]] = 1.0
+    buoyancy_force_v = buoyancy_v * g2kg * gravity
+
+    theta = np.tile((math.pi / 4.0) * buoyancy_sign_v, (num_pairs, 1))
+    q = np.power(buoyancy_sign_v * buoyancy_force_v / (l2 * hd_b), 1 / (1 + hd_s))
+
+    converged_v = np.zeros(num_pairs, bool)
+    no_flight_v = np.zeros(num_pairs, bool)
+    active_i = np.arange(num_pairs)
+    residual_test = 0.001  # as hydro_model()
+    for j in range(loop_count):
+        q_a = q[active_i]
+        theta_a = theta[active_i]
+        q_prev = np.array(q_a)
+        with warnings.catch_warnings():
+            neg_i = q_prev < 0
+            q_prev[neg_i] = np.nan
+            warnings.simplefilter("ignore")
+            scaled_drag = np.power(q_prev, -hd_s)
+        tth_v = np.tan(theta_a)
+        discriminant_inv_v = (
+            hd_a2[active_i] * tth_v * tth_v * scaled_drag / hd_bc4[active_i]
+        )
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            flying_v = buoyancy_pitch_ok_v * discriminant_inv_v > 1.0
+        q_a[:] = 0.0
+        any_flying_v = np.any(flying_v, axis=1)
+        if not np.all(any_flying_v):
+            # Rows with nothing flying are finished, reported as unconverged and fully stalled
+            no_flight_v[active_i[~any_flying_v]] = True
+        sqrt_discriminant = np.sqrt(1.0 - 1.0 / discriminant_inv_v[flying_v])
+        row_i, _ = np.nonzero(flying_v)
+        q_a[flying_v] = (
+            (
+                np.broadcast_to(buoyancy_force_v, flying_v.shape)[flying_v]
+                * np.sin(theta_a[flying_v])
+                * scaled_drag[flying_v]
+            )
+            / l2_hd_b2[active_i][row_i, 0]
+            * (1.0 + sqrt_discriminant)
+        )
+        alpha = (-hd_a[active_i][row_i, 0] * tth_v[flying_v] / hd_c2) * (
+            1.0 - sqrt_discriminant
+        )
+        theta_a[:] = 0.0
+        theta_a[flying_v] = np.radians(
+            np.broadcast_to(vehicle_pitch_degrees_v, flying_v.shape)[flying_v] - alpha
+        )
+        residual_v = np.full(flying_v.shape, -np.inf)
+        residual_v[flying_v] = np.fabs(
+            (q_a[flying_v] - q_prev[flying_v]) / q_a[flying_v]
+        )
+        max_residual_v = np.max(residual_v, axis=1)
+
+        # Rows without flight keep the q/theta they had when hydro_model() would have returned
+        live_v = any_flying_v
+        q[active_i[live_v]] = q_a[live_v]
+        theta[active_i[live_v]] = theta_a[live_v]
+        q[active_i[~live_v]] = 0.0
+
+        done_v = (max_residual_v < residual_test) & live_v & (j >= 2)
+        converged_v[active_i[done_v]] = True
+        active_i = active_i[live_v & ~done_v]
+        if len(active_i) == 0:
+            break
+
+    u_mag = m2cm * np.sqrt(2.0 * q / rho0)
+
+    # As find_stalled() plus the points where pitch is opposite buoyancy forcing
+    stalled_v = (
+        (u_mag >= calib_consts["max_stall_speed"])
+        & (vehicle_pitch_degrees_v < calib_consts["min_stall_angle"])
+    ) | (u_mag <= calib_consts["min_stall_speed"])
+    stalled_v |= buoyancy_pitch_ok_v == 0.0
+    stalled_v[no_flight_v] = True
+    u_mag[stalled_v] = 0.0
+    theta[stalled_v] = 0.0
+    return (converged_v, u_mag, theta, stalled_v)
@@ -35,7 +35,6 @@
 from __future__ import annotations
 
 import argparse
-import contextlib
 import datetime
 import math
 import os
@@ -70,21 +69,22 @@ def magcal(
     doplot: str
 ) -> tuple[list, np.array, float, float, Any]:
 
-    nc_files = []
+    dive_extracts = []
     for d in dives:
         fname = os.path.join(path, f'p{glider:03d}{d:04d}.nc')
-        with contextlib.suppress(Exception):
-            nc_files.append(Utils.open_netcdf_file(fname))
+        dive_extract = Utils.read_dive_extract(fname, "magcal", magcal_extract_version, magcal_extract)
+        if dive_extract is not None:
+            dive_extracts.append(dive_extract)
 
-    if len(nc_files) == 0:
+    if len(dive_extracts) == 0:
         return ([], [], 0, 0, None)
 
-    if len(nc_files) == 1:
-        title = PlotUtils.get_mission_dive(nc_files[0])
+    if len(dive_extracts) == 1:
+        title = str(dive_extracts[0]["mission_dive"])
     else:
-        title = PlotUtils.get_mission_str(nc_files[0]) + f' dives {dives}'
+        title = str(dive_extracts[0]["mission_str"]) + f' dives {dives}'
 
-    hard, soft, cover, circ, fig = magcal_worker(nc_files, softiron, doplot, title)
+    hard, soft, cover, circ, fig = magcal_extract_worker(dive_extracts, softiron, doplot, title)
 
     if fig and doplot == 'png':
         imgs = fig.to_image(format="png")
@@ -104,19 +104,55 @@ def magcal(
 
     return (hard, soft, cover, circ, imgs)
 
+# Bump whenever magcal_extract changes
+magcal_extract_version = 1
+
+def magcal_extract(
+    nc: scipy.io._netcdf.netcdf_file
+) -> dict[str, Any]:
+    """Pulls what magcal_extract_worker needs out of a dive netcdf file"""
+    extract = {
+        "has_mag": "eng_mag_x" in nc.variables,
+        "sg_data_point": nc.dimensions["sg_data_point"].size,
+        "mission_dive": PlotUtils.get_mission_dive(nc),
+        "mission_str": PlotUtils.get_mission_str(nc),
+    }
+
+    if extract["has_mag"]:
+        for var in ("eng_pitchAng", "eng_rollAng", "eng_mag_x", "eng_mag_y", "eng_mag_z"):
+            extract[var] = nc.variables[var][:]
+
+    for var in ("log_gps_lon", "log_gps_lat", "log_gps_time"):
+        if var in nc.variables:
+            extract[var] = nc.variables[var][:]
+
+    for var in ("log_IRON", "log_MAGCAL"):
+        if var in nc.variables:
+            extract[var] = nc.variables[var][:].tobytes().decode("utf-8")
+
+    return extract
+
 def magcal_worker(
     dive_nc_file: list[scipy.io._netcdf.netcdf_file],
     softiron: bool,
     doplot: str,
     title: str
 ) -> tuple[list, np.array, float, float, plotly.graph_object.Figure]:
+    return magcal_extract_worker([magcal_extract(f) for f in dive_nc_file], softiron, doplot, title)
+
+def magcal_extract_worker(
+    dive_extracts: list[dict[str, Any]],
+    softiron: bool,
+    doplot: str,
+    title: str
+) -> tuple[list, np.array, float, float, plotly.graph_object.Figure]:
     
-    if "eng_mag_x" not in dive_nc_file[0].variables:
+    if not dive_extracts[0]["has_mag"]:
         return ([], [], 0, 0, None)
 
     npts      = 0
-    for f in dive_nc_file:
-        npts = npts + f.dimensions["sg_data_point"].size
+    for f in dive_extracts:
+        npts = npts + f["sg_data_point"]
 
     pitch     = np.empty(shape=(0))
     roll      = np.empty(shape=(0))
@@ -129,7 +165,7 @@ def magcal_worker(
     if npts > 2000:
         decimate = math.ceil(npts / 2000)
         idx = range(0, npts, decimate)
-        npts = len(idx) + len(dive_nc_file)
+        npts = len(idx) + len(dive_extracts)
     else:
         decimate = 1
 
@@ -142,21 +178,21 @@ def magcal_worker(
     roll_deg  = np.empty(shape=(npts,))
 
     k = 0
-    for f in dive_nc_file:
-        mpts = f.dimensions["sg_data_point"].size
+    for f in dive_extracts:
+        mpts = f["sg_data_point"]
         idx = range(0, mpts, decimate)
         #print(idx)
         mpts = len(idx)
         #print(npts, k, mpts)
-        #print(len(f.variables["eng_pitchAng"][idx]))
+        #print(len(f["eng_pitchAng"][idx]))
         #print(len(pitch[k:k+mpts]))
-        pitch[k:k+mpts]     = f.variables["eng_pitchAng"][idx] * math.pi / 180.0
-        roll[k:k+mpts]      = f.variables["eng_rollAng"][idx] * math.pi / 180.0
-        fxm[k:k+mpts]       = f.variables["eng_mag_x"][idx]
-        fym[k:k+mpts]       = -f.variables["eng_mag_y"][idx]
-        fzm[k:k+mpts]       = -f.variables["eng_mag_z"][idx]
-        pitch_deg[k:k+mpts] = f.variables["eng_pitchAng"][idx]
-        roll_deg[k:k+mpts]  = f.variables["eng_rollAng"][idx]
+        pitch[k:k+mpts]     = f["eng_pitchAng"][idx] * math.pi / 180.0
+        roll[k:k+mpts]      = f["eng_rollAng"][idx] * math.pi / 180.0
+        fxm[k:k+mpts]       = f["eng_mag_x"][idx]
+        fym[k:k+mpts]       = -f["eng_mag_y"][idx]
+        fzm[k:k+mpts]       = -f["eng_mag_z"][idx]
+        pitch_deg[k:k+mpts] = f["eng_pitchAng"][idx]
+        roll_deg[k:k+mpts]  = f["eng_rollAng"][idx]
         k = k + mpts
         
     npts = max([k, npts])
@@ -269,9 +305,9 @@ def magcal_worker(
             # The 'unit' keyword in TimedeltaIndex construction is deprecated and will be removed in a future version. Use pd.to_timedelta instead.
             # on some package combos - filter out for now
             warnings.simplefilter('ignore', FutureWarning)            
-            igrf = ppigrf.igrf(dive_nc_file[0]['log_gps_lon'][0],
-                               dive_nc_file[0]['log_gps_lat'][0],
-                               0, datetime.datetime.fromtimestamp(dive_nc_file[0]['log_gps_time'][0]))
+            igrf = ppigrf.igrf(dive_extracts[0]['log_gps_lon'][0],
+                               dive_extracts[0]['log_gps_lat'][0],
+                               0, datetime.datetime.fromtimestamp(dive_extracts[0]['log_gps_time'][0]))
 
         Wf = 0.1
         Wfh = 1.0
@@ -426,14 +462,11 @@ def magcal_worker(
     fy_h = []
 
     doSG = False
-    if "log_IRON" in dive_nc_file[-1].variables:
+    if "log_IRON" in dive_extracts[-1]:
         iron = list(
             map(
                 float,
-                dive_nc_file[-1].variables["log_IRON"][:]
-                .tobytes()
-                .decode("utf-8")
-                .split(","),
+                str(dive_extracts[-1]["log_IRON"]).split(","),
             )
         )
 
@@ -451,14 +484,11 @@ def magcal_worker(
         doSG = True
         
     doMAGCAL = False
-    if "log_MAGCAL" in dive_nc_file[-1].variables:
+    if "log_MAGCAL" in dive_extracts[-1]:
         iron = list(
             map(
                 float,
-                dive_nc_file[-1].variables["log_MAGCAL"][:]
-                .tobytes()
-                .decode("utf-8")
-                .split(","),
+                str(dive_extracts[-1]["log_MAGCAL"]).split(","),
             )
         )
 
@@ -34,11 +34,13 @@
 
 """Routines for creating dive profiles from a Seaglider's eng and log files"""
 
+import concurrent.futures
 import contextlib
 import copy
 import cProfile
 import glob
 import math
+import multiprocessing
 import os
 import pdb
 import pstats
@@ -76,6 +78,9 @@ import Utils
 import Utils2
 from BaseLog import (
     BaseLogger,
+    log_capture_replay,
+    log_capture_start,
+    log_capture_stop,
     log_critical,
     log_debug,
     log_error,
@@ -2483,6 +2488,9 @@ def make_dive_profile(
         return (2, None)
 
     BaseNetCDF.reset_nc_char_dims()
+    BaseNetCDF.set_nc_write_profile(base_opts, "dive")
+    # --sensor_extension_budget applies per dive
+    Sensors.reset_extension_budget()
 
     # set up logging
     # str() prints 'None' for None rather than ''
@@ -7478,6 +7486,128 @@ def collect_nc_perdive_files(base_opts):
     return dive_nc_file_names
 
 
+def process_dive(dive_path, base_opts, logger_eng_files):
+    """Makes the per-dive netCDF file for one dive in a mission directory
+
+    Returns:
+        (dive_num, ret_val, nc_file_created) - ret_val as for make_dive_profile()
+    """
+    log_debug("Processing %s" % dive_path)
+    head, _ = os.path.splitext(os.path.abspath(dive_path))
+    if base_opts.target_dir:
+        _, base = os.path.split(os.path.abspath(dive_path))
+        outhead = os.path.join(base_opts.target_dir, base)
+    else:
+        outhead = head
+
+    log_info("Head = %s" % head)
+
+    eng_file_name = head + ".eng"
+    log_file_name = head + ".log"
+
+    base_opts.make_dive_profiles = True
+    nc_dive_file_name = outhead + ".nc"
+
+    sg_calib_file_name, _ = os.path.split(os.path.abspath(dive_path))
+    sg_calib_file_name = os.path.join(sg_calib_file_name, "sg_calib_constants.m")
+    dive_num = FileMgr.get_dive(eng_file_name)
+
+    log_info("Dive number = %d" % dive_num)
+
+    log_debug("logger_eng_files = %s" % logger_eng_files[dive_path])
+
+    nc_file_created = None
+    try:
+        (ret_val, nc_file_created) = make_dive_profile(
+            base_opts.force,
+            dive_num,
+            eng_file_name,
+            log_file_name,
+            sg_calib_file_name,
+            base_opts,
+            nc_dive_file_name,
+            logger_eng_files=logger_eng_files[dive_path],
+        )
+    except Exception:
+        if DEBUG_PDB:
+            _, _, tb = sys.exc_info()
+            traceback.print_exc()
+            pdb.post_mortem(tb)
+
+        log_error("Error processing dive %d - skipping" % dive_num, "exc")
+        ret_val = 1
+    finally:
+        TraceArray.trace_results_stop()  # Just in case we bailed out...no harm if closed
+        QC.qc_log_stop()
+
+    return (dive_num, ret_val, nc_file_created)
+
+
+# Worker process state for process_dives(), set by the pool initializer
+_dive_pool_args = None
+
+
+def _dive_pool_init(base_opts, logger_eng_files):
+    """Process pool initializer for process_dives()"""
+    global _dive_pool_args
+    _dive_pool_args = (base_opts, logger_eng_files)
+
+
+def _dive_pool_process(dive_path):
+    """Runs process_dive() in a pool worker, capturing its log output for the parent"""
+    log_capture_start()
+    try:
+        result = process_dive(dive_path, *_dive_pool_args)
+    except Exception:
+        log_error("Error processing %s - skipping" % dive_path, "exc")
+        result = (FileMgr.get_dive(dive_path + ".eng"), 1, None)
+    return (result, log_capture_stop())
+
+
+def process_dives(dive_list, base_opts, logger_eng_files):
+    """Makes the per-dive netCDF files for dive_list, using base_opts.jobs processes
+
+    Dives are independent, so with more than one job they are farmed out to a process
+    pool.  Each worker's log output is captured and replayed into this process's log,
+    one dive at a time, so the log and the results are in dive_list order regardless
+    of which dive finished first.  The generator finishes only after every dive has
+    finished, so callers can build the mission level products after the loop.
+
+    Yields:
+        (dive_num, ret_val, nc_file_created) for each dive, in dive_list order
+    """
+    jobs = min(max(base_opts.jobs, 1), len(dive_list))
+    if jobs <= 1:
+        for dive_path in dive_list:
+            yield process_dive(dive_path, base_opts, logger_eng_files)
+        return
+
+    log_info("Processing %d dives with %d jobs" % (len(dive_list), jobs))
+    # fork, so the workers inherit the sensor extensions and netCDF tables set up by the caller
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=jobs,
+        mp_context=multiprocessing.get_context("fork"),
+        initializer=_dive_pool_init,
+        initargs=(base_opts, logger_eng_files),
+    ) as executor:
+        futures = [
+            executor.submit(_dive_pool_process, dive_path) for dive_path in dive_list
+        ]
+        try:
+            for dive_path, future in zip(dive_list, futures, strict=True):
+                try:
+                    result, captured = future.result()
+                except Exception:
+                    log_error("Worker failed processing %s" % dive_path, "exc")
+                    result = (FileMgr.get_dive(dive_path + ".eng"), 1, None)
+                else:
+                    log_capture_replay(captured)
+                yield result
+        finally:
+            for future in futures:
+                future.cancel()
+
+
 def main():
     """Command line driver for creating per-dive netCDF files
 
@@ -7609,69 +7739,21 @@ def main():
     dives_processed = []
     dives_not_processed = []
     # Now, create the profiles
-    for dive_path in dive_list:
-        log_debug("Processing %s" % dive_path)
-        head, _ = os.path.splitext(os.path.abspath(dive_path))
-        if base_opts.target_dir:
-            _, base = os.path.split(os.path.abspath(dive_path))
-            outhead = os.path.join(base_opts.target_dir, base)
-        else:
-            outhead = head
-
-        log_info("Head = %s" % head)
-
-        eng_file_name = head + ".eng"
-        log_file_name = head + ".log"
-
-        base_opts.make_dive_profiles = True
-
-        if base_opts.make_dive_profiles:
-            nc_dive_file_name = outhead + ".nc"
-        else:
-            nc_dive_file_name = None
-
-        sg_calib_file_name, _ = os.path.split(os.path.abspath(dive_path))
-        sg_calib_file_name = os.path.join(sg_calib_file_name, "sg_calib_constants.m")
-        dive_num = FileMgr.get_dive(eng_file_name)
-
-        log_info("Dive number = %d" % dive_num)
-
-        log_debug("logger_eng_files = %s" % logger_eng_files[dive_path])
-
-        try:
-            (temp_ret_val, _) = make_dive_profile(
-                base_opts.force,
-                dive_num,
-                eng_file_name,
-                log_file_name,
-                sg_calib_file_name,
-                base_opts,
-                nc_dive_file_name,
-                logger_eng_files=logger_eng_files[dive_path],
-            )
-        except KeyboardInterrupt:
-            log_info("Interrupted by user - bailing out")
-            ret_val = 1
-            break
-        except Exception:
-            if DEBUG_PDB:
-                _, _, tb = sys.exc_info()
-                traceback.print_exc()
-                pdb.post_mortem(tb)
-
-            log_error("Error processing dive %d - skipping" % dive_num, "exc")
-            temp_ret_val = True
-
-        TraceArray.trace_results_stop()  # Just in case we bailed out...no harm if closed
-        QC.qc_log_stop()
-        if temp_ret_val == 1:
-            ret_val = 1
-            log_warning("Problems writing auxillary files")
-            dives_not_processed.append(dive_num)
-        elif temp_ret_val == 2:
-            log_info("Skipped processing dive %d" % dive_num)
-        else:
-            dives_processed.append(dive_num)
+    try:
+        for dive_num, temp_ret_val, _ in process_dives(
+            dive_list, base_opts, logger_eng_files
+        ):
+            if temp_ret_val == 1:
+                ret_val = 1
+                log_warning("Problems writing auxillary files")
+                dives_not_processed.append(dive_num)
+            elif temp_ret_val == 2:
+                log_info("Skipped processing dive %d" % dive_num)
+            else:
+                dives_processed.append(dive_num)
+    except KeyboardInterrupt:
+        log_info("Interrupted by user - bailing out")
+        ret_val = 1
 
     log_info(
         "Finished processing "
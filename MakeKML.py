@@ -31,6 +31,7 @@
 """Routines for creating KML files from netCDF data, comm.log and target files"""
 
 import collections
+import contextlib
 import cProfile
 import functools
 import glob
@@ -97,6 +98,107 @@ m_per_deg = 111120.0
 # - How to do playback/route tracing?  (Have dives and fixes show up as they occur)
 
 
+# Per-dive GPS positions and placemark/track fragments are cached in the mission
+# directory so only new or reprocessed dives are re-read from their netcdf files.
+# Bump the version if printDive or extractGPSPositions change their output.
+kml_fragment_cache_version = 1
+
+
+def kml_fragment_config(base_opts, instrument_id, dive_num, call_time):
+    """Returns what a cached printDive fragment depends on, other than the dive's
+    netcdf file
+    """
+    return (
+        kml_fragment_cache_version,
+        instrument_id,
+        dive_num,
+        base_opts.surface_track,
+        base_opts.subsurface_track,
+        base_opts.simplified,
+        base_opts.skip_points,
+        getattr(base_opts, "vis_base_url", None),
+        call_time,
+    )
+
+
+def kml_fragment_cache_name(cache_dir, dive_nc_file_name):
+    """Returns the cache file name for a dive and what identifies the dive file's version"""
+    stamp = Utils.file_stamp(dive_nc_file_name)
+    dive_stamp = None if stamp is None else (kml_fragment_cache_version, *stamp)
+    cache_name = os.path.join(cache_dir, f"{os.path.basename(dive_nc_file_name)}.pkl")
+    return (cache_name, dive_stamp)
+
+
+def load_kml_fragment_cache(cache_name, dive_stamp):
+    """Returns the cached entry for a dive, or an empty entry if it is missing or out
+    of date
+    """
+    if dive_stamp is None:
+        return {}
+    cache_d = Utils.load_pickle_cache(cache_name)
+    if not isinstance(cache_d, dict) or cache_d.get("stamp") != dive_stamp:
+        return {}
+    return cache_d
+
+
+class MissionKMLOutput:
+    """Output stream for the mission kml
+
+    If compressing, the kml is deflated straight into the kmz as it is written,
+    rather than being written out in full and then zipped.  Either way, the output
+    goes to a temporary file that replaces the previous kml/kmz on commit(), so an
+    interrupted run leaves the last complete output in place.
+    """
+
+    def __init__(self, mission_kml_name, zip_kml):
+        self.mission_kml_name = mission_kml_name
+        self.zip_file = None
+        if zip_kml:
+            head, _ = os.path.splitext(mission_kml_name)
+            self.output_name = head + ".kmz"
+        else:
+            self.output_name = mission_kml_name
+        self.tmp_name = f"{self.output_name}.tmp"
+        if zip_kml:
+            self.zip_file = zipfile.ZipFile(self.tmp_name, "w", zipfile.ZIP_DEFLATED)
+            self.fo = io.TextIOWrapper(
+                self.zip_file.open(os.path.basename(mission_kml_name), "w"),
+                encoding="utf-8",
+            )
+        else:
+            self.fo = open(self.tmp_name, "w")  # noqa: SIM115
+
+    def write(self, s):
+        return self.fo.write(s)
+
+    def commit(self, add_files):
+        """Closes out the output, adding add_files (name in kmz -> file name) to the kmz
+
+        Returns:
+            Name of the kml or kmz file written
+        """
+        self.fo.close()
+        if self.zip_file:
+            for k, v in add_files.items():
+                self.zip_file.write(v, k)
+            self.zip_file.close()
+        os.replace(self.tmp_name, self.output_name)
+        if self.zip_file and os.path.exists(self.mission_kml_name):
+            # Left over from an uncompressed run
+            os.remove(self.mission_kml_name)
+        return self.output_name
+
+    def discard(self):
+        """Abandons the output, leaving any previous kml/kmz in place"""
+        with contextlib.suppress(Exception):
+            self.fo.close()
+        if self.zip_file:
+            with contextlib.suppress(Exception):
+                self.zip_file.close()
+        with contextlib.suppress(OSError):
+            os.remove(self.tmp_name)
+
+
 def cmp_function(a, b):
     """Compares two archived targets files, sorting in reverse chronilogical order (most recent one first)"""
     a_dive = None
@@ -1131,7 +1233,7 @@ def main(
     mission_kml_name = os.path.join(base_opts.mission_dir, mission_kml_file_name_base)
 
     try:
-        fo = open(mission_kml_name, "w")
+        fo = MissionKMLOutput(mission_kml_name, zip_kml)
     except Exception:
         log_error(f"Could not open {mission_kml_name}", "exc")
         log_info("Bailing out...")
@@ -1307,6 +1409,10 @@ def main(
 
     # Plot dives
     dive_gps_positions = {}
+    use_cache = getattr(base_opts, "kml_cache", False)
+    cache_dir = os.path.join(base_opts.mission_dir, ".kml_fragments")
+    # dive_num -> (cache_name, dive_stamp, cache entry, entry changed)
+    fragment_cache = {}
     fo.write(
         '<Folder id="SG%0.3dDives">\n<name>SG%0.3d Dives</name>\n'
         % (base_opts.instrument_id, base_opts.instrument_id)
@@ -1327,6 +1433,7 @@ def main(
                     log_warning(
                         "Caught SIGUSR1 perviously - stopping furhter MakeKML processing"
                     )
+                    fo.discard()
                     return 1
             except AttributeError:
                 pass
@@ -1336,9 +1443,27 @@ def main(
                 os.path.abspath(os.path.expanduser(dive_nc_file_name))
             )
             dive_num = int(tail[4:8])
+            if use_cache:
+                cache_name, dive_stamp = kml_fragment_cache_name(
+                    cache_dir, dive_nc_file_name
+                )
+                cache_d = load_kml_fragment_cache(cache_name, dive_stamp)
+                if "gps_pos" in cache_d:
+                    dive_gps_positions[dive_num] = dive_gps_position(
+                        *cache_d["gps_pos"]
+                    )
+                    fragment_cache[dive_num] = [cache_name, dive_stamp, cache_d, False]
+                    continue
             gps_pos = extractGPSPositions(dive_nc_file_name, dive_num)
             if gps_pos is not None:
                 dive_gps_positions[dive_num] = gps_pos
+                if use_cache and dive_stamp is not None:
+                    fragment_cache[dive_num] = [
+                        cache_name,
+                        dive_stamp,
+                        {"gps_pos": tuple(gps_pos)},
+                        True,
+                    ]
 
     # Deal with Dive 0
     # Add any non-plotted surface positions
@@ -1445,6 +1570,7 @@ def main(
                     log_warning(
                         "Caught SIGUSR1 perviously - stopping furhter MakeKML processing"
                     )
+                    fo.discard()
                     return 1
             except AttributeError:
                 pass
@@ -1473,15 +1599,29 @@ def main(
 
             # To get the old behaviour, replace True with last_dive
             # dive_gps_positions[dive_num]
-            printDive(
-                base_opts,
-                dive_nc_file_name,
-                base_opts.instrument_id,
-                dive_num,
-                False,
-                fo,
-                call_time=call_time.get(dive_num - 1, None),
+            dive_call_time = call_time.get(dive_num - 1, None)
+            fragment_config = kml_fragment_config(
+                base_opts, base_opts.instrument_id, dive_num, dive_call_time
             )
+            cache_entry = fragment_cache.get(dive_num)
+            if cache_entry and cache_entry[2].get("fragment_config") == fragment_config:
+                fo.write(cache_entry[2]["fragment"])
+            else:
+                fragment_fo = io.StringIO()
+                dive_pos = printDive(
+                    base_opts,
+                    dive_nc_file_name,
+                    base_opts.instrument_id,
+                    dive_num,
+                    False,
+                    fragment_fo,
+                    call_time=dive_call_time,
+                )
+                fo.write(fragment_fo.getvalue())
+                if cache_entry and dive_pos is not None:
+                    cache_entry[2]["fragment_config"] = fragment_config
+                    cache_entry[2]["fragment"] = fragment_fo.getvalue()
+                    cache_entry[3] = True
 
             # Add any non-plotted surface positions and drift tracks here
             non_plotted_positions = [
@@ -1706,6 +1846,20 @@ def main(
     # Close out dive folder
     fo.write("</Folder>\n")
 
+    for cache_name, dive_stamp, cache_d, changed in fragment_cache.values():
+        if changed:
+            cache_d["stamp"] = dive_stamp
+            Utils.save_pickle_cache(cache_name, cache_d)
+    if use_cache:
+        log_info(
+            "Reused %d of %d cached dives (%s)"
+            % (
+                sum(not changed for _, _, _, changed in fragment_cache.values()),
+                len(dive_nc_file_names) if dive_nc_file_names else 0,
+                cache_dir,
+            )
+        )
+
     # Print the last known position outside the tree structure
     if last_surface_position and last_surface_position:
         try:
@@ -1834,6 +1988,7 @@ def main(
             log_warning(
                 "Caught SIGUSR1 perviously - stopping furhter MakeKML processing"
             )
+            fo.discard()
             return 1
     except AttributeError:
         pass
@@ -1911,8 +2066,6 @@ def main(
 
     printFooter(fo)
 
-    fo.close()
-
     # Stop processing if signaled
     try:
         if (
@@ -1922,34 +2075,22 @@ def main(
             log_warning(
                 "Caught SIGUSR1 perviously - stopping furhter MakeKML processing"
             )
+            fo.discard()
             return 1
     except AttributeError:
         pass
 
-    # Zip the output file
-    if zip_kml:
-        head, _ = os.path.splitext(mission_kml_name)
-        mission_kml_zip_name = head + ".kmz"
-        try:
-            if os.path.exists(mission_kml_zip_name):
-                os.unlink(mission_kml_zip_name)
-            mission_kml_zip_file = zipfile.ZipFile(
-                mission_kml_zip_name, "w", zipfile.ZIP_DEFLATED
-            )
-            mission_kml_zip_file.write(mission_kml_name, mission_kml_file_name_base)
-            for k, v in add_files.items():
-                mission_kml_zip_file.write(v, k)
-            mission_kml_zip_file.close()
-            os.remove(mission_kml_name)
-        except Exception:
-            log_error(f"Could not process {mission_kml_zip_name}", "exc")
-            log_info("Bailing out...")
-            return 1
-        if processed_other_files is not None:
-            processed_other_files.append(mission_kml_zip_name)
-    else:
-        if processed_other_files is not None:
-            processed_other_files.append(mission_kml_name)
+    # Finish the output file - if compressing, the kml has been written straight into
+    # the kmz as it was generated
+    try:
+        output_name = fo.commit(add_files)
+    except Exception:
+        log_error(f"Could not process {fo.output_name}", "exc")
+        log_info("Bailing out...")
+        fo.discard()
+        return 1
+    if processed_other_files is not None:
+        processed_other_files.append(output_name)
 
     log_info(
         "Finished processing "
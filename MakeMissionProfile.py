@@ -113,31 +113,23 @@ def bin_data(bin_width, which_half, include_empty_bins, depth_m_v, inp_data_colu
         return [None, None, None]
 
     # First, create an array of indices of the bins and find the largest such index
-    # Find the sample index for the maximum depth
+    # Find the sample index for the maximum depth (the first deepest sample, if below 0.0)
+    num_rows = len(depth_m_v)
     max_depth_sample_index = 0
     max_depth = 0.0
-    num_rows = len(depth_m_v)
-    for i in range(num_rows):
-        if depth_m_v[i] > max_depth:
-            max_depth = depth_m_v[i]
-            max_depth_sample_index = i
-
-    bin_index = np.zeros(num_rows, np.int32)
-
-    try:
-        # Seed the bin_index mapping from index to depth bin
-        for i in range(num_rows):
-            # bin_index[i] = 1 + int((depth_m_v[i] + bin_width/2.0)/bin_width)
-            # Zero base indexing
-            bin_index[i] = int(round((depth_m_v[i] + bin_width / 2.0) / bin_width)) - 1
-    except Exception:
+    if num_rows and np.max(depth_m_v) > max_depth:
+        max_depth_sample_index = int(np.argmax(depth_m_v))
+        max_depth = depth_m_v[max_depth_sample_index]
+
+    # Seed the bin_index mapping from index to depth bin
+    # bin_index = 1 + int((depth_m_v + bin_width/2.0)/bin_width)
+    # Zero base indexing
+    bin_index_f = np.round((depth_m_v + bin_width / 2.0) / bin_width) - 1
+    if not np.all(np.abs(bin_index_f) <= np.iinfo(np.int32).max):
         DEBUG_PDB_F()
-        log_error("Unexpected error in bin_data", "exc")
+        log_error("Unexpected error in bin_data - depths out of range")
         return [None, None, None]
-
-    # print len(bin_index)
-    # print "bin_index"
-    # print bin_index
+    bin_index = bin_index_f.astype(np.int32)
 
     log_debug(
         "Init max_depth_sample_index = %d, bin_index[max_depth_sample_index] = %d, max_depth=%f"
@@ -145,13 +137,14 @@ def bin_data(bin_width, which_half, include_empty_bins, depth_m_v, inp_data_colu
     )  # Index of maximum depth
 
     # Now that we know the index to bin mapping, make sure that the max_depth_sample_index is the
-    # highest index in the bin that contains the deepest observation - implicitly assigning those
-    # observations to the down bin
-    for i in range(max_depth_sample_index, num_rows):
-        if bin_index[i] == bin_index[max_depth_sample_index]:
-            max_depth_sample_index = i
-        if bin_index[i] < bin_index[max_depth_sample_index]:
-            break
+    # highest index in the bin that contains the deepest observation (before the profile leaves
+    # that bin upward) - implicitly assigning those observations to the down bin
+    max_bin = bin_index[max_depth_sample_index]
+    after_max_v = bin_index[max_depth_sample_index:]
+    shallower_i = np.nonzero(after_max_v < max_bin)[0]
+    if len(shallower_i):
+        after_max_v = after_max_v[: shallower_i[0]]
+    max_depth_sample_index += int(np.nonzero(after_max_v == max_bin)[0][-1])
 
     log_debug(
         "Final max_depth_sample_index = %d, bin_index[max_depth_sample_index] = %d"
@@ -161,198 +154,202 @@ def bin_data(bin_width, which_half, include_empty_bins, depth_m_v, inp_data_colu
     log_debug(
         "bin_index[max_depth_sample_index] = %d" % bin_index[max_depth_sample_index]
     )
+    sample_i_v = np.arange(num_rows)
     # float32 to float64
     if which_half == Globals.WhichHalf.combine:
-        obs_bin = np.zeros(bin_index[max_depth_sample_index] + 1, np.float64)
+        num_bins = max_bin + 1
+        obs_bin = np.zeros(num_bins, np.float64)
         # log_info("Number combined bins %d" % len(obs_bin))
-        # obs_bin = np.zeros(bin_index[max_depth_sample_index], np.float64)
         obs_bin[:] = BaseNetCDF.nc_nan
+        depth_bin = np.zeros(num_bins, np.float64)
+
+        # Bin the profile
+        in_bin_i = np.logical_and(bin_index >= 0, bin_index < num_bins)
+        num_obs_bin, data_means = bin_means(
+            sample_i_v[in_bin_i], bin_index[in_bin_i], num_bins, data_columns, True
+        )
+        has_obs_i = num_obs_bin > 0
+        depth_bin[has_obs_i] = (np.arange(num_bins)[has_obs_i] + 1) * float(bin_width)
         data_cols_bin = []
-        for _ in data_columns:
-            data_cols_bin.append(
-                np.zeros(bin_index[max_depth_sample_index] + 1, np.float64)
+        for d in range(num_data_cols):
+            data_col_bin = np.zeros(num_bins, np.float64)
+            data_col_bin[has_obs_i] = data_means[d][has_obs_i]
+            data_cols_bin.append(data_col_bin)
+        return (obs_bin, depth_bin, data_cols_bin)
+
+    # Up, Down or both - each half is binned to (obs, depth, data columns) then
+    # the down half is laid out deepest last and the up half deepest first
+    halves = []
+    if which_half in (Globals.WhichHalf.down, Globals.WhichHalf.both):
+        num_bins = max_bin + 1
+        log_debug("Number down bins %d" % num_bins)
+        half_i = np.arange(max_depth_sample_index + 1)
+        halves.append((half_i, np.zeros(num_bins, np.float64), False))
+
+    if which_half in (Globals.WhichHalf.up, Globals.WhichHalf.both):
+        num_bins = max_bin
+        log_debug("Number up bins %d" % num_bins)
+        half_i = sample_i_v[max_depth_sample_index + 1 :]
+        halves.append((half_i, np.zeros(num_bins, np.float64), True))
+
+    obs_bin = []
+    depth_bin = []
+    data_cols_bin = [[] for _ in range(num_data_cols)]
+    for half_i, half_obs_bin, reverse in halves:
+        num_bins = len(half_obs_bin)
+        half_bin_index = bin_index[half_i]
+        in_bin_i = np.logical_and(half_bin_index >= 0, half_bin_index < num_bins)
+        num_obs_bin, data_means = bin_means(
+            half_i[in_bin_i], half_bin_index[in_bin_i], num_bins, data_columns, False
+        )
+        half_depth_bin = (np.arange(num_bins) + 1) * float(bin_width)
+        if reverse:
+            num_obs_bin = num_obs_bin[::-1]
+            half_depth_bin = half_depth_bin[::-1]
+            data_means = data_means[:, ::-1]
+        has_obs_i = num_obs_bin > 0
+        # Eliminate the empty bins along the half profile, if so desired
+        keep_i = slice(None) if include_empty_bins else has_obs_i
+        obs_bin.append(
+            np.where(has_obs_i, num_obs_bin, BaseNetCDF.nc_nan).astype(np.float64)[
+                keep_i
+            ]
+        )
+        depth_bin.append(half_depth_bin[keep_i])
+        for d in range(num_data_cols):
+            data_cols_bin[d].append(
+                np.where(has_obs_i, data_means[d], BaseNetCDF.nc_nan)[keep_i]
             )
-            # data_cols_bin.append(np.zeros(bin_index[max_depth_sample_index], np.float64))
-        depth_bin = np.zeros(bin_index[max_depth_sample_index] + 1, np.float64)
-        # depth_bin = np.zeros(bin_index[max_depth_sample_index], np.float64)
 
-        # Bin the profile
-        for j in range(bin_index[max_depth_sample_index] + 1):
-            # for j in xrange(bin_index[max_depth_sample_index]):
-            obs_bin_tuple = np.where(bin_index == j)
-            num_obs_bin = len(obs_bin_tuple[0])
-            if num_obs_bin:
-                depth_bin[j] = float((j + 1) * bin_width)
-                for d in range(num_data_cols):
-                    # data_cols_bin[d][j] = average(data_columns[d][obs_bin_tuple])
-                    # Average the actual readings - anything that is a BaseNetCDF.nc_nan or nc_inf is excluded
-                    temp_data_col = data_columns[d][obs_bin_tuple]
+    obs_bin = np.concatenate(obs_bin) if obs_bin else np.zeros(0, np.float64)
+    log_debug("Total bins = %d" % len(obs_bin))
+    depth_bin = np.concatenate(depth_bin) if depth_bin else np.zeros(0, np.float64)
+    data_cols_bin = [
+        np.concatenate(x) if x else np.zeros(0, np.float64) for x in data_cols_bin
+    ]
+    return [obs_bin, depth_bin, data_cols_bin]
+
+
+def bin_means(sample_i_v, bin_index_v, num_bins, data_columns, combine):
+    """Grouped mean of the finite values in each bin for each data column
+
+    Sums are formed the same way np.average() forms them on a bin's values (numpy's
+    pairwise summation over a contiguous array), so results are identical to averaging
+    each bin separately.
+
+    Input:
+        sample_i_v - indices into the data columns of the samples to bin
+        bin_index_v - bin (0 to num_bins - 1) for each of sample_i_v
+        num_bins - number of bins
+        data_columns - list of data columns
+        combine - True for how combined profiles have treated bins with observations but
+            no finite values (np.average() of nothing), False for BaseNetCDF.nc_nan
+
+    Output:
+        num_obs_bin - number of observations in each bin
+        data_means - array of [data column, bin] means; NaN for bins with no finite values
+    """
+    num_obs_bin = np.bincount(bin_index_v, minlength=num_bins)[:num_bins]
+    data_means = np.full((len(data_columns), num_bins), BaseNetCDF.nc_nan)
+    # Order samples by bin, keeping time order within each bin
+    order_i = np.argsort(bin_index_v, kind="stable")
+    sample_i_v = sample_i_v[order_i]
+    bin_index_v = bin_index_v[order_i]
+
+    def group_sums(values, bins_v):
+        # Bins of the same size are summed together as rows of a 2D array
+        counts_v = np.bincount(bins_v, minlength=num_bins)[:num_bins]
+        starts_v = np.cumsum(counts_v) - counts_v
+        sums = np.zeros((values.shape[0], num_bins), np.float64)
+        for count in np.unique(counts_v[counts_v > 0]):
+            group_i = np.nonzero(counts_v == count)[0]
+            values_i = starts_v[group_i][:, np.newaxis] + np.arange(count)
+            # Each bin's values contiguous so numpy sums them pairwise as np.average() does
+            group_values = np.ascontiguousarray(values[:, values_i])
+            sums[:, group_i] = np.add.reduce(group_values, axis=2)
+        return sums, counts_v
+
+    def set_means(cols, sums, counts_v):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            means = sums / counts_v
+        if not combine:
+            means[:, counts_v == 0] = BaseNetCDF.nc_nan
+        has_obs_i = num_obs_bin > 0
+        for ii, d in enumerate(cols):
+            data_means[d][has_obs_i] = means[ii][has_obs_i]
+
+    # Columns that are finite throughout are binned together
+    finite_cols = []
+    for d, data_column in enumerate(data_columns):
+        values_v = data_column[sample_i_v]
+        if values_v.dtype != np.float64:
+            # Average exactly as np.average() does for other types
+            for j in np.nonzero(num_obs_bin)[0]:
+                bin_values_v = values_v[bin_index_v == j]
+                bin_values_v = bin_values_v[np.isfinite(bin_values_v)]
+                if bin_values_v.size or combine:
                     try:
-                        data_cols_bin[d][j] = np.average(
-                            temp_data_col[np.where(np.isfinite(temp_data_col))]
-                        )
+                        data_means[d][j] = np.average(bin_values_v)
                     except (ZeroDivisionError, FloatingPointError):
-                        data_cols_bin[d][j] = BaseNetCDF.nc_nan
+                        data_means[d][j] = BaseNetCDF.nc_nan
+            continue
+        finite_i = np.isfinite(values_v)
+        if np.all(finite_i):
+            finite_cols.append(d)
+        else:
+            sums, counts_v = group_sums(
+                values_v[finite_i][np.newaxis, :], bin_index_v[finite_i]
+            )
+            set_means([d], sums, counts_v)
+    if finite_cols:
+        values = np.vstack([data_columns[d][sample_i_v] for d in finite_cols])
+        sums, counts_v = group_sums(values, bin_index_v)
+        set_means(finite_cols, sums, counts_v)
 
-        return (obs_bin, depth_bin, data_cols_bin)
+    return num_obs_bin, data_means
 
-    else:
-        # Up, Down or both
-        if which_half in (Globals.WhichHalf.down, Globals.WhichHalf.both):
-            obs_down_bin = np.zeros(bin_index[max_depth_sample_index] + 1, np.float64)
-            log_debug("Number down bins %d" % len(obs_down_bin))
-            # obs_down_bin = np.zeros(bin_index[max_depth_sample_index], np.float64)
-            data_cols_down_bin = []
-            for _ in data_columns:
-                data_cols_down_bin.append(
-                    np.zeros(bin_index[max_depth_sample_index] + 1, np.float64)
-                )
-                # data_cols_down_bin.append(np.zeros(bin_index[max_depth_sample_index], np.float64))
-            depth_down_bin = np.zeros(bin_index[max_depth_sample_index] + 1, np.float64)
-            # depth_down_bin = np.zeros(bin_index[max_depth_sample_index], np.float64)
-
-            bin_down_index = np.zeros(num_rows)
-            bin_down_index[:] = -1
-            bin_down_index[: max_depth_sample_index + 1] = bin_index[
-                : max_depth_sample_index + 1
-            ]
-            # print 'Bin down index'
-            # print bin_down_index
-
-            # Bin the down profile
-            for j in range(bin_index[max_depth_sample_index] + 1):
-                # for j in xrange(bin_index[max_depth_sample_index]):
-                obs_bin_tuple = np.where(bin_down_index == j)
-                num_obs_bin = len(obs_bin_tuple[0])
-                obs_down_bin[j] = num_obs_bin
-                depth_down_bin[j] = float((j + 1) * bin_width)
-                if num_obs_bin:
-                    # print data_columns
-                    for d in range(num_data_cols):
-                        # data_cols_down_bin[d][j] = np.average(data_columns[d][obs_bin_tuple])
-                        # Average the actual readings - anything that is a BaseNetCDF.nc_nan or nc_inf is excluded
-                        temp_data_col = data_columns[d][obs_bin_tuple]
-                        temp_temp_data_col = temp_data_col[
-                            np.where(np.isfinite(temp_data_col))
-                        ]
-                        if temp_temp_data_col.size == 0:
-                            data_cols_down_bin[d][j] = BaseNetCDF.nc_nan
-                            continue
-                        try:
-                            data_cols_down_bin[d][j] = np.average(temp_temp_data_col)
-                        except (ZeroDivisionError, FloatingPointError):
-                            data_cols_down_bin[d][j] = BaseNetCDF.nc_nan
-
-                # msg = "index=%d obs = %d depth=%.2f" % (j, num_obs_bin, depth_up_bin[j])
-                # for d in xrange(num_data_cols):
-                #    msg = msg + " dc[%d]=%f" % (d, data_cols_up_bin[d][j])
-                # log_info(msg)
-            # print "obs_down_bin"
-            # print obs_down_bin
-
-        if which_half in (Globals.WhichHalf.up, Globals.WhichHalf.both):
-            # obs_up_bin = np.zeros(bin_index[max_depth_sample_index] + 1, np.float64)
-            obs_up_bin = np.zeros(bin_index[max_depth_sample_index], np.float64)
-            log_debug("Number up bins %d" % len(obs_up_bin))
-            data_cols_up_bin = []
-            for _ in data_columns:
-                # data_cols_up_bin.append(np.zeros(bin_index[max_depth_sample_index] + 1, np.float64))
-                data_cols_up_bin.append(
-                    np.zeros(bin_index[max_depth_sample_index], np.float64)
-                )
-            # depth_up_bin = np.zeros(bin_index[max_depth_sample_index] + 1, np.float64)
-            depth_up_bin = np.zeros(bin_index[max_depth_sample_index], np.float64)
 
-            bin_up_index = np.zeros(num_rows)
-            bin_up_index[:] = -1
-            bin_up_index[max_depth_sample_index + 1 : num_rows] = bin_index[
-                max_depth_sample_index + 1 : num_rows
-            ]
-            # print 'Bin up index'
-            # print bin_up_index
-
-            # Bin the up profile
-            # for j in xrange(bin_index[max_depth_sample_index] + 1):
-            for j in range(bin_index[max_depth_sample_index]):
-                obs_bin_tuple = np.where(bin_up_index == j)
-                num_obs_bin = len(obs_bin_tuple[0])
-                obs_up_bin[j] = num_obs_bin
-                depth_up_bin[j] = float((j + 1) * bin_width)
-                if num_obs_bin:
-                    for d in range(num_data_cols):
-                        # data_cols_up_bin[d][j] = np.average(data_columns[d][obs_bin_tuple])
-                        # Average the actual readings - anything that is a BaseNetCDF.nc_nan or nc_inf is excluded
-                        temp_data_col = data_columns[d][obs_bin_tuple]
-                        temp_temp_data_col = temp_data_col[
-                            np.where(np.isfinite(temp_data_col))
-                        ]
-                        if temp_temp_data_col.size == 0:
-                            data_cols_up_bin[d][j] = BaseNetCDF.nc_nan
-                            continue
-                        try:
-                            data_cols_up_bin[d][j] = np.average(temp_temp_data_col)
-                        except (ZeroDivisionError, FloatingPointError):
-                            data_cols_up_bin[d][j] = BaseNetCDF.nc_nan
-
-                # msg = "index=%d obs = %d depth=%.2f" % (j, num_obs_bin, depth_up_bin[j])
-                # for d in xrange(num_data_cols):
-                #    msg = msg + " dc[%d]=%f" % (d, data_cols_up_bin[d][j])
-                # log_info(msg)
-
-        # Tranverse the vectors and remove the zero filled bins along the half profile desired
-        # NOTE: this needs to be re-done to deal with shift to a zero based index scheme
-        # and tested with .bpo file generation
-        total_bins = 0
-        if which_half in (Globals.WhichHalf.down, Globals.WhichHalf.both):
-            if include_empty_bins:
-                total_bins += len(depth_down_bin)
-            else:
-                for i in range(len(depth_down_bin)):
-                    if obs_down_bin[i] > 0:
-                        total_bins += 1
+# Per-dive results of make_mission_profile() are cached in the mission directory so
+# later runs only read and bin dives whose netcdf files are new or have changed.  Bump
+# this when what is cached for a dive changes.
+mission_profile_cache_version = 1
 
-        if which_half in (Globals.WhichHalf.up, Globals.WhichHalf.both):
-            if include_empty_bins:
-                total_bins += len(depth_up_bin)
-            else:
-                for i in range(len(depth_up_bin)):
-                    if obs_up_bin[i] > 0:
-                        total_bins += 1
 
-        log_debug("Total bins = %d" % total_bins)
+def mission_profile_cache_name(base_opts, bin_width, wh_file):
+    """Returns the name of the per-dive cache for a mission profile"""
+    return os.path.join(
+        base_opts.mission_dir, ".mission_profile_%1.1fm_%s.pkl" % (bin_width, wh_file)
+    )
 
-        obs_bin = np.zeros(total_bins, np.float64)
-        obs_bin[:] = BaseNetCDF.nc_nan
-        depth_bin = np.zeros(total_bins, np.float64)
-        depth_bin[:] = BaseNetCDF.nc_nan
-        data_cols_bin = []
-        for _ in range(num_data_cols):
-            temp = np.zeros(total_bins, np.float64)
-            temp[:] = BaseNetCDF.nc_nan
-            data_cols_bin.append(temp)
-
-        current_bin = 0
-        if which_half in (Globals.WhichHalf.down, Globals.WhichHalf.both):
-            for i in range(len(depth_down_bin)):
-                if obs_down_bin[i] > 0:
-                    obs_bin[current_bin] = obs_down_bin[i]
-                    for d in range(num_data_cols):
-                        data_cols_bin[d][current_bin] = data_cols_down_bin[d][i]
-                if obs_down_bin[i] > 0 or include_empty_bins:
-                    depth_bin[current_bin] = depth_down_bin[i]
-                    current_bin += 1
-
-        if which_half in (Globals.WhichHalf.up, Globals.WhichHalf.both):
-            for i in range(-1, -len(depth_up_bin) - 1, -1):
-                if obs_up_bin[i] > 0:
-                    obs_bin[current_bin] = obs_up_bin[i]
-                    for d in range(num_data_cols):
-                        data_cols_bin[d][current_bin] = data_cols_up_bin[d][i]
-                if obs_up_bin[i] > 0 or include_empty_bins:
-                    depth_bin[current_bin] = depth_up_bin[i]
-                    current_bin += 1
-
-        return [obs_bin, depth_bin, data_cols_bin]
+
+def mission_profile_cache_config(bin_width, which_half, profile_cfg_d):
+    """Returns what a cached dive depends on, other than the dive's netcdf file"""
+    included_metadata = []
+    for var_name, md in sorted(BaseNetCDF.nc_var_metadata.items()):
+        if md[0] or var_name in profile_cfg_d:
+            included_metadata.append((var_name, md[0], md[1], md[3]))
+    return repr(
+        (
+            mission_profile_cache_version,
+            Globals.mission_profile_nc_fileversion,
+            bin_width,
+            int(which_half),
+            sorted(profile_cfg_d.items()),
+            QC.only_good_qc_values,
+            included_metadata,
+        )
+    )
+
+
+def load_mission_profile_cache(cache_name, config):
+    """Returns the cached dives in cache_name, if made with the same config"""
+    cache_d = Utils.load_pickle_cache(cache_name)
+    if cache_d is None:
+        return {}
+    if not isinstance(cache_d, dict) or cache_d.get("config") != config:
+        log_info(f"{cache_name} is out of date - rebinning all dives")
+        return {}
+    return cache_d["dives"]
 
 
 # NOTE this is the closest to a ARGO profile data set, a set of dives (cycles)
@@ -387,6 +384,16 @@ def make_mission_profile(dive_nc_profile_names, base_opts):
 
     Raises:
     """
+    BaseNetCDF.set_nc_write_profile(base_opts, "profile")
+    try:
+        return _make_mission_profile(dive_nc_profile_names, base_opts)
+    finally:
+        # Later writers of per-dive files (e.g. CTDAdjustment) get the dive settings back
+        BaseNetCDF.set_nc_write_profile(base_opts, "dive")
+
+
+def _make_mission_profile(dive_nc_profile_names, base_opts):
+    """Body of make_mission_profile() - writes under the profile nc write profile"""
 
     if base_opts.dump_whole_mission_config:
         Utils.dump_mission_cfg(sys.stdout, BaseNetCDF.nc_var_metadata)
@@ -429,6 +436,18 @@ def make_mission_profile(dive_nc_profile_names, base_opts):
         log_error("No dive profile names provided to make_mission_profile")
         return (1, mission_profile_name)
 
+    use_cache = getattr(base_opts, "mission_profile_cache", False)
+    if use_cache:
+        cache_name = mission_profile_cache_name(base_opts, bin_width, wh_file)
+        cache_config = mission_profile_cache_config(
+            bin_width, which_half, profile_cfg_d
+        )
+        cached_dives_d = load_mission_profile_cache(cache_name, cache_config)
+    else:
+        cached_dives_d = {}
+    new_cached_dives_d = {}
+    num_cached = 0
+
     master_globals_d = {}
     master_instruments_d = {}
     platform_var = "Seaglider"
@@ -462,23 +481,45 @@ def make_mission_profile(dive_nc_profile_names, base_opts):
 
         if first_profile_name is None:
             first_profile_name = dive_nc_profile_name
+
+        # What this dive contributes, recorded so it can be replayed from the cache
+        dive_stamp = Utils.file_stamp(dive_nc_profile_name) if use_cache else None
+        cached_dive = cached_dives_d.get(dive_nc_profile_name)
+        if dive_stamp is not None and cached_dive and cached_dive[0] == dive_stamp:
+            dive_d = cached_dive[1]
+            num_cached += 1
+        else:
+            dive_d = None
+
         try:  # RuntimeError
             dive_num = 0  # impossible dive number
-            (
-                status,
-                globals_d,
-                _,
-                eng_f,
-                calib_consts,
-                results_d,
-                _,
-                nc_info_d,
-                instruments_d,
-            ) = MakeDiveProfiles.load_dive_profile_data(
-                base_opts, False, dive_nc_profile_name, None, None, None, None
-            )
-            if status == 0:
-                raise RuntimeError("Unable to read %s" % dive_nc_profile_name)
+            if dive_d is not None:
+                globals_d = dive_d["globals_d"]
+                calib_consts = dive_d["calib_consts"]
+            else:
+                (
+                    status,
+                    globals_d,
+                    _,
+                    eng_f,
+                    calib_consts,
+                    results_d,
+                    _,
+                    nc_info_d,
+                    instruments_d,
+                ) = MakeDiveProfiles.load_dive_profile_data(
+                    base_opts, False, dive_nc_profile_name, None, None, None, None
+                )
+                if status == 0:
+                    raise RuntimeError("Unable to read %s" % dive_nc_profile_name)
+                dive_d = {
+                    "globals_d": globals_d,
+                    "calib_consts": {
+                        k: calib_consts[k]
+                        for k in ("id_str", "mission_title")
+                        if k in calib_consts
+                    },
+                }
             # Just take the file as-is
             # elif status == 2:
             # raise RuntimeError("%s requires updating" % dive_nc_profile_name)
@@ -513,17 +554,44 @@ def make_mission_profile(dive_nc_profile_names, base_opts):
                     % (mission_profile_name, base_opts.mission_dir)
                 )
 
+            if "dive" in dive_d:
+                # Reuse the cached results for this dive
+                new_cached_dives_d[dive_nc_profile_name] = (dive_stamp, dive_d)
+                if "skipped" in dive_d:
+                    log_warning(dive_d["skipped"])
+                    continue
+                reviewed = reviewed and dive_d["reviewed"]
+                BaseNetCDF.merge_nc_globals(master_globals_d, globals_d)
+                BaseNetCDF.merge_instruments(
+                    master_instruments_d, dive_d["instruments_d"]
+                )
+                mission_nc_dive_d[dive_num] = dive_d["dive"]
+                for dive_nc_varname in dive_d["unknown_vars"]:
+                    if dive_nc_varname not in unknown_vars:
+                        log_warning(
+                            "Unknown variable (%s) in %s - skipping"
+                            % (dive_nc_varname, dive_nc_profile_name)
+                        )
+                        unknown_vars[dive_nc_varname] = dive_nc_profile_name
+                included_scalar_vars.update(dive_d["scalar_vars"])
+                included_binned_vars.update(dive_d["binned_vars"])
+                temp_dive_vars = {"bin_time": dive_d["bin_time"]}
+                continue
+
             # process the file
             # See if this dive was skipped, had an error, or is missing variables we require
+            dive_d["dive"] = None
             try:
                 results_d["processing_error"]
             except KeyError:
                 pass
             else:
-                log_warning(
+                dive_d["skipped"] = (
                     "%s is marked as having a processing error - not including in binned profile"
                     % dive_nc_profile_name
                 )
+                log_warning(dive_d["skipped"])
+                new_cached_dives_d[dive_nc_profile_name] = (dive_stamp, dive_d)
                 continue
 
             try:
@@ -531,19 +599,23 @@ def make_mission_profile(dive_nc_profile_names, base_opts):
             except KeyError:
                 pass
             else:
-                log_warning(
+                dive_d["skipped"] = (
                     "%s is marked as a skipped_profile - not including in binned profile"
                     % dive_nc_profile_name
                 )
+                log_warning(dive_d["skipped"])
+                new_cached_dives_d[dive_nc_profile_name] = (dive_stamp, dive_d)
                 continue
 
-            try:
-                reviewed = reviewed and results_d["reviewed"]
-            except KeyError:
-                reviewed = False
+            dive_d["reviewed"] = results_d.get("reviewed", False)
+            reviewed = reviewed and dive_d["reviewed"]
 
             BaseNetCDF.merge_nc_globals(master_globals_d, globals_d)
             BaseNetCDF.merge_instruments(master_instruments_d, instruments_d)
+            dive_d["instruments_d"] = instruments_d
+            dive_d["unknown_vars"] = []
+            dive_d["scalar_vars"] = set()
+            dive_d["binned_vars"] = set()
 
             mission_nc_dive_d[dive_num] = {}
             # Collect the GPS positions
@@ -658,6 +730,7 @@ def make_mission_profile(dive_nc_profile_names, base_opts):
                 try:
                     md = BaseNetCDF.nc_var_metadata[dive_nc_varname]
                 except KeyError:
+                    dive_d["unknown_vars"].append(dive_nc_varname)
                     try:
                         unknown_vars[dive_nc_varname]
                     except KeyError:
@@ -688,6 +761,7 @@ def make_mission_profile(dive_nc_profile_names, base_opts):
                         value  # record scalar value
                     )
                     included_scalar_vars.add(dive_nc_varname)
+                    dive_d["scalar_vars"].add(dive_nc_varname)
                 else:
                     if nc_data_type == "Q":
                         # we don't bin qc vectors but we might want to use them to filter the others
@@ -731,6 +805,7 @@ def make_mission_profile(dive_nc_profile_names, base_opts):
             for t in temp_dive_var_names:
                 # This variable will definitely be added (since it is after the removes)
                 included_binned_vars.add(t)
+                dive_d["binned_vars"].add(t)
                 md = BaseNetCDF.nc_var_metadata[t]  # ensured available
                 include_in_mission_profile, nc_data_type, meta_data_d, mdp_dim_info = md
                 # convert all data to sg_data_point size if not
@@ -846,6 +921,10 @@ def make_mission_profile(dive_nc_profile_names, base_opts):
                             temp_dive_var_names[j]
                         ] = np.array(data_cols_bin[j], np.float64)
 
+            dive_d["dive"] = mission_nc_dive_d[dive_num]
+            dive_d["bin_time"] = temp_dive_vars["bin_time"][[0, -1]]
+            new_cached_dives_d[dive_nc_profile_name] = (dive_stamp, dive_d)
+
         except KeyboardInterrupt:
             log_error("Keyboard interrupt - breaking out")
             return (1, mission_profile_name)
@@ -855,6 +934,15 @@ def make_mission_profile(dive_nc_profile_names, base_opts):
             if dive_num and dive_num in mission_nc_dive_d:
                 del mission_nc_dive_d[dive_num]
 
+    if use_cache:
+        log_info(
+            "%d of %d dives from %s"
+            % (num_cached, len(dive_nc_profile_names), cache_name)
+        )
+        Utils.save_pickle_cache(
+            cache_name, {"config": cache_config, "dives": new_cached_dives_d}
+        )
+
     if not mission_profile_name:
         log_error("Unable to determine profiles file name - bailing out")
         return (1, mission_profile_name)
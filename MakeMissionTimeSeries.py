@@ -50,7 +50,6 @@ import FileMgr
 import Globals
 import GPS
 import MakeDiveProfiles
-import QC
 import Sensors
 import Utils
 import Utils2
@@ -81,6 +80,220 @@ def DEBUG_PDB_F() -> None:
 # but, at present, we don't add any qc variables here (see declarations in BaseNetCDF).
 # They could be added trivially since we do no interpretation, but see comment under MMP.
 # Again, ARGO uses PRESSURE as the primary axis (not time, which is aux for us, or depth, which is derived from pressure)
+# Per-dive extracts for make_mission_timeseries() are cached in the mission directory so
+# later runs only read dives whose netcdf files are new or have changed.  Bump this when
+# what load_dive_timeseries_data() returns changes.
+mission_timeseries_cache_version = 1
+
+
+def mission_timeseries_cache_config(timeseries_cfg_d):
+    """Returns what a cached dive depends on, other than the dive's netcdf file"""
+    included_metadata = []
+    for var_name, md in sorted(BaseNetCDF.nc_var_metadata.items()):
+        if md[0] or var_name in timeseries_cfg_d:
+            included_metadata.append((var_name, md[0], md[1], tuple(md[3] or ())))
+    return repr(
+        (
+            mission_timeseries_cache_version,
+            Globals.mission_timeseries_nc_fileversion,
+            sorted(timeseries_cfg_d.items()),
+            included_metadata,
+        )
+    )
+
+
+def mission_timeseries_cache_name(cache_dir, dive_nc_profile_name):
+    """Returns the cache file name for a dive and what identifies the dive file's version"""
+    cache_name = os.path.join(
+        cache_dir, "%s.pkl" % os.path.basename(dive_nc_profile_name)
+    )
+    return (cache_name, Utils.file_stamp(dive_nc_profile_name))
+
+
+def load_mission_timeseries_cache(cache_name, config, dive_stamp):
+    """Returns the cached extract for a dive, or None if it is missing or out of date"""
+    if dive_stamp is None:
+        return None
+    cache_d = Utils.load_pickle_cache(cache_name)
+    if (
+        not isinstance(cache_d, dict)
+        or cache_d.get("config") != config
+        or cache_d.get("stamp") != dive_stamp
+    ):
+        return None
+    return cache_d["dive"]
+
+
+def load_dive_timeseries_data(dive_nc_profile_name, base_opts, timeseries_cfg_d):
+    """Reads what a dive contributes to the mission timeseries from its netcdf file
+
+    Returns:
+        Dictionary of the dive's globals, calibration constants used for naming,
+        instruments, reviewed status, per-dive values and the (variable name, value)
+        pairs to include in the timeseries, in file order.  The value is None for
+        variables with no metadata.  Dives marked with a processing error or as
+        skipped have a "skipped" message in place of the data.
+
+    Raises:
+        RuntimeError if the dive can't be used
+    """
+    (
+        status,
+        globals_d,
+        _,
+        eng_f,
+        calib_consts,
+        results_d,
+        _,
+        nc_info_d,
+        instruments_d,
+    ) = MakeDiveProfiles.load_dive_profile_data(
+        base_opts, False, dive_nc_profile_name, None, None, None, None
+    )
+    if status == 0:
+        raise RuntimeError("Unable to read %s" % dive_nc_profile_name)
+    # Just take the file as-is
+    # elif status == 2:
+    # raise RuntimeError("%s requires updating" % dive_nc_profile_name)
+
+    try:
+        dive_num = globals_d["dive_number"]
+    except KeyError as e:
+        raise RuntimeError(
+            "No dive_number attribute in %s" % dive_nc_profile_name
+        ) from e
+
+    dive_d = {
+        "globals_d": globals_d,
+        "calib_consts": {
+            k: calib_consts[k] for k in ("id_str", "mission_title") if k in calib_consts
+        },
+        "nc_info_d": nc_info_d,
+    }
+
+    # process the file
+    # See if this dive was skipped, had an error, or is missing variables we require
+    try:
+        results_d["processing_error"]
+    except KeyError:
+        pass
+    else:
+        dive_d["skipped"] = (
+            "%s is marked as having a processing error - not including in timeseries"
+            % dive_nc_profile_name
+        )
+        return dive_d
+
+    try:
+        results_d["skipped_profile"]
+    except KeyError:
+        pass
+    else:
+        dive_d["skipped"] = (
+            "%s is marked as a skipped_profile - not including in timeseries"
+            % dive_nc_profile_name
+        )
+        return dive_d
+
+    dive_d["reviewed"] = results_d.get("reviewed", False)
+    dive_d["instruments_d"] = instruments_d
+
+    # Collect the GPS positions
+    dive_values_d = {}
+    try:
+        dive_values_d["start_latitude"] = results_d["log_gps_lat"][GPS.GPS_I.GPS2]
+        dive_values_d["start_longitude"] = results_d["log_gps_lon"][GPS.GPS_I.GPS2]
+        dive_values_d["start_time"] = results_d["log_gps_time"][GPS.GPS_I.GPS2]
+
+        dive_values_d["end_latitude"] = results_d["log_gps_lat"][GPS.GPS_I.GPSE]
+        dive_values_d["end_longitude"] = results_d["log_gps_lon"][GPS.GPS_I.GPSE]
+        dive_values_d["end_time"] = results_d["log_gps_time"][GPS.GPS_I.GPSE]
+    except KeyError as exception:
+        raise RuntimeError(
+            "Unable to extract GPS fix data from %s (%s)"
+            % (dive_nc_profile_name, exception.args)
+        ) from exception
+
+    # Compute average position
+    profile_mean_lat, profile_mean_lon = Utils.average_position(
+        results_d["log_gps_lat"][GPS.GPS_I.GPS2],
+        results_d["log_gps_lon"][GPS.GPS_I.GPS2],
+        results_d["log_gps_lat"][GPS.GPS_I.GPSE],
+        results_d["log_gps_lon"][GPS.GPS_I.GPSE],
+    )
+    dive_values_d["mean_latitude"] = profile_mean_lat
+    dive_values_d["mean_longitude"] = profile_mean_lon
+    mean_profile_time = (
+        (
+            results_d["log_gps_time"][GPS.GPS_I.GPSE]
+            - results_d["log_gps_time"][GPS.GPS_I.GPS2]
+        )
+        / 2.0
+    ) + results_d["log_gps_time"][GPS.GPS_I.GPS2]
+    dive_values_d["mean_time"] = mean_profile_time
+    dive_values_d["dive_number"] = dive_num
+
+    profile_t = time.gmtime(mean_profile_time)
+
+    dive_values_d["year"] = profile_t.tm_year
+    dive_values_d["month"] = profile_t.tm_mon
+    dive_values_d["date"] = profile_t.tm_mday
+    dive_values_d["hour"] = profile_t.tm_hour + (profile_t.tm_sec / 60.0)
+    dive_values_d["dd"] = (
+        (profile_t.tm_yday - 1)
+        + (profile_t.tm_hour / 24.0)
+        + (profile_t.tm_min / 1440.0)
+        + (profile_t.tm_sec / 86400.0)
+    )
+
+    # Find the deepest sample
+    max_depth_sample_index = 0
+    max_depth = 0.0
+    tmp_sgdepth_m_v = results_d["depth"]
+    sg_np = len(tmp_sgdepth_m_v)
+    for i in range(sg_np):
+        if tmp_sgdepth_m_v[i] > max_depth:
+            max_depth = tmp_sgdepth_m_v[i]
+            max_depth_sample_index = i
+    tmp_sgdepth_m_v = None
+    # log_debug("Deepest sample = %d (%d)" % (max_depth_sample_index, max_depth))
+
+    dive_values_d["deepest_sample_time"] = results_d[BaseNetCDF.nc_sg_time_var][
+        max_depth_sample_index
+    ]
+    dive_d["dive_values"] = dive_values_d
+
+    # See what is inside
+    # add eng_f vector data to results_d so we add those if so marked
+    for column in eng_f.columns:
+        column_v = eng_f.get_col(column)
+        results_d[BaseNetCDF.nc_sg_eng_prefix + column] = column_v
+
+    dive_vars = []
+    for dive_nc_varname in list(results_d.keys()):
+        try:
+            md = BaseNetCDF.nc_var_metadata[dive_nc_varname]
+        except KeyError:
+            dive_vars.append((dive_nc_varname, None))
+            continue
+
+        include_in_mission_profile, nc_data_type, meta_data_d, mdp_dim_info = md
+
+        if dive_nc_varname in timeseries_cfg_d:
+            if not timeseries_cfg_d[dive_nc_varname]:
+                continue
+        elif not include_in_mission_profile:
+            continue
+
+        if mdp_dim_info:
+            dive_vars.append((dive_nc_varname, results_d[dive_nc_varname]))
+        else:
+            # Squeeze to convert (1,) arrays into scalars
+            dive_vars.append((dive_nc_varname, np.squeeze(results_d[dive_nc_varname])))
+    dive_d["vars"] = dive_vars
+    return dive_d
+
+
 def make_mission_timeseries(dive_nc_profile_names, base_opts):
     """Creates a single time series from a list of dive netCDF files
 
@@ -95,6 +308,16 @@ def make_mission_timeseries(dive_nc_profile_names, base_opts):
             1 - failure
         mission_timeseries_name - the name possibly changed from the input parameter
     """
+    BaseNetCDF.set_nc_write_profile(base_opts, "timeseries")
+    try:
+        return _make_mission_timeseries(dive_nc_profile_names, base_opts)
+    finally:
+        # Later writers of per-dive files (e.g. CTDAdjustment) get the dive settings back
+        BaseNetCDF.set_nc_write_profile(base_opts, "dive")
+
+
+def _make_mission_timeseries(dive_nc_profile_names, base_opts):
+    """Body of make_mission_timeseries() - writes under the timeseries nc write profile"""
 
     if base_opts.dump_whole_mission_config:
         Utils.dump_mission_cfg(sys.stdout, BaseNetCDF.nc_var_metadata)
@@ -212,6 +435,12 @@ def make_mission_timeseries(dive_nc_profile_names, base_opts):
     for var in dive_vars:
         mission_nc_dive_d[var] = []
 
+    use_cache = getattr(base_opts, "mission_timeseries_cache", False)
+    if use_cache:
+        cache_dir = os.path.join(base_opts.mission_dir, ".mission_timeseries")
+        cache_config = mission_timeseries_cache_config(timeseries_cfg_d)
+    num_cached = 0
+
     unknown_vars = {}
     total_dive_vars = set()
     for dive_nc_profile_name in dive_nc_profile_names:
@@ -230,31 +459,29 @@ def make_mission_timeseries(dive_nc_profile_names, base_opts):
 
         try:  # RuntimeError
             dive_num = 0  # impossible dive number
-            (
-                status,
-                globals_d,
-                _,
-                eng_f,
-                calib_consts,
-                results_d,
-                _,
-                nc_info_d,
-                instruments_d,
-            ) = MakeDiveProfiles.load_dive_profile_data(
-                base_opts, False, dive_nc_profile_name, None, None, None, None
-            )
-            if status == 0:
-                raise RuntimeError("Unable to read %s" % dive_nc_profile_name)
-            # Just take the file as-is
-            # elif status == 2:
-            # raise RuntimeError("%s requires updating" % dive_nc_profile_name)
-
-            try:
-                dive_num = globals_d["dive_number"]
-            except KeyError as e:
-                raise RuntimeError(
-                    "No dive_number attribute in %s" % dive_nc_profile_name
-                ) from e
+            dive_d = None
+            if use_cache:
+                cache_name, dive_stamp = mission_timeseries_cache_name(
+                    cache_dir, dive_nc_profile_name
+                )
+                dive_d = load_mission_timeseries_cache(
+                    cache_name, cache_config, dive_stamp
+                )
+            if dive_d is None:
+                dive_d = load_dive_timeseries_data(
+                    dive_nc_profile_name, base_opts, timeseries_cfg_d
+                )
+                if use_cache and dive_stamp is not None:
+                    Utils.save_pickle_cache(
+                        cache_name,
+                        {"config": cache_config, "stamp": dive_stamp, "dive": dive_d},
+                    )
+            else:
+                num_cached += 1
+            globals_d = dive_d["globals_d"]
+            calib_consts = dive_d["calib_consts"]
+            nc_info_d = dive_d["nc_info_d"]
+            dive_num = globals_d["dive_number"]
 
             if not instrument_id:
                 # calib_consts is set; figure out filename, etc.
@@ -279,130 +506,23 @@ def make_mission_timeseries(dive_nc_profile_names, base_opts):
                     % (mission_timeseries_name, base_opts.mission_dir)
                 )
 
-            # process the file
-            # See if this dive was skipped, had an error, or is missing variables we require
-            try:
-                results_d["processing_error"]
-            except KeyError:
-                pass
-            else:
-                log_warning(
-                    "%s is marked as having a processing error - not including in timeseries"
-                    % dive_nc_profile_name
-                )
+            # See if this dive was skipped or had an error
+            if "skipped" in dive_d:
+                log_warning(dive_d["skipped"])
                 continue
 
-            try:
-                results_d["skipped_profile"]
-            except KeyError:
-                pass
-            else:
-                log_warning(
-                    "%s is marked as a skipped_profile - not including in timeseries"
-                    % dive_nc_profile_name
-                )
-                continue
-
-            try:
-                reviewed = reviewed and results_d["reviewed"]
-            except KeyError:
-                reviewed = False
+            reviewed = reviewed and dive_d["reviewed"]
 
             BaseNetCDF.merge_nc_globals(master_globals_d, globals_d)
-            BaseNetCDF.merge_instruments(master_instruments_d, instruments_d)
+            BaseNetCDF.merge_instruments(master_instruments_d, dive_d["instruments_d"])
 
-            # Collect the GPS positions
-            try:
-                mission_nc_dive_d["start_latitude"].append(
-                    results_d["log_gps_lat"][GPS.GPS_I.GPS2]
-                )
-                mission_nc_dive_d["start_longitude"].append(
-                    results_d["log_gps_lon"][GPS.GPS_I.GPS2]
-                )
-                mission_nc_dive_d["start_time"].append(
-                    results_d["log_gps_time"][GPS.GPS_I.GPS2]
-                )
+            for var, value in dive_d["dive_values"].items():
+                mission_nc_dive_d[var].append(value)
 
-                mission_nc_dive_d["end_latitude"].append(
-                    results_d["log_gps_lat"][GPS.GPS_I.GPSE]
-                )
-                mission_nc_dive_d["end_longitude"].append(
-                    results_d["log_gps_lon"][GPS.GPS_I.GPSE]
-                )
-                mission_nc_dive_d["end_time"].append(
-                    results_d["log_gps_time"][GPS.GPS_I.GPSE]
-                )
-            except KeyError as exception:
-                raise RuntimeError(
-                    "Unable to extract GPS fix data from %s (%s)"
-                    % (dive_nc_profile_name, exception.args)
-                ) from exception
-
-            # Compute average position
-            profile_mean_lat, profile_mean_lon = Utils.average_position(
-                results_d["log_gps_lat"][GPS.GPS_I.GPS2],
-                results_d["log_gps_lon"][GPS.GPS_I.GPS2],
-                results_d["log_gps_lat"][GPS.GPS_I.GPSE],
-                results_d["log_gps_lon"][GPS.GPS_I.GPSE],
-            )
-            mission_nc_dive_d["mean_latitude"].append(profile_mean_lat)
-            mission_nc_dive_d["mean_longitude"].append(profile_mean_lon)
-            mean_profile_time = (
-                (
-                    results_d["log_gps_time"][GPS.GPS_I.GPSE]
-                    - results_d["log_gps_time"][GPS.GPS_I.GPS2]
-                )
-                / 2.0
-            ) + results_d["log_gps_time"][GPS.GPS_I.GPS2]
-            mission_nc_dive_d["mean_time"].append(mean_profile_time)
-            mission_nc_dive_d["dive_number"].append(dive_num)
-
-            profile_t = time.gmtime(mean_profile_time)
-
-            mission_nc_dive_d["year"].append(profile_t.tm_year)
-            mission_nc_dive_d["month"].append(profile_t.tm_mon)
-            mission_nc_dive_d["date"].append(profile_t.tm_mday)
-            mission_nc_dive_d["hour"].append(
-                profile_t.tm_hour + (profile_t.tm_sec / 60.0)
-            )
-            mission_nc_dive_d["dd"].append(
-                (profile_t.tm_yday - 1)
-                + (profile_t.tm_hour / 24.0)
-                + (profile_t.tm_min / 1440.0)
-                + (profile_t.tm_sec / 86400.0)
-            )
-
-            # Find the deepest sample
-            max_depth_sample_index = 0
-            max_depth = 0.0
-            tmp_sgdepth_m_v = results_d["depth"]
-            sg_np = len(tmp_sgdepth_m_v)
-            for i in range(sg_np):
-                if tmp_sgdepth_m_v[i] > max_depth:
-                    max_depth = tmp_sgdepth_m_v[i]
-                    max_depth_sample_index = i
-            tmp_sgdepth_m_v = None
-            # log_debug("Deepest sample = %d (%d)" % (max_depth_sample_index, max_depth))
-
-            mission_nc_dive_d["deepest_sample_time"].append(
-                results_d[BaseNetCDF.nc_sg_time_var][max_depth_sample_index]
-            )
-
-            log_debug("Processing %s" % dive_nc_profile_name)
-
-            # See what is inside
-            # add eng_f vector data to results_d so we add those if so marked
-            for column in eng_f.columns:
-                column_v = eng_f.get_col(column)
-                results_d[BaseNetCDF.nc_sg_eng_prefix + column] = column_v
-
-            dive_nc_varnames = list(results_d.keys())
             temp_dive_vars = {}
             extended_dim_names = []  # since infos can share dims, only extend once
-            for dive_nc_varname in dive_nc_varnames:
-                try:
-                    md = BaseNetCDF.nc_var_metadata[dive_nc_varname]
-                except KeyError:
+            for dive_nc_varname, value in dive_d["vars"]:
+                if value is None:
                     try:
                         unknown_vars[dive_nc_varname]
                     except KeyError:
@@ -414,17 +534,12 @@ def make_mission_timeseries(dive_nc_profile_names, base_opts):
                         unknown_vars[dive_nc_varname] = dive_nc_profile_name
                     continue
 
+                md = BaseNetCDF.nc_var_metadata[dive_nc_varname]
                 include_in_mission_profile, nc_data_type, meta_data_d, mdp_dim_info = md
 
-                if dive_nc_varname in timeseries_cfg_d:
-                    if not timeseries_cfg_d[dive_nc_varname]:
-                        continue
-                elif not include_in_mission_profile:
-                    continue
-
                 # Variable is tagged for adding to the mission profile
                 if mdp_dim_info:
-                    temp_dive_vars[dive_nc_varname] = results_d[dive_nc_varname]
+                    temp_dive_vars[dive_nc_varname] = value
                     # We know from ensure_cf_compliance() that this var is a vector
                     mdp_dim_info = mdp_dim_info[0]  # get first (and only) info
                     dim_name = nc_info_d[mdp_dim_info]
@@ -493,17 +608,6 @@ def make_mission_timeseries(dive_nc_profile_names, base_opts):
                         values = []
                         mission_nc_dive_d[dive_nc_varname] = values
                         dive_vars.append(dive_nc_varname)
-                    try:
-                        # Squeeze to convert (1,) arrays into scalars
-                        value = np.squeeze(results_d[dive_nc_varname])
-                    except KeyError:
-                        log_error(
-                            "Unable to extract %s from %s"
-                            % (dive_nc_varname, dive_nc_profile_name)
-                        )
-                        value = (
-                            QC.QC_MISSING if nc_data_type == "Q" else BaseNetCDF.nc_nan
-                        )
                     values.append(value)
 
             # now initialize or extend the vector values for these variables
@@ -562,6 +666,12 @@ def make_mission_timeseries(dive_nc_profile_names, base_opts):
             log_error("%s - skipping" % (exception.args[0]))
             continue
 
+    if use_cache:
+        log_info(
+            "%d of %d dives from %s"
+            % (num_cached, len(dive_nc_profile_names), cache_dir)
+        )
+
     if not mission_timeseries_name:
         log_error("Unable to determine timeseries file name - bailing out")
         return (1, mission_timeseries_name)
@@ -278,6 +278,11 @@ def main():
 
     # Files common to both versions of the basestation
     moveFiles("comm.log", base_opts.mission_dir, base_opts.target_dir)
+    moveFiles(
+        os.path.basename(CommLog.comm_log_index_name("comm.log")),
+        base_opts.mission_dir,
+        base_opts.target_dir,
+    )  # parse index for comm.log
     moveFiles(
         "history.log", base_opts.mission_dir, base_opts.target_dir
     )  # shell command history
@@ -34,6 +34,8 @@
 from __future__ import annotations
 
 import collections
+import collections.abc
+import copy
 import os
 import stat
 import time
@@ -144,13 +146,103 @@ def setup_plot_directory(base_opts: BaseOpts.BaseOptions) -> int:
     return 0
 
 
+class DiveVariable:
+    """Read-once view of a dive netcdf variable
+
+    The whole variable is read on the first [:] or getValue() and each caller gets
+    its own copy, so in place edits in one plot do not leak into the next.  Any
+    other index, and all attributes, go to the underlying variable.
+    """
+
+    def __init__(self, var):
+        self.var = var
+        self.data = None
+        self.value = None
+
+    def __getattr__(self, name):
+        return getattr(self.var, name)
+
+    def __len__(self):
+        return len(self.var)
+
+    def __getitem__(self, key):
+        if key is Ellipsis or (isinstance(key, slice) and key == slice(None)):
+            if self.data is None:
+                self.data = self.var[:]
+            return copy.copy(self.data)
+        return self.var[key]
+
+    def getValue(self):
+        if self.value is None:
+            self.value = self.var.getValue()
+        return copy.copy(self.value)
+
+
+class DiveVariables(collections.abc.Mapping):
+    """The variables of a DiveData, wrapped in DiveVariable as they are asked for"""
+
+    def __init__(self, nc_variables):
+        self.nc_variables = nc_variables
+        self.cache = {}
+
+    def __getitem__(self, name):
+        if name not in self.cache:
+            self.cache[name] = DiveVariable(self.nc_variables[name])
+        return self.cache[name]
+
+    def __contains__(self, name):
+        return name in self.nc_variables
+
+    def __iter__(self):
+        return iter(self.nc_variables)
+
+    def __len__(self):
+        return len(self.nc_variables)
+
+
+class DiveData:
+    """Per-dive data shared by all the dive plots
+
+    Stands in for the open dive netcdf file - variables are read from the file
+    once for the whole plot suite and derived quantities computed by memoize()
+    (the gc move tables from extract_gc_moves, for one) are only built once.
+    Global attributes and dimensions come straight from the file.
+    """
+
+    def __init__(self, ncf):
+        self.ncf = ncf
+        self.variables = DiveVariables(ncf.variables)
+        self.derived = {}
+
+    def __getattr__(self, name):
+        return getattr(self.ncf, name)
+
+    def __getitem__(self, name):
+        return self.variables[name]
+
+    def memoize(self, name, func, *args):
+        """Return a copy of func(*args), calling func only the first time name is asked for"""
+        if name not in self.derived:
+            self.derived[name] = func(*args)
+        return copy.deepcopy(self.derived[name])
+
+
 def extract_gc_moves(ncf: scipy.io._netcdf.netcdf_file) -> tuple:
     """
     Motor positions returned contain positions at all times from the GC table, plus locations
     interpolated from the those positions onto the engineering file time grid.  This is a good
     for plotly based plotting code, but does not accurately where motors may have been between
     GC reported positions.
+
+    For a DiveData, the moves are computed once per dive.
     """
+    if isinstance(ncf, DiveData):
+        return ncf.memoize("gc_moves", compute_gc_moves, ncf)
+    return compute_gc_moves(ncf)
+
+
+def compute_gc_moves(ncf: scipy.io._netcdf.netcdf_file) -> tuple:
+    """Builds the extract_gc_moves tables from the dive netcdf file"""
     gc_moves = []
 
     # Figure it out from the actual moves
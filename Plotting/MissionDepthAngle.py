@@ -35,13 +35,13 @@ from __future__ import annotations
 
 import typing
 
-import pandas as pd
 import plotly
 
 # pylint: disable=wrong-import-position
 if typing.TYPE_CHECKING:
     import BaseOpts
 
+import BaseDB
 import PlotUtilsPlotly
 import Utils
 from BaseLog import log_error, log_info
@@ -73,10 +73,7 @@ def mission_depthangle(
     fig = plotly.graph_objects.Figure()
     df = None
     try:
-        df = pd.read_sql_query(
-            "SELECT dive,log__SM_DEPTHo,log__SM_ANGLEo from dives",
-            conn,
-        ).sort_values("dive")
+        df = BaseDB.fetchDiveColumns(conn, ["log__SM_DEPTHo", "log__SM_ANGLEo"])
     except Exception:
         log_error("Could not fetch needed columns", "exc")
         if dbcon is None:
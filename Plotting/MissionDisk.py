@@ -36,7 +36,6 @@ from __future__ import annotations
 import typing
 import warnings
 
-import pandas as pd
 import plotly
 
 # pylint: disable=wrong-import-position
@@ -45,6 +44,7 @@ if typing.TYPE_CHECKING:
 
 import numpy as np
 
+import BaseDB
 import PlotUtilsPlotly
 import Utils
 from BaseLog import log_error, log_info
@@ -73,8 +73,7 @@ def mission_disk(
     else:
         conn = dbcon
 
-    res = conn.cursor().execute("PRAGMA table_info(dives)")
-    columns = [i[1] for i in res]
+    columns = BaseDB.diveColumnNames(conn)
 
     qcols = list(
         filter(
@@ -88,15 +87,10 @@ def mission_disk(
     if len(qcols) == 0:
         return ([], [])
 
-    qstr = ",".join(qcols)
-
     fig = plotly.graph_objects.Figure()
     df = None
     try:
-        df = pd.read_sql_query(
-            f"SELECT dive,{qstr} from dives",
-            conn,
-        ).sort_values("dive")
+        df = BaseDB.fetchDiveColumns(conn, qcols)
     except Exception:
         log_error("Could not fetch needed columns", "exc")
         if dbcon is None:
@@ -292,22 +286,16 @@ def mission_pmar_disk(
     else:
         conn = dbcon
 
-    res = conn.cursor().execute("PRAGMA table_info(dives)")
-    columns = [i[1] for i in res]
+    columns = BaseDB.diveColumnNames(conn)
 
     qcols = list(filter(lambda x: x.startswith("log_PM_FREEKB"), columns))
 
     if len(qcols) == 0:
         return ([], [])
 
-    qstr = ",".join(qcols)
-
     df = None
     try:
-        df = pd.read_sql_query(
-            f"SELECT dive,{qstr} from dives",
-            conn,
-        ).sort_values("dive")
+        df = BaseDB.fetchDiveColumns(conn, qcols)
     except Exception:
         log_error("Could not fetch needed columns", "exc")
         if dbcon is None:
@@ -105,23 +105,20 @@ def mission_energy(
         return ([], [])
     #l_annotations = []
 
-    if dive is None:
-        clause = ''
-    else:
-        clause = f"WHERE dive <= {dive}"
-
     #res = conn.cursor().execute('PRAGMA table_info(dives)')
     #unused columns = [i[1] for i in res]
 
     try:
         # capacity 10V and 24V are normalized battery availability
-        fg_df = pd.read_sql_query(
-            f"SELECT dive,fg_kJ_used_10V,fg_kJ_used_24V,fg_batt_capacity_10V,fg_batt_capacity_24V,fg_ah_used_10V,fg_ah_used_24V,log_FG_AHR_10Vo,log_FG_AHR_24Vo FROM dives {clause} ORDER BY dive ASC", 
+        fg_df = BaseDB.fetchDiveColumns(
             conn,
-        ).sort_values("dive")
+            ["fg_kJ_used_10V", "fg_kJ_used_24V", "fg_batt_capacity_10V", "fg_batt_capacity_24V",
+             "fg_ah_used_10V", "fg_ah_used_24V", "log_FG_AHR_10Vo", "log_FG_AHR_24Vo"],
+            dive=dive,
+        )
     except pandas.errors.DatabaseError as exc:
-        if "no such column:" in repr(exc):
-            missing_col = repr(exc).split("no such column:")[1].split('"')[0]
+        if "no such column:" in str(exc):
+            missing_col = str(exc).split("no such column:")[1].strip()
             log_error(f"Could not fetch {missing_col} - skipping mission_energy plot")
         else:
             log_error("Failed database call", "exc")
@@ -138,20 +135,18 @@ def mission_energy(
         return ([], [])
 
     try:
-        batt_df = pd.read_sql_query(
-            f"SELECT dive,batt_capacity_10V,batt_capacity_24V,batt_Ahr_cap_10V,batt_Ahr_cap_24V,batt_ah_10V,batt_ah_24V,batt_volts_10V,batt_volts_24V,batt_kJ_used_10V,batt_kJ_used_24V,time_seconds_on_surface,time_seconds_diving,log_gps_time AS dive_end FROM dives {clause} ORDER BY dive ASC", 
+        batt_df = BaseDB.fetchDiveColumns(
             conn,
-        ).sort_values("dive")
+            ["batt_capacity_10V", "batt_capacity_24V", "batt_Ahr_cap_10V", "batt_Ahr_cap_24V",
+             "batt_ah_10V", "batt_ah_24V", "batt_volts_10V", "batt_volts_24V",
+             "batt_kJ_used_10V", "batt_kJ_used_24V", "time_seconds_on_surface",
+             "time_seconds_diving", "log_gps_time"],
+            dive=dive,
+        ).rename(columns={"log_gps_time": "dive_end"})
 
-        start = pd.read_sql_query(
-            "SELECT dive,log_gps2_time FROM dives ORDER BY dive ASC LIMIT 1",
-            conn,
-        )["log_gps2_time"].iloc()[0]
+        start_t = BaseDB.fetchDiveColumns(conn, ["log_gps2_time"])["log_gps2_time"]
 
-        start_t = pd.read_sql_query(
-            "SELECT dive,log_gps2_time FROM dives ORDER BY dive",
-            conn,
-        )["log_gps2_time"]
+        start = start_t.iloc()[0]
 
         batt_df["batt_Ahr_cap_24V"].iloc()[-1]
         if batt_df["batt_Ahr_cap_24V"].iloc()[-1] is None or batt_df["batt_Ahr_cap_24V"].iloc()[-1] == 0:
@@ -272,10 +267,7 @@ def mission_energy(
             if fg_df["dive"].to_numpy()[-1] >= base_opts.mission_energy_dives_back
             else fg_df["dive"].to_numpy()[-1]
         )
-        days_df_modeled = pd.read_sql_query(
-            f"SELECT dive,energy_days_total_Modeled FROM dives {clause} ORDER BY dive ASC", 
-            conn,
-        ).sort_values("dive")
+        days_df_modeled = BaseDB.fetchDiveColumns(conn, ["energy_days_total_Modeled"], dive=dive)
 
 
         # TODO Using the polyfit on the normalized battery capacity for the fuel guage yields
@@ -359,14 +351,11 @@ def mission_energy(
                               "energy_days_total_FG", 
                               (end_t - start)/86400,conn)
 
-            days_df_fg = pd.read_sql_query(
-                f"SELECT dive,energy_days_total_FG FROM dives {clause} ORDER BY dive ASC", 
-                conn,
-            ).sort_values("dive")
+            days_df_fg = BaseDB.fetchDiveColumns(conn, ["energy_days_total_FG"], dive=dive)
 
 
         # Find the device and sensor columnns for power consumption
-        df = pd.read_sql_query("PRAGMA table_info(dives)", conn)
+        df = pd.DataFrame({"name": BaseDB.diveColumnNames(conn)})
         allcols = [x for x in df["name"]]
 
         device_joule_cols = df[
@@ -375,12 +364,10 @@ def mission_energy(
             )
         ]["name"].to_list()
 
-        device_joules_df = pd.read_sql_query(
-            f"SELECT dive,{','.join(device_joule_cols)} from dives", conn
-        ).sort_values("dive")
+        device_joules_df = BaseDB.fetchDiveColumns(conn, device_joule_cols)
 
         if 'GC_pitch_joules' in allcols:
-            GCdf = pd.read_sql_query(f"SELECT dive,GC_VBD_joules,GC_pitch_joules,GC_roll_joules FROM dives {clause} ORDER BY dive ASC", conn)
+            GCdf = BaseDB.fetchDiveColumns(conn, ["GC_VBD_joules", "GC_pitch_joules", "GC_roll_joules"], dive=dive)
             device_joules_df["device_Pitch_motor_joules"] = GCdf["GC_pitch_joules"]
             device_joules_df["device_VBD_pump_joules"] = GCdf["GC_VBD_joules"]
             device_joules_df["device_Roll_motor_joules"] = GCdf["GC_roll_joules"]
@@ -409,9 +396,7 @@ def mission_energy(
             )
         ]["name"].to_list()
 
-        sensor_joules_df = pd.read_sql_query(
-            f"SELECT dive,{','.join(sensor_joule_cols)} from dives", conn
-        ).sort_values("dive")
+        sensor_joules_df = BaseDB.fetchDiveColumns(conn, sensor_joule_cols)
 
         if dbcon is None:
             try:
@@ -70,18 +70,12 @@ def mission_int_sensors(
         log_error("Could not open mission database")
         return ([], [])
 
-    if dive is None:
-        clause = ""
-    else:
-        clause = f"WHERE dive <= {dive}"
-
     fig = plotly.graph_objects.Figure()
     df = None
     try:
-        df = pd.read_sql_query(
-            f"SELECT dive,log_HUMID,log_INTERNAL_PRESSURE from dives {clause} ORDER BY dive ASC",
-            conn,
-        ).sort_values("dive")
+        df = BaseDB.fetchDiveColumns(
+            conn, ["log_HUMID", "log_INTERNAL_PRESSURE"], dive=dive
+        )
     except Exception:
         log_error("Could not fetch needed columns", "exc")
         if dbcon is None:
@@ -91,10 +85,7 @@ def mission_int_sensors(
 
     df_int_temperature = None
     try:
-        df_int_temperature = pd.read_sql_query(
-            f"SELECT dive,log_TEMP from dives {clause} ORDER BY dive ASC",
-            conn,
-        ).sort_values("dive")
+        df_int_temperature = BaseDB.fetchDiveColumns(conn, ["log_TEMP"], dive=dive)
     except pd.errors.DatabaseError as e:
         if e.args[0].endswith("no such column: log_TEMP"):
             pass
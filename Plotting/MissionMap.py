@@ -45,7 +45,6 @@ import matplotlib.patches as patches
 import matplotlib.path as mpath
 import matplotlib.pyplot as plt
 import numpy as np
-import pandas as pd
 import xarray as xr
 
 from CalibConst import getSGCalibrationConstants
@@ -56,6 +55,7 @@ if typing.TYPE_CHECKING:
 
 from cartopy.mpl.ticker import LatitudeFormatter, LongitudeFormatter
 
+import BaseDB
 import Utils
 from BaseLog import log_error, log_info, log_warning
 from Plotting import plotmissionsingle
@@ -133,8 +133,8 @@ def mission_map(
         conn = dbcon
 
     try:
-        df = pd.read_sql_query("SELECT dive,log_gps_lat AS lat,log_gps_lon AS lon FROM dives ORDER BY dive ASC", conn) \
-               .sort_values("dive")
+        df = BaseDB.fetchDiveColumns(conn, ["log_gps_lat", "log_gps_lon"]) \
+               .rename(columns={"log_gps_lat": "lat", "log_gps_lon": "lon"})
     except Exception:
         log_error("database error")
         if dbcon is None:
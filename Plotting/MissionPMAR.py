@@ -42,13 +42,13 @@ from dataclasses import dataclass
 from typing import Any
 
 import numpy as np
-import pandas as pd
 import plotly
 
 # pylint: disable=wrong-import-position
 if typing.TYPE_CHECKING:
     import BaseOpts
 
+import BaseDB
 import PlotUtilsPlotly
 import Utils
 from BaseLog import log_error, log_info
@@ -108,8 +108,7 @@ def mission_pmar_stats(
     else:
         conn = dbcon
 
-    res = conn.cursor().execute("PRAGMA table_info(dives)")
-    columns = [i[1] for i in res]
+    columns = BaseDB.diveColumnNames(conn)
 
     qcols = []
     for col in columns:
@@ -120,14 +119,9 @@ def mission_pmar_stats(
     if len(qcols) == 0:
         return ([], [])
 
-    qstr = ",".join(qcols)
-
     df = None
     try:
-        df = pd.read_sql_query(
-            f"SELECT dive,{qstr} from dives",
-            conn,
-        ).sort_values("dive")
+        df = BaseDB.fetchDiveColumns(conn, qcols)
     except Exception:
         log_error("Could not fetch needed columns", "exc")
         if dbcon is None:
@@ -43,6 +43,7 @@ import plotly
 if typing.TYPE_CHECKING:
     import BaseOpts
 
+import BaseDB
 import PlotUtilsPlotly
 import Utils
 from BaseLog import log_error, log_info, log_warning
@@ -72,58 +73,43 @@ def mission_volume(
     else:
         conn = dbcon
 
-    cur = conn.cursor()
-    res = cur.execute("PRAGMA table_info(dives)")
-    columns = [i[1] for i in res]
+    columns = BaseDB.diveColumnNames(conn)
 
     fig = plotly.graph_objects.Figure()
     volmax_df = None
     if "implied_volmax" in columns:
         try:
-            volmax_df = pd.read_sql_query(
-                "SELECT dive,implied_volmax from dives",
-                conn,
-            ).sort_values("dive")
+            volmax_df = BaseDB.fetchDiveColumns(conn, ["implied_volmax"])
         except (pd.io.sql.DatabaseError, sqlite3.OperationalError):
             log_warning("Could not load implied volmax", "exc")
 
     regressed_volmax_df = None
     if "vert_vel_regress_volmax" in columns:
         try:
-            regressed_volmax_df = pd.read_sql_query(
-                "SELECT dive,vert_vel_regress_volmax from dives",
-                conn,
-            ).sort_values("dive")
+            regressed_volmax_df = BaseDB.fetchDiveColumns(
+                conn, ["vert_vel_regress_volmax"]
+            )
         except (pd.io.sql.DatabaseError, sqlite3.OperationalError):
             log_warning("Could not load implied volmax", "exc")
 
     volmax_GSM_df = None
     if "implied_volmax_GSM" in columns:
         try:
-            volmax_GSM_df = pd.read_sql_query(
-                "SELECT dive,implied_volmax_GSM from dives",
-                conn,
-            ).sort_values("dive")
+            volmax_GSM_df = BaseDB.fetchDiveColumns(conn, ["implied_volmax_GSM"])
         except (pd.io.sql.DatabaseError, sqlite3.OperationalError):
             log_warning("Could not load implied volmax GSM", "exc")
 
     glider_df = None
     if "implied_volmax_glider" in columns:
         try:
-            glider_df = pd.read_sql_query(
-                "SELECT dive,implied_volmax_glider from dives",
-                conn,
-            ).sort_values("dive")
+            glider_df = BaseDB.fetchDiveColumns(conn, ["implied_volmax_glider"])
         except (sqlite3.OperationalError, pd.io.sql.DatabaseError):
             log_warning("Could not load implied volmax from the glider estimate", "exc")
 
     flight_df = None
     if "implied_volmax_fm" in columns:
         try:
-            flight_df = pd.read_sql_query(
-                "SELECT dive,implied_volmax_fm from dives",
-                conn,
-            ).sort_values("dive")
+            flight_df = BaseDB.fetchDiveColumns(conn, ["implied_volmax_fm"])
         except (sqlite3.OperationalError, pd.io.sql.DatabaseError):
             log_warning(
                 "Could not load implied volmax from the flight model estimate", "exc"
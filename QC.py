@@ -381,7 +381,7 @@ def qc_noise(data_v, window_size=15, std_band=3):
     diff_data_v = data_v - data_filtered_v  # compute detrended data
     noise_floor = std_band * np.std(diff_data_v)  # good chance of being spurious
     diff_data_v = abs(diff_data_v)
-    bad_i_v = [i for i in range(len(data_v)) if diff_data_v[i] > noise_floor]
+    bad_i_v = np.nonzero(diff_data_v > noise_floor)[0].tolist()
     return bad_i_v
 
 
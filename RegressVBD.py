@@ -114,6 +114,63 @@ def flightModelW(bu, ph, xl, a, b, c, rho, s):
     else:
         return None
 
+def flightModelWArray(bu, ph, xl, a, b, c, rho, s):
+    """Array version of flightModelW - the same fixed point iteration is run on every
+    sample, with each sample dropping out as it converges or bails out.
+    Samples for which flightModelW returns None are NaN here.
+    """
+    gravity = 9.81
+    tol = 0.001
+
+    bu = np.asarray(bu, dtype=np.float64)
+    ph = np.broadcast_to(np.asarray(ph, dtype=np.float64), bu.shape)
+
+    with np.errstate(all='ignore'):
+        w = np.sign(bu) * np.sqrt(np.abs(bu) / 1000.0) / 10
+        th = 3.14159 / 4.0 * np.sign(bu)
+
+        buoyforce = 0.001 * gravity * bu
+
+        q = np.power(np.sign(bu) * buoyforce / (xl * xl * b), 1.0 / (1.0 + s))
+        q_old = np.zeros(bu.shape)
+
+        W = np.full(bu.shape, np.nan)
+        done = (bu == 0) | (np.sign(bu) * np.sign(ph) <= 0)
+        W[done] = w[done]
+        active = ~done
+
+        for _ in range(15):
+            active &= (np.abs((q - q_old) / q) > tol) & (q > 0)
+            if not active.any():
+                break
+            q_old[active] = q[active]
+
+            tan_th = np.tan(th)
+            param = 4.0 * b * c / (a * a * np.power(tan_th, 2.0) * np.power(q, -s))
+            bail = active & ((np.abs(tan_th) < 0.01) | (q == 0) | (param > 1))
+            W[bail] = w[bail]
+            done |= bail
+            active &= ~bail
+
+            root = np.sqrt(1.0 - param[active])
+            q[active] = (
+                buoyforce[active]
+                * np.sin(th[active])
+                / (2.0 * xl * xl * b * np.power(q[active], s))
+                * (1.0 + root)
+            )
+            alpha = -a * tan_th[active] / (2.0 * c) * (1.0 - root)
+
+            thdeg = ph[active] - alpha
+            th[active] = thdeg * 3.14159 / 180.0
+
+        # math.sqrt raises on a negative argument, which flightModelW maps to 0
+        umag = np.where(2.0 * q / rho < 0, 0.0, np.sqrt(2.0 * q / rho))
+        W_final = np.where(np.isfinite(umag) & np.isfinite(th), umag * np.sin(th), np.nan)
+        W[~done] = W_final[~done]
+
+    return W
+
 def w_misfit_abc(x0, W, Vol, Dens, Pit, m, rho, vol0):
     bias = x0[0]
     hd_a = x0[1]
@@ -132,20 +189,17 @@ def w_misfit_bias(bias, abc, W, Vol, Dens, Pit, m, rho, vol0):
 
     return np.nanmean(W_biased - W)
 
-def getVars(fname, basis_C_VBD, basis_VBD_CNV):
-    try:
-        nc = Utils.open_netcdf_file(fname)
-    except:
-        log_debug(f"could not open {fname}")
-        return None, None, None, None, None
+# Bump whenever getVarsExtract changes
+regress_vbd_extract_version = 1
 
+def getVarsExtract(nc):
     c_vbd = nc.variables["log_C_VBD"].getValue()
 
     # SG eng time base
     time  = nc.variables["time"][:]
     depth = nc.variables["depth"][:]
     pitch = nc.variables["eng_pitchAng"][:]
-    vbd   = nc.variables["eng_vbdCC"][:] + (c_vbd - basis_C_VBD)*basis_VBD_CNV
+    vbd   = nc.variables["eng_vbdCC"][:]
 
     # CTD time base
     ctd_time = nc.variables["ctd_time"][:]
@@ -199,20 +253,25 @@ def getVars(fname, basis_C_VBD, basis_VBD_CNV):
 #        )
 #    )[0]
 
-    nc.close()
-
-    return w, depth[inds], vbd[inds], density[inds], pitch[inds]
+    return { "c_vbd": c_vbd, "w": w, "depth": depth[inds], "vbd": vbd[inds], "density": density[inds], "pitch": pitch[inds] }
 #    return w[inds], depth[inds], vbd[inds], density[inds], pitch[inds]
 
+def getVars(fname, basis_C_VBD, basis_VBD_CNV):
+    ex = Utils.read_dive_extract(fname, "regress_vbd", regress_vbd_extract_version, getVarsExtract)
+    if ex is None:
+        log_debug(f"could not open {fname}")
+        return None, None, None, None, None
+
+    vbd = ex["vbd"] + (ex["c_vbd"] - basis_C_VBD)*basis_VBD_CNV
+
+    return ex["w"], ex["depth"], vbd, ex["density"], ex["pitch"]
+
 def getModelW(bu, Pit, HD_A, HD_B, HD_C, rho0):
+    w = flightModelWArray(bu, Pit, 1.8, HD_A, HD_B, HD_C, rho0, -0.25)
     W = bu.copy()
-    for k, b in enumerate(bu):
-        w = flightModelW(b, Pit[k], 1.8, HD_A, HD_B, HD_C, rho0, -0.25)
-        if w:
-            W[k] = 100*w
-        else:
-            W[k] = 0
- 
+    # flightModelW returning None (NaN here) or 0 gives a 0 model velocity
+    W[:] = np.where(np.isnan(w) | (w == 0), 0, 100*w)
+
     return W
 
 def regress(path, glider, dives, depthlims, init_bias, mass, doplot, plot_dives, bias_only=False, decimate=1, rho=None):
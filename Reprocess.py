@@ -55,9 +55,7 @@ import MakeKML
 import MakeMissionProfile
 import MakeMissionTimeSeries
 import PlotUtils
-import QC
 import Sensors
-import TraceArray
 import Utils
 from BaseLog import (
     BaseLogger,
@@ -261,70 +259,29 @@ def main(cmdline_args: list[str] = sys.argv[1:]):
     dives_not_processed = []  # MDP failed
     nc_files_created = []
 
-    for dive_path in dive_list:
-        log_debug(f"Processing {dive_path}")
-        head, _ = os.path.splitext(os.path.abspath(dive_path))
-        if base_opts.target_dir:
-            _, base = os.path.split(os.path.abspath(dive_path))
-            outhead = os.path.join(base_opts.target_dir, base)
-        else:
-            outhead = head
-
-        log_info(f"Head = {head}")
-
-        eng_file_name = head + ".eng"
-        log_file_name = head + ".log"
-        dive_num = FileMgr.get_dive(eng_file_name)
-
-        base_opts.make_dive_profiles = True
-        nc_dive_file_name = outhead + ".nc"
-
-        sg_calib_file_name, _ = os.path.split(os.path.abspath(dive_path))
-        sg_calib_file_name = os.path.join(sg_calib_file_name, "sg_calib_constants.m")
-
-        dive_num = FileMgr.get_dive(eng_file_name)
-        log_info("Dive number = %d" % dive_num)
-        log_debug(f"logger_eng_files = {logger_eng_files[dive_path]}")
-
-        try:
-            (temp_ret_val, nc_file_created) = MakeDiveProfiles.make_dive_profile(
-                base_opts.force,
-                dive_num,
-                eng_file_name,
-                log_file_name,
-                sg_calib_file_name,
-                base_opts,
-                nc_dive_file_name,
-                logger_eng_files=logger_eng_files[dive_path],
-            )
-        except KeyboardInterrupt:
-            log_info("Interrupted by user - bailing out")
-            ret_val = 1
-            break
-        except Exception:
-            log_error("Error processing dive %d - skipping" % dive_num, "exc")
-            temp_ret_val = 1
-
-        TraceArray.trace_results_stop()  # Just in case we bailed out...no harm if closed
-        QC.qc_log_stop()
-        # Even if the processing failed, we may get a netcdf files out
-        if nc_file_created:
-            nc_files_created.append(nc_file_created)
-        if temp_ret_val == 1:
-            ret_val = 1
-            dives_not_processed.append(dive_num)
-        elif temp_ret_val == 2:
-            log_info("Skipped processing dive %d" % dive_num)
-        else:
-            dives_processed.append(dive_num)
-            # If MDP does nothing (success w/o force option for example), it returns None
-            # - don't add to list
+    try:
+        for dive_num, temp_ret_val, nc_file_created in MakeDiveProfiles.process_dives(
+            dive_list, base_opts, logger_eng_files
+        ):
+            # Even if the processing failed, we may get a netcdf files out
             if nc_file_created:
-                dive_nc_file_names.append(nc_file_created)
-                if not base_opts.called_from_fm:
-                    BaseDB.loadDB(base_opts, nc_file_created, run_dive_plots=False)
-
-        del temp_ret_val
+                nc_files_created.append(nc_file_created)
+            if temp_ret_val == 1:
+                ret_val = 1
+                dives_not_processed.append(dive_num)
+            elif temp_ret_val == 2:
+                log_info("Skipped processing dive %d" % dive_num)
+            else:
+                dives_processed.append(dive_num)
+                # If MDP does nothing (success w/o force option for example), it returns None
+                # - don't add to list
+                if nc_file_created:
+                    dive_nc_file_names.append(nc_file_created)
+                    if not base_opts.called_from_fm:
+                        BaseDB.loadDB(base_opts, nc_file_created, run_dive_plots=False)
+    except KeyboardInterrupt:
+        log_info("Interrupted by user - bailing out")
+        ret_val = 1
 
     log_info(f"Dives processed = {dives_processed}")
     log_info(f"Dives failed to process = {dives_not_processed}")
@@ -357,8 +314,9 @@ def main(cmdline_args: list[str] = sys.argv[1:]):
                     nc_files_created = list(set(nc_files_created + fm_nc_files_created))
                     del fm_nc_files_created
                     if not base_opts.called_from_fm:
-                        for ncf in nc_files_created:
-                            BaseDB.loadDB(base_opts, ncf, run_dive_plots=False)
+                        BaseDB.loadDBFiles(
+                            base_opts, nc_files_created, run_dive_plots=False
+                        )
                     all_dive_nc_file_names.extend(nc_files_created)
                     all_dive_nc_file_names = sorted(
                         Utils.unique(all_dive_nc_file_names)
@@ -35,6 +35,7 @@ import contextlib
 import os
 import re
 import shutil
+import time
 
 import BaseNetCDF
 import LogFile
@@ -67,6 +68,12 @@ class SensorExtensions:
         self.__extension_file_name = None
         self.__extension_directory = None
         self.__se_dict = collections.OrderedDict()
+        # Timing counters, keyed by (extension, processing_func)
+        self.__stats = collections.defaultdict(
+            lambda: {"calls": 0, "secs": 0.0, "skipped": 0}
+        )
+        # Time spent in each extension since the last reset_extension_budget()
+        self.__budget_secs = collections.defaultdict(float)
         basestation_directory = base_opts.basestation_directory
         sensor_extension_directory = os.path.join(
             basestation_directory, sensor_extension_subdirectory
@@ -337,6 +344,55 @@ class SensorExtensions:
 
         return (self.__se_dict, ret_val)
 
+    def reset_extension_budget(self):
+        """Starts a new budget window - called at the start of each dive"""
+        self.__budget_secs.clear()
+
+    def extension_stats(self):
+        """Returns the timing counters - {(extension, processing_func): {calls, secs, skipped}}"""
+        return {k: dict(v) for k, v in self.__stats.items()}
+
+    def merge_extension_stats(self, stats):
+        """Adds in timing counters collected elsewhere (for example, in a worker process)"""
+        for k, v in stats.items():
+            for counter, value in v.items():
+                self.__stats[k][counter] += value
+
+    def __call_extension(self, key, processing_func, *args):
+        """Calls one extension function, updating its timing counters
+
+        Once an extension has used up base_opts.sensor_extension_budget secs since the
+        last reset_extension_budget(), its further calls are skipped (init_ functions are
+        always called).
+
+        Returns:
+            (extension return value, skipped)
+        """
+        stats = self.__stats[(key, processing_func)]
+        budget = getattr(self.__base_opts, "sensor_extension_budget", None)
+        if (
+            budget
+            and not processing_func.startswith("init_")
+            and self.__budget_secs[key] > budget
+        ):
+            stats["skipped"] += 1
+            log_warning(
+                f"{key} has used more than its {budget} sec budget - skipping {processing_func}",
+                alert=f"SENSOR_BUDGET_{os.path.basename(key)}",
+            )
+            return (None, True)
+        t0 = time.perf_counter()
+        try:
+            return (
+                self.__se_dict[key][processing_func](self.__base_opts, key, *args),
+                False,
+            )
+        finally:
+            secs = time.perf_counter() - t0
+            stats["calls"] += 1
+            stats["secs"] += secs
+            self.__budget_secs[key] += secs
+
     def process_sensor_extensions(self, processing_func, *args):
         """Processes the instruments extension file - calling each extension configured for the
         processing function with the supplied arguments
@@ -349,8 +405,12 @@ class SensorExtensions:
         for key in list(self.__se_dict.keys()):
             ext = self.__se_dict[key]
             if processing_func in ext:
-                extension_ret_val = ext[processing_func](self.__base_opts, key, *args)
-                if extension_ret_val is None:
+                extension_ret_val, skipped = self.__call_extension(
+                    key, processing_func, *args
+                )
+                if skipped:
+                    ret_val = 1
+                elif extension_ret_val is None:
                     log_warning(f"Extension returned None ({key},{processing_func})")
                     ret_val = 1
                 elif extension_ret_val < 0:
@@ -374,7 +434,11 @@ class SensorExtensions:
             d = self.__se_dict[key]
             if "logger_prefix" in d and d["logger_prefix"] == logger_prefix:
                 if processing_func in d:
-                    extension_ret_val = d[processing_func](self.__base_opts, key, *args)
+                    extension_ret_val, skipped = self.__call_extension(
+                        key, processing_func, *args
+                    )
+                    if skipped:
+                        return 1
                     if extension_ret_val < 0:
                         log_error(
                             "Error running %s(%s) - return %d"
@@ -402,6 +466,7 @@ def set_globals() -> None:
 
     sensor_extensions = None
 
+
 # Set globals on import
 set_globals()
 
@@ -497,6 +562,40 @@ def process_logger_func(logger_prefix, processing_func, *args):
         )
 
 
+def extension_stats():
+    """Returns the sensor extension timing counters - see SensorExtensions.extension_stats()"""
+    if sensor_extensions is None:
+        return {}
+    return sensor_extensions.extension_stats()
+
+
+def reset_extension_budget():
+    """Starts a new sensor extension budget window - see SensorExtensions.reset_extension_budget()"""
+    if sensor_extensions is not None:
+        sensor_extensions.reset_extension_budget()
+
+
+def merge_extension_stats(stats):
+    """Adds timing counters from a worker process into this process's counters"""
+    if sensor_extensions is not None:
+        sensor_extensions.merge_extension_stats(stats)
+
+
+def log_extension_stats():
+    """Logs the time spent in each sensor extension function, slowest first"""
+    stats = extension_stats()
+    if not stats:
+        return
+    log_info("Sensor extension stats")
+    for (key, processing_func), v in sorted(
+        stats.items(), key=lambda x: x[1]["secs"], reverse=True
+    ):
+        msg = f"{os.path.basename(key)}:{processing_func}:{v['secs']:.3f} secs, {v['calls']} calls"
+        if v["skipped"]:
+            msg += f", {v['skipped']} skipped"
+        log_info(msg)
+
+
 # These routines process configuration file based serdev and logdev sensors
 # pylint: disable=unused-argument
 def conf_file_asc2eng(base_opts, conf_file_name, datafile):
@@ -356,7 +356,7 @@ def eng_file_reader(eng_files, nc_info_d, calib_consts):
     ret_list = []
     fn = eng_files[0]
 
-    ef = Utils.read_eng_file(fn["file_name"])
+    ef = Utils.read_eng_file(fn["file_name"], cache=True)
     if not ef:
         log_error("Could not read %s - not using in profile" % fn["file_name"])
         return ([], {})
@@ -314,7 +314,7 @@ def eng_file_reader(eng_files, nc_info_d, calib_consts):
 
     data_vectors = {}
     for fn in eng_files:
-        ef = Utils.read_eng_file(fn["file_name"])
+        ef = Utils.read_eng_file(fn["file_name"], cache=True)
         if not ef:
             log_error(f"Could not read {fn['file_name']} - not using in profile")
             continue
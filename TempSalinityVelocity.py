@@ -267,6 +267,50 @@ def filter_unsteady(
     return (hdm_speed_unsteady_cm_s_v, hdm_glide_angle_unsteady_deg_v)
 
 
+def first_order_recurrence(a_v, b_v, x0=0.0, max_log_range=500.0, max_block=4096):
+    """Solve the time-varying linear recurrence x[i] = a_v[i]*x[i-1] + b_v[i]
+
+    This is the lfilter-style closed form x[i] = P[i]*(x[s] + sum(b[k]/P[k])),
+    with P the cumulative product of a_v, evaluated in blocks starting at s.
+    Blocks are cut before the product could leave the floating point range
+    (|log P| > max_log_range), so decaying modes neither underflow P nor
+    overflow b/P.
+
+    Input:
+      a_v - per-sample coefficients (a_v[0] is unused)
+      b_v - per-sample forcing (b_v[0] is unused)
+      x0 - initial value, x[0]
+      max_log_range - largest excursion of log|P| allowed within a block
+      max_block - longest block, bounding the cost of searching for the cut
+
+    Returns:
+      x_v - the solution, same length as a_v
+    """
+    n = len(a_v)
+    x_v = np.empty(n)
+    if n == 0:
+        return x_v
+    x_v[0] = x0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_a_v = np.log(np.abs(a_v))
+    s = 1
+    while s < n:
+        # The first point of a block is stepped directly, so a zero coefficient
+        # only ever occurs there
+        x_v[s] = a_v[s] * x_v[s - 1] + b_v[s]
+        e = min(n, s + 1 + max_block)
+        # NaN and -inf (a zero coefficient) also cut the block
+        out_of_range_i_v = np.nonzero(
+            ~(np.abs(np.cumsum(log_a_v[s + 1 : e])) <= max_log_range)
+        )[0]
+        if len(out_of_range_i_v):
+            e = s + 1 + out_of_range_i_v[0]
+        p_v = np.cumprod(a_v[s + 1 : e])
+        x_v[s + 1 : e] = p_v * (x_v[s] + np.cumsum(b_v[s + 1 : e] / p_v))
+        s = e
+    return x_v
+
+
 # pylint: disable=too-many-arguments disable=too-many-locals
 
 
@@ -465,6 +509,8 @@ def TSV_iterative(
         Bim_min = mode_cache["Bim_min"]
         Bem_min = mode_cache["Bem_min"]
         mode_data = mode_cache["mode_data"]
+        # "loop" is the original per-sample formulation, kept as a reference
+        vectorized = getattr(base_opts, "tsv_solver", "vectorized") == "vectorized"
     else:
         log_debug("Thermal-inertia correction disabled.")
         perform_thermal_inertia_correction = 0  # False
@@ -993,15 +1039,19 @@ def TSV_iterative(
             TraceArray.trace_array("Bo_%d" % loop, Bo)
 
             # ensure Biot numbers are always in range of tables
-            # These maps cost about 1sec for 28K points
-            Bi = [
-                (Bim_max if Bn > Bim_max else (Bim_min if Bn < Bim_min else Bn))
-                for Bn in Bi
-            ]
-            Bo = [
-                (Bem_max if Bn > Bem_max else (Bem_min if Bn < Bem_min else Bn))
-                for Bn in Bo
-            ]
+            if vectorized:
+                Bi = np.clip(Bi, Bim_min, Bim_max)
+                Bo = np.clip(Bo, Bem_min, Bem_max)
+            else:
+                # These maps cost about 1sec for 28K points
+                Bi = [
+                    (Bim_max if Bn > Bim_max else (Bim_min if Bn < Bim_min else Bn))
+                    for Bn in Bi
+                ]
+                Bo = [
+                    (Bem_max if Bn > Bem_max else (Bem_min if Bn < Bem_min else Bn))
+                    for Bn in Bo
+                ]
 
             temp_mode_v = np.zeros(mp_fine)  # individual mode contribution
             temp_modes_v = np.zeros(mp_fine)  # sum of modal contributions
@@ -1010,14 +1060,21 @@ def TSV_iterative(
                 # interp2 using Bo and Bi
                 # Can't just call the closures once on the Bi,Bo arrays
                 # as that returns a matrix of the complete cross-product
+                # (ev() evaluates the closures pointwise instead)
                 tau_f = mode_data[mode][0]
-                tau_v = [tau_f(Bi[i], Bo[i]) for i in range(r_sg_np)]
-                tau_v = np.reshape(np.array(tau_v), tnp)
+                if vectorized:
+                    tau_v = tau_f.ev(Bi, Bo)
+                else:
+                    tau_v = [tau_f(Bi[i], Bo[i]) for i in range(r_sg_np)]
+                    tau_v = np.reshape(np.array(tau_v), tnp)
                 TraceArray.trace_array("mode_tau_%d_%d" % (loop, mode), tau_v)
 
                 Ai_f = mode_data[mode][1]
-                Ai_v = [Ai_f(Bi[i], Bo[i]) for i in range(r_sg_np)]
-                Ai_v = np.reshape(np.array(Ai_v), tnp)
+                if vectorized:
+                    Ai_v = Ai_f.ev(Bi, Bo)
+                else:
+                    Ai_v = [Ai_f(Bi[i], Bo[i]) for i in range(r_sg_np)]
+                    Ai_v = np.reshape(np.array(Ai_v), tnp)
                 TraceArray.trace_array("mode_A_%d_%d" % (loop, mode), Ai_v)
 
                 # Expand tau and Ai to the fine-grained time grid
@@ -1026,33 +1083,55 @@ def TSV_iterative(
                 Ai_v = pchip(mode_time_s_v, Ai_v, m_time_fine_s_v)
 
                 # Iteratively solve for thermal inertia wall heat anomaly
-                temp_mode_v[:] = (
-                    0  # reset contrinution array and set temp_mode_v[0] = 0 as boundary condition
-                )
-                # initialize the iterative computation
-                prior_tau_v_i = tau_v[0]
-                prior_tau_v_2 = 2 * prior_tau_v_i
-                prior_temp_mode_v_i = 0  # Twaf[0]
-                prior_Ai_dTadt = Ai_v[0] * dTadt_v[0]
-                # Explicitly unroll the indexing loop using rotational variables for iterative solution
-                for ii in range(1, mp_fine):
-                    tau_v_i = tau_v[ii]
-                    tau_v_2 = 2 * tau_v_i
-                    Ai_dTadt = Ai_v[ii] * dTadt_v[ii]
-                    # update for the next iteration
-                    prior_temp_mode_v_i = (
-                        prior_temp_mode_v_i
-                        * tau_v_i
-                        * (prior_tau_v_2 - m_dt)
-                        / (prior_tau_v_i * (tau_v_2 + m_dt))
-                    ) - (
-                        m_dt * tau_v_i * (prior_Ai_dTadt + Ai_dTadt) / (tau_v_2 + m_dt)
+                if vectorized:
+                    # The update below, as x[ii] = a[ii]*x[ii-1] + b[ii]
+                    tau_2_v = 2 * tau_v
+                    Ai_dTadt_v = Ai_v * dTadt_v
+                    a_v = np.zeros(mp_fine)
+                    b_v = np.zeros(mp_fine)
+                    a_v[1:] = (
+                        tau_v[1:]
+                        * (tau_2_v[:-1] - m_dt)
+                        / (tau_v[:-1] * (tau_2_v[1:] + m_dt))
+                    )
+                    b_v[1:] = -(
+                        m_dt
+                        * tau_v[1:]
+                        * (Ai_dTadt_v[:-1] + Ai_dTadt_v[1:])
+                        / (tau_2_v[1:] + m_dt)
                     )
-                    temp_mode_v[ii] = prior_temp_mode_v_i  # record the anomaly
-                    # rotate variables (prior_temp_mode_v_i is already 'rotated')
-                    prior_tau_v_i = tau_v_i
-                    prior_tau_v_2 = tau_v_2
-                    prior_Ai_dTadt = Ai_dTadt
+                    temp_mode_v = first_order_recurrence(a_v, b_v)
+                else:
+                    temp_mode_v[:] = (
+                        0  # reset contrinution array and set temp_mode_v[0] = 0 as boundary condition
+                    )
+                    # initialize the iterative computation
+                    prior_tau_v_i = tau_v[0]
+                    prior_tau_v_2 = 2 * prior_tau_v_i
+                    prior_temp_mode_v_i = 0  # Twaf[0]
+                    prior_Ai_dTadt = Ai_v[0] * dTadt_v[0]
+                    # Explicitly unroll the indexing loop using rotational variables for iterative solution
+                    for ii in range(1, mp_fine):
+                        tau_v_i = tau_v[ii]
+                        tau_v_2 = 2 * tau_v_i
+                        Ai_dTadt = Ai_v[ii] * dTadt_v[ii]
+                        # update for the next iteration
+                        prior_temp_mode_v_i = (
+                            prior_temp_mode_v_i
+                            * tau_v_i
+                            * (prior_tau_v_2 - m_dt)
+                            / (prior_tau_v_i * (tau_v_2 + m_dt))
+                        ) - (
+                            m_dt
+                            * tau_v_i
+                            * (prior_Ai_dTadt + Ai_dTadt)
+                            / (tau_v_2 + m_dt)
+                        )
+                        temp_mode_v[ii] = prior_temp_mode_v_i  # record the anomaly
+                        # rotate variables (prior_temp_mode_v_i is already 'rotated')
+                        prior_tau_v_i = tau_v_i
+                        prior_tau_v_2 = tau_v_2
+                        prior_Ai_dTadt = Ai_dTadt
 
                 TraceArray.trace_array("mode_temp_%d_%d" % (loop, mode), temp_mode_v)
                 temp_modes_v = (
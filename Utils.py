@@ -42,6 +42,7 @@ from __future__ import annotations
 
 import bz2
 import collections
+import contextlib
 import errno
 import functools
 import glob
@@ -604,9 +605,210 @@ def run_cmd_shell(cmd, timeout=None, shell=True):
     return (sts, out_f)
 
 
-def read_eng_file(eng_file_name):
+def eng_file_cache_name(eng_file_name):
+    """Returns the name of the binary sidecar cache for an eng file"""
+    return f"{eng_file_name}.npz"
+
+
+def load_eng_file_cache(eng_file_name):
+    """Returns the read_eng_file() result cached for eng_file_name, or None if there is
+    no cache or eng_file_name has changed since it was written
+    """
+    cache_file_name = eng_file_cache_name(eng_file_name)
+    try:
+        st = os.stat(eng_file_name)
+        with np.load(cache_file_name, allow_pickle=False) as npz:
+            if (int(npz["st_mtime_ns"]), int(npz["st_size"])) != (
+                st.st_mtime_ns,
+                st.st_size,
+            ):
+                return None
+            tmp = npz["data"]
+            data_column_headers = npz["columns"].tolist()
+            file_header = npz["file_header"].tolist()
+    except FileNotFoundError:
+        return None
+    except Exception:
+        log_warning(f"Could not read {cache_file_name} - ignoring", "exc")
+        return None
+    data = {}
+    for i in range(len(data_column_headers)):
+        data[data_column_headers[i]] = tmp[:, i]
+    return {"file_header": file_header, "data": data}
+
+
+def save_eng_file_cache(eng_file_name, st, file_header, data_column_headers, tmp):
+    """Writes the parsed contents of eng_file_name, as of stat st, to its sidecar cache"""
+    cache_file_name = eng_file_cache_name(eng_file_name)
+    tmp_file_name = f"{cache_file_name}.tmp"
+    try:
+        with open(tmp_file_name, "wb") as fo:
+            np.savez(
+                fo,
+                data=tmp,
+                columns=np.array(data_column_headers, dtype=str),
+                file_header=np.array(file_header, dtype=str),
+                st_mtime_ns=np.int64(st.st_mtime_ns),
+                st_size=np.int64(st.st_size),
+            )
+        os.replace(tmp_file_name, cache_file_name)
+    except Exception:
+        log_warning(f"Could not write {cache_file_name}", "exc")
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_file_name)
+
+
+# Per-dive extracts for tools that repeatedly read a few variables from a range of
+# dives (RegressVBD, Magcal) are kept as npz files under this directory, next to the
+# dive netcdf files
+dive_extract_cache_dir = ".dive_extracts"
+
+
+def dive_extract_cache_name(dive_nc_file_name, tag):
+    """Returns the name of the extract cache for a dive netcdf file"""
+    return os.path.join(
+        os.path.dirname(dive_nc_file_name),
+        dive_extract_cache_dir,
+        f"{os.path.basename(dive_nc_file_name)}.{tag}.npz",
+    )
+
+
+def load_dive_extract_cache(dive_nc_file_name, tag, version):
+    """Returns the extract cached for dive_nc_file_name, or None if there is no cache
+    or the netcdf file (or the extract version) has changed since it was written
+    """
+    cache_file_name = dive_extract_cache_name(dive_nc_file_name, tag)
+    try:
+        st = os.stat(dive_nc_file_name)
+        with np.load(cache_file_name, allow_pickle=False) as npz:
+            if (
+                int(npz["st_mtime_ns"]),
+                int(npz["st_size"]),
+                int(npz["version"]),
+            ) != (st.st_mtime_ns, st.st_size, version):
+                return None
+            return {
+                k: npz[k]
+                for k in npz.files
+                if k not in ("st_mtime_ns", "st_size", "version")
+            }
+    except FileNotFoundError:
+        return None
+    except Exception:
+        log_warning(f"Could not read {cache_file_name} - ignoring", "exc")
+        return None
+
+
+def save_dive_extract_cache(dive_nc_file_name, tag, version, st, extract_d):
+    """Writes the extract of dive_nc_file_name, as of stat st, to its cache"""
+    cache_file_name = dive_extract_cache_name(dive_nc_file_name, tag)
+    tmp_file_name = f"{cache_file_name}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_file_name), exist_ok=True)
+        with open(tmp_file_name, "wb") as fo:
+            np.savez(
+                fo,
+                st_mtime_ns=np.int64(st.st_mtime_ns),
+                st_size=np.int64(st.st_size),
+                version=np.int64(version),
+                **extract_d,
+            )
+        os.replace(tmp_file_name, cache_file_name)
+    except Exception:
+        # The mission directory may well be read-only for the caller (vis, for one)
+        log_debug(f"Could not write {cache_file_name}", "exc")
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_file_name)
+
+
+def read_dive_extract(dive_nc_file_name, tag, version, extract):
+    """Returns extract() of a dive netcdf file, reusing a cached copy if the file is
+    unchanged since the cache was written
+
+    Tools such as magcal and regress_vbd are re-run over overlapping dive ranges, so
+    the per-dive extract is cached next to the netcdf file rather than re-read each
+    time.
+
+    Args:
+        dive_nc_file_name: dive netcdf file to read
+        tag: Name of the extract - one cache file is kept per dive and tag
+        version: Version of extract(); bump it whenever extract() changes
+        extract: Called with the open netcdf file; returns a dictionary of numpy
+            arrays, scalars and strings
+
+    Returns:
+        Dictionary of the extracted values as numpy arrays (scalars and strings as
+        0-d arrays)
+        None if the netcdf file could not be opened
+    """
+    extract_d = load_dive_extract_cache(dive_nc_file_name, tag, version)
+    if extract_d is not None:
+        return extract_d
+
+    try:
+        st = os.stat(dive_nc_file_name)
+        ds = open_netcdf_file(dive_nc_file_name)
+    except Exception:
+        return None
+    try:
+        extract_d = {k: np.asarray(v) for k, v in extract(ds).items()}
+    finally:
+        ds.close()
+
+    save_dive_extract_cache(dive_nc_file_name, tag, version, st, extract_d)
+    return extract_d
+
+
+# The per-dive caches of the whole mission products (MakeMissionProfile,
+# MakeMissionTimeSeries, MakeKML) are pickles, checked against file_stamp() of each
+# dive netcdf file
+def file_stamp(file_name):
+    """Returns what identifies the version of a file, or None if it can't be stat'd"""
+    try:
+        st = os.stat(file_name)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def load_pickle_cache(cache_name):
+    """Returns the contents of a pickled cache, or None if it is missing or unreadable"""
+    try:
+        with open(cache_name, "rb") as fi:
+            return pickle.load(fi)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        log_warning(f"Could not read {cache_name} - ignoring", "exc")
+        return None
+
+
+def save_pickle_cache(cache_name, cache_d):
+    """Pickles cache_d to cache_name, creating its directory if needed"""
+    tmp_name = f"{cache_name}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_name) or ".", exist_ok=True)
+        with open(tmp_name, "wb") as fo:
+            pickle.dump(cache_d, fo)
+        os.replace(tmp_name, cache_name)
+    except Exception:
+        log_warning(f"Could not write {cache_name}", "exc")
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_name)
+
+
+# Any token starting with N (NaN, N/A, ...) is a missing value
+eng_file_missing_pattern = re.compile(r"(?<!\S)N\S*")
+
+
+def read_eng_file(eng_file_name, cache=False):
     """Reads and eng file, returning the column headers and data in a dictionary
 
+    Args:
+        eng_file_name: eng file to read
+        cache: If True, reuse (or write) a binary copy of the parsed file next to
+            eng_file_name, so an unchanged eng file is not re-parsed
+
     Returns:
         Dictionary with eng file headers and data if successful
         None if failed to parse eng file
@@ -616,21 +818,24 @@ def read_eng_file(eng_file_name):
     # columns_header_pattern = re.compile("^%(?P<header>.*?):(?P<value>.*)")
     columns_header_pattern = re.compile(r"^%columns:\s*(?P<value>.*)")
 
+    if cache:
+        ef = load_eng_file_cache(eng_file_name)
+        if ef is not None:
+            return ef
+
     try:
         eng_file = open(eng_file_name, "r")  # noqa: SIM115
+        st = os.fstat(eng_file.fileno())
+        eng_lines = eng_file.readlines()
     except OSError:
         log_error("Could not open %s for reading" % (eng_file_name))
         return None
+    eng_file.close()
 
     line_count = 0
-    rows = []
     data_column_headers = []
     file_header = []
-    while True:
-        eng_line_temp = eng_file.readline()
-        # log_debug("[%s]" % eng_line_temp)
-        if eng_line_temp == "":
-            break
+    for eng_line_temp in eng_lines:
         eng_line = eng_line_temp.rstrip().rstrip()
         line_count = line_count + 1
         if eng_line.find("%data") != -1:
@@ -648,42 +853,57 @@ def read_eng_file(eng_file_name):
     if not data_column_headers:
         return None
 
-    # Process the data
-    while True:
-        eng_line_temp = eng_file.readline()
-        # log_debug("[%s]" % eng_line_temp)
-        if eng_line_temp == "":  # EOF?
-            break
-        eng_line = eng_line_temp.rstrip()
-        line_count = line_count + 1
-        if eng_line[0] == "%":
-            continue
-        raw_strs = eng_line.split()
-        row = []
-        for i in range(len(raw_strs)):
-            if (raw_strs[i])[0:1] == "N":
-                row.append(np.nan)
-            else:
-                try:
-                    row.append(np.float64(raw_strs[i]))
-                except Exception:
-                    log_error(
-                        "Problems converting [%s] to float from line [%s] (%s, line %d)"
-                        % (raw_strs[i], eng_line, eng_file_name, line_count)
-                    )
-                    continue
+    # Process the data - in bulk, falling back to line by line when the bulk
+    # parse fails so malformed lines are reported as before
+    data_lines = [x.rstrip() for x in eng_lines[line_count:]]
+    data_lines = [x for x in data_lines if x[0:1] != "%"]
+    tmp = None
+    if data_lines and all(data_lines):
+        try:
+            tmp = np.loadtxt(
+                [eng_file_missing_pattern.sub("nan", x) for x in data_lines],
+                dtype=np.float64,
+                comments=None,
+                ndmin=2,
+            )
+        except ValueError:
+            tmp = None
+
+    if tmp is None:
+        rows = []
+        for eng_line_temp in eng_lines[line_count:]:
+            eng_line = eng_line_temp.rstrip()
+            line_count = line_count + 1
+            if eng_line[0] == "%":
+                continue
+            raw_strs = eng_line.split()
+            row = []
+            for i in range(len(raw_strs)):
+                if (raw_strs[i])[0:1] == "N":
+                    row.append(np.nan)
+                else:
+                    try:
+                        row.append(np.float64(raw_strs[i]))
+                    except Exception:
+                        log_error(
+                            "Problems converting [%s] to float from line [%s] (%s, line %d)"
+                            % (raw_strs[i], eng_line, eng_file_name, line_count)
+                        )
+                        continue
 
-        rows.append(row)
+            rows.append(row)
 
-    if not rows:
-        return None
+        if not rows:
+            return None
+
+        tmp = np.array(rows, np.float64)
 
-    tmp = np.array(rows, np.float64)
     data = {}
     for i in range(len(data_column_headers)):
         data[data_column_headers[i]] = tmp[:, i]
 
-    eng_file.close()
+    if cache:
+        save_eng_file_cache(eng_file_name, st, file_header, data_column_headers, tmp)
     # log_info("Eng file col headers %s" % data.keys())
     return {"file_header": file_header, "data": data}
 
@@ -729,6 +949,10 @@ def cart2pol(x, y):
     return np.angle(z), np.abs(z)
 
 
+# Window elements handed to each np.median call in medfilt1
+medfilt1_chunk_elements = 1 << 20
+
+
 # http://staff.washington.edu/bdjwww/medfilt.py
 def medfilt1(x=None, L=None):
     """
@@ -784,18 +1008,22 @@ def medfilt1(x=None, L=None):
 
     # body --------------------------------------------------------------------
 
-    for i, _ in enumerate(xin):
-        # left boundary (Lwing terms)
-        if i < Lwing:
-            xout[i] = np.median(xin[0 : i + Lwing + 1])  # (0 to i+Lwing)
-
-        # right boundary (Lwing terms)
-        elif i >= N - Lwing:
-            xout[i] = np.median(xin[i - Lwing : N])  # (i-Lwing to N-1)
-
-        # middle (N - 2*Lwing terms; input vector and filter window overlap completely)
-        else:
-            xout[i] = np.median(xin[i - Lwing : i + Lwing + 1])  # (i-Lwing to i+Lwing)
+    # left and right boundaries (Lwing terms each), where the window shrinks
+    for i in range(min(Lwing, N)):
+        xout[i] = np.median(xin[0 : i + Lwing + 1])  # (0 to i+Lwing)
+    for i in range(max(N - Lwing, Lwing), N):
+        xout[i] = np.median(xin[i - Lwing : N])  # (i-Lwing to N-1)
+
+    # middle (N - 2*Lwing terms; input vector and filter window overlap completely)
+    # One median per row of a strided (copy free) view of the windows, taken in
+    # chunks so the partitioned copy np.median makes stays small
+    n_middle = N - 2 * Lwing
+    if n_middle > 0:
+        windows = np.lib.stride_tricks.sliding_window_view(xin, L)
+        chunk = max(1, medfilt1_chunk_elements // L)
+        for start in range(0, n_middle, chunk):
+            stop = min(start + chunk, n_middle)
+            xout[Lwing + start : Lwing + stop] = np.median(windows[start:stop], axis=1)
 
     return xout
 
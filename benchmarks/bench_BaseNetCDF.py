@@ -0,0 +1,191 @@
+# -*- python-fmt -*-
+
+## Copyright (c) 2026  University of Washington.
+##
+## Redistribution and use in source and binary forms, with or without
+## modification, are permitted provided that the following conditions are met:
+##
+## 1. Redistributions of source code must retain the above copyright notice, this
+##    list of conditions and the following disclaimer.
+##
+## 2. Redistributions in binary form must reproduce the above copyright notice,
+##    this list of conditions and the following disclaimer in the documentation
+##    and/or other materials provided with the distribution.
+##
+## 3. Neither the name of the University of Washington nor the names of its
+##    contributors may be used to endorse or promote products derived from this
+##    software without specific prior written permission.
+##
+## THIS SOFTWARE IS PROVIDED BY THE UNIVERSITY OF WASHINGTON AND CONTRIBUTORS “AS
+## IS” AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+## IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+## DISCLAIMED. IN NO EVENT SHALL THE UNIVERSITY OF WASHINGTON OR CONTRIBUTORS BE
+## LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+## CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE
+## GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+## HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+## LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT
+## OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""Compare the netCDF write profiles in BaseNetCDF.nc_write_profiles
+
+For each profile, over a copy of a mission with per-dive netcdf files:
+  - the per-dive files are rewritten with the profile's createVariable() arguments
+  - the mission timeseries and mission profile files are made with
+    --nc_write_profile <profile>
+and the write time, file sizes and the latency of typical reads - whole
+variables from the per-dive files, a range of dives from the mission files -
+are reported.
+
+Usage: python benchmarks/bench_BaseNetCDF.py [testdata/mission ...]
+"""
+
+import glob
+import os
+import pathlib
+import shutil
+import sys
+import tempfile
+import time
+import types
+
+import netCDF4
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir))
+
+import BaseNetCDF
+import MakeMissionProfile
+import MakeMissionTimeSeries
+
+default_missions = ("testdata/sg171_EKAMSAT_Apr24",)
+dive_range_reads = 10  # number of dive range reads timed per mission file
+dive_range_fraction = 0.2  # fraction of the mission's dives in each range read
+
+
+def rewrite_nc(src_name, dst_name):
+    """Copy src_name to dst_name with the current write settings"""
+    with netCDF4.Dataset(src_name) as src, netCDF4.Dataset(dst_name, "w") as dst:
+        dst.setncatts({k: src.getncattr(k) for k in src.ncattrs()})
+        for name, dim in src.dimensions.items():
+            dst.createDimension(name, len(dim))
+        for name, var in src.variables.items():
+            fill_value = getattr(var, "_FillValue", False)
+            dst_var = dst.createVariable(
+                name,
+                var.dtype,
+                var.dimensions,
+                fill_value=fill_value,
+                **BaseNetCDF.nc_var_write_kwargs(dst, var.dimensions),
+            )
+            dst_var.setncatts(
+                {k: var.getncattr(k) for k in var.ncattrs() if k != "_FillValue"}
+            )
+            var.set_auto_maskandscale(False)
+            dst_var.set_auto_maskandscale(False)
+            if var.dimensions:
+                dst_var[:] = var[:]
+            else:
+                dst_var.assignValue(var.getValue())
+
+
+def rewrite_all(src_names, dst_names):
+    for src_name, dst_name in zip(src_names, dst_names, strict=True):
+        rewrite_nc(src_name, dst_name)
+
+
+def read_whole(nc_names):
+    for nc_name in nc_names:
+        with netCDF4.Dataset(nc_name) as ds:
+            for var in ds.variables.values():
+                var[:]
+
+
+def read_dive_ranges(nc_name):
+    """Reads of one variable over a run of dives - the largest dive ordered one"""
+    rng = np.random.default_rng(0)
+    with netCDF4.Dataset(nc_name) as ds:
+        var = max(
+            (v for v in ds.variables.values() if v.dimensions and v.dtype.kind == "f"),
+            key=lambda v: v.size,
+        )
+        n = var.shape[0]
+        span = max(1, int(n * dive_range_fraction))
+        for start in rng.integers(0, max(1, n - span), dive_range_reads):
+            var[start : start + span]
+        return var.name
+
+
+def size_mb(nc_names):
+    return sum(os.path.getsize(f) for f in nc_names) / 1e6
+
+
+def timed(func, *args):
+    start = time.time()
+    result = func(*args)
+    return time.time() - start, result
+
+
+def main():
+    missions = sys.argv[1:] or default_missions
+    for mission in missions:
+        data_dir = pathlib.Path(mission)
+        src_nc_names = sorted(glob.glob(str(data_dir / "p*.nc")))
+        print(f"{mission}: {len(src_nc_names)} dives")
+        for profile_name in BaseNetCDF.nc_write_profiles:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                mission_dir = pathlib.Path(tmp_dir).joinpath(data_dir.name)
+                mission_dir.mkdir()
+                for p in data_dir.iterdir():
+                    if p.is_file() and not p.name.startswith("p"):
+                        shutil.copy(p, mission_dir)
+
+                BaseNetCDF.set_nc_write_profile(
+                    types.SimpleNamespace(nc_write_profile=profile_name), "dive"
+                )
+                dive_nc_names = [
+                    str(mission_dir / os.path.basename(f)) for f in src_nc_names
+                ]
+                dive_t, _ = timed(rewrite_all, src_nc_names, dive_nc_names)
+                dive_read_t, _ = timed(read_whole, dive_nc_names)
+                print(
+                    f"  {profile_name:9s} dive        write {dive_t:6.2f}s "
+                    f"{size_mb(dive_nc_names):7.2f}MB read (whole vars) {dive_read_t:6.3f}s"
+                )
+
+                cmdline = [
+                    "--mission_dir",
+                    str(mission_dir),
+                    "--nc_write_profile",
+                    profile_name,
+                ]
+                for label, maker, no_cache in (
+                    (
+                        "timeseries",
+                        MakeMissionTimeSeries.main,
+                        "--no-mission_timeseries_cache",
+                    ),
+                    (
+                        "profile",
+                        MakeMissionProfile.main,
+                        "--no-mission_profile_cache",
+                    ),
+                ):
+                    before = set(mission_dir.glob("*.nc"))
+                    make_t, _ = timed(maker, cmdline + [no_cache])
+                    made = [str(p) for p in set(mission_dir.glob("*.nc")) - before]
+                    if not made:
+                        print(f"  {profile_name:9s} {label:11s} not created")
+                        continue
+                    read_t, var_name = timed(read_dive_ranges, made[0])
+                    print(
+                        f"  {profile_name:9s} {label:11s} write {make_t:6.2f}s "
+                        f"{size_mb(made):7.2f}MB read ({dive_range_reads} "
+                        f"dive ranges of {var_name}) {read_t:6.3f}s"
+                    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
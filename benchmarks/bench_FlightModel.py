@@ -0,0 +1,135 @@
+# -*- python-fmt -*-
+
+## Copyright (c) 2026  University of Washington.
+##
+## Redistribution and use in source and binary forms, with or without
+## modification, are permitted provided that the following conditions are met:
+##
+## 1. Redistributions of source code must retain the above copyright notice, this
+##    list of conditions and the following disclaimer.
+##
+## 2. Redistributions in binary form must reproduce the above copyright notice,
+##    this list of conditions and the following disclaimer in the documentation
+##    and/or other materials provided with the distribution.
+##
+## 3. Neither the name of the University of Washington nor the names of its
+##    contributors may be used to endorse or promote products derived from this
+##    software without specific prior written permission.
+##
+## THIS SOFTWARE IS PROVIDED BY THE UNIVERSITY OF WASHINGTON AND CONTRIBUTORS “AS
+## IS” AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+## IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+## DISCLAIMED. IN NO EVENT SHALL THE UNIVERSITY OF WASHINGTON OR CONTRIBUTORS BE
+## LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+## CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE
+## GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+## HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+## LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT
+## OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""Compare the loop and batched a/b grid searches in FlightModel.solve_ab_grid()
+
+Runs FlightModel over a copy of each testdata mission that has per-dive netcdf files,
+asking for an a/b grid over all the dives, and times each solver on that combined data.
+
+Usage: python benchmarks/bench_FlightModel.py [testdata/mission ...]
+"""
+
+import os
+import pathlib
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir))
+
+import BaseOpts
+import FlightModel
+
+default_missions = ("testdata/sg171_EKAMSAT_Apr24",)
+solve_ab_grid_batched = FlightModel.solve_ab_grid_batched
+
+
+def capture_grid_inputs(data_dir, tmp_dir):
+    """Run FlightModel over a copy of data_dir and return the solve_ab_grid inputs"""
+    mission_dir = pathlib.Path(tmp_dir).joinpath(data_dir.name)
+    mission_dir.mkdir()
+    for p in data_dir.iterdir():
+        if p.is_file():
+            shutil.copy(p, mission_dir)
+    dive_nums = sorted(int(p.stem[4:]) for p in mission_dir.glob("p*.nc"))
+
+    captured = []
+
+    def capture(base_opts, abs_compress, combined_data_d):
+        captured.append((base_opts, abs_compress, dict(combined_data_d)))
+        return FlightModel.solve_ab_grid_loop(base_opts, abs_compress, combined_data_d)
+
+    FlightModel.set_globals()
+    FlightModel.generate_figures = False
+    FlightModel.mission_directory = str(mission_dir)
+    FlightModel.grid_dive_sets = [dive_nums]
+    FlightModel.solve_ab_grid_batched = capture
+    try:
+        base_opts = BaseOpts.BaseOptions(
+            "FlightModel benchmark",
+            cmdline_args=["--mission_dir", str(mission_dir)],
+            calling_module="FlightModel",
+        )
+        FlightModel.process_directory(base_opts)
+    finally:
+        FlightModel.solve_ab_grid_batched = solve_ab_grid_batched
+    return captured[-1] if captured else None
+
+
+def time_solver(solver, args, **controls):
+    for k, v in controls.items():
+        setattr(FlightModel, k, v)
+    try:
+        start = time.time()
+        result = solver(*args)
+        return time.time() - start, result
+    finally:
+        for k in controls:
+            setattr(FlightModel, k, 0)
+
+
+def main():
+    missions = sys.argv[1:] or default_missions
+    for mission in missions:
+        data_dir = pathlib.Path(mission)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            grid_inputs = capture_grid_inputs(data_dir, tmp_dir)
+            if grid_inputs is None:
+                print(f"{mission}: no a/b grid solved")
+                continue
+            base_opts, abs_compress, combined_data_d = grid_inputs
+            print(
+                f"{mission}: {len(combined_data_d['w'])} points, "
+                f"{len(FlightModel.hd_a_grid)}x{len(FlightModel.hd_b_grid)} grid"
+            )
+            args = (base_opts, abs_compress, combined_data_d)
+            loop_t, (W_loop, ia, ib) = time_solver(FlightModel.solve_ab_grid_loop, args)
+            print(f"  {'loop':24s} {loop_t:7.2f}s")
+            for label, controls in (
+                ("batched", {}),
+                ("batched, 4 workers", {"ab_grid_workers": 4}),
+                ("batched, coarse stride 3", {"ab_grid_coarse_stride": 3}),
+            ):
+                t, (W, b_ia, b_ib) = time_solver(
+                    solve_ab_grid_batched, args, **controls
+                )
+                print(
+                    f"  {label:24s} {t:7.2f}s x{loop_t / t:5.1f} "
+                    f"min {'same' if (b_ia, b_ib) == (ia, ib) else 'DIFFERENT'} "
+                    f"grid {'same' if np.array_equal(W, W_loop) else 'differs'}"
+                )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
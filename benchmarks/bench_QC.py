@@ -0,0 +1,133 @@
+# -*- python-fmt -*-
+
+## Copyright (c) 2026  University of Washington.
+##
+## Redistribution and use in source and binary forms, with or without
+## modification, are permitted provided that the following conditions are met:
+##
+## 1. Redistributions of source code must retain the above copyright notice, this
+##    list of conditions and the following disclaimer.
+##
+## 2. Redistributions in binary form must reproduce the above copyright notice,
+##    this list of conditions and the following disclaimer in the documentation
+##    and/or other materials provided with the distribution.
+##
+## 3. Neither the name of the University of Washington nor the names of its
+##    contributors may be used to endorse or promote products derived from this
+##    software without specific prior written permission.
+##
+## THIS SOFTWARE IS PROVIDED BY THE UNIVERSITY OF WASHINGTON AND CONTRIBUTORS “AS
+## IS” AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+## IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+## DISCLAIMED. IN NO EVENT SHALL THE UNIVERSITY OF WASHINGTON OR CONTRIBUTORS BE
+## LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+## CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE
+## GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+## HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+## LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT
+## OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""Time the scicon noise filter, QC.qc_noise(), and the Utils.medfilt1() it is built on
+
+The testdata CT profiles are resampled to scicon rates (and the dive stretched) to
+get long profiles, with electronic noise spikes added.  The original per-sample
+medfilt1 loop is timed against the current strided version, checking that both
+give identical results.
+
+Usage: python benchmarks/bench_QC.py [per-dive netcdf file ...]
+"""
+
+import os
+import sys
+import time
+
+import netCDF4
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir))
+
+import QC
+import Utils
+
+default_nc_files = ("testdata/sg171_EKAMSAT_Apr24/p1710100.nc",)
+sample_rates = (1.0, 4.0)  # [Hz]
+dive_hours = (2.0, 8.0)
+window_sizes = (15, 61)
+
+
+def medfilt1_loop(x, L):
+    """The original medfilt1 body - np.median on a fresh slice for every sample"""
+    xin = np.array(x)
+    N = len(xin)
+    xout = np.zeros(N)
+    L = int(L)
+    if L % 2 == 0:
+        L += 1
+    Lwing = (L - 1) // 2
+    for i in range(N):
+        if i < Lwing:
+            xout[i] = np.median(xin[0 : i + Lwing + 1])
+        elif i >= N - Lwing:
+            xout[i] = np.median(xin[i - Lwing : N])
+        else:
+            xout[i] = np.median(xin[i - Lwing : i + Lwing + 1])
+    return xout
+
+
+def long_profiles(nc_file_name):
+    """Yields (label, data_v) scicon rate profiles built from nc_file_name's CT data"""
+    rng = np.random.default_rng(0)
+    with netCDF4.Dataset(nc_file_name) as ds:
+        time_v = np.ma.filled(ds.variables["ctd_time"][:], np.nan)
+        for var in ("temperature", "conductivity"):
+            data_v = np.ma.filled(ds.variables[var][:], np.nan)
+            good_i_v = np.isfinite(time_v) & np.isfinite(data_v)
+            t_v = time_v[good_i_v] - time_v[good_i_v][0]
+            for hours in dive_hours:
+                for rate in sample_rates:
+                    new_t_v = np.arange(0, hours * 3600.0, 1.0 / rate)
+                    new_v = np.interp(
+                        new_t_v * t_v[-1] / new_t_v[-1], t_v, data_v[good_i_v]
+                    )
+                    new_v += 0.001 * rng.standard_normal(len(new_v))
+                    spikes_i_v = rng.choice(len(new_v), len(new_v) // 500)
+                    new_v[spikes_i_v] += rng.choice((-1.0, 1.0), len(spikes_i_v))
+                    yield (f"{var} {hours:.0f}h {rate:.0f}Hz", new_v)
+
+
+def best_time(func, *args, repeats=3):
+    best = None
+    for _ in range(repeats):
+        start = time.time()
+        result = func(*args)
+        t = time.time() - start
+        best = t if best is None else min(best, t)
+    return best, result
+
+
+def main():
+    nc_files = sys.argv[1:] or [
+        os.path.join(os.path.dirname(__file__), os.pardir, f) for f in default_nc_files
+    ]
+    for nc_file_name in nc_files:
+        print(os.path.basename(nc_file_name))
+        for label, data_v in long_profiles(nc_file_name):
+            for window_size in window_sizes:
+                loop_t, loop_r = best_time(
+                    medfilt1_loop, data_v, window_size, repeats=1
+                )
+                new_t, new_r = best_time(Utils.medfilt1, data_v, window_size)
+                noise_t, bad_i_v = best_time(QC.qc_noise, data_v, window_size)
+                same = np.array_equal(loop_r, new_r, equal_nan=True)
+                print(
+                    f"  {label:24s} {len(data_v):6d} pts L={window_size:2d} "
+                    f"medfilt1 loop {loop_t:7.3f}s strided {new_t:6.3f}s "
+                    f"x{loop_t / new_t:6.1f} {'same' if same else 'DIFFERENT'} "
+                    f"qc_noise {noise_t:6.3f}s ({len(bad_i_v)} bad)"
+                )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+# -*- python-fmt -*-
+
+## Copyright (c) 2026  University of Washington.
+##
+## Redistribution and use in source and binary forms, with or without
+## modification, are permitted provided that the following conditions are met:
+##
+## 1. Redistributions of source code must retain the above copyright notice, this
+##    list of conditions and the following disclaimer.
+##
+## 2. Redistributions in binary form must reproduce the above copyright notice,
+##    this list of conditions and the following disclaimer in the documentation
+##    and/or other materials provided with the distribution.
+##
+## 3. Neither the name of the University of Washington nor the names of its
+##    contributors may be used to endorse or promote products derived from this
+##    software without specific prior written permission.
+##
+## THIS SOFTWARE IS PROVIDED BY THE UNIVERSITY OF WASHINGTON AND CONTRIBUTORS “AS
+## IS” AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+## IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+## DISCLAIMED. IN NO EVENT SHALL THE UNIVERSITY OF WASHINGTON OR CONTRIBUTORS BE
+## LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+## CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE
+## GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+## HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+## LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT
+## OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""Time Utils.read_eng_file() over the testdata eng files
+
+Compares the original line by line parse, the bulk parse and a read from the
+binary sidecar cache, checking that all three return the same data.
+
+Usage: python benchmarks/bench_Utils.py [eng_file ...]
+"""
+
+import glob
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir))
+
+import Utils
+
+
+def read_eng_file_by_line(eng_file_name):
+    """Forces the line by line parse read_eng_file() falls back to"""
+    loadtxt = np.loadtxt
+
+    def fail(*args, **kwargs):
+        raise ValueError
+
+    np.loadtxt = fail
+    try:
+        return Utils.read_eng_file(eng_file_name)
+    finally:
+        np.loadtxt = loadtxt
+
+
+def same(ef1, ef2):
+    if ef1 is None or ef2 is None:
+        return ef1 is ef2
+    return (
+        ef1["file_header"] == ef2["file_header"]
+        and list(ef1["data"]) == list(ef2["data"])
+        and all(
+            np.array_equal(ef1["data"][k], ef2["data"][k], equal_nan=True)
+            for k in ef1["data"]
+        )
+    )
+
+
+def time_reader(reader, eng_files, repeats=3):
+    best = None
+    for _ in range(repeats):
+        start = time.time()
+        results = [reader(f) for f in eng_files]
+        t = time.time() - start
+        best = t if best is None else min(best, t)
+    return best, results
+
+
+def main():
+    src_files = sys.argv[1:] or sorted(
+        glob.glob(
+            os.path.join(
+                os.path.dirname(__file__), os.pardir, "testdata", "**", "*.eng"
+            ),
+            recursive=True,
+        )
+    )
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Copy so the sidecar caches do not land in testdata
+        eng_files = []
+        for ii, src in enumerate(src_files):
+            dst = os.path.join(tmp_dir, f"{ii:04d}_{os.path.basename(src)}")
+            shutil.copy(src, dst)
+            try:
+                Utils.read_eng_file(dst)
+            except Exception as e:
+                print(f"Skipping {src}: {e}")
+                continue
+            eng_files.append(dst)
+        n_bytes = sum(os.path.getsize(f) for f in eng_files)
+        print(f"{len(eng_files)} eng files, {n_bytes / 1e6:.1f} MB")
+
+        line_t, line_r = time_reader(read_eng_file_by_line, eng_files)
+        bulk_t, bulk_r = time_reader(Utils.read_eng_file, eng_files)
+        for f in eng_files:
+            Utils.read_eng_file(f, cache=True)  # populate the caches
+        cache_t, cache_r = time_reader(
+            lambda f: Utils.read_eng_file(f, cache=True), eng_files
+        )
+        for label, t, r in (
+            ("line by line", line_t, line_r),
+            ("bulk", bulk_t, bulk_r),
+            ("sidecar cache", cache_t, cache_r),
+        ):
+            n_diff = sum(not same(a, b) for a, b in zip(line_r, r, strict=True))
+            print(
+                f"  {label:16s} {t:7.3f}s x{line_t / t:5.1f} "
+                f"{'same' if not n_diff else f'{n_diff} DIFFERENT'}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -73,7 +73,7 @@ async def hitsTable(path):
 
     print(minDive, maxDive)
     whichVars = ['latitude', 'longitude', 'depth']
-    data = ExtractTimeseries.extractVars(ncfilename, whichVars, minDive, maxDive)
+    data = await ExtractTimeseries.run_netcdf(ExtractTimeseries.extractVars, ncfilename, whichVars, minDive, maxDive)
     del(data['time'])
 
     fla = scipy.interpolate.interp1d(data['epoch'], data['latitude'], bounds_error=False, fill_value='extrapolate')
@@ -12,10 +12,81 @@ https://github.com/jessecusack/ocean_tools/blob/master/ocean_tools/sandwell.py
 MIT license
 """
 
+import functools
 import os
 import numpy as np
 import glob
 
+# Grid parameters.
+nlon = 21600         # Number of longitude points.
+nlat = 17280         # Number of latitude points.
+lat_min = -80.738    # Most southern extent of grid.
+lat_max = 80.738     # Most northern extent of grid.
+arcmin = 1./60.      # A single arcminute. (1/60 of a degree)
+dtype = '>i2'        # Data are big-endian (>) 2 byte signed integers.
+
+default_file_path = '/usr/local/basestation3/data/topo_17.1.img'
+
+# Open memory maps of grid files - file_path -> ((mtime, size), memmap)
+_grids = {}
+
+
+@functools.lru_cache(maxsize=1)
+def grid_axes():
+    """Longitude and colatitude (90 - latitude) of the grid columns and rows.
+
+    Returns
+    -------
+    all_lons : 1-D numpy.ndarray of floats
+        Longitude of each column, 0 to 360.
+    all_lats : 1-D numpy.ndarray of floats
+        90 - latitude of each row, monotonically increasing.
+
+    """
+    rad = np.pi/180.     # A single radian.
+
+    # Mercator projection transformations. (Ref: Wikipedia)
+    y = lambda phi: np.log(np.tan(np.pi/4. + phi/2.))
+    phi = lambda y: 2*np.arctan(np.exp(y)) - np.pi/2.
+
+    all_lons = np.arange(0., 360., arcmin)
+    all_lats = 90. - phi(np.linspace(y(lat_max*rad), y(lat_min*rad), nlat))/rad
+
+    all_lons.flags.writeable = False
+    all_lats.flags.writeable = False
+    return all_lons, all_lats
+
+
+def open_grid(file_path=None):
+    """Memory map of the Smith and Sandwell grid.
+
+    The map is opened once per file and shared between calls, so repeated
+    reads only touch the pages they need (and the OS keeps those cached)
+    rather than seeking and reading strips from the file each time.
+
+    Parameters
+    ----------
+    file_path : string, optional
+        Path to the Smith and Sandwell data file.
+
+    Returns
+    -------
+    grid : 2-D numpy.memmap of big-endian 16 bit integers.
+        Bathymetry values, indexed [row, column] to match grid_axes().
+
+    """
+    if file_path is None:
+        file_path = default_file_path
+
+    st = os.stat(file_path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    if file_path in _grids and _grids[file_path][0] == stamp:
+        return _grids[file_path][1]
+
+    grid = np.memmap(file_path, dtype=dtype, mode='r', shape=(nlat, nlon))
+    _grids[file_path] = (stamp, grid)
+    return grid
+
 
 def read_grid(lon_lat, file_path=None):
     """Read in Smith and Sandwell bathymetry data.
@@ -57,15 +128,6 @@ def read_grid(lon_lat, file_path=None):
 
     """
 
-    # Important parameters.
-    nlon = 21600         # Number of longitude points.
-    nlat = 17280         # Number of latitude points.
-    lat_min = -80.738    # Most southern extent of grid.
-    lat_max = 80.738     # Most northern extent of grid.
-    arcmin = 1./60.      # A single arcminute. (1/60 of a degree)
-    rad = np.pi/180.     # A single radian.
-    bytes_per_val = 2    # Number of bytes for each datum in file.
-    dtype = '>i2'        # Data are big-endian (>) 2 byte signed integers.
     cross_0 = False      # Flag if grid crosses Greenwich meridian.
 
     west, east, south, north = lon_lat
@@ -91,43 +153,28 @@ def read_grid(lon_lat, file_path=None):
     if east < 0:
         east = east + 360.
 
-    # Mercator projection transformations. (Ref: Wikipedia)
-    y = lambda phi: np.log(np.tan(np.pi/4. + phi/2.))
-    phi = lambda y: 2*np.arctan(np.exp(y)) - np.pi/2.
-
-    all_lons = np.arange(0., 360., arcmin)
-    all_lats = 90. - phi(np.linspace(y(lat_max*rad), y(lat_min*rad), nlat))/rad
+    all_lons, all_lats = grid_axes()
 
     loni1, loni2 = all_lons.searchsorted([west, east]) + 1
     lati1, lati2 = all_lats.searchsorted([north, south]) + 1
-    Nlats = lati2 - lati1
     lats = all_lats[lati1:lati2]
 
     if east < west:
         cross_0 = True
         lons = np.concatenate((all_lons[(loni1 - nlon):], all_lons[:loni2]))
     else:
-        Nlons = loni2 - loni1
         lons = all_lons[loni1:loni2]
 
     lat_grid, lon_grid = np.meshgrid(lats, lons)
     bathy_grid = np.ndarray(lat_grid.shape, dtype='i2')
 
-    if file_path is None:
-        file_path = '/usr/local/basestation3/data/topo_17.1.img';
-
-    with open(file_path, 'rb') as f:
-        for i in range(Nlats):
-            if cross_0:
-                f.seek(bytes_per_val*((lati1 + i)*nlon + loni1))
-                N = nlon - loni1
-                bathy_grid[:N, i] = np.fromfile(f, dtype=dtype, count=N)
-
-                f.seek(bytes_per_val*(lati1 + i)*nlon)
-                bathy_grid[N:, i] = np.fromfile(f, dtype=dtype, count=loni2)
-            else:
-                f.seek(bytes_per_val*((lati1 + i)*nlon + loni1))
-                bathy_grid[:, i] = np.fromfile(f, dtype=dtype, count=Nlons)
+    grid = open_grid(file_path)
+    if cross_0:
+        N = nlon - loni1
+        bathy_grid[:N, :] = grid[lati1:lati2, loni1:].T
+        bathy_grid[N:, :] = grid[lati1:lati2, :loni2].T
+    else:
+        bathy_grid[:, :] = grid[lati1:lati2, loni1:loni2].T
 
     lat_grid = 90 - lat_grid
     lon_grid[lon_grid > 180.] = lon_grid[lon_grid > 180.] - 360.
@@ -140,6 +187,66 @@ def read_grid(lon_lat, file_path=None):
 
     return lon_grid, lat_grid, bathy_grid
 
+def lookup_points(lon, lat, file_path=None):
+    """Bathymetry at a batch of points, interpolated from the grid.
+
+    Parameters
+    ----------
+    lon : array_like
+        Longitudes of the points, -180 to 360.
+    lat : array_like
+        Latitudes of the points, same shape as lon.
+    file_path : string, optional
+        Path to the Smith and Sandwell data file.
+
+    Returns
+    -------
+    bathy : numpy.ndarray of floats
+        Bathymetry values, bilinearly interpolated between the four
+        surrounding grid points.
+
+    Raises
+    ------
+    ValueError
+        If any latitude is not in the range -80.738 to +80.738.
+
+    Notes
+    -----
+    Only the grid points around each point are read, so this is much cheaper
+    than read_grid for scattered points.  Points either side of the
+    Greenwich meridian interpolate across it.
+
+    """
+    lon = np.asarray(lon, dtype=np.float64)
+    lat = np.asarray(lat, dtype=np.float64)
+
+    if np.any((lat < lat_min) | (lat > lat_max)):
+        raise ValueError(
+            'Latitude out of bounds ({} to {}).'.format(lat_min, lat_max)
+            )
+
+    _, all_lats = grid_axes()
+    grid = open_grid(file_path)
+
+    col = np.mod(lon, 360.)/arcmin
+    col0 = np.floor(col)
+    fx = col - col0
+    col0 = col0.astype(np.int64) % nlon
+    col1 = (col0 + 1) % nlon
+
+    row = np.interp(90. - lat, all_lats, np.arange(nlat, dtype=np.float64))
+    row0 = np.minimum(np.floor(row).astype(np.int64), nlat - 2)
+    fy = row - row0
+    row1 = row0 + 1
+
+    f00 = grid[row0, col0].astype(np.float64)
+    f01 = grid[row0, col1].astype(np.float64)
+    f10 = grid[row1, col0].astype(np.float64)
+    f11 = grid[row1, col1].astype(np.float64)
+
+    return ((f00*(1. - fx) + f01*fx)*(1. - fy) +
+            (f10*(1. - fx) + f11*fx)*fy)
+
 def bilinear_interpolation(xa, ya, fg, x, y):
     """Because, bizarrely, this doesn't exist in numpy.
 
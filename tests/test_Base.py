@@ -29,6 +29,8 @@
 
 import pathlib
 
+import netCDF4
+import numpy as np
 import pytest
 import testutils
 
@@ -114,3 +116,39 @@ def test_conversion(caplog, test_data_dir, cmd_line, allowed_msgs):
     testutils.run_mission(
         data_dir, mission_dir, Base.main, cmd_line, caplog, allowed_msgs
     )
+
+
+def test_logger_jobs(caplog, tmp_path):
+    """--logger_jobs 2 processes the same files and writes the same netCDF files as a serial run"""
+    data_dir = pathlib.Path("testdata/sg179_Guam_Oct19")
+    allowed_msgs = test_cases[1][3]
+
+    processed = {}
+    for run, args in (("serial", ""), ("jobs", "--logger_jobs 2")):
+        mission_dir = tmp_path.joinpath(run)
+        cmd_line = f"--verbose --local --plot_types none --skip_flight_model {args} --mission_dir {mission_dir} --config {mission_dir}/sg179.conf".split()
+        testutils.run_mission(
+            data_dir, mission_dir, Base.main, cmd_line, caplog, allowed_msgs
+        )
+        processed[run] = [
+            [pathlib.Path(f).relative_to(mission_dir) for f in file_list]
+            for file_list in Base._processed_file_lists()
+        ]
+    assert "with 2 jobs" in caplog.text
+    assert processed["serial"] == processed["jobs"]
+
+    nc_files = sorted(p.name for p in tmp_path.joinpath("serial").glob("p*.nc"))
+    assert nc_files
+    assert nc_files == sorted(p.name for p in tmp_path.joinpath("jobs").glob("p*.nc"))
+    for nc_file in nc_files:
+        with (
+            netCDF4.Dataset(tmp_path.joinpath("serial", nc_file)) as serial_nc,
+            netCDF4.Dataset(tmp_path.joinpath("jobs", nc_file)) as jobs_nc,
+        ):
+            assert serial_nc.variables.keys() == jobs_nc.variables.keys()
+            for var in serial_nc.variables:
+                np.testing.assert_array_equal(
+                    np.ma.filled(serial_nc.variables[var][:]),
+                    np.ma.filled(jobs_nc.variables[var][:]),
+                    err_msg=f"{nc_file}:{var}",
+                )
@@ -0,0 +1,109 @@
+# -*- python-fmt -*-
+
+## Copyright (c) 2026  University of Washington.
+##
+## Redistribution and use in source and binary forms, with or without
+## modification, are permitted provided that the following conditions are met:
+##
+## 1. Redistributions of source code must retain the above copyright notice, this
+##    list of conditions and the following disclaimer.
+##
+## 2. Redistributions in binary form must reproduce the above copyright notice,
+##    this list of conditions and the following disclaimer in the documentation
+##    and/or other materials provided with the distribution.
+##
+## 3. Neither the name of the University of Washington nor the names of its
+##    contributors may be used to endorse or promote products derived from this
+##    software without specific prior written permission.
+##
+## THIS SOFTWARE IS PROVIDED BY THE UNIVERSITY OF WASHINGTON AND CONTRIBUTORS “AS
+## IS” AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+## IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+## DISCLAIMED. IN NO EVENT SHALL THE UNIVERSITY OF WASHINGTON OR CONTRIBUTORS BE
+## LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+## CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE
+## GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+## HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+## LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT
+## OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import math
+import sqlite3
+
+import pandas as pd
+import pytest
+
+import BaseDB
+
+
+def test_write_dive_row():
+    con = sqlite3.connect(":memory:")
+    cur = con.cursor()
+    cur.execute("CREATE TABLE dives(dive INT, max_depth FLOAT);")
+
+    row = {}
+    BaseDB.setColumn(row, "max_depth", 990.5, "FLOAT")
+    BaseDB.setColumn(row, "error_count", 3, "INTEGER")
+    BaseDB.setColumn(row, "target_name", "it's", "TEXT")
+    BaseDB.setColumn(row, "pitch_dive", math.nan, "FLOAT")
+    # Column names are case insensitive - last value wins
+    BaseDB.setColumn(row, "MAX_DEPTH", 1000.0, "FLOAT")
+    BaseDB.writeDiveRow(4, cur, row)
+    # Rewriting a dive replaces the row
+    BaseDB.writeDiveRow(4, cur, row)
+
+    cur.execute("SELECT dive,max_depth,error_count,target_name,pitch_dive FROM dives;")
+    assert cur.fetchall() == [(4, 1000.0, 3, "it's", None)]
+    assert BaseDB.rowValue(row, "max_depth") == 1000.0
+    with pytest.raises(ValueError):
+        BaseDB.rowValue(row, "pitch_dive")
+    with pytest.raises(KeyError):
+        BaseDB.rowValue(row, "log_D_TGT")
+
+
+def test_fetch_dive_columns():
+    con = sqlite3.connect(":memory:")
+    cur = con.cursor()
+    cur.execute("CREATE TABLE dives(dive INT, max_depth FLOAT, log_HUMID FLOAT);")
+    BaseDB.createDiveIndexes(cur)
+    assert cur.execute(
+        "SELECT name FROM sqlite_master WHERE type='index';"
+    ).fetchall() == [("dives_dive_idx",)]
+    # Out of order on purpose
+    cur.executemany(
+        "INSERT INTO dives VALUES(?,?,?);",
+        [(2, 200.0, 50.0), (1, 100.0, 40.0), (3, 300.0, None)],
+    )
+
+    with BaseDB.diveColumnCache(con) as cache:
+        df = BaseDB.fetchDiveColumns(con, ["max_depth", "log_HUMID"], dive=2)
+        assert df["dive"].to_list() == [1, 2]
+        assert df["max_depth"].to_list() == [100.0, 200.0]
+        assert sorted(cache["columns"]) == ["log_humid", "max_depth"]
+
+        # Served from the cache, and callers get their own copy
+        df["max_depth"] = 0.0
+        df = BaseDB.fetchDiveColumns(con, ["MAX_DEPTH"])
+        assert df["MAX_DEPTH"].to_list() == [100.0, 200.0, 300.0]
+
+        with pytest.raises(pd.errors.DatabaseError, match="no such column: log_TEMP"):
+            BaseDB.fetchDiveColumns(con, ["log_TEMP"])
+
+        # addValToDB only drops the column it wrote
+        BaseDB.addValToDB(None, 3, "log_HUMID", 60.0, con=con)
+        assert list(cache["columns"]) == ["max_depth"]
+        df = BaseDB.fetchDiveColumns(con, ["log_HUMID"])
+        assert df["log_HUMID"].to_list() == [40.0, 50.0, 60.0]
+
+        # Any other write empties it
+        cur.execute("UPDATE dives SET max_depth = 310.0 WHERE dive = 3;")
+        df = BaseDB.fetchDiveColumns(con, ["max_depth"])
+        assert df["max_depth"].to_list() == [100.0, 200.0, 310.0]
+        assert "log_temp_slope" not in BaseDB.diveColumnNames(con)
+        BaseDB.addValToDB(None, 3, "log_TEMP_slope", 0.5, con=con)
+        assert "log_TEMP_slope" in BaseDB.diveColumnNames(con)
+
+    assert id(con) not in BaseDB.dive_column_caches
+    # Without a cache, reads go straight to the table
+    df = BaseDB.fetchDiveColumns(con, ["log_TEMP_slope"])
+    assert df["log_TEMP_slope"].to_list()[-1] == 0.5
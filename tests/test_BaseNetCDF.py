@@ -0,0 +1,84 @@
+# -*- python-fmt -*-
+
+## Copyright (c) 2026  University of Washington.
+##
+## Redistribution and use in source and binary forms, with or without
+## modification, are permitted provided that the following conditions are met:
+##
+## 1. Redistributions of source code must retain the above copyright notice, this
+##    list of conditions and the following disclaimer.
+##
+## 2. Redistributions in binary form must reproduce the above copyright notice,
+##    this list of conditions and the following disclaimer in the documentation
+##    and/or other materials provided with the distribution.
+##
+## 3. Neither the name of the University of Washington nor the names of its
+##    contributors may be used to endorse or promote products derived from this
+##    software without specific prior written permission.
+##
+## THIS SOFTWARE IS PROVIDED BY THE UNIVERSITY OF WASHINGTON AND CONTRIBUTORS “AS
+## IS” AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+## IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+## DISCLAIMED. IN NO EVENT SHALL THE UNIVERSITY OF WASHINGTON OR CONTRIBUTORS BE
+## LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+## CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE
+## GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+## HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+## LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT
+## OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import types
+
+import netCDF4
+import numpy as np
+import pytest
+
+import BaseNetCDF
+
+
+@pytest.fixture(autouse=True)
+def restore_write_settings():
+    yield
+    BaseNetCDF.nc_write_settings = BaseNetCDF.nc_write_profiles["archive"]["dive"]
+
+
+@pytest.mark.parametrize("profile_name", list(BaseNetCDF.nc_write_profiles))
+def test_nc_write_profiles(tmp_path, profile_name):
+    opts = types.SimpleNamespace(nc_write_profile=profile_name)
+    for file_type in BaseNetCDF.nc_write_file_types:
+        BaseNetCDF.set_nc_write_profile(opts, file_type)
+        settings = BaseNetCDF.nc_write_profiles[profile_name][file_type]
+        with netCDF4.Dataset(tmp_path / f"{file_type}.nc", "w") as ds:
+            ds.createDimension("profile", 40)
+            ds.createDimension("depth", 500)
+            ds.createDimension("sg_data_point", 50000)
+            for name, dims in (
+                ("binned", ("profile", "depth")),
+                ("samples", ("sg_data_point",)),
+            ):
+                var = ds.createVariable(
+                    name, "d", dims, **BaseNetCDF.nc_var_write_kwargs(ds, dims)
+                )
+                var[:] = np.zeros(var.shape)
+                filters = var.filters()
+                assert filters["zlib"]
+                assert filters["complevel"] == settings["complevel"]
+                assert filters["shuffle"] == settings["shuffle"]
+                chunking = var.chunking()
+                if settings["chunking"] == "dive_range":
+                    assert chunking == (
+                        [BaseNetCDF.nc_chunk_profiles, 500]
+                        if len(dims) == 2
+                        else [BaseNetCDF.nc_chunk_dive_range_elements]
+                    )
+                elif settings["chunking"] == "whole":
+                    assert chunking == list(var.shape)
+
+
+def test_nc_write_profile_unknown():
+    BaseNetCDF.set_nc_write_profile(
+        types.SimpleNamespace(nc_write_profile="bogus"), "dive"
+    )
+    assert (
+        BaseNetCDF.nc_write_settings == BaseNetCDF.nc_write_profiles["archive"]["dive"]
+    )
@@ -0,0 +1,126 @@
+# -*- python-fmt -*-
+
+## Copyright (c) 2026  University of Washington.
+##
+## Redistribution and use in source and binary forms, with or without
+## modification, are permitted provided that the following conditions are met:
+##
+## 1. Redistributions of source code must retain the above copyright notice, this
+##    list of conditions and the following disclaimer.
+##
+## 2. Redistributions in binary form must reproduce the above copyright notice,
+##    this list of conditions and the following disclaimer in the documentation
+##    and/or other materials provided with the distribution.
+##
+## 3. Neither the name of the University of Washington nor the names of its
+##    contributors may be used to endorse or promote products derived from this
+##    software without specific prior written permission.
+##
+## THIS SOFTWARE IS PROVIDED BY THE UNIVERSITY OF WASHINGTON AND CONTRIBUTORS “AS
+## IS” AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+## IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+## DISCLAIMED. IN NO EVENT SHALL THE UNIVERSITY OF WASHINGTON OR CONTRIBUTORS BE
+## LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+## CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE
+## GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+## HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+## LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT
+## OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import time
+
+import BaseProfile
+
+
+def test_span_tree(tmp_path):
+    """Spans nest under the innermost open span and round trip through JSON"""
+    profiler = BaseProfile.start_profiler("test")
+    try:
+        with BaseProfile.span("stage_a", "stage"):
+            with BaseProfile.span("dive_1", "dive", dive=1):
+                time.sleep(0.02)
+            BaseProfile.add_span("p0001:plot", "plot", 0.5, 0.25)
+        # Left open - closed when the parent is stopped
+        outer = profiler.start("stage_b", "stage")
+        profiler.start("dive_2", "dive")
+        profiler.stop(outer)
+    finally:
+        assert BaseProfile.stop_profiler() is profiler
+
+    # Inactive profiler - spans are no-ops
+    with BaseProfile.span("ignored") as span_obj:
+        assert span_obj is None
+
+    file_name = tmp_path.joinpath("profiles", "run.json")
+    assert profiler.write(str(file_name))
+    with open(file_name) as fi:
+        profile_d = json.load(fi)
+
+    run = profile_d["run"]
+    assert [x["name"] for x in run["children"]] == ["stage_a", "stage_b"]
+    stage_a = run["children"][0]
+    assert [x["name"] for x in stage_a["children"]] == ["dive_1", "p0001:plot"]
+    assert stage_a["children"][0]["attrs"] == {"dive": 1}
+    assert stage_a["children"][0]["wall"] >= 0.02
+    assert stage_a["children"][1]["wall"] == 0.5
+    assert stage_a["wall"] >= stage_a["children"][0]["wall"]
+    assert run["children"][1]["children"][0]["wall"] is not None
+    for key in ("cpu", "cpu_children", "peak_rss_kb"):
+        assert run[key] is not None
+
+
+def test_cprofile_span(tmp_path):
+    """Spans matching a pattern are run under cProfile"""
+    profiler = BaseProfile.start_profiler("test", ["*.py"])
+    try:
+        with BaseProfile.span("ext.py", "extension"):
+            sum(range(1000))
+        with BaseProfile.span("other", "extension"):
+            pass
+    finally:
+        BaseProfile.stop_profiler()
+    file_name = tmp_path.joinpath("run.json")
+    assert profiler.write(str(file_name))
+    with open(file_name) as fi:
+        children = json.load(fi)["run"]["children"]
+    assert tmp_path.joinpath(children[0]["cprofile"]).exists()
+    assert "cprofile" not in children[1]
+
+
+def test_diff_profiles(tmp_path):
+    """Spans are matched by path, with repeated names kept apart"""
+
+    def record(walls):
+        return {
+            "version": BaseProfile.profile_record_version,
+            "run": {
+                "name": "Base.py",
+                "wall": sum(walls.values()),
+                "cpu": None,
+                "children": [
+                    {"name": name.split("#")[0], "wall": wall, "cpu": wall}
+                    for name, wall in walls.items()
+                ],
+            },
+        }
+
+    old_d = record({"a": 1.0, "a#1": 2.0, "b": 3.0})
+    new_d = record({"a": 1.0, "a#1": 5.0, "c": 0.5})
+    rows = BaseProfile.diff_profiles(old_d, new_d, min_delta=0.1)
+    # Largest change first, unchanged spans dropped
+    assert [row[0] for row in rows] == [
+        "Base.py/a#1",
+        "Base.py/b",
+        "Base.py",
+        "Base.py/c",
+    ]
+    assert rows[0][1:3] == (2.0, 5.0)
+    assert rows[1][2] is None
+    assert rows[3][1] is None
+
+    old_file = tmp_path.joinpath("old.json")
+    new_file = tmp_path.joinpath("new.json")
+    old_file.write_text(json.dumps(old_d))
+    new_file.write_text(json.dumps(new_d))
+    assert BaseProfile.main([str(old_file), str(new_file)]) == 0
@@ -0,0 +1,114 @@
+# -*- python-fmt -*-
+
+## Copyright (c) 2026  University of Washington.
+##
+## Redistribution and use in source and binary forms, with or without
+## modification, are permitted provided that the following conditions are met:
+##
+## 1. Redistributions of source code must retain the above copyright notice, this
+##    list of conditions and the following disclaimer.
+##
+## 2. Redistributions in binary form must reproduce the above copyright notice,
+##    this list of conditions and the following disclaimer in the documentation
+##    and/or other materials provided with the distribution.
+##
+## 3. Neither the name of the University of Washington nor the names of its
+##    contributors may be used to endorse or promote products derived from this
+##    software without specific prior written permission.
+##
+## THIS SOFTWARE IS PROVIDED BY THE UNIVERSITY OF WASHINGTON AND CONTRIBUTORS “AS
+## IS” AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+## IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+## DISCLAIMED. IN NO EVENT SHALL THE UNIVERSITY OF WASHINGTON OR CONTRIBUTORS BE
+## LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+## CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE
+## GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+## HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+## LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT
+## OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import pathlib
+import time
+
+import CommLog
+import Globals
+
+
+def session_summary(comm_log_result):
+    """Reduces a process_comm_log() result to comparable values"""
+    comm_log, start_pos, session, line_count, ret_val = comm_log_result
+    return (
+        [
+            (s.connect_ts, s.disconnect_ts, s.dive_num, s.calls_made, str(s.gps_fix))
+            for s in comm_log.sessions
+        ],
+        comm_log.raw_lines_with_ts,
+        comm_log.file_transfer_method,
+        sorted(comm_log.files_transfered),
+        start_pos,
+        None if session is None else (session.connect_ts, session.dive_num),
+        line_count,
+        ret_val,
+    )
+
+
+def test_comm_log_index(tmp_path):
+    """Tests the comm.log index is extended as the file grows and rebuilt when it shrinks"""
+    os.environ["TZ"] = "UTC"
+    time.tzset()
+    data = pathlib.Path("testdata/sg236_NANOOS_May23/comm.log").read_bytes()
+    comm_log_file_name = str(tmp_path.joinpath("comm.log"))
+    index_file_name = CommLog.comm_log_index_name(comm_log_file_name)
+
+    # Cuts land mid-line as well as on line boundaries
+    for cut in (len(data) // 7, len(data) // 3 + 11, len(data) // 2, len(data)):
+        pathlib.Path(comm_log_file_name).write_bytes(data[:cut])
+        indexed = CommLog.process_comm_log(comm_log_file_name, None)
+        assert os.path.exists(index_file_name)
+        os.rename(index_file_name, index_file_name + ".save")
+        full = CommLog.process_comm_log(comm_log_file_name, None)
+        os.replace(index_file_name + ".save", index_file_name)
+        assert session_summary(indexed) == session_summary(full)
+
+    # Truncated comm.log
+    pathlib.Path(comm_log_file_name).write_bytes(data[: len(data) // 4])
+    indexed = CommLog.process_comm_log(comm_log_file_name, None)
+    os.remove(index_file_name)
+    full = CommLog.process_comm_log(comm_log_file_name, None)
+    assert session_summary(indexed) == session_summary(full)
+
+
+def test_comm_log_index_shared(tmp_path, monkeypatch):
+    """Tests callers with different known_commlog_files lists resume from the same index"""
+    os.environ["TZ"] = "UTC"
+    time.tzset()
+    data = pathlib.Path("testdata/sg236_NANOOS_May23/comm.log").read_bytes()
+    comm_log_file_name = str(tmp_path.joinpath("comm.log"))
+
+    loads = []
+    load_comm_log_index = CommLog.load_comm_log_index
+
+    def recording_load(*args):
+        index = load_comm_log_index(*args)
+        loads.append(None if index is None else index[0])
+        return index
+
+    monkeypatch.setattr(CommLog, "load_comm_log_index", recording_load)
+
+    # Base.py passes Globals.known_files, most other callers the default list
+    known_lists = (Globals.known_files, None)
+    for cut in (len(data) // 2, len(data)):
+        pathlib.Path(comm_log_file_name).write_bytes(data[:cut])
+        for known_files in known_lists * 2:
+            indexed = CommLog.process_comm_log(
+                comm_log_file_name, None, known_commlog_files=known_files
+            )
+            assert session_summary(indexed)[-1] == 0
+
+    # Only the very first parse starts from scratch, and the second parse
+    # with each list resumes from where the other left off
+    assert loads[0] is None
+    assert all(pos is not None for pos in loads[1:])
+    assert loads[1] == loads[2] == loads[3] > 0
+    assert loads[5] == loads[6] == loads[7] > loads[4]
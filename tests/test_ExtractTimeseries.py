@@ -0,0 +1,129 @@
+# -*- python-fmt -*-
+
+## Copyright (c) 2026  University of Washington.
+##
+## Redistribution and use in source and binary forms, with or without
+## modification, are permitted provided that the following conditions are met:
+##
+## 1. Redistributions of source code must retain the above copyright notice, this
+##    list of conditions and the following disclaimer.
+##
+## 2. Redistributions in binary form must reproduce the above copyright notice,
+##    this list of conditions and the following disclaimer in the documentation
+##    and/or other materials provided with the distribution.
+##
+## 3. Neither the name of the University of Washington nor the names of its
+##    contributors may be used to endorse or promote products derived from this
+##    software without specific prior written permission.
+##
+## THIS SOFTWARE IS PROVIDED BY THE UNIVERSITY OF WASHINGTON AND CONTRIBUTORS “AS
+## IS” AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+## IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+## DISCLAIMED. IN NO EVENT SHALL THE UNIVERSITY OF WASHINGTON OR CONTRIBUTORS BE
+## LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+## CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE
+## GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+## HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+## LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT
+## OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import asyncio
+import os
+import threading
+
+import netCDF4
+import numpy as np
+import pytest
+
+import ExtractTimeseries
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(
+        ExtractTimeseries,
+        "_timeseries_cache",
+        type(ExtractTimeseries._timeseries_cache)(),
+    )
+
+
+def write_timeseries(ncfilename, n, value):
+    # As MakeMissionTimeSeries does, via Utils.open_netcdf_file
+    if os.path.exists(ncfilename):
+        os.remove(ncfilename)
+    with netCDF4.Dataset(ncfilename, "w") as ncf:
+        ncf.createDimension("sg_data_point", n)
+        ncf.createVariable("depth", "f8", ("sg_data_point",))[:] = np.full(n, value)
+
+
+def test_cached_timeseries(tmp_path, monkeypatch):
+    names = [str(tmp_path / f"ts{ii}.nc") for ii in range(3)]
+    for name in names:
+        write_timeseries(name, 100, 1.0)
+
+    # Unchanged file - the same entry, and the data is only read once
+    cached = ExtractTimeseries.cached_timeseries(names[0])
+    depth = cached.data("depth")
+    assert ExtractTimeseries.cached_timeseries(names[0]) is cached
+    assert cached.users == 2
+    cached.release()
+    assert cached.data("depth") is depth
+    assert np.shares_memory(cached.variables["depth"][:], depth)
+    assert cached.nbytes == depth.nbytes
+
+    # Rewritten file - reopened, and the old entry's data dropped but its file
+    # kept open until its last user is done
+    write_timeseries(names[0], 200, 2.0)
+    reopened = ExtractTimeseries.cached_timeseries(names[0])
+    assert reopened is not cached
+    assert cached.nbytes == 0
+    assert cached.nci.isopen()
+    assert cached.variables["depth"][:].tolist() == [1.0] * 100
+    assert cached.nbytes == 0
+    cached.release()
+    assert not cached.nci.isopen()
+    assert reopened.variables["depth"][:].tolist() == [2.0] * 200
+    reopened.release()
+    assert reopened.nci.isopen()
+
+    # Least recently used entries are evicted past timeseries_cache_max files...
+    monkeypatch.setattr(ExtractTimeseries, "timeseries_cache_max", 2)
+    first = ExtractTimeseries.cached_timeseries(names[1])
+    first.variables["depth"][:]
+    second = ExtractTimeseries.cached_timeseries(names[2])
+    assert list(ExtractTimeseries._timeseries_cache) == [names[1], names[2]]
+    assert reopened.nbytes == 0
+    assert not reopened.nci.isopen()
+    assert first.nbytes == 800
+
+    # ...and past timeseries_cache_max_bytes of data, keeping the one in use
+    monkeypatch.setattr(ExtractTimeseries, "timeseries_cache_max_bytes", 1000)
+    assert second.variables["depth"][:].tolist() == [1.0] * 100
+    assert list(ExtractTimeseries._timeseries_cache) == [names[2]]
+    assert first.nbytes == 0
+    assert first.nci.isopen()
+    assert second.nbytes == 800
+    first.release()
+    second.release()
+    assert not first.nci.isopen()
+    assert second.nci.isopen()
+
+    assert ExtractTimeseries.cached_timeseries(str(tmp_path / "missing.nc")) is None
+
+
+def test_run_netcdf(tmp_path):
+    ncfilename = str(tmp_path / "ts.nc")
+    write_timeseries(ncfilename, 10, 1.0)
+
+    async def run():
+        thread = await ExtractTimeseries.run_netcdf(threading.current_thread)
+        names = await ExtractTimeseries.run_netcdf(
+            ExtractTimeseries.getVarNames, ncfilename, cached=True
+        )
+        return (thread, names)
+
+    thread, names = asyncio.run(run())
+    assert thread.name.startswith("netcdf")
+    assert names == [{"var": "depth", "dim": "sg_data_point"}]
+    # The request's use of the cache entry ended with it
+    assert ExtractTimeseries._timeseries_cache[ncfilename].users == 0
@@ -0,0 +1,273 @@
+# -*- python-fmt -*-
+
+## Copyright (c) 2026  University of Washington.
+##
+## Redistribution and use in source and binary forms, with or without
+## modification, are permitted provided that the following conditions are met:
+##
+## 1. Redistributions of source code must retain the above copyright notice, this
+##    list of conditions and the following disclaimer.
+##
+## 2. Redistributions in binary form must reproduce the above copyright notice,
+##    this list of conditions and the following disclaimer in the documentation
+##    and/or other materials provided with the distribution.
+##
+## 3. Neither the name of the University of Washington nor the names of its
+##    contributors may be used to endorse or promote products derived from this
+##    software without specific prior written permission.
+##
+## THIS SOFTWARE IS PROVIDED BY THE UNIVERSITY OF WASHINGTON AND CONTRIBUTORS “AS
+## IS” AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+## IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+## DISCLAIMED. IN NO EVENT SHALL THE UNIVERSITY OF WASHINGTON OR CONTRIBUTORS BE
+## LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+## CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE
+## GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+## HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+## LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT
+## OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import pickle
+import types
+
+import numpy as np
+import pytest
+
+import FlightModel
+import HydroModel
+
+flight_consts = {
+    "hd_c": 5.7e-6,
+    "hd_s": -0.25,
+    "rho0": 1027.5,
+    "glider_length": 1.8,
+    "max_stall_speed": 20.0,
+    "min_stall_speed": 1.0,
+    "min_stall_angle": 10.0,
+    "mass": 52.0,
+    "mass_comp": 0,
+    "temp_ref": 15.0,
+    "therm_expan": 7.05e-5,
+}
+
+
+def synthetic_flight(n_pts, seed=0):
+    """Buoyancy and pitch roughly like a dive and climb, with a few bad points"""
+    rng = np.random.default_rng(seed)
+    buoyancy = np.concatenate(
+        (rng.normal(-150, 40, n_pts // 2), rng.normal(150, 40, n_pts - n_pts // 2))
+    )
+    pitch = np.sign(buoyancy) * rng.uniform(10, 35, n_pts)
+    pitch[rng.random(n_pts) < 0.05] *= -1
+    return buoyancy, pitch
+
+
+def test_hydro_model_grid():
+    buoyancy, pitch = synthetic_flight(1000)
+    hd_a_v, hd_b_v = (
+        x.ravel()
+        for x in np.meshgrid(
+            10 ** np.linspace(-3.5, -2.0, 7), 10 ** np.linspace(-2.2, -1.1, 5)
+        )
+    )
+    converged_v, speed, glide_angle, stalled = HydroModel.hydro_model_grid(
+        buoyancy, pitch, flight_consts, hd_a_v, hd_b_v
+    )
+    consts_d = dict(flight_consts)
+    for ii, (hd_a, hd_b) in enumerate(zip(hd_a_v, hd_b_v, strict=True)):
+        consts_d["hd_a"] = hd_a
+        consts_d["hd_b"] = hd_b
+        converged, speed_v, glide_angle_v, stalled_i_v = HydroModel.hydro_model(
+            buoyancy, pitch, consts_d
+        )
+        assert converged == converged_v[ii]
+        assert np.array_equal(np.nonzero(stalled[ii])[0], stalled_i_v)
+        if converged:
+            assert np.array_equal(speed[ii], speed_v)
+            assert np.array_equal(glide_angle[ii], glide_angle_v)
+
+
+@pytest.mark.parametrize("workers", (0, 2))
+def test_solve_ab_grid_batched(workers):
+    n_pts = 600
+    buoyancy, pitch = synthetic_flight(n_pts, seed=1)
+    consts_d = dict(flight_consts)
+    consts_d["hd_a"] = 0.0035
+    consts_d["hd_b"] = 0.011
+    _, speed, glide_angle, _ = HydroModel.hydro_model(buoyancy, pitch, consts_d)
+    rng = np.random.default_rng(2)
+    # Work back from buoyancy to a displaced volume at a constant density
+    density = np.full(n_pts, 1025.0)
+    combined_data_d = {
+        "w": speed * np.sin(glide_angle) + rng.normal(0, 0.5, n_pts),
+        "pressure": np.linspace(10, 500, n_pts),
+        "temperature": np.full(n_pts, 15.0),
+        "density_insitu": density,
+        "density": density,
+        "displaced_volume": (buoyancy / 1000.0 + consts_d["mass"]) / density * 1e6,
+        "pitch": pitch,
+        "n_velo": False,
+        "correct_aoa_velo": False,
+    }
+    abs_compress = np.zeros(n_pts)
+    base_opts = types.SimpleNamespace(fm_isopycnal=False)
+
+    FlightModel.flight_consts_d = consts_d
+    FlightModel.hd_a_grid = 10 ** np.linspace(-3.5, -2.0, 16)
+    FlightModel.hd_b_grid = 10 ** np.linspace(-2.2, -1.1, 9)
+    FlightModel.ab_grid_workers = workers
+    try:
+        W_loop, ia_loop, ib_loop = FlightModel.solve_ab_grid_loop(
+            base_opts, abs_compress, dict(combined_data_d)
+        )
+        W_batched, ia_batched, ib_batched = FlightModel.solve_ab_grid_batched(
+            base_opts, abs_compress, dict(combined_data_d)
+        )
+        assert W_loop[ib_loop, ia_loop] < FlightModel.w_rms_func_bad
+        assert np.array_equal(W_loop, W_batched)
+        assert (ia_loop, ib_loop) == (ia_batched, ib_batched)
+
+        FlightModel.ab_grid_coarse_stride = 3
+        W_coarse, ia_coarse, ib_coarse = FlightModel.solve_ab_grid_batched(
+            base_opts, abs_compress, dict(combined_data_d)
+        )
+        assert (ia_loop, ib_loop) == (ia_coarse, ib_coarse)
+        assert W_coarse[ib_coarse, ia_coarse] == W_loop[ib_loop, ia_loop]
+        # Stalled coarse cells are not blended into the interpolated misfits
+        bad = FlightModel.w_rms_func_bad
+        assert np.count_nonzero(W_loop == bad)
+        assert W_coarse[W_coarse != bad].max() <= W_loop[W_loop != bad].max()
+
+        # Seeded from a prior minimum, near or far
+        for prior_ia_ib in ((ia_loop, ib_loop), (0, 0)):
+            W_prior, ia_prior, ib_prior = FlightModel.solve_ab_grid_batched(
+                base_opts, abs_compress, dict(combined_data_d), prior_ia_ib
+            )
+            assert (ia_loop, ib_loop) == (ia_prior, ib_prior)
+            window = np.s_[
+                max(prior_ia_ib[1] - 3, 0) : prior_ia_ib[1] + 4,
+                max(prior_ia_ib[0] - 3, 0) : prior_ia_ib[0] + 4,
+            ]
+            assert np.array_equal(W_prior[window], W_loop[window])
+    finally:
+        FlightModel.set_globals()
+
+
+def test_dive_data_cache(tmp_path):
+    FlightModel.flight_dive_data_d = {"volmax": 50000.0}
+    cache = FlightModel.DiveDataCache(max_bytes=3 * 100 * 8)
+    nc_files = []
+    for dive_num in range(1, 5):
+        nc_file = tmp_path.joinpath(f"p000{dive_num:04d}.nc")
+        nc_file.write_bytes(b"x" * dive_num)
+        nc_files.append(nc_file)
+        key = cache.key("flight", dive_num, nc_file)
+        dd = FlightModel.flight_data(dive_num)
+        dd.n_valid = 100
+        cache.store(
+            key,
+            dd,
+            {"w": np.zeros(50), "displaced_volume": np.zeros(50)},
+            -400.0,
+            np.full(50, -200.0),
+            ("n_valid",),
+        )
+    # 4 entries at 100 floats each into a 300 float cache
+    assert cache.evictions == 1
+    dd = FlightModel.flight_data(1)
+    assert cache.fetch(cache.key("flight", 1, nc_files[0]), dd) is None
+
+    dd = FlightModel.flight_data(2)
+    data_d = cache.fetch(cache.key("flight", 2, nc_files[1]), dd)
+    assert dd.n_valid == 100
+    assert np.all(data_d["displaced_volume"] == 50000.0 - 400.0 - 200.0)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # A reprocessed (rewritten) nc file is a different key
+    nc_files[1].write_bytes(b"xxxxxxxx")
+    assert cache.fetch(cache.key("flight", 2, nc_files[1]), dd) is None
+    FlightModel.set_globals()
+
+
+def test_flight_db(tmp_path):
+    db_file = tmp_path.joinpath("flight.db")
+    fdd = FlightModel.flight_database()
+    fdd.update(
+        {
+            "fm_version": FlightModel.fm_version,
+            "glider": 171,
+            "history": "first\n",
+            "ab_grid_cache": {1: ("a", 1)},
+            "restart_cache": {},
+        }
+    )
+    for dive_num in (1, 2, 3):
+        fdd[dive_num] = FlightModel.flight_data(dive_num)
+    FlightModel.write_flight_db(db_file, fdd)
+
+    # Only changed rows are rewritten
+    fdd[2].hd_a = 0.005
+    fdd["ab_grid_cache"][2] = ("b", 2)
+    del fdd["ab_grid_cache"][1]
+    del fdd[3]
+    fdd["history"] += "second\n"
+    assert fdd.dives.changed == {3}
+    assert FlightModel.flight_data.changed_dives == {2}
+    FlightModel.write_flight_db(db_file, fdd)
+    assert not fdd.dives.changed and not FlightModel.flight_data.changed_dives
+
+    # Rows are read as they are used
+    rfdd = FlightModel.read_flight_db(db_file)
+    assert rfdd["glider"] == 171
+    assert rfdd["history"] == "first\nsecond\n"
+    assert not rfdd.dives.loaded
+    assert sorted(k for k in rfdd if isinstance(k, int)) == [1, 2]
+    assert 2 in rfdd and 3 not in rfdd
+    assert rfdd[2].hd_a == 0.005
+    assert rfdd.dives.unloaded == {1}
+    assert dict(rfdd["ab_grid_cache"]) == {2: ("b", 2)}
+
+    # ...and saving a change leaves the others unread
+    rfdd[2].hd_b = 0.01
+    FlightModel.write_flight_db(db_file, rfdd)
+    assert rfdd.dives.unloaded == {1}
+    rfdd = FlightModel.read_flight_db(db_file)
+    assert (rfdd[1].hd_b, rfdd[2].hd_b) == (0, 0.01)
+
+    # Pickled (checkpoints), the database is a plain dict
+    pfdd = pickle.loads(pickle.dumps(rfdd))
+    assert type(pfdd) is dict and type(pfdd["ab_grid_cache"]) is dict
+    assert sorted(k for k in pfdd if isinstance(k, int)) == [1, 2]
+
+
+def test_flight_db_migration(tmp_path):
+    flight_dir = tmp_path.joinpath("flight")
+    flight_dir.mkdir()
+    fdd = {
+        "fm_version": FlightModel.fm_version,
+        "last_updated": 0,
+        "glider": 171,
+        "mission_title": "test",
+        "history": "",
+        "hd_s_scale": 1.0,
+        "ab_grid_cache": {},
+        "restart_cache": {},
+        3: FlightModel.flight_data(3),
+    }
+    with open(flight_dir.joinpath("flight.pkl"), "wb") as fh:
+        pickle.dump(fdd, fh)
+    base_opts = types.SimpleNamespace(mission_dir=str(tmp_path))
+    FlightModel.flight_dive_data_d = None
+    try:
+        FlightModel.load_flight_database(base_opts, {}, verify=False)
+        assert FlightModel.flight_dive_data_d[3].dive_num == 3
+        FlightModel.write_flight_db(
+            FlightModel.flight_dive_data_filename, FlightModel.flight_dive_data_d
+        )
+        rfdd = FlightModel.read_flight_db(flight_dir.joinpath("flight.db"))
+        assert rfdd[3].dive_num == 3
+        assert rfdd["mission_title"] == "test"
+    finally:
+        FlightModel.flight_dive_data_d = None
+        FlightModel.flight_dive_data_filename = None
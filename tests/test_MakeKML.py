@@ -0,0 +1,80 @@
+# -*- python-fmt -*-
+
+## Copyright (c) 2026  University of Washington.
+##
+## Redistribution and use in source and binary forms, with or without
+## modification, are permitted provided that the following conditions are met:
+##
+## 1. Redistributions of source code must retain the above copyright notice, this
+##    list of conditions and the following disclaimer.
+##
+## 2. Redistributions in binary form must reproduce the above copyright notice,
+##    this list of conditions and the following disclaimer in the documentation
+##    and/or other materials provided with the distribution.
+##
+## 3. Neither the name of the University of Washington nor the names of its
+##    contributors may be used to endorse or promote products derived from this
+##    software without specific prior written permission.
+##
+## THIS SOFTWARE IS PROVIDED BY THE UNIVERSITY OF WASHINGTON AND CONTRIBUTORS “AS
+## IS” AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+## IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+## DISCLAIMED. IN NO EVENT SHALL THE UNIVERSITY OF WASHINGTON OR CONTRIBUTORS BE
+## LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+## CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE
+## GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+## HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+## LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT
+## OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import os
+import shutil
+import time
+import zipfile
+
+import testutils
+
+import BaseOpts
+import MakeKML
+
+
+def test_kml_cache(tmp_path, caplog):
+    os.environ["TZ"] = "UTC"
+    time.tzset()
+    data_dir = "testdata/sg236_NANOOS_May23_netcdfs"
+    for f in os.listdir(data_dir):
+        if f.endswith(".nc") or f == "comm.log":
+            shutil.copy(os.path.join(data_dir, f), tmp_path)
+    shutil.copy("testdata/sg236_NANOOS_May23/sg_calib_constants.m", tmp_path)
+
+    def make_kml(*args):
+        base_opts = BaseOpts.BaseOptions(
+            "test",
+            cmdline_args=["--verbose", "--mission_dir", str(tmp_path), *args],
+            calling_module="MakeKML",
+        )
+        caplog.clear()
+        assert MakeKML.main(base_opts, None, None) == 0
+        with zipfile.ZipFile(tmp_path.joinpath("sg236.kmz")) as zf:
+            assert zf.namelist() == ["sg236.kml"]
+            return zf.read("sg236.kml")
+
+    kml_full = make_kml("--no-kml_cache")
+    assert not tmp_path.joinpath(".kml_fragments").exists()
+
+    def check_kml():
+        assert make_kml() == kml_full
+
+    testutils.run_cache_sequence(check_kml, tmp_path.joinpath("p2360003.nc"), 5, caplog)
+    assert not tmp_path.joinpath("sg236.kmz.tmp").exists()
+
+    # Uncompressed, the same kml is written out directly
+    assert not tmp_path.joinpath("sg236.kml").exists()
+    base_opts = BaseOpts.BaseOptions(
+        "test",
+        cmdline_args=["--mission_dir", str(tmp_path), "--no-compress_output"],
+        calling_module="MakeKML",
+    )
+    assert MakeKML.main(base_opts, None, None) == 0
+    assert tmp_path.joinpath("sg236.kml").read_bytes() == kml_full
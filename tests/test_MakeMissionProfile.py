@@ -30,10 +30,14 @@
 import pathlib
 
 import numpy as np
+import pytest
 import testutils
 import xarray as xr
 
+import BaseNetCDF
+import Globals
 import MakeMissionProfile
+from BaseLog import log_debug, log_error
 
 
 def test_mission_config(caplog):
@@ -46,6 +50,8 @@ def test_mission_config(caplog):
         str(mission_dir),
         "--whole_mission_config",
         str(mission_dir.joinpath("sg249_mission.yml")),
+        "--nc_write_profile",
+        "balanced",
     ]
 
     testutils.run_mission(
@@ -56,9 +62,15 @@ def test_mission_config(caplog):
         caplog,
         allowed_msgs,
     )
+    # Later per-dive file writers are not left with the mission profile settings
+    assert (
+        BaseNetCDF.nc_write_settings == BaseNetCDF.nc_write_profiles["balanced"]["dive"]
+    )
 
     # Check for variables
-    dsi = xr.load_dataset(mission_dir.joinpath("sg249_NANOOS_Apr-2024_1.0m_up_and_down_profile.nc"))
+    dsi = xr.load_dataset(
+        mission_dir.joinpath("sg249_NANOOS_Apr-2024_1.0m_up_and_down_profile.nc")
+    )
 
     var_dict = {
         "wlbb2fl_sig470nm": np.dtype("float64"),
@@ -73,3 +85,303 @@ def test_mission_config(caplog):
         assert dsi.variables[v].dtype == t
 
     assert "wlbb2fl_sig695nm" not in dsi.variables
+
+
+def test_mission_profile_cache(caplog):
+    data_dir = pathlib.Path("testdata/sg249_NANOOS_Apr24")
+    mission_dir = data_dir.joinpath("mission_dir")
+    allowed_msgs = [""]
+    cmd_line = [
+        "--verbose",
+        "--mission_dir",
+        str(mission_dir),
+        "--whole_mission_config",
+        str(mission_dir.joinpath("sg249_mission.yml")),
+    ]
+    profile_name = mission_dir.joinpath(
+        "sg249_NANOOS_Apr-2024_1.0m_up_and_down_profile.nc"
+    )
+    cache_name = mission_dir.joinpath(".mission_profile_1.0m_up_and_down.pkl")
+
+    testutils.run_mission(
+        data_dir,
+        mission_dir,
+        MakeMissionProfile.main,
+        [*cmd_line, "--no-mission_profile_cache"],
+        caplog,
+        allowed_msgs,
+    )
+    assert not cache_name.exists()
+    dsi_full = xr.load_dataset(profile_name)
+
+    for attr in ("uuid", "history", "date_created", "date_modified"):
+        dsi_full.attrs.pop(attr, None)
+
+    def check_profile():
+        assert MakeMissionProfile.main(cmd_line) == 0
+        dsi = xr.load_dataset(profile_name)
+        for attr in ("uuid", "history", "date_created", "date_modified"):
+            dsi.attrs.pop(attr, None)
+        assert dsi.identical(dsi_full)
+
+    testutils.run_cache_sequence(
+        check_profile, mission_dir.joinpath("p2490012.nc"), 6, caplog
+    )
+
+
+# fmt: off
+def bin_data_reference(bin_width, which_half, include_empty_bins, depth_m_v, inp_data_columns):
+    """bin_data() as it was before being vectorized"""
+
+    if not include_empty_bins and which_half == Globals.WhichHalf.combine:
+        log_error("Combined profiles and stripping empty bins not currently supported")
+        return None
+
+    try:
+        num_data_cols = len(inp_data_columns)
+        if len(np.nonzero(np.isnan(depth_m_v))[0]):
+            depth_filter_i = np.logical_not(np.isnan(depth_m_v))
+            depth_m_v = depth_m_v[depth_filter_i].copy()
+            data_columns = []
+            for d in range(num_data_cols):
+                data_columns.append(inp_data_columns[d][depth_filter_i])
+        else:
+            data_columns = inp_data_columns
+    except Exception:
+        log_error("Unexpected error in bin_data", "exc")
+        return [None, None, None]
+
+    max_depth_sample_index = 0
+    max_depth = 0.0
+    num_rows = len(depth_m_v)
+    for i in range(num_rows):
+        if depth_m_v[i] > max_depth:
+            max_depth = depth_m_v[i]
+            max_depth_sample_index = i
+
+    bin_index = np.zeros(num_rows, np.int32)
+
+    try:
+        for i in range(num_rows):
+            bin_index[i] = int(round((depth_m_v[i] + bin_width / 2.0) / bin_width)) - 1
+    except Exception:
+        log_error("Unexpected error in bin_data", "exc")
+        return [None, None, None]
+
+    for i in range(max_depth_sample_index, num_rows):
+        if bin_index[i] == bin_index[max_depth_sample_index]:
+            max_depth_sample_index = i
+        if bin_index[i] < bin_index[max_depth_sample_index]:
+            break
+
+    log_debug(
+        "bin_index[max_depth_sample_index] = %d" % bin_index[max_depth_sample_index]
+    )
+    if which_half == Globals.WhichHalf.combine:
+        obs_bin = np.zeros(bin_index[max_depth_sample_index] + 1, np.float64)
+        obs_bin[:] = BaseNetCDF.nc_nan
+        data_cols_bin = []
+        for _ in data_columns:
+            data_cols_bin.append(
+                np.zeros(bin_index[max_depth_sample_index] + 1, np.float64)
+            )
+        depth_bin = np.zeros(bin_index[max_depth_sample_index] + 1, np.float64)
+
+        for j in range(bin_index[max_depth_sample_index] + 1):
+            obs_bin_tuple = np.where(bin_index == j)
+            num_obs_bin = len(obs_bin_tuple[0])
+            if num_obs_bin:
+                depth_bin[j] = float((j + 1) * bin_width)
+                for d in range(num_data_cols):
+                    temp_data_col = data_columns[d][obs_bin_tuple]
+                    try:
+                        data_cols_bin[d][j] = np.average(
+                            temp_data_col[np.where(np.isfinite(temp_data_col))]
+                        )
+                    except (ZeroDivisionError, FloatingPointError):
+                        data_cols_bin[d][j] = BaseNetCDF.nc_nan
+
+        return (obs_bin, depth_bin, data_cols_bin)
+
+    else:
+        if which_half in (Globals.WhichHalf.down, Globals.WhichHalf.both):
+            obs_down_bin = np.zeros(bin_index[max_depth_sample_index] + 1, np.float64)
+            log_debug("Number down bins %d" % len(obs_down_bin))
+            data_cols_down_bin = []
+            for _ in data_columns:
+                data_cols_down_bin.append(
+                    np.zeros(bin_index[max_depth_sample_index] + 1, np.float64)
+                )
+            depth_down_bin = np.zeros(bin_index[max_depth_sample_index] + 1, np.float64)
+
+            bin_down_index = np.zeros(num_rows)
+            bin_down_index[:] = -1
+            bin_down_index[: max_depth_sample_index + 1] = bin_index[
+                : max_depth_sample_index + 1
+            ]
+
+            for j in range(bin_index[max_depth_sample_index] + 1):
+                obs_bin_tuple = np.where(bin_down_index == j)
+                num_obs_bin = len(obs_bin_tuple[0])
+                obs_down_bin[j] = num_obs_bin
+                depth_down_bin[j] = float((j + 1) * bin_width)
+                if num_obs_bin:
+                    for d in range(num_data_cols):
+                        temp_data_col = data_columns[d][obs_bin_tuple]
+                        temp_temp_data_col = temp_data_col[
+                            np.where(np.isfinite(temp_data_col))
+                        ]
+                        if temp_temp_data_col.size == 0:
+                            data_cols_down_bin[d][j] = BaseNetCDF.nc_nan
+                            continue
+                        try:
+                            data_cols_down_bin[d][j] = np.average(temp_temp_data_col)
+                        except (ZeroDivisionError, FloatingPointError):
+                            data_cols_down_bin[d][j] = BaseNetCDF.nc_nan
+
+
+        if which_half in (Globals.WhichHalf.up, Globals.WhichHalf.both):
+            obs_up_bin = np.zeros(bin_index[max_depth_sample_index], np.float64)
+            log_debug("Number up bins %d" % len(obs_up_bin))
+            data_cols_up_bin = []
+            for _ in data_columns:
+                data_cols_up_bin.append(
+                    np.zeros(bin_index[max_depth_sample_index], np.float64)
+                )
+            depth_up_bin = np.zeros(bin_index[max_depth_sample_index], np.float64)
+
+            bin_up_index = np.zeros(num_rows)
+            bin_up_index[:] = -1
+            bin_up_index[max_depth_sample_index + 1 : num_rows] = bin_index[
+                max_depth_sample_index + 1 : num_rows
+            ]
+
+            for j in range(bin_index[max_depth_sample_index]):
+                obs_bin_tuple = np.where(bin_up_index == j)
+                num_obs_bin = len(obs_bin_tuple[0])
+                obs_up_bin[j] = num_obs_bin
+                depth_up_bin[j] = float((j + 1) * bin_width)
+                if num_obs_bin:
+                    for d in range(num_data_cols):
+                        temp_data_col = data_columns[d][obs_bin_tuple]
+                        temp_temp_data_col = temp_data_col[
+                            np.where(np.isfinite(temp_data_col))
+                        ]
+                        if temp_temp_data_col.size == 0:
+                            data_cols_up_bin[d][j] = BaseNetCDF.nc_nan
+                            continue
+                        try:
+                            data_cols_up_bin[d][j] = np.average(temp_temp_data_col)
+                        except (ZeroDivisionError, FloatingPointError):
+                            data_cols_up_bin[d][j] = BaseNetCDF.nc_nan
+
+
+        total_bins = 0
+        if which_half in (Globals.WhichHalf.down, Globals.WhichHalf.both):
+            if include_empty_bins:
+                total_bins += len(depth_down_bin)
+            else:
+                for i in range(len(depth_down_bin)):
+                    if obs_down_bin[i] > 0:
+                        total_bins += 1
+
+        if which_half in (Globals.WhichHalf.up, Globals.WhichHalf.both):
+            if include_empty_bins:
+                total_bins += len(depth_up_bin)
+            else:
+                for i in range(len(depth_up_bin)):
+                    if obs_up_bin[i] > 0:
+                        total_bins += 1
+
+        log_debug("Total bins = %d" % total_bins)
+
+        obs_bin = np.zeros(total_bins, np.float64)
+        obs_bin[:] = BaseNetCDF.nc_nan
+        depth_bin = np.zeros(total_bins, np.float64)
+        depth_bin[:] = BaseNetCDF.nc_nan
+        data_cols_bin = []
+        for _ in range(num_data_cols):
+            temp = np.zeros(total_bins, np.float64)
+            temp[:] = BaseNetCDF.nc_nan
+            data_cols_bin.append(temp)
+
+        current_bin = 0
+        if which_half in (Globals.WhichHalf.down, Globals.WhichHalf.both):
+            for i in range(len(depth_down_bin)):
+                if obs_down_bin[i] > 0:
+                    obs_bin[current_bin] = obs_down_bin[i]
+                    for d in range(num_data_cols):
+                        data_cols_bin[d][current_bin] = data_cols_down_bin[d][i]
+                if obs_down_bin[i] > 0 or include_empty_bins:
+                    depth_bin[current_bin] = depth_down_bin[i]
+                    current_bin += 1
+
+        if which_half in (Globals.WhichHalf.up, Globals.WhichHalf.both):
+            for i in range(-1, -len(depth_up_bin) - 1, -1):
+                if obs_up_bin[i] > 0:
+                    obs_bin[current_bin] = obs_up_bin[i]
+                    for d in range(num_data_cols):
+                        data_cols_bin[d][current_bin] = data_cols_up_bin[d][i]
+                if obs_up_bin[i] > 0 or include_empty_bins:
+                    depth_bin[current_bin] = depth_up_bin[i]
+                    current_bin += 1
+
+        return [obs_bin, depth_bin, data_cols_bin]
+# fmt: on
+
+
+def make_profile(num_rows, max_depth, seed):
+    """Synthetic dive and climb with noise, NaNs and Infs in depth and data"""
+    rng = np.random.default_rng(seed)
+    half = num_rows // 2
+    depth_m_v = np.concatenate(
+        (np.linspace(0, max_depth, half), np.linspace(max_depth, 0, num_rows - half))
+    ) + rng.normal(0, 1.0, num_rows)
+    depth_m_v[rng.integers(0, num_rows, 3)] = np.nan
+    data_columns = [rng.normal(size=num_rows) * 10 for _ in range(4)]
+    data_columns[1][rng.random(num_rows) < 0.3] = np.nan
+    data_columns[2][rng.random(num_rows) < 0.05] = np.inf
+    data_columns[3][:] = np.nan
+    data_columns.append(rng.normal(size=num_rows).astype(np.float32))
+    return depth_m_v, data_columns
+
+
+def assert_identical(a, b):
+    if isinstance(a, np.ndarray):
+        assert isinstance(b, np.ndarray)
+        assert a.dtype == b.dtype
+        assert a.shape == b.shape
+        assert a.tobytes() == b.tobytes()
+    elif isinstance(a, list | tuple):
+        assert type(a) is type(b)
+        assert len(a) == len(b)
+        for x, y in zip(a, b, strict=True):
+            assert_identical(x, y)
+    else:
+        assert a == b
+
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+@pytest.mark.parametrize("include_empty_bins", (True, False))
+@pytest.mark.parametrize(
+    "which_half",
+    (
+        Globals.WhichHalf.down,
+        Globals.WhichHalf.up,
+        Globals.WhichHalf.both,
+        Globals.WhichHalf.combine,
+    ),
+)
+@pytest.mark.parametrize(
+    "bin_width,num_rows,max_depth",
+    ((1.0, 3000, 500.0), (5.0, 2000, 990.0), (2.0, 200, 40.0), (0.5, 50, 1.0)),
+)
+def test_bin_data(bin_width, num_rows, max_depth, which_half, include_empty_bins):
+    depth_m_v, data_columns = make_profile(num_rows, max_depth, num_rows)
+    ref = bin_data_reference(
+        bin_width, which_half, include_empty_bins, depth_m_v, data_columns
+    )
+    new = MakeMissionProfile.bin_data(
+        bin_width, which_half, include_empty_bins, depth_m_v, data_columns
+    )
+    assert_identical(ref, new)
@@ -73,3 +73,42 @@ def test_mission_config(caplog):
         assert dsi.variables[v].dtype == t
 
     assert "wlbb2fl_sig470nm" not in dsi.variables
+
+
+def test_mission_timeseries_cache(caplog):
+    data_dir = pathlib.Path("testdata/sg249_NANOOS_Apr24")
+    mission_dir = data_dir.joinpath("mission_dir")
+    allowed_msgs = [""]
+    cmd_line = [
+        "--verbose",
+        "--mission_dir",
+        str(mission_dir),
+        "--whole_mission_config",
+        str(mission_dir.joinpath("sg249_mission.yml")),
+    ]
+    timeseries_name = mission_dir.joinpath("sg249_NANOOS_Apr-2024_timeseries.nc")
+
+    testutils.run_mission(
+        data_dir,
+        mission_dir,
+        MakeMissionTimeSeries.main,
+        [*cmd_line, "--no-mission_timeseries_cache"],
+        caplog,
+        allowed_msgs,
+    )
+    assert not mission_dir.joinpath(".mission_timeseries").exists()
+    dsi_full = xr.load_dataset(timeseries_name)
+
+    for attr in ("uuid", "history", "date_created", "date_modified"):
+        dsi_full.attrs.pop(attr, None)
+
+    def check_timeseries():
+        assert MakeMissionTimeSeries.main(cmd_line) == 0
+        dsi = xr.load_dataset(timeseries_name)
+        for attr in ("uuid", "history", "date_created", "date_modified"):
+            dsi.attrs.pop(attr, None)
+        assert dsi.identical(dsi_full)
+
+    testutils.run_cache_sequence(
+        check_timeseries, mission_dir.joinpath("p2490012.nc"), 6, caplog
+    )
@@ -0,0 +1,84 @@
+# -*- python-fmt -*-
+
+## Copyright (c) 2026  University of Washington.
+##
+## Redistribution and use in source and binary forms, with or without
+## modification, are permitted provided that the following conditions are met:
+##
+## 1. Redistributions of source code must retain the above copyright notice, this
+##    list of conditions and the following disclaimer.
+##
+## 2. Redistributions in binary form must reproduce the above copyright notice,
+##    this list of conditions and the following disclaimer in the documentation
+##    and/or other materials provided with the distribution.
+##
+## 3. Neither the name of the University of Washington nor the names of its
+##    contributors may be used to endorse or promote products derived from this
+##    software without specific prior written permission.
+##
+## THIS SOFTWARE IS PROVIDED BY THE UNIVERSITY OF WASHINGTON AND CONTRIBUTORS “AS
+## IS” AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+## IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+## DISCLAIMED. IN NO EVENT SHALL THE UNIVERSITY OF WASHINGTON OR CONTRIBUTORS BE
+## LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+## CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE
+## GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+## HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+## LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT
+## OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import netCDF4
+import numpy as np
+import pytest
+
+import PlotUtils
+
+
+@pytest.fixture
+def dive_ncf(tmp_path):
+    ncf = netCDF4.Dataset(tmp_path / "p1790001.nc", "w")
+    ncf.dive_number = 1
+    ncf.createDimension("sg_data_point", 4)
+    depth = ncf.createVariable("depth", "f8", ("sg_data_point",))
+    depth[:] = [0.0, 10.0, 20.0, 5.0]
+    depth.units = "meters"
+    ncf.createVariable("log_C_PITCH", "f8", ())[:] = 2100.0
+    ncf.set_auto_mask(False)
+    yield ncf
+    ncf.close()
+
+
+def test_dive_data(dive_ncf):
+    dive_data = PlotUtils.DiveData(dive_ncf)
+
+    # Attributes, dimensions and membership come from the file
+    assert dive_data.dive_number == 1
+    assert dive_data.dimensions["sg_data_point"].size == 4
+    assert "depth" in dive_data.variables
+    assert "ctd_depth" not in dive_data.variables
+    with pytest.raises(KeyError):
+        dive_data.variables["ctd_depth"]
+    assert dive_data.variables["depth"].units == "meters"
+    assert len(dive_data.variables["depth"]) == 4
+
+    depth = dive_data.variables["depth"][:]
+    np.testing.assert_array_equal(depth, [0.0, 10.0, 20.0, 5.0])
+    # One read shared by all callers, each getting their own copy
+    depth[:] = np.nan
+    assert dive_data.variables["depth"] is dive_data["depth"]
+    np.testing.assert_array_equal(dive_data["depth"][:], [0.0, 10.0, 20.0, 5.0])
+    assert dive_data.variables["depth"][1:3].tolist() == [10.0, 20.0]
+
+    assert dive_data.variables["log_C_PITCH"].getValue() == 2100.0
+
+    calls = []
+
+    def max_depth(ncf):
+        calls.append(1)
+        return [np.max(ncf.variables["depth"][:])]
+
+    assert dive_data.memoize("max_depth", max_depth, dive_data) == [20.0]
+    result = dive_data.memoize("max_depth", max_depth, dive_data)
+    result.append(0.0)
+    assert dive_data.memoize("max_depth", max_depth, dive_data) == [20.0]
+    assert len(calls) == 1
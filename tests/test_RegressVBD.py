@@ -0,0 +1,74 @@
+# -*- python-fmt -*-
+
+## Copyright (c) 2026  University of Washington.
+##
+## Redistribution and use in source and binary forms, with or without
+## modification, are permitted provided that the following conditions are met:
+##
+## 1. Redistributions of source code must retain the above copyright notice, this
+##    list of conditions and the following disclaimer.
+##
+## 2. Redistributions in binary form must reproduce the above copyright notice,
+##    this list of conditions and the following disclaimer in the documentation
+##    and/or other materials provided with the distribution.
+##
+## 3. Neither the name of the University of Washington nor the names of its
+##    contributors may be used to endorse or promote products derived from this
+##    software without specific prior written permission.
+##
+## THIS SOFTWARE IS PROVIDED BY THE UNIVERSITY OF WASHINGTON AND CONTRIBUTORS “AS
+## IS” AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+## IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+## DISCLAIMED. IN NO EVENT SHALL THE UNIVERSITY OF WASHINGTON OR CONTRIBUTORS BE
+## LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+## CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE
+## GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+## HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+## LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT
+## OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import numpy as np
+
+import RegressVBD
+
+# Typical basestation hydrodynamic parameters
+hd_a = 0.003836
+hd_b = 0.010078
+hd_c = 9.85e-6
+rho0 = 1027.5
+
+
+def test_flight_model_w_array():
+    rng = np.random.default_rng(0)
+    n_pts = 2000
+    bu = np.concatenate(
+        (rng.normal(-150, 60, n_pts // 2), rng.normal(150, 60, n_pts - n_pts // 2))
+    )
+    pitch = np.sign(bu) * rng.uniform(0.5, 40, n_pts)
+    # Sign mismatches, neutral buoyancy, level pitch, missing data and stalls
+    pitch[rng.random(n_pts) < 0.05] *= -1
+    bu[:5] = 0
+    pitch[5:10] = 0
+    bu[10:15] = np.nan
+    pitch[15:20] = np.nan
+    bu[20:25] = 0.1
+    pitch[20:25] = 89.0
+
+    for hd in ((hd_a, hd_b, hd_c), (0.005, 0.02, 1e-4), (1e-3, 5e-3, 2e-3)):
+        w_array = RegressVBD.flightModelWArray(bu, pitch, 1.8, *hd, rho0, -0.25)
+        w_scalar = np.array(
+            [
+                RegressVBD.flightModelW(b, p, 1.8, *hd, rho0, -0.25)
+                for b, p in zip(bu, pitch, strict=True)
+            ],
+            dtype=np.float64,
+        )
+        np.testing.assert_allclose(w_array, w_scalar, rtol=1e-9, atol=1e-12)
+
+        W_model = np.array(bu)
+        for k, w in enumerate(w_scalar):
+            W_model[k] = 100 * w if w and np.isfinite(w) else 0
+        np.testing.assert_allclose(
+            RegressVBD.getModelW(bu, pitch, *hd, rho0), W_model, rtol=1e-9, atol=1e-10
+        )
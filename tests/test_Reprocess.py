@@ -126,3 +126,92 @@ def test_mission_extension(caplog, reprocess_mission_extensions, report_divencf)
             break
 
     assert f_found_msg == report_divencf
+
+
+def test_jobs(caplog):
+    """Tests that dives processed in a process pool are logged back in dive order"""
+    data_dir = pathlib.Path("testdata/sg171_EKAMSAT_Apr24")
+    mission_dir = data_dir.joinpath("mission_dir")
+
+    allowed_msgs = [""]
+    cmd_line = [
+        "--verbose",
+        "--mission_dir",
+        str(mission_dir),
+        "--skip_flight_model",
+        "--force",
+        "--jobs",
+        "2",
+        "100:102",
+    ]
+
+    testutils.run_mission(
+        data_dir,
+        mission_dir,
+        Reprocess.main,
+        cmd_line,
+        caplog,
+        allowed_msgs,
+    )
+    assert any(
+        "Processing 3 dives with 2 jobs" in record.getMessage()
+        for record in caplog.records
+    )
+    dive_nums = [
+        record.getMessage().split("=")[-1].strip()
+        for record in caplog.records
+        if "Dive number = " in record.getMessage()
+    ]
+    assert dive_nums == ["100", "101", "102"]
+    assert any(
+        "Dives processed = [100, 101, 102]" in record.getMessage()
+        for record in caplog.records
+    )
+
+
+def test_plot_jobs(caplog):
+    """Tests that plots rendered in a process pool are created and timed"""
+    data_dir = pathlib.Path("testdata/sg171_EKAMSAT_Apr24")
+    mission_dir = data_dir.joinpath("mission_dir")
+
+    allowed_msgs = [""]
+    cmd_line = [
+        "--verbose",
+        "--mission_dir",
+        str(mission_dir),
+        "--skip_flight_model",
+        "--skip_kml",
+        "--force",
+        "--reprocess_plots",
+        "--plot_jobs",
+        "2",
+        "--dive_plots",
+        "plot_pitch_roll",
+        "plot_TS",
+        "--mission_plots",
+        "mission_depthangle",
+        "--plot_directory",
+        str(mission_dir.joinpath("plots").absolute()),
+        "100",
+    ]
+
+    def create_plot_dir(mission_dir: pathlib.Path) -> None:
+        mission_dir.joinpath("plots").mkdir()
+
+    testutils.run_mission(
+        data_dir,
+        mission_dir,
+        Reprocess.main,
+        cmd_line,
+        caplog,
+        allowed_msgs,
+        pre_test_hook=create_plot_dir,
+    )
+    timed_plots = [
+        record.getMessage().split(":")[-1].split()[0]
+        for record in caplog.records
+        if record.getMessage().endswith("secs") and "took" in record.getMessage()
+    ]
+    for plot_name in ("plot_pitch_roll", "plot_TS", "mission_depthangle"):
+        assert plot_name in timed_plots
+    assert list(mission_dir.joinpath("plots").glob("dv0100_*"))
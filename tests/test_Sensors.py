@@ -0,0 +1,111 @@
+# -*- python-fmt -*-
+
+## Copyright (c) 2026  University of Washington.
+##
+## Redistribution and use in source and binary forms, with or without
+## modification, are permitted provided that the following conditions are met:
+##
+## 1. Redistributions of source code must retain the above copyright notice, this
+##    list of conditions and the following disclaimer.
+##
+## 2. Redistributions in binary form must reproduce the above copyright notice,
+##    this list of conditions and the following disclaimer in the documentation
+##    and/or other materials provided with the distribution.
+##
+## 3. Neither the name of the University of Washington nor the names of its
+##    contributors may be used to endorse or promote products derived from this
+##    software without specific prior written permission.
+##
+## THIS SOFTWARE IS PROVIDED BY THE UNIVERSITY OF WASHINGTON AND CONTRIBUTORS “AS
+## IS” AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+## IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+## DISCLAIMED. IN NO EVENT SHALL THE UNIVERSITY OF WASHINGTON OR CONTRIBUTORS BE
+## LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+## CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE
+## GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+## HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+## LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT
+## OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import types
+
+import pytest
+
+import BaseLog
+import Sensors
+
+ext = "/opt/basestation/Sensors/slow_ext.py"
+
+
+@pytest.fixture
+def sensors(tmp_path, monkeypatch):
+    """A SensorExtensions with one extension whose hooks each take 3 (fake) secs"""
+    clock = [0.0]
+
+    def hook(base_opts, key, *args):
+        clock[0] += 3.0
+        return 0
+
+    monkeypatch.setattr(Sensors.time, "perf_counter", lambda: clock[0])
+    monkeypatch.setattr(BaseLog.BaseLogger, "alerts_d", {})
+    base_opts = types.SimpleNamespace(
+        basestation_directory=str(tmp_path), sensor_extension_budget=5.0
+    )
+    se = Sensors.SensorExtensions(base_opts)
+    se._SensorExtensions__se_dict[ext] = {
+        "init_sensor": hook,
+        "asc2eng": hook,
+        "logger_prefix": "sx",
+    }
+    monkeypatch.setattr(Sensors, "sensor_extensions", se)
+    return se
+
+
+def test_extension_stats(sensors):
+    assert Sensors.process_sensor_extensions("asc2eng") == 0
+    assert Sensors.process_logger_func("sx", "asc2eng") == 0
+    assert Sensors.extension_stats() == {
+        (ext, "asc2eng"): {"calls": 2, "secs": 6.0, "skipped": 0}
+    }
+
+    Sensors.merge_extension_stats(
+        {
+            (ext, "asc2eng"): {"calls": 3, "secs": 1.5, "skipped": 1},
+            (ext, "init_sensor"): {"calls": 1, "secs": 0.5, "skipped": 0},
+        }
+    )
+    assert Sensors.extension_stats() == {
+        (ext, "asc2eng"): {"calls": 5, "secs": 7.5, "skipped": 1},
+        (ext, "init_sensor"): {"calls": 1, "secs": 0.5, "skipped": 0},
+    }
+    # A copy - not the live counters
+    Sensors.extension_stats()[(ext, "asc2eng")]["calls"] = 0
+    assert Sensors.extension_stats()[(ext, "asc2eng")]["calls"] == 5
+
+
+def test_extension_budget(sensors):
+    # 3 secs used - under the 5 sec budget
+    assert Sensors.process_sensor_extensions("asc2eng") == 0
+    # 6 secs used - over the budget
+    assert Sensors.process_sensor_extensions("asc2eng") == 0
+    assert BaseLog.log_alerts() == {}
+    assert Sensors.process_sensor_extensions("asc2eng") == 1
+    assert Sensors.process_logger_func("sx", "asc2eng") == 1
+    assert list(BaseLog.log_alerts()) == ["SENSOR_BUDGET_slow_ext.py"]
+    assert len(BaseLog.log_alerts()["SENSOR_BUDGET_slow_ext.py"]) == 2
+    # init_ hooks are never skipped
+    for _ in range(3):
+        assert Sensors.process_sensor_extensions("init_sensor") == 0
+    assert Sensors.extension_stats() == {
+        (ext, "asc2eng"): {"calls": 2, "secs": 6.0, "skipped": 2},
+        (ext, "init_sensor"): {"calls": 3, "secs": 9.0, "skipped": 0},
+    }
+
+    # The budget is per dive
+    Sensors.reset_extension_budget()
+    assert Sensors.process_sensor_extensions("asc2eng") == 0
+    assert Sensors.extension_stats()[(ext, "asc2eng")] == {
+        "calls": 3,
+        "secs": 9.0,
+        "skipped": 2,
+    }
@@ -0,0 +1,63 @@
+# -*- python-fmt -*-
+
+## Copyright (c) 2026  University of Washington.
+##
+## Redistribution and use in source and binary forms, with or without
+## modification, are permitted provided that the following conditions are met:
+##
+## 1. Redistributions of source code must retain the above copyright notice, this
+##    list of conditions and the following disclaimer.
+##
+## 2. Redistributions in binary form must reproduce the above copyright notice,
+##    this list of conditions and the following disclaimer in the documentation
+##    and/or other materials provided with the distribution.
+##
+## 3. Neither the name of the University of Washington nor the names of its
+##    contributors may be used to endorse or promote products derived from this
+##    software without specific prior written permission.
+##
+## THIS SOFTWARE IS PROVIDED BY THE UNIVERSITY OF WASHINGTON AND CONTRIBUTORS “AS
+## IS” AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+## IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+## DISCLAIMED. IN NO EVENT SHALL THE UNIVERSITY OF WASHINGTON OR CONTRIBUTORS BE
+## LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+## CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE
+## GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+## HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+## LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT
+## OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import numpy as np
+import pytest
+
+import TempSalinityVelocity
+
+
+def recurrence_loop(a_v, b_v):
+    x_v = np.zeros(len(a_v))
+    for ii in range(1, len(a_v)):
+        x_v[ii] = a_v[ii] * x_v[ii - 1] + b_v[ii]
+    return x_v
+
+
+@pytest.mark.parametrize("tau", (0.6, 5.0, 200.0))
+def test_first_order_recurrence(tau):
+    # Mode-like coefficients - long enough to decay past the float range,
+    # so the solver has to cut blocks
+    rng = np.random.default_rng(0)
+    n = 20000
+    tau_v = tau * (1.0 + 0.2 * rng.random(n))
+    a_v = np.zeros(n)
+    a_v[1:] = tau_v[1:] * (2 * tau_v[:-1] - 1) / (tau_v[:-1] * (2 * tau_v[1:] + 1))
+    b_v = rng.standard_normal(n)
+
+    x_v = TempSalinityVelocity.first_order_recurrence(a_v, b_v)
+    ref_v = recurrence_loop(a_v, b_v)
+    assert np.allclose(x_v, ref_v, rtol=1e-10, atol=1e-12 * np.max(np.abs(ref_v)))
+
+
+def test_first_order_recurrence_zero_coefficient():
+    a_v = np.array([0.0, 0.5, 0.0, 2.0, 0.5])
+    b_v = np.array([0.0, 1.0, 1.0, 1.0, 1.0])
+    x_v = TempSalinityVelocity.first_order_recurrence(a_v, b_v)
+    assert np.allclose(x_v, recurrence_loop(a_v, b_v))
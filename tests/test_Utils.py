@@ -27,6 +27,9 @@
 ## LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT
 ## OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import os
+
+import numpy as np
 import pytest
 
 import Utils
@@ -75,3 +78,118 @@ def test_run_cmd_shell_timeout(caplog):
 
     assert ret_code is None
     assert fo is None
+
+
+eng_file_text = """%version: 66.12
+%columns: a.x,a.y,a.z
+%data:
+1.0 2.5 NaN
+% a comment
+3 N/A -4e2
+"""
+
+
+def test_read_eng_file(tmp_path):
+    eng_file = tmp_path.joinpath("p1230001.eng")
+    eng_file.write_text(eng_file_text)
+    ef = Utils.read_eng_file(eng_file)
+    assert ef["file_header"] == ["%version: 66.12", "%columns: a.x,a.y,a.z"]
+    assert list(ef["data"]) == ["a.x", "a.y", "a.z"]
+    assert np.array_equal(ef["data"]["a.x"], [1.0, 3.0])
+    assert np.array_equal(ef["data"]["a.y"], [2.5, np.nan], equal_nan=True)
+    assert np.array_equal(ef["data"]["a.z"], [np.nan, -400.0], equal_nan=True)
+
+    # Cached copy is reused until the eng file changes
+    assert Utils.read_eng_file(eng_file, cache=True) is not None
+    cache_file = Utils.eng_file_cache_name(eng_file)
+    assert os.path.exists(cache_file)
+    ef_cached = Utils.read_eng_file(eng_file, cache=True)
+    assert ef_cached["file_header"] == ef["file_header"]
+    for k, v in ef["data"].items():
+        assert np.array_equal(ef_cached["data"][k], v, equal_nan=True)
+    eng_file.write_text(eng_file_text + "5 6 7\n")
+    assert len(Utils.read_eng_file(eng_file, cache=True)["data"]["a.x"]) == 3
+
+    # Malformed lines fall back to the line by line parse, which drops bad values
+    eng_file.write_text(eng_file_text + "8 bad 9 10\n")
+    ef = Utils.read_eng_file(eng_file)
+    assert np.array_equal(ef["data"]["a.y"], [2.5, np.nan, 9.0], equal_nan=True)
+
+
+def test_read_dive_extract(tmp_path):
+    nc_file_name = str(tmp_path.joinpath("p1230001.nc"))
+    with Utils.open_netcdf_file(nc_file_name, "w") as ds:
+        ds.createDimension("sg_data_point", 3)
+        ds.createVariable("depth", "f8", ("sg_data_point",))[:] = [1.0, 2.0, 3.0]
+        ds.createVariable("log_C_VBD", "f8")[:] = 2900.0
+
+    calls = []
+
+    def extract(nc):
+        calls.append(1)
+        return {
+            "depth": nc.variables["depth"][:],
+            "c_vbd": nc.variables["log_C_VBD"].getValue(),
+            "title": "sg123",
+        }
+
+    for _ in range(2):
+        ex = Utils.read_dive_extract(nc_file_name, "test", 1, extract)
+        assert np.array_equal(ex["depth"], [1.0, 2.0, 3.0])
+        assert float(ex["c_vbd"]) == 2900.0
+        assert str(ex["title"]) == "sg123"
+    assert len(calls) == 1
+    assert os.path.exists(Utils.dive_extract_cache_name(nc_file_name, "test"))
+
+    # A new extract version or a changed netcdf file re-reads the file
+    Utils.read_dive_extract(nc_file_name, "test", 2, extract)
+    assert len(calls) == 2
+    with Utils.open_netcdf_file(nc_file_name, "a") as ds:
+        ds.variables["depth"][:] = [4.0, 5.0, 6.0]
+    ex = Utils.read_dive_extract(nc_file_name, "test", 2, extract)
+    assert len(calls) == 3
+    assert np.array_equal(ex["depth"], [4.0, 5.0, 6.0])
+
+    assert (
+        Utils.read_dive_extract(f"{nc_file_name}.missing", "test", 1, extract) is None
+    )
+
+
+def test_pickle_cache(tmp_path):
+    cache_name = str(tmp_path.joinpath(".cache", "p1230001.nc.pkl"))
+    assert Utils.load_pickle_cache(cache_name) is None
+    assert Utils.file_stamp(cache_name) is None
+
+    Utils.save_pickle_cache(cache_name, {"stamp": (1, 2), "dive": [1, 2, 3]})
+    assert Utils.load_pickle_cache(cache_name) == {"stamp": (1, 2), "dive": [1, 2, 3]}
+    st = os.stat(cache_name)
+    assert Utils.file_stamp(cache_name) == (st.st_mtime_ns, st.st_size)
+
+    # A failed write leaves the previous cache and no temporary file
+    Utils.save_pickle_cache(cache_name, {"dive": lambda: None})
+    assert Utils.load_pickle_cache(cache_name)["dive"] == [1, 2, 3]
+    assert os.listdir(os.path.dirname(cache_name)) == ["p1230001.nc.pkl"]
+
+    with open(cache_name, "wb") as fo:
+        fo.write(b"not a pickle")
+    assert Utils.load_pickle_cache(cache_name) is None
+
+
+@pytest.mark.parametrize("L", (2, 3, 15, 60, 99))
+def test_medfilt1(L, monkeypatch):
+    # Small chunks, so the strided middle section is taken in several pieces
+    monkeypatch.setattr(Utils, "medfilt1_chunk_elements", 256)
+    rng = np.random.default_rng(0)
+    x = rng.standard_normal(100)
+    x[[10, 50]] = np.nan
+
+    xout = Utils.medfilt1(x, L)
+
+    # Window shrinks at the edges
+    L = L + 1 if L % 2 == 0 else L
+    Lwing = (L - 1) // 2
+    expected = [
+        np.median(x[max(0, i - Lwing) : min(len(x), i + Lwing + 1)])
+        for i in range(len(x))
+    ]
+    np.testing.assert_array_equal(xout, expected)
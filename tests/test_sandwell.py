@@ -0,0 +1,110 @@
+# -*- python-fmt -*-
+
+## Copyright (c) 2026  University of Washington.
+##
+## Redistribution and use in source and binary forms, with or without
+## modification, are permitted provided that the following conditions are met:
+##
+## 1. Redistributions of source code must retain the above copyright notice, this
+##    list of conditions and the following disclaimer.
+##
+## 2. Redistributions in binary form must reproduce the above copyright notice,
+##    this list of conditions and the following disclaimer in the documentation
+##    and/or other materials provided with the distribution.
+##
+## 3. Neither the name of the University of Washington nor the names of its
+##    contributors may be used to endorse or promote products derived from this
+##    software without specific prior written permission.
+##
+## THIS SOFTWARE IS PROVIDED BY THE UNIVERSITY OF WASHINGTON AND CONTRIBUTORS “AS
+## IS” AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+## IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+## DISCLAIMED. IN NO EVENT SHALL THE UNIVERSITY OF WASHINGTON OR CONTRIBUTORS BE
+## LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+## CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE
+## GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+## HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+## LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT
+## OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import numpy as np
+import pytest
+
+import sandwell
+
+
+@pytest.fixture
+def grid_file(tmp_path):
+    """A sparse, full size grid file with random bathymetry in a band around the equator"""
+    file_path = tmp_path.joinpath("topo.img")
+    with open(file_path, "wb") as fo:
+        fo.truncate(sandwell.nlat * sandwell.nlon * 2)
+    grid = np.memmap(
+        file_path, dtype=sandwell.dtype, mode="r+", shape=(sandwell.nlat, sandwell.nlon)
+    )
+    rng = np.random.default_rng(0)
+    grid[8400:8900, :] = rng.integers(-8000, 3000, (500, sandwell.nlon))
+    grid.flush()
+    del grid
+    return str(file_path)
+
+
+def reference_read(lon_lat, file_path):
+    """Strip by strip read of the grid, as read_grid originally did"""
+    all_lons, all_lats = sandwell.grid_axes()
+    west, east, south, north = lon_lat
+    west %= 360.0
+    east %= 360.0
+    loni1, loni2 = all_lons.searchsorted([west, east]) + 1
+    lati1, lati2 = all_lats.searchsorted([90.0 - north, 90.0 - south]) + 1
+    rows = []
+    with open(file_path, "rb") as f:
+        for i in range(lati1, lati2):
+            f.seek(2 * (i * sandwell.nlon + loni1))
+            if east < west:
+                row = np.fromfile(f, dtype=sandwell.dtype, count=sandwell.nlon - loni1)
+                f.seek(2 * i * sandwell.nlon)
+                row = np.concatenate(
+                    (row, np.fromfile(f, dtype=sandwell.dtype, count=loni2))
+                )
+            else:
+                row = np.fromfile(f, dtype=sandwell.dtype, count=loni2 - loni1)
+            rows.append(row)
+    return np.fliplr(np.array(rows).T)
+
+
+@pytest.mark.parametrize(
+    "lon_lat", [[-1, 1, -2, 2], [179, -179, 0, 1], [10, 30, -3, 0]]
+)
+def test_read_grid(grid_file, lon_lat):
+    lon, lat, bathy = sandwell.read_grid(lon_lat, grid_file)
+    assert bathy.shape == lon.shape == lat.shape
+    assert np.array_equal(bathy, reference_read(lon_lat, grid_file))
+    assert np.all(np.diff(lat, axis=1) > 0)
+
+
+def test_lookup_points(grid_file):
+    lon, lat, bathy = sandwell.read_grid([179, -179, -1, 1], grid_file)
+
+    # Grid points come back exactly, midpoints as the mean of their neighbours
+    ii = np.arange(5, 50, 7)
+    jj = np.arange(3, 24, 3)
+    assert np.array_equal(
+        sandwell.lookup_points(lon[ii, jj], lat[ii, jj], grid_file), bathy[ii, jj]
+    )
+    np.testing.assert_allclose(
+        sandwell.lookup_points(
+            (lon[ii, jj] + lon[ii + 1, jj]) / 2, lat[ii, jj], grid_file
+        ),
+        (bathy[ii, jj] + bathy[ii + 1, jj].astype(np.float64)) / 2,
+    )
+    np.testing.assert_allclose(
+        sandwell.lookup_points(
+            lon[ii, jj], (lat[ii, jj] + lat[ii, jj + 1]) / 2, grid_file
+        ),
+        (bathy[ii, jj] + bathy[ii, jj + 1].astype(np.float64)) / 2,
+    )
+
+    with pytest.raises(ValueError):
+        sandwell.lookup_points([0.0], [85.0], grid_file)
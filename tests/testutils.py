@@ -30,6 +30,7 @@
 
 import os
 import pathlib
+import re
 import shutil
 import time
 from collections.abc import Callable
@@ -86,3 +87,29 @@ def run_mission(
                 bad_errors += f"{record.levelname}:{record.getMessage()}\n"
     if bad_errors:
         pytest.fail(bad_errors)
+
+
+def run_cache_sequence(
+    run_func: Callable[[], None],
+    changed_file: pathlib.Path,
+    num_dives: int,
+    caplog: Any,
+) -> None:
+    """Checks a per-dive cache over three runs - the first fills the cache, the second
+    reuses every dive and the third re-reads the one dive whose file was touched
+
+    Args:
+    run_func: runs the tool once (with its cache enabled) and checks its output
+    changed_file: dive file touched before the third run
+    num_dives: number of dives in the mission
+    caplog: logging capture from pytest fixture - each run must log "<reused> of <num_dives> "
+    """
+    for run, reused in enumerate((0, num_dives, num_dives - 1)):
+        if run == 2:
+            os.utime(changed_file)
+        caplog.clear()
+        run_func()
+        assert any(
+            re.search(rf"\b{reused} of {num_dives} ", record.getMessage())
+            for record in caplog.records
+        ), f"run {run}: no '{reused} of {num_dives}' message"
@@ -31,6 +31,7 @@
 
 import asyncio
 import calendar
+import collections
 import os
 import os.path
 import random
@@ -99,6 +100,101 @@ async def checkClose(conn):
     except ValueError:
         pass
 
+# Per worker pools of read-only connections to the per glider databases.
+# Connections are opened immutable, so a pool - and the column lists and
+# query results cached alongside it - is only good while the database file
+# is unchanged. Pools are dropped when the file stamp changes or when 
+# watchMonitorPublish reports the file was written (see dbWatcher).
+# Holding the connections open also lets sqlite reuse its prepared
+# statements for the queries the dashboard polls with.
+dbPools = {}
+DB_POOL_IDLE = 4      # idle connections kept per database
+DB_RESULT_CACHE = 32  # query results kept per database
+
+async def dbPool(dbfile):
+    try:
+        st = await aiofiles.os.stat(dbfile)
+    except FileNotFoundError:
+        raise aiosqlite.OperationalError(f"{dbfile} not found") from None
+
+    stamp = (st.st_mtime_ns, st.st_size)
+    pool = dbPools.get(dbfile)
+    if pool is None or pool['stamp'] != stamp:
+        await dbPoolClose(dbfile)
+        pool = { 'stamp': stamp, 'idle': [], 'columns': {}, 'results': collections.OrderedDict() }
+        dbPools[dbfile] = pool
+
+    return pool
+
+async def dbPoolClose(dbfile):
+    pool = dbPools.pop(dbfile, None)
+    if pool:
+        while pool['idle']:
+            await checkClose(pool['idle'].pop())
+            Utils.logDB(f'pool close {dbfile}')
+
+async def dbFetch(dbfile, q, rowFactory=None, cache=True):
+    # returns (rows, column names) for query q, raises aiosqlite errors like
+    # a fresh connection would. Cached results are shared between requests
+    # so callers must not modify them
+    pool = await dbPool(dbfile)
+    key = (q, rowFactory)
+    if cache and key in pool['results']:
+        pool['results'].move_to_end(key)
+        return pool['results'][key]
+
+    if pool['idle']:
+        conn = pool['idle'].pop()
+    else:
+        conn = await aiosqlite.connect('file:' + dbfile + '?immutable=1', uri=True)
+        Utils.logDB(f'pool open {dbfile}')
+
+    try:
+        cur = await conn.cursor()
+        cur.row_factory = rowFactory
+        await cur.execute(q)
+        rows = await cur.fetchall()
+        names = [ d[0] for d in cur.description ] if cur.description else []
+        await cur.close()
+    finally:
+        if dbPools.get(dbfile) is pool and len(pool['idle']) < DB_POOL_IDLE:
+            pool['idle'].append(conn)
+        else:
+            await checkClose(conn)
+
+    if cache:
+        pool['results'][key] = (rows, names)
+        if len(pool['results']) > DB_RESULT_CACHE:
+            pool['results'].popitem(last=False)
+
+    return (rows, names)
+
+async def dbColumns(dbfile, table):
+    pool = await dbPool(dbfile)
+    if table not in pool['columns']:
+        (rows, _) = await dbFetch(dbfile, f"PRAGMA table_info({table})", cache=False)
+        if not rows:
+            raise aiosqlite.OperationalError(f"no such table: {table}")
+        pool['columns'][table] = [ r[1] for r in rows ]
+
+    return pool['columns'][table]
+
+async def dbWatcher(app):
+    zsock = zmq.asyncio.Context().socket(zmq.SUB)
+    zsock.setsockopt(zmq.LINGER, 0)
+    zsock.connect(app.config.WATCH_IPC)
+    zsock.setsockopt(zmq.SUBSCRIBE, b"")
+    while True:
+        try:
+            msg = await zsock.recv_multipart()
+            topic = msg[0].decode('utf-8')
+            if '-db-' in topic:
+                await dbPoolClose(loads(msg[1])['full'])
+
+        except BaseException: 
+            zsock.close()
+            return
+
 PERM_INVALID = -1
 PERM_REJECT = 0
 PERM_VIEW   = 1
@@ -415,6 +511,28 @@ def gliderPath(glider, request, mission=None):
     else:
         return f'sg{glider:03d}'
 
+def grepFile(fname, search, prefix, maxHits):
+    # runs in an executor thread - returns up to maxHits matching lines,
+    # each preceeded by prefix
+    try:
+        with open(fname, 'r', errors='replace') as f:
+            text = f.read()
+    except OSError:
+        return []
+
+    # most files have no hits at all - skip the line split for those
+    if search not in text:
+        return []
+
+    hits = []
+    for line in text.splitlines():
+        if search in line:
+            hits.append(prefix + line.strip())
+            if len(hits) >= maxHits:
+                break
+
+    return hits
+
 def baseOpts(instrument_id, mission_dir, module_name):
     cnf_file = os.path.join(mission_dir, f'sg{instrument_id:03d}.conf')
 
@@ -437,27 +555,20 @@ async def getLatestCall(request, glider, conn=None, limit=1, path=None):
         if not await aiofiles.os.path.exists(dbfile):
             return None
 
-        myconn = await aiosqlite.connect('file:' + dbfile + '?immutable=1', uri=True)
-        Utils.logDB(f'getLatestCall open {glider}')
-        myconn.row_factory = rowToDict
-    else:
-        myconn = conn
-
     row = None
+    q = f"SELECT * FROM calls ORDER BY epoch DESC LIMIT {limit};"
+    sanic.log.logger.info(q)
     try:
-        cur = await myconn.cursor()
-        q = f"SELECT * FROM calls ORDER BY epoch DESC LIMIT {limit};"
-        sanic.log.logger.info(q)
-        await cur.execute(q)
-        row = await cur.fetchall()
-        await cur.close()
+        if conn is None:
+            (row, _) = await dbFetch(dbfile, q, rowFactory=rowToDict)
+        else:
+            cur = await conn.cursor()
+            await cur.execute(q)
+            row = await cur.fetchall()
+            await cur.close()
     except Exception as e:
         sanic.log.logger.info(e)
 
-    if conn is None:
-        Utils.logDB(f'getLatestCall close {glider}')
-        await myconn.close()
-
     return row
 
 async def getLatestFile(glider, request, which, dive=None):
@@ -1328,28 +1439,11 @@ def attachHandlers(app: sanic.Sanic):
         dbfile = f'{gliderPath(glider,request)}/sg{glider:03d}.db'
         message = { 'dive': dive, 'parm': [], 'file': [] }
         if await Path(dbfile).exists():
-            async with aiosqlite.connect('file:' + dbfile + '?immutable=1', uri=True) as conn:
-                Utils.logDB(f'deltas open {glider}')
-                conn.row_factory = rowToDict # not async but called from async fetchall
-                cur = await conn.cursor()
-                try:
-                    await cur.execute(f"SELECT * FROM changes WHERE dive={dive} ORDER BY parm ASC;")
-                except aiosqlite.OperationalError as e:
-                    Utils.logDB(f'deltas close (exception) {glider}')
-                    return sanic.response.json({'error': f'db error {e}'})
-
-                message['parm'] = await cur.fetchall()
-
-                try:
-                    await cur.execute(f"SELECT * FROM files WHERE dive={dive} ORDER BY file ASC;")
-                except aiosqlite.OperationalError as e:
-                    Utils.logDB(f'deltas close (exception 2) {glider}')
-                    return sanic.response.json({'error': f'db error {e}'})
-
-                message['file'] = await cur.fetchall()
-                Utils.logDB(f'deltas close {glider}')
-
-            await checkClose(conn)
+            try:
+                (message['parm'], _) = await dbFetch(dbfile, f"SELECT * FROM changes WHERE dive={dive} ORDER BY parm ASC;", rowFactory=rowToDict)
+                (message['file'], _) = await dbFetch(dbfile, f"SELECT * FROM files WHERE dive={dive} ORDER BY file ASC;", rowFactory=rowToDict)
+            except aiosqlite.OperationalError as e:
+                return sanic.response.json({'error': f'db error {e}'})
 
         return sanic.response.json(message)
 
@@ -1378,20 +1472,13 @@ def attachHandlers(app: sanic.Sanic):
             dbfile = f"{m['path']}/sg{m['glider']:03d}.db"
             y = { "first": None, "last": None, "dives": None, "dog": None }             
             if await Path(dbfile).exists():
-                async with aiosqlite.connect('file:' + dbfile + '?immutable=1', uri=True) as conn:
-                    conn.row_factory = rowToDict
-                    cur = await conn.cursor()
-                    try:
-                        await cur.execute("SELECT dive,log_start,distance_over_ground FROM dives ORDER BY dive ASC")
-                        r = await cur.fetchall()
-                        if r and len(r) >= 1:
-                            dog = sum([ (z['distance_over_ground'] if z['distance_over_ground'] else 0) for z in r])
-                            y = { "first": r[0]['log_start'], "last": r[-1]['log_start'], "dives": r[-1]['dive'], "dog": dog }             
-                    except Exception as e:
-                        sanic.log.logger.info(f"exception {e}, {m['glider']}, {m['mission']}")
-                        pass
-
-                await checkClose(conn)
+                try:
+                    (r, _) = await dbFetch(dbfile, "SELECT dive,log_start,distance_over_ground FROM dives ORDER BY dive ASC", rowFactory=rowToDict)
+                    if r and len(r) >= 1:
+                        dog = sum([ (z['distance_over_ground'] if z['distance_over_ground'] else 0) for z in r])
+                        y = { "first": r[0]['log_start'], "last": r[-1]['log_start'], "dives": r[-1]['dive'], "dog": dog }             
+                except Exception as e:
+                    sanic.log.logger.info(f"exception {e}, {m['glider']}, {m['mission']}")
 
             y.update({ k: m[k] for k in m.keys() & fields })
             x.append(y)
@@ -1487,7 +1574,14 @@ def attachHandlers(app: sanic.Sanic):
         else:
             pattern = None
  
-        out = []
+        maxHits = request.app.config.GREP_MAX_HITS
+        if 'max' in request.args and request.args['max'][0].isdigit():
+            maxHits = min(maxHits, int(request.args['max'][0]))
+
+        # work out the dive (and cycle) of each file from its name so files
+        # outside the requested range are never opened and the rest are
+        # searched in dive order
+        todo = []
         for f in files:
             dv = None
             cy = None
@@ -1500,25 +1594,33 @@ def attachHandlers(app: sanic.Sanic):
                     if 'cycle' in m.groupdict():
                         cy = int(m.group("cycle"))
 
-            async with aiofiles.open(f, 'r') as file:
+            todo.append((dv if dv is not None else -1, cy if cy is not None else -1, os.path.basename(f), f, dv, cy))
+
+        todo.sort(key=lambda x: x[0:3])
+
+        # hits are sent back as each file is searched, the searching itself
+        # happens off the event loop
+        response = await request.respond(content_type="text/plain")
+        loop = asyncio.get_running_loop()
+        nHits = 0
+        for _, _, fname, f, dv, cy in todo:
+            add = ''
+            if showdive and dv is not None:
+                add = add + f"{dv:04d} "
+                if cy is not None:
+                    add = add + f"{cy:04d} "
+            if showfile:
+                add = add + f"{fname}: "
+
+            hits = await loop.run_in_executor(None, partial(grepFile, f, search, add, maxHits - nHits))
+            if hits:
+                await response.send(("\n" if nHits else "") + "\n".join(hits))
+                nHits = nHits + len(hits)
+                if nHits >= maxHits:
+                    await response.send(f"\n[stopped after {maxHits} matches]")
+                    break
 
-                async for line in file:
-                    add = ''
-                    if search in line:
-                        if showdive and dv is not None:
-                            add = add + f"{dv:04d} "
-                            if cy is not None:
-                                add = add + f"{cy:04d} "
-                        if showfile:
-                            add = add + f"{os.path.basename(f)}: "
-
-                        add = add + line.strip()
-                        out.append(add)
-
-        if len(files) > 1:
-            out = sorted(out)
-   
-        return sanic.response.text("\n".join(out)) 
+        await response.eof()
                      
     @app.route('/recs/<glider:int>')
     # description: pilot recommendations
@@ -1540,22 +1642,15 @@ def attachHandlers(app: sanic.Sanic):
     async def statusHandler(request, glider:int):
         dbfile = f'{gliderPath(glider,request)}/sg{glider:03d}.db'
         if await Path(dbfile).exists():
-            async with aiosqlite.connect('file:' + dbfile + '?immutable=1', uri=True) as conn:
-                Utils.logDB(f'status open {glider}')
-                cur = await conn.cursor()
-                try:
-                    await cur.execute("SELECT dive FROM dives ORDER BY dive DESC LIMIT 1")
-                except aiosqlite.OperationalError as e:
-                    Utils.logDB(f'status close (exception) {glider}')
-                    return sanic.response.json({'error': f'no table {e}'})
-
-                try:
-                    maxdv = (await cur.fetchone())[0]
-                except Exception:
-                    maxdv = 0
+            try:
+                (rows, _) = await dbFetch(dbfile, "SELECT dive FROM dives ORDER BY dive DESC LIMIT 1")
+            except aiosqlite.OperationalError as e:
+                return sanic.response.json({'error': f'no table {e}'})
 
-                Utils.logDB(f'status close {glider}')
-            await checkClose(conn)
+            try:
+                maxdv = rows[0][0]
+            except Exception:
+                maxdv = 0
             
         else:
             return sanic.response.json({'error': 'file not found'})
@@ -1689,7 +1784,8 @@ def attachHandlers(app: sanic.Sanic):
         softiron = 'softiron' in request.args
         dives = RegressVBD.parseRangeList(dives)
 
-        hard, soft, cover, circ, plt = Magcal.magcal(path, glider, dives, softiron, 'html')
+        # reads the dive netCDF files - runs on the netCDF worker thread
+        hard, soft, cover, circ, plt = await ExtractTimeseries.run_netcdf(Magcal.magcal, path, glider, dives, softiron, 'html')
 
         return sanic.response.html((f'<html>hard0="{hard[0]:.1f} {hard[1]:.1f} {hard[2]:.1f}"<br>'
                                     f'soft0="{soft[0][0]:.3f} {soft[0][1]:.3f} {soft[0][2]:.3f} '
@@ -1713,7 +1809,8 @@ def attachHandlers(app: sanic.Sanic):
 
         mass = float(request.args['mass'][0]) if 'mass' in request.args else None
         
-        bias, hd, vel, rms, log, plt, figs = RegressVBD.regress(path, glider, dives, [depth1, depth2], initBias, mass, 'html', True)
+        # reads the dive netCDF files - runs on the netCDF worker thread
+        bias, hd, vel, rms, log, plt, figs = await ExtractTimeseries.run_netcdf(RegressVBD.regress, path, glider, dives, [depth1, depth2], initBias, mass, 'html', True)
         if rms[1] == 0:
             return sanic.response.html("did not converge")
 
@@ -1763,23 +1860,10 @@ def attachHandlers(app: sanic.Sanic):
         else:
             q = q + " ORDER BY dive ASC;"
 
-        async with aiosqlite.connect('file:' + dbfile + '?immutable=1', uri=True) as conn:
-            Utils.logDB(f'db open {glider}')
-            conn.row_factory = rowToDict # not async but called from async fetchall
-            cur = await conn.cursor()
-            try:
-                await cur.execute(q)
-            except aiosqlite.OperationalError as e:
-                Utils.logDB(f'db close (exception) {glider}')
-                return sanic.response.json({'error': f'no table {e}'})
-
-            data = await cur.fetchall()
-            # r = [dict((cur.description[i][0], value) \
-            #       for i, value in enumerate(row)) for row in data]
-
-            Utils.logDB(f'db close {glider}')
-
-        await checkClose(conn)
+        try:
+            (data, _) = await dbFetch(dbfile, q, rowFactory=rowToDict)
+        except aiosqlite.OperationalError as e:
+            return sanic.response.json({'error': f'no table {e}'})
 
         return sanic.response.json(data)
 
@@ -1808,20 +1892,11 @@ def attachHandlers(app: sanic.Sanic):
         else:
             q = q + f" ORDER BY {col2},dive ASC;"
 
-        async with aiosqlite.connect('file:' + dbfile + '?immutable=1', uri=True) as conn:
-            Utils.logDB(f'changes open {glider}')
-            conn.row_factory = rowToDict # not async but called from async fetchall
-            cur = await conn.cursor()
-            try:
-                await cur.execute(q)
-            except aiosqlite.OperationalError as e:
-                Utils.logDB(f'changes close (exception) {glider}')
-                return sanic.response.json({'error': f'no table {e}'})
-
-            data = await cur.fetchall()
-            Utils.logDB(f'changes close {glider}')
+        try:
+            (data, _) = await dbFetch(dbfile, q, rowFactory=rowToDict)
+        except aiosqlite.OperationalError as e:
+            return sanic.response.json({'error': f'no table {e}'})
 
-        await checkClose(conn)
         return sanic.response.json(data)
 
 
@@ -1835,20 +1910,13 @@ def attachHandlers(app: sanic.Sanic):
         if not await aiofiles.os.path.exists(dbfile):
             return sanic.response.json({'error': 'no db'})
 
-        async with aiosqlite.connect('file:' + dbfile + '?immutable=1', uri=True) as conn:
-            Utils.logDB(f'dbvars open {glider}')
-            cur = await conn.cursor()
-            try:
-                await cur.execute('select * from dives')
-            except aiosqlite.OperationalError as e:
-                Utils.logDB(f'dbvars close (exception) {glider}')
-                return sanic.response.json({'error': f'no table {e}'})
-            names = list(map(lambda x: x[0], cur.description))
-            data = {}
-            data['names'] = names
+        try:
+            names = await dbColumns(dbfile, 'dives')
+        except aiosqlite.OperationalError as e:
+            return sanic.response.json({'error': f'no table {e}'})
 
-            Utils.logDB(f'dbvars close {glider}')
-        await checkClose(conn)
+        data = {}
+        data['names'] = names
         return sanic.response.json(data)
 
     @app.route('/pro/<glider:int>/<whichVar:str>/<whichProfiles:int>/<first:int>/<last:int>/<stride:int>/<top:int>/<bot:int>/<binSize:int>')
@@ -1863,7 +1931,8 @@ def attachHandlers(app: sanic.Sanic):
         if not await aiofiles.os.path.exists(ncfilename):
             return sanic.response.text('no db')
 
-        data = ExtractTimeseries.timeSeriesToProfile(whichVar, whichProfiles, first, last, stride, top, bot, binSize, ncfilename)
+        # extraction runs on the netCDF worker thread against the process level timeseries cache
+        data = await ExtractTimeseries.run_netcdf(ExtractTimeseries.timeSeriesToProfile, whichVar, whichProfiles, first, last, stride, top, bot, binSize, ncfilename, cached=True)
         out = ExtractTimeseries.dumps(data[0]) # need custom serializer for the numpy array
         return sanic.response.raw(out, headers={ 'Content-type': 'application/json' })
 
@@ -1878,7 +1947,10 @@ def attachHandlers(app: sanic.Sanic):
         if not await aiofiles.os.path.exists(ncfilename):
             return sanic.response.json({'error': 'no db'})
 
-        names = ExtractTimeseries.getVarNames(ncfilename)
+        names = await ExtractTimeseries.run_netcdf(ExtractTimeseries.getVarNames, ncfilename, cached=True)
+        if names is None:
+            return sanic.response.json({'error': 'no db'})
+
         names = sorted([ f['var'] for f in names ])
         return sanic.response.json(names)
         
@@ -1898,7 +1970,7 @@ def attachHandlers(app: sanic.Sanic):
         if 'time' in dbVars:
             dbVars.remove('time')
 
-        data = ExtractTimeseries.extractVars(ncfilename, dbVars, dive if dive > 0 else 1, dive if dive > 0 else 100000)
+        data = await ExtractTimeseries.run_netcdf(ExtractTimeseries.extractVars, ncfilename, dbVars, dive if dive > 0 else 1, dive if dive > 0 else 100000, cached=True)
         return sanic.response.json(data)
 
     @app.route('/query/<glider:int>/<queryVars:str>')
@@ -1931,31 +2003,23 @@ def attachHandlers(app: sanic.Sanic):
         else:
             q = f"SELECT {queryVars} FROM dives"
 
-        async with aiosqlite.connect('file:' + dbfile + '?immutable=1', uri=True) as conn:
-            # conn.row_factory = rowToDict
-            Utils.logDB(f'query open {glider}')
-            cur = await conn.cursor()
-            try:
-                await cur.execute(q)
-            except Exception:
-                Utils.logDB(f'query close (except) {glider}')
-                return sanic.response.json({'error': 'db error'})
+        try:
+            (d, names) = await dbFetch(dbfile, q)
+        except Exception:
+            return sanic.response.json({'error': 'db error'})
 
-            d = await cur.fetchall()
-            if format == 'json':
-                data = {}
-                for i in range(len(cur.description)):
-                    data[cur.description[i][0]] = [ f[i] for f in d ]
+        if format == 'json':
+            data = {}
+            for i in range(len(names)):
+                data[names[i]] = [ f[i] for f in d ]
 
-                Utils.logDB(f'query close (return) {glider}')
-                return sanic.response.json(data)
-            else:
-                txt = ''
-                for f in d:
-                    txt = txt + str(f).strip('()') + "\n"
+            return sanic.response.json(data)
+        else:
+            txt = ''
+            for f in d:
+                txt = txt + str(f).strip('()') + "\n"
 
-                Utils.logDB(f'query close (else) {glider}')
-                return sanic.response.text(txt)
+            return sanic.response.text(txt)
                 
 
     @app.route('/selftest/<glider:int>')
@@ -2456,28 +2520,25 @@ def attachHandlers(app: sanic.Sanic):
                 return sanic.response.text('nothing new')
 
         dbfile = f'{gliderPath(glider,request)}/sg{glider:03d}.db'
-        async with aiosqlite.connect('file:' + dbfile + '?immutable=1', uri=True) as conn:
-            try:
-                conn.row_factory = rowToDict
-                cur = await conn.cursor()
-                if recent and newer_t > 0:
-                    q = f"SELECT epoch,lat,lon FROM calls WHERE epoch > {newer_t} ORDER BY epoch ASC;"
-                else: # we might need all of them
-                    q = "SELECT epoch,lat,lon FROM calls ORDER BY epoch ASC;"
-                await cur.execute(q)
-                rows = await cur.fetchall()
-    
-                if not rows or len(rows) == 0 or (newer_t > rows[-1]['epoch']):
-                    return sanic.response.text('nothing new')
+        try:
+            if recent and newer_t > 0:
+                q = f"SELECT epoch,lat,lon FROM calls WHERE epoch > {newer_t} ORDER BY epoch ASC;"
+                (rows, _) = await dbFetch(dbfile, q, rowFactory=rowToDict, cache=False)
+            else: # we might need all of them
+                q = "SELECT epoch,lat,lon FROM calls ORDER BY epoch ASC;"
+                (rows, _) = await dbFetch(dbfile, q, rowFactory=rowToDict)
+
+            if not rows or len(rows) == 0 or (newer_t > rows[-1]['epoch']):
+                return sanic.response.text('nothing new')
 
-                lines = []
-                for r in rows:
-                    line = f"{time.strftime('%Y-%m-%dT%H:%M:%SZ',time.gmtime(r['epoch']))},{r['lat']:.7f},{r['lon']:.7f},0"
-                    lines.append(line)
+            lines = []
+            for r in rows:
+                line = f"{time.strftime('%Y-%m-%dT%H:%M:%SZ',time.gmtime(r['epoch']))},{r['lat']:.7f},{r['lon']:.7f},0"
+                lines.append(line)
 
-                return sanic.response.text('\n'.join(lines))
-            except Exception as e:
-                return sanic.response.text(f'error {e}')
+            return sanic.response.text('\n'.join(lines))
+        except Exception as e:
+            return sanic.response.text(f'error {e}')
 
     @app.route('/pos/poll/<glider:str>')
     # description: get latest glider position
@@ -2527,28 +2588,19 @@ def attachHandlers(app: sanic.Sanic):
             if not await aiofiles.os.path.exists(dbfile):
                 continue
 
-            async with aiosqlite.connect('file:' + dbfile + '?immutable=1', uri=True) as conn:
-                Utils.logDB(f'posPoll open {glider}')
-                try:
-                    conn.row_factory = rowToDict
-                    cur = await conn.cursor()
-                    await cur.execute(q)
-                    row = await cur.fetchone()
-                    if row:
-                        if format == 'json':
-                            Utils.logDB(f'posPoll close 1 {glider}')
-                            row.update({"glider": glider})
-                            out.append(row)
-                        elif format == 'csv':
-                            Utils.logDB(f'posPoll close 2 {glider}')
-                            outs = outs + f"{row['epoch']},{row['lat']},{row['lon']}\n"
-                    else:
-                        Utils.logDB(f'posPoll close 3 {glider}')
-                        # return sanic.response.text('none')
-                except Exception as e:
-                    sanic.log.logger.info(e)
-                    Utils.logDB(f'posPoll close oops {glider}')
-                    return sanic.response.json({'error': 'oops'})
+            try:
+                (rows, _) = await dbFetch(dbfile, q, rowFactory=rowToDict)
+                if rows:
+                    row = rows[0]
+                    if format == 'json':
+                        out.append({ **row, "glider": glider })
+                    elif format == 'csv':
+                        outs = outs + f"{row['epoch']},{row['lat']},{row['lon']}\n"
+                # else:
+                    # return sanic.response.text('none')
+            except Exception as e:
+                sanic.log.logger.info(e)
+                return sanic.response.json({'error': 'oops'})
 
         if format == 'csv':
             return sanic.response.text(outs)
@@ -3399,6 +3451,12 @@ async def buildFilesWatchList(config):
 
                     files[fname] = { "glider": m['glider'], "file": f, "full": fname, "size": sz, "delta": 0, 'config': False, "mission": m['mission'] if m['mission'] else "" } 
 
+                # database writes are published under their own topic (not -file-)
+                # so the stream handlers don't try to relay them, see dbWatcher
+                f = f"sg{m['glider']:03d}.db"
+                fname = f"{m['path']}/{f}" if m['path'] else f"sg{m['glider']:03d}/{f}"
+                files[fname] = { "glider": m['glider'], "file": f, "full": fname, "size": 0, "delta": 0, 'config': False, "mission": m['mission'] if m['mission'] else "", "topic": "db" } 
+
 
 
     return (watcher, files)
@@ -3518,8 +3576,9 @@ async def watchMonitorPublish(config):
                     else:
                         sz = 0
 
-                    msg = [(f"{files[fname]['glider']:03d}-file-{files[fname]['file']}").encode('utf-8'), dumps(files[fname])]
-                    sanic.log.logger.info(f"{files[fname]['glider']:03d}-file-{files[fname]['file']}, {sz}")
+                    topic = f"{files[fname]['glider']:03d}-{files[fname].get('topic', 'file')}-{files[fname]['file']}"
+                    msg = [topic.encode('utf-8'), dumps(files[fname])]
+                    sanic.log.logger.info(f"{topic}, {sz}")
                     await zsock.send_multipart(msg)
 
                 elif len(chartSock):
@@ -3631,9 +3690,13 @@ def createApp(overrides: dict, test=False) -> sanic.Sanic:
         app.config.ALERT = 'ping'
     if 'PILOT_AUTH_TYPE' not in app.config:
         app.config.PILOT_AUTH_TYPE = AUTH_TYPE_ADVANCED
+    if 'GREP_MAX_HITS' not in app.config:
+        app.config.GREP_MAX_HITS = 10000
 
     if isinstance(app.config.PILOT_AUTH_TYPE, str):
         app.config.PILOT_AUTH_TYPE = int(app.config.PILOT_AUTH_TYPE)
+    if isinstance(app.config.GREP_MAX_HITS, str):
+        app.config.GREP_MAX_HITS = int(app.config.GREP_MAX_HITS)
 
     app.config.TEMPLATING_PATH_TO_TEMPLATES=f"{sys.path[0]}/html"
 
@@ -3643,6 +3706,7 @@ def createApp(overrides: dict, test=False) -> sanic.Sanic:
     attachHandlers(app)
 
     app.add_task(configWatcher)
+    app.add_task(dbWatcher)
 
     return app
 
@@ -3668,7 +3732,8 @@ def usage():
     print("  Environment variables: ")
     print("    SANIC_CERTPATH, SANIC_ROOTDIR, SANIC_SECRET, ")
     print("    SANIC_MISSIONS_FILE, SANIC_USERS_FILE, SANIC_FQDN, ")
-    print("    SANIC_USER, SANIC_SINGLE_MISSION, SANIC_ALERT")
+    print("    SANIC_USER, SANIC_SINGLE_MISSION, SANIC_ALERT, ")
+    print("    SANIC_GREP_MAX_HITS (search tool match limit, default 10000)")
 
 if __name__ == '__main__':
 